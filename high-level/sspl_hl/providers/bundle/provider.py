@@ -87,7 +87,11 @@ class SupportBundleProvider(BaseCastorProvider):
         Create bundle success handler
         """
         bundle_name = '{}.tar'.format(bundle_name)
-        if result:
+        if result == 'partial':
+            self.log_warning('Bundling for Bundle_id: {} is Complete, '
+                             'without the files of some SSUs'.
+                             format(bundle_name))
+        elif result:
             self.log_info('Bundling for Bundle_id: {} is Complete'.
                           format(bundle_name))
         else:
@@ -24,9 +24,7 @@ PLEX data provider for getting Halon response messages.
 import threading
 import json
 
-import time
 from twisted.internet import reactor
-from twisted.internet.task import deferLater
 
 # PLEX
 from plex.core import log
@@ -35,6 +33,7 @@ from plex.core import log
 from plex.util.list_util import ensure_list
 from sspl_hl.utils.rabbit_mq_utils import HalondConsumer
 from sspl_hl.utils.base_castor_provider import BaseCastorProvider
+from sspl_hl.utils.response_store import ResponseCorrelator, ResponseTimeout
 
 
 class RMQException(Exception):
@@ -52,11 +51,12 @@ class ResponseProvider(BaseCastorProvider):
     Class to support Halond response message consumption.
     """
 
-    RESPONSE_POLLING_COUNT = 5
+    # Seconds a query waits for its response from Halon
+    RESPONSE_TIMEOUT = 21
 
     def __init__(self, name, description):
         super(ResponseProvider, self).__init__(name, description)
-        self.__message_dict = {}
+        self._responses = ResponseCorrelator(reactor)
 
     def on_create(self):
         """
@@ -92,47 +92,39 @@ class ResponseProvider(BaseCastorProvider):
     def render_query(self, request):
         """ Render query for Response Provider
         """
-        defer_res = deferLater(
-            reactor,
-            1,
-            self._check_and_get_data,
-            ResponseProvider.RESPONSE_POLLING_COUNT,
-            request
-        )
+        reactor.callFromThread(self._wait_for_response, request)
+
+    def _wait_for_response(self, request):
+        """ Reply to request with the response to its message id as soon as
+        it is delivered, in the reactor thread
+        """
+        message_id = request.selection_args.get('messageId')
+        self.log_info('Waiting for Response. MSG_ID: {}'.format(message_id))
+        defer_res = self._responses.wait(
+            message_id, ResponseProvider.RESPONSE_TIMEOUT)
+        defer_res.addCallbacks(json.dumps, self._handle_timeout,
+                               errbackArgs=(message_id,))
         defer_res.addCallback(
             ResponseProvider.handle_success_response, request)
         defer_res.addErrback(
             ResponseProvider.handle_error_response, request)
 
-    def _check_and_get_data(self, count_down, request):
-        """ Fetch data from response cache
+    def _handle_timeout(self, failure, message_id):
+        """ Timeout handler for _wait_for_response
         """
-        poll_count = ResponseProvider.RESPONSE_POLLING_COUNT+1 - count_down
-        time.sleep(poll_count)
-        message_id = request.selection_args.get('messageId')
-        self.log_info('Polling for Response. MSG_ID: {}. Re-try_Count: {}'
-                      .format(message_id, poll_count))
-        if message_id in self.__message_dict.keys():
-            return json.dumps(self.__message_dict.get(message_id))
-        elif count_down > 0:
-            return self._check_and_get_data(count_down-1, request)
-        else:
-            err_msg = "File System Status couldn't be retrieved"
-            err_reply = "Timed out while waiting for response" \
-                        " with message=id :{} from halon".format(message_id)
-            self.log_warning(err_reply)
-            return err_msg
+        failure.trap(ResponseTimeout)
+        err_reply = "Timed out while waiting for response" \
+                    " with message=id :{} from halon".format(message_id)
+        self.log_warning(err_reply)
+        return "File System Status couldn't be retrieved"
 
     def put_response_message(self, body):
         """
-        Read the request extract message_id and put the response
-        message to file with file name as message_id.
+        Read the response, extract its responseId and deliver it to the
+        requests waiting for that message id.
 
         @param body: message body consumed from rabbit-mq queue
         @type body: str
-
-        @param msg_dict: response messages dict
-        @type msg_dict: dict
         """
         log.info('Message received from sspl_hl_resp queue: {}'.
                  format(body))
@@ -152,8 +144,9 @@ class ResponseProvider(BaseCastorProvider):
             log.info("Invalid Msg: response_id not found. Msg: {}".
                      format(message))
             return
-        self.__message_dict[response_id] = message
-        log.info("Updated message dict with:{}:{}".format(
+        # Handed to the requests waiting for it in the reactor thread
+        reactor.callFromThread(self._responses.deliver, response_id, message)
+        log.info("Delivered response:{}:{}".format(
             response_id,
             message)
         )
@@ -26,7 +26,7 @@ from twisted.internet.defer import DeferredList
 from sspl_hl.utils.base_castor_provider import BaseCastorProvider
 from twisted.internet.threads import deferToThread
 from sspl_hl.utils.message_utils import FileSystemStatusQueryRequest
-from sspl_hl.utils.rabbit_mq_utils import HalondPublisher
+from sspl_hl.utils.rabbit_mq_utils import get_halond_publisher
 
 
 class StatusProvider(BaseCastorProvider):
@@ -116,7 +116,7 @@ class StatusProvider(BaseCastorProvider):
         """ Publish status request message to rabbitmq
         """
         message = self._generate_fs_status_req_msg()
-        self.publisher = HalondPublisher(None)
+        self.publisher = get_halond_publisher()
         self.publisher.publish_message(message)
         return message
 
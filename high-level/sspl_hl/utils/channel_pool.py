@@ -0,0 +1,173 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+Pool of long lived publishing channels to RabbitMQ.
+
+Each slot of the pool holds a blocking connection and its channel, opened on
+first use and kept open. A thread publishes on a slot it has to itself, as
+blocking connections are not thread safe. Connection attempts that fail
+are spaced by an exponential backoff, bounded, shared by all the slots:
+while it lasts, publishing fails at once instead of sleeping.
+"""
+
+import Queue
+import threading
+import time
+
+
+class PublishError(Exception):
+
+    """
+    A message could not be published, or the broker did not confirm it.
+    """
+    pass
+
+
+class ChannelPool(object):
+
+    """
+    Pool of connections each with a channel publishing with confirms.
+    """
+
+    # Connections, and so publications in progress at once: as many as
+    #  threads in the reactor thread pool by default
+    POOL_SIZE = 10
+
+    # Seconds before connecting again after a first failure, then doubled
+    #  on every failure up to MAX_BACKOFF
+    INITIAL_BACKOFF = 1
+
+    MAX_BACKOFF = 60
+
+    # Longest wait for a free slot, in seconds
+    ACQUIRE_TIMEOUT = 30
+
+    def __init__(self, connect, errors, size=POOL_SIZE,
+                 initial_backoff=INITIAL_BACKOFF, max_backoff=MAX_BACKOFF,
+                 clock=time.time):
+        """
+        @param connect: opens a connection and returns it with a channel
+                        ready to publish, declarations done and confirms on
+        @type connect: callable returning (connection, channel)
+
+        @param errors: exceptions raised by connect or by a broken channel
+        @type errors: tuple
+        """
+        self._connect = connect
+        self._errors = errors
+        self._initial_backoff = initial_backoff
+        self._max_backoff = max_backoff
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._next_attempt = 0
+        # Last in first out, connections beyond the first are only opened
+        #  for publications at once
+        self._slots = Queue.LifoQueue()
+        for _ in range(size):
+            self._slots.put([None, None])
+
+    def publish(self, exchange, routing_key, body):
+        """
+        Publish body and wait for the broker to confirm it.
+
+        A channel found broken, e.g. the broker restarted since it was last
+        used, is opened again at once, a single time.
+
+        @raise PublishError: no connection could be made, or the message
+                             was not confirmed
+        """
+        try:
+            slot = self._slots.get(timeout=self.ACQUIRE_TIMEOUT)
+        except Queue.Empty:
+            raise PublishError('No channel free after {} secs'.format(
+                self.ACQUIRE_TIMEOUT))
+        try:
+            self._publish(slot, exchange, routing_key, body)
+        finally:
+            self._slots.put(slot)
+
+    def close(self):
+        """
+        Close the connections of the free slots, opened again on next use.
+        """
+        slots = []
+        while True:
+            try:
+                slots.append(self._slots.get_nowait())
+            except Queue.Empty:
+                break
+        for slot in slots:
+            self._close(slot)
+            self._slots.put(slot)
+
+    def connected(self):
+        """
+        @return: number of free slots with an open connection
+        @rtype: int
+        """
+        with self._slots.mutex:
+            return sum(1 for slot in self._slots.queue if slot[1] is not None)
+
+    def _publish(self, slot, exchange, routing_key, body):
+        reopened = slot[1] is None
+        while True:
+            if slot[1] is None:
+                self._open(slot)
+            try:
+                confirmed = slot[1].basic_publish(exchange=exchange,
+                                                  routing_key=routing_key,
+                                                  body=body)
+            except self._errors as err:
+                self._close(slot)
+                if reopened:
+                    raise PublishError('Publish failed. Details: {}'.format(
+                        str(err)))
+                reopened = True
+                continue
+            # With confirms on, False when the broker nacked the message
+            if confirmed is False:
+                raise PublishError('Message not confirmed by the broker')
+            return
+
+    def _open(self, slot):
+        with self._lock:
+            wait = self._next_attempt - self._clock()
+        if wait > 0:
+            raise PublishError('Not connected, next attempt in {:.1f} secs'
+                               .format(wait))
+        try:
+            slot[0], slot[1] = self._connect()
+        except self._errors as err:
+            with self._lock:
+                self._failures += 1
+                backoff = min(self._max_backoff, self._initial_backoff *
+                              2 ** (self._failures - 1))
+                self._next_attempt = self._clock() + backoff
+            raise PublishError('Connection failed, next attempt in {} secs. '
+                               'Details: {}'.format(backoff, str(err)))
+        with self._lock:
+            self._failures = 0
+            self._next_attempt = 0
+
+    def _close(self, slot):
+        connection, slot[0], slot[1] = slot[0], None, None
+        if connection is None:
+            return
+        try:
+            connection.close()
+        except self._errors:
+            pass
@@ -25,8 +25,10 @@ import pika
 import json
 # Local
 from pika.exceptions import AMQPConnectionError, AMQPError
+import threading
 import time
 
+from sspl_hl.utils.channel_pool import ChannelPool, PublishError
 from sspl_hl.utils.message_utils import NodeStatusResponse
 from sspl_hl.utils.message_utils import FileSysStatusResponse
 # PLEX
@@ -244,6 +246,109 @@ class HalondPublisher(HalondRMQ):
                      format(self.exchange, self.routing_key, message))
 
 
+class HalondPublisherPool(RabbitMQConfiguration):
+
+    """
+    Class to define a Halond Rabbit-MQ publisher sharing long lived,
+    confirmed channels between threads.
+
+    Unlike HalondPublisher, nothing is connected until a message is
+    published and a failure to connect is reported at once, the next
+    attempt being delayed by a bounded exponential backoff.
+    """
+
+    def __init__(self, config_file_path, size=ChannelPool.POOL_SIZE):
+        """
+        Initialize the object from a configuration file.
+
+        @param config_file_path: Absolute path to configuration JSON file.
+        @type config_file_path: str
+
+        @param size: Connections, and so messages published at once.
+        @type size: int
+        """
+        super(HalondPublisherPool, self).__init__(config_file_path)
+        self.exchange = 'sspl_hl_cmd'
+        self.routing_key = self.exchange
+        self._pool = ChannelPool(self._connect, (AMQPError,), size=size)
+
+    def _connect(self):
+        """
+        Open a connection and a channel with confirms on, the exchange
+        declared.
+        """
+        connection = pika.BlockingConnection(
+            pika.ConnectionParameters(
+                host=self.host,
+                virtual_host=self.virtual_host,
+                credentials=pika.PlainCredentials(
+                    self.username,
+                    self.password)
+            )
+        )
+        try:
+            channel = connection.channel()
+            channel.exchange_declare(
+                exchange=self.exchange,
+                type=self.exchange_type,
+                auto_delete=False)
+            channel.confirm_delivery()
+        except AMQPError:
+            connection.close()
+            raise
+        log.info('RMQ Publisher connected to Xchange: [{}], type: [{}]'
+                 .format(self.exchange, self.exchange_type))
+        return connection, channel
+
+    def publish_message(self, message):
+        """
+        Publish the message to Halond Rabbit-MQ queue and wait for the
+        broker to confirm it.
+
+        @param message: message to be published to queue.
+        @type message: dict
+
+        @raise PublishError: the message could not be published.
+        """
+        try:
+            self._pool.publish(self.exchange, self.routing_key,
+                               json.dumps(message))
+        except PublishError as err:
+            log.warning(
+                'Message Publish Failed to Xchange: [{}], Key: [{}], Msg: {}. '
+                'Details: {}'.format(self.exchange,
+                                     self.routing_key,
+                                     message,
+                                     str(err)))
+            raise
+        log.info('Message Published to Xchange: [{}], Key: [{}], Msg: {}'.
+                 format(self.exchange, self.routing_key, message))
+
+    def close(self):
+        """
+        Close the idle connections.
+        """
+        self._pool.close()
+
+
+_HALOND_PUBLISHER = None
+_HALOND_PUBLISHER_LOCK = threading.Lock()
+
+
+def get_halond_publisher():
+    """
+    Return the Halond publisher shared by the whole process, created on
+    first call from the default configuration.
+
+    @rtype: HalondPublisherPool
+    """
+    global _HALOND_PUBLISHER  # pylint: disable=global-statement
+    with _HALOND_PUBLISHER_LOCK:
+        if _HALOND_PUBLISHER is None:
+            _HALOND_PUBLISHER = HalondPublisherPool(None)
+        return _HALOND_PUBLISHER
+
+
 class HalonRequestHandler(object):
     # pylint: disable=too-few-public-methods
 
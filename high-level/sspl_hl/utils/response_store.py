@@ -0,0 +1,183 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+Correlation of Halon response messages with the requests waiting for them.
+
+A request waits for the response to its message id on a Deferred, fired as
+soon as the response is delivered. Every response delivered is also kept,
+for the requests to come or repeated, in a store bounded in size whose
+entries expire after a TTL. Both classes must only be used from the
+reactor thread.
+"""
+
+from collections import OrderedDict
+
+from twisted.internet import defer
+
+
+class ResponseTimeout(Exception):
+
+    """
+    No response was delivered for a message id in time.
+    """
+    pass
+
+
+class TTLStore(object):
+
+    """
+    Dict like store whose entries expire ttl seconds after they were put,
+    the oldest ones being evicted when it holds more than max_size.
+    """
+
+    def __init__(self, clock, ttl, max_size):
+        """
+        @param clock: provider of the current time, e.g. the reactor
+        @type clock: L{twisted.internet.interfaces.IReactorTime}
+        """
+        self._clock = clock
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        self.evict()
+        return len(self._entries)
+
+    def __contains__(self, key):
+        self.evict()
+        return key in self._entries
+
+    def put(self, key, value):
+        """
+        Store value under key, replacing and renewing any previous one.
+        """
+        self._entries.pop(key, None)
+        self._entries[key] = (self._clock.seconds() + self._ttl, value)
+        self.evict()
+
+    def get(self, key, default=None):
+        """
+        Return the value of key, default if there is none.
+        """
+        self.evict()
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        return entry[1]
+
+    def pop(self, key, default=None):
+        """
+        Remove and return the value of key, default if there is none.
+        """
+        self.evict()
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        return entry[1]
+
+    def evict(self):
+        """
+        Drop the expired entries, then the oldest ones beyond max_size.
+        """
+        now = self._clock.seconds()
+        while self._entries:
+            key, (expires, _) = next(iter(self._entries.items()))
+            if expires > now and len(self._entries) <= self._max_size:
+                break
+            del self._entries[key]
+
+
+class ResponseCorrelator(object):
+
+    """
+    Hands each response delivered to the requests waiting for its id.
+    """
+
+    # Seconds a response is kept for the requests to come
+    RESPONSE_TTL = 300
+
+    # Most responses kept
+    MAX_RESPONSES = 10000
+
+    def __init__(self, clock, ttl=RESPONSE_TTL, max_size=MAX_RESPONSES):
+        """
+        @param clock: the reactor, or a L{twisted.internet.task.Clock}
+        @type clock: L{twisted.internet.interfaces.IReactorTime}
+        """
+        self._clock = clock
+        self._waiters = {}
+        self._responses = TTLStore(clock, ttl, max_size)
+
+    def wait(self, message_id, timeout):
+        """
+        Wait for the response to message_id.
+
+        @return: Deferred firing with the response, or failing with
+                 L{ResponseTimeout} after timeout seconds. Cancelling it
+                 stops the wait.
+        @rtype: L{twisted.internet.defer.Deferred}
+        """
+        if message_id in self._responses:
+            return defer.succeed(self._responses.get(message_id))
+
+        def cancel(deferred):
+            self._forget(message_id, deferred)
+            if timeout_call.active():
+                timeout_call.cancel()
+
+        deferred = defer.Deferred(cancel)
+        timeout_call = self._clock.callLater(
+            timeout, self._time_out, message_id, deferred)
+        self._waiters.setdefault(message_id, []).append(
+            (deferred, timeout_call))
+        return deferred
+
+    def deliver(self, message_id, response):
+        """
+        Fire the Deferreds waiting for message_id with response, and keep it
+        for the requests to come, repeated queries included.
+        """
+        self._responses.put(message_id, response)
+        for deferred, timeout_call in self._waiters.pop(message_id, []):
+            timeout_call.cancel()
+            deferred.callback(response)
+
+    def pending(self):
+        """
+        @return: number of requests waiting for a response
+        @rtype: int
+        """
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def stored(self):
+        """
+        @return: number of responses kept for requests to come
+        @rtype: int
+        """
+        return len(self._responses)
+
+    def _forget(self, message_id, deferred):
+        waiters = self._waiters.get(message_id, [])
+        waiters[:] = [waiter for waiter in waiters
+                      if waiter[0] is not deferred]
+        if not waiters:
+            self._waiters.pop(message_id, None)
+
+    def _time_out(self, message_id, deferred):
+        self._forget(message_id, deferred)
+        deferred.errback(ResponseTimeout(
+            "No response with message id {} in time".format(message_id)))
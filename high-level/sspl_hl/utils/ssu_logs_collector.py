@@ -21,11 +21,13 @@ as the input.
 
 
 import subprocess
+import glob
 import os
 import shutil
 import sys
 import json
 import socket
+import tarfile
 
 # NOTE:- Since this script will be triggered by mco we will not be
 # showing detailed output/Errors on the screens, instead return codes.
@@ -38,9 +40,9 @@ import socket
 # 3 : Command lines arguments not supplied
 # 4 : Could not create tmp/bundle directory
 # 5 : Some commands could not be executed
-# 6 : Files cannot be copied to /tmp/bundle
+# 6 : Files cannot be added to the tar bundle
 # 7 : Tar bundle could not be created
-# 8 : Tar Bundle could not be send to SSU
+# 8 : Tar Bundle could not be send to CMU
 # 9 : Clean up Failed
 # Note: Detailed input params for debugging purposes as follows:
 # '{"action": ["m0reportbug", "mv -f m0reportbug-data.tar.gz /tmp/bundle/"],
@@ -60,7 +62,10 @@ class RemoteFileCollector(object):
     """
 
     BUNDLE_TMP_DIR = '/tmp/bundle'
-    BUNDLE_TAR = '{}.tar'.format(BUNDLE_TMP_DIR)
+    BUNDLE_LOG = '{}.log'.format(BUNDLE_TMP_DIR)
+    # Names of config.NODE_BUNDLE_FILE and NODE_BUNDLE_TMP_SUFFIX on the CMU
+    BUNDLE_FILE = 'bundle.tar.gz'
+    BUNDLE_TMP_SUFFIX = '.part'
 
     def __init__(self, collection_rules):
         self._rule = json.loads(collection_rules)
@@ -84,8 +89,7 @@ class RemoteFileCollector(object):
     def collect(self):
         """Collect files from remote nodes"""
         if self._execute_actions():
-            if self._collect_files():
-                self._send_tar_bundle()
+            self._send_bundle()
         self.clean_up()
 
     def _execute_actions(self):
@@ -112,9 +116,6 @@ class RemoteFileCollector(object):
             if os.path.exists(RemoteFileCollector.BUNDLE_TMP_DIR):
                 shutil.rmtree(RemoteFileCollector.BUNDLE_TMP_DIR)
                 log('Older bundle directory is removed!')
-            if os.path.exists(RemoteFileCollector.BUNDLE_TAR):
-                os.remove(RemoteFileCollector.BUNDLE_TAR)
-                log('Older bundle.tar is removed!')
             os.mkdir(RemoteFileCollector.BUNDLE_TMP_DIR)
             log('Tmp bundle, {} dir Successfully Created'.format(
                 RemoteFileCollector.BUNDLE_TMP_DIR))
@@ -129,42 +130,82 @@ class RemoteFileCollector(object):
             print 4
             return False
 
-    def _collect_files(self):
+    def _send_bundle(self):
         """
-        Collect files into local bucket and create a tar ball
+        Stream the outputs of the actions and the files, compressed as a
+        tar, straight to the bucket of the CMU. Nothing is copied or
+        tarred in /tmp on the way. The tar is streamed under a temporary
+        name, renamed once complete and removed if it could not be.
         """
-        self._copy_files_to_local_bucket()
-
-        tar_cmd = 'tar -cf {} -C /tmp bundle'.format(
-            RemoteFileCollector.BUNDLE_TAR
-        )
-        if self._execute_command(tar_cmd):
-            log('Bundle package created. bundle.tar')
-            return True
-        else:
-            log('Bundle package Failed to tarred. Command: {}'.format(
-                tar_cmd), 3)
+        bundle = os.path.join(self._bucket, RemoteFileCollector.BUNDLE_FILE)
+        partial = bundle + RemoteFileCollector.BUNDLE_TMP_SUFFIX
+        cmd = self._cmu_command('cat > {}'.format(partial))
+        log('Sending the tar bundle to CMU: {}'.format(' '.join(cmd)))
+        try:
+            ssh = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        except OSError as err:
+            log('Tar bundle CANNOT be sent to CMU. Details: {}'.format(err), 3)
+            print 8
+            return
+        created = False
+        try:
+            with tarfile.open(fileobj=ssh.stdin, mode='w|gz') as tar:
+                tar.add(RemoteFileCollector.BUNDLE_TMP_DIR, arcname='bundle')
+                self._add_files(tar)
+                if LOGGER:
+                    LOGGER.flush()
+                    tar.add(RemoteFileCollector.BUNDLE_LOG,
+                            arcname='bundle.log')
+            created = True
+        except (OSError, IOError, tarfile.TarError) as err:
+            log('Tar bundle could not be created. Details: {}'.format(err), 3)
             print 7
+        finally:
+            ssh.stdin.close()
+        sent = ssh.wait() == 0
+        if created and sent and self._run_on_cmu(
+                'mv -f {} {}'.format(partial, bundle)):
+            log('Tar ball Successfully Sent.')
+            return
+        if created:
+            log('Tar bundle CANNOT be sent to CMU', 3)
+            print 8
+        self._run_on_cmu('rm -f {}'.format(partial))
+
+    def _cmu_command(self, command):
+        """
+        Return the ssh command running command on the CMU
+        """
+        return ['ssh', 'root@{}'.format(self._node_name), command]
+
+    def _run_on_cmu(self, command):
+        """
+        Run command on the CMU, return True if it succeeded
+        """
+        try:
+            return subprocess.call(self._cmu_command(command)) == 0
+        except OSError as err:
+            log('Command: {} failed on CMU. Details: {}'.format(command, err),
+                3)
             return False
 
-    def _copy_files_to_local_bucket(self):
+    def _add_files(self, tar):
         """
-        Copy each file mentioned in the list to remote bundle package
+        Add each file mentioned in the list to the bundle package
         """
-        copy_count = 0
-        for _file in self._files:
-            try:
-                shutil.copy(_file, RemoteFileCollector.BUNDLE_TMP_DIR)
-                log('File collected successfully: [{}]'.format(_file))
-                copy_count += 1
-            except (OSError, IOError) as err:
-                log('Failed to collect bundle directory: {}. Details: {}'
-                    .format(_file, str(err)))
-        if copy_count < 1 and len(self._files) > 0:
+        added = 0
+        for pattern in self._files:
+            for _file in glob.glob(pattern) or [pattern]:
+                try:
+                    tar.add(_file, arcname=os.path.join(
+                        'bundle', os.path.basename(_file)))
+                    log('File collected successfully: [{}]'.format(_file))
+                    added += 1
+                except (OSError, IOError) as err:
+                    log('Failed to collect file: {}. Details: {}'
+                        .format(_file, str(err)))
+        if added < 1 and len(self._files) > 0:
             print 6
-            return False
-        else:
-            return True
 
     @staticmethod
     def _execute_command(command):
@@ -180,22 +221,6 @@ class RemoteFileCollector(object):
             return None
         return result
 
-    def _send_tar_bundle(self):
-        """
-        Get the file from remote node
-        """
-        cmd = 'scp {}.* root@{}:{}/ '.format(
-            RemoteFileCollector.BUNDLE_TMP_DIR,
-            self._node_name,
-            self._bucket
-        )
-        log('Sending the tar file to CMU')
-        if self._execute_command(cmd):
-            log('Tar ball Successfully Sent.')
-        else:
-            log('Tar bundle CANNOT be sent to CMU', 3)
-            print 8
-
     def clean_up(self):
         """
         Clean the tar bundle
@@ -129,6 +129,34 @@ def bundle_files(target_files, target_path):
         error(why=str(extra_info))
 
 
+def get_node_bundle_path(bundle_name, node):
+    """
+    Return the path of the tar of the files of node in the bundle
+    """
+    return os.path.join(config.BASE_BUCKET_PATH, bundle_name, 'nodes', node,
+                        config.NODE_BUNDLE_FILE)
+
+
+def check_node_bundles(bundle_name, nodes_list):
+    """
+    Remove the tars of the nodes left incomplete, e.g. by a collection
+    which failed part way, and return the nodes without a complete tar.
+    """
+    missing = []
+    for node in nodes_list:
+        path = get_node_bundle_path(bundle_name, node)
+        partial = path + config.NODE_BUNDLE_TMP_SUFFIX
+        if os.path.exists(partial):
+            try:
+                os.remove(partial)
+            except OSError as err:
+                error(why='{} could not be removed. Details: {}'.format(
+                    partial, str(err)))
+        if not os.path.isfile(path):
+            missing.append(node)
+    return missing
+
+
 def get_bundle_dir_config(dir_struct_info, nodes_list, bundle_name):
     """
     Returns the bundle directory structure in json
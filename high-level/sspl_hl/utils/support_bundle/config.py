@@ -37,6 +37,19 @@ BUNDLE_TMP_DIR = '/tmp/bundle/'
 
 SUPPORT_BUNDLE_DIR_STRUCTURE = {"nodes": {}, "logs": {}, PLEX_LOGS: {}}
 
+# Compressed tar of the files of an SSU, in nodes/<ssu>/ of the bundle. It
+#  is written with NODE_BUNDLE_TMP_SUFFIX appended and renamed once
+#  complete, ssu_logs_collector.py uses the same names.
+NODE_BUNDLE_FILE = 'bundle.tar.gz'
+NODE_BUNDLE_TMP_SUFFIX = '.part'
+
+# How the files of the SSUs are collected:
+#  'stream': read by the CMU over SFTP straight into the tar of each SSU,
+#            MAX_PARALLEL_NODES SSUs at once
+#  'mco': each SSU runs ssu_logs_collector.py and sends its own tar
+REMOTE_COLLECTION = 'stream'
+MAX_PARALLEL_NODES = 4
+
 
 def get_decision_logs_command():
     """Query Halon interface and get the decision log node
@@ -0,0 +1,391 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+Streams the files of cluster nodes into a compressed tar bundle per node.
+
+Each file is read from its node and written into a member of the tar of the
+node as it is read, without any copy on either side. Each node has a worker
+of its own, a semaphore bounds the workers collecting at once. A file or a
+node which cannot be read is reported and skipped, the bundle keeps what
+could be collected and a report lists the nodes which failed.
+"""
+
+import fnmatch
+import json
+import os
+import stat
+import tarfile
+import threading
+from collections import namedtuple
+
+# Outcome of the collection of a node: path of its tar, or None if nothing
+#  could be collected, files and bytes collected and the errors met
+NodeResult = namedtuple('NodeResult', 'node path files bytes errors')
+
+
+class NodeFiles(object):
+
+    """
+    Files of a node, read by BundleStreamer.
+
+    Patterns may only have wildcards in their last component, e.g.
+    /var/crash/*. Directories are collected with all they contain.
+    """
+
+    # Exceptions raised by a node which cannot be read
+    ERRORS = (IOError, OSError)
+
+    def __init__(self, name):
+        self.name = name
+
+    def prepare(self):
+        """
+        Called before the files are read, e.g. to connect to the node.
+        """
+        pass
+
+    def close(self):
+        """
+        Called once the files were read, even if preparing failed.
+        """
+        pass
+
+    def stat(self, path):
+        """
+        @return: attributes of path, following links
+        @rtype: object with st_mode, st_size and st_mtime
+        """
+        raise NotImplementedError
+
+    def listdir(self, path):
+        """
+        @return: names of the entries of the directory path
+        @rtype: list
+        """
+        raise NotImplementedError
+
+    def open(self, path):
+        """
+        @return: path opened for reading in binary mode
+        @rtype: file like object
+        """
+        raise NotImplementedError
+
+    def find(self, pattern):
+        """
+        Yield (path, attributes) of the regular files matching pattern and
+        of the files below the directories matching it.
+        """
+        directory, name = os.path.split(pattern)
+        if any(char in name for char in '*?['):
+            paths = [os.path.join(directory, entry)
+                     for entry in sorted(self.listdir(directory))
+                     if fnmatch.fnmatch(entry, name)]
+        else:
+            paths = [pattern]
+        for path in paths:
+            for found in self._walk(path):
+                yield found
+
+    def _walk(self, path):
+        attributes = self.stat(path)
+        if stat.S_ISREG(attributes.st_mode):
+            yield path, attributes
+        elif stat.S_ISDIR(attributes.st_mode):
+            for entry in sorted(self.listdir(path)):
+                for found in self._walk(os.path.join(path, entry)):
+                    yield found
+
+
+class LocalNodeFiles(NodeFiles):
+
+    """
+    Files of this host below root, named as if root was /.
+    """
+
+    def __init__(self, name, root='/'):
+        super(LocalNodeFiles, self).__init__(name)
+        self._root = root
+
+    def _local(self, path):
+        return os.path.join(self._root, path.lstrip('/'))
+
+    def stat(self, path):
+        return os.stat(self._local(path))
+
+    def listdir(self, path):
+        return os.listdir(self._local(path))
+
+    def open(self, path):
+        return open(self._local(path), 'rb')
+
+
+class SftpNodeFiles(NodeFiles):
+
+    """
+    Files of a node read through a paramiko SFTP client.
+    """
+
+    # Request the whole of a file at once rather than a block per round
+    #  trip while reading it
+    PREFETCH = True
+
+    def __init__(self, name, sftp=None):
+        super(SftpNodeFiles, self).__init__(name)
+        self.sftp = sftp
+
+    def stat(self, path):
+        return self.sftp.stat(path)
+
+    def listdir(self, path):
+        return self.sftp.listdir(path)
+
+    def open(self, path):
+        remote_file = self.sftp.open(path, 'rb')
+        if self.PREFETCH:
+            remote_file.prefetch()
+        return remote_file
+
+
+class _MemberReader(object):
+    # pylint: disable=too-few-public-methods
+
+    """
+    Reads exactly size bytes of a file for its tar member: the end of a
+    file grown since it was listed is left out, a file shrunk or failing
+    to be read is padded with zeros so the tar stays readable.
+    """
+
+    def __init__(self, source, size, errors):
+        self._source = source
+        self._left = size
+        self._errors = errors
+        self.error = None
+
+    def read(self, size):
+        size = min(size, self._left)
+        data = ''
+        if self._source is not None:
+            try:
+                data = self._source.read(size)
+            except self._errors as err:
+                self.error = err
+                self._source = None
+            if not data and size:
+                self._source = None
+        if len(data) < size:
+            if self.error is None:
+                self.error = IOError('File shrunk while collected')
+            data += '\0' * (size - len(data))
+        self._left -= len(data)
+        return data
+
+
+class BundleStreamer(object):
+
+    """
+    Collects the files of nodes into <bucket>/<node>.tar.gz, several nodes
+    at once. A tar is written under a temporary name and only renamed once
+    complete, so a tar of the bucket is never truncated.
+    """
+
+    # Nodes collected at once
+    MAX_PARALLEL = 4
+
+    # Fastest compression: the higher levels divide the throughput of gzip
+    #  by ten for a few percents less, and much of what is collected, e.g.
+    #  the m0reportbug archives, is compressed already
+    COMPRESS_LEVEL = 1
+
+    REPORT_FILE = 'collection_report.json'
+
+    # Suffix of a tar while it is written
+    PARTIAL_SUFFIX = '.part'
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, bucket, logger, max_parallel=MAX_PARALLEL,
+                 compression='gz', compresslevel=COMPRESS_LEVEL,
+                 progress=None, bundle_name='{}.tar'):
+        """
+        @param bucket: directory the tar of each node is written in
+        @type bucket: str
+
+        @param bundle_name: path of the tar of a node in bucket, formatted
+                            with the name of the node, before the extension
+                            of the compression
+        @type bundle_name: str
+
+        @param compression: tarfile compression, 'gz', 'bz2' or ''
+        @type compression: str
+
+        @param compresslevel: level of the compression, 1 to 9
+        @type compresslevel: int
+
+        @param progress: called with the name of a node, the files and bytes
+                         collected so far on it, after each file
+        @type progress: callable
+        """
+        self._bucket = bucket
+        self.logger = logger
+        self._max_parallel = max_parallel
+        self._compression = compression
+        self._compresslevel = compresslevel
+        self._progress = progress
+        self._bundle_name = bundle_name
+
+    def collect(self, nodes, patterns):
+        """
+        Collect the files matching patterns on nodes, at most max_parallel
+        at once, and write a report of the collection in the bucket.
+
+        @return: the result of each node, in the order of nodes
+        @rtype: list of NodeResult
+        """
+        results = [None] * len(nodes)
+        slots = threading.BoundedSemaphore(self._max_parallel)
+
+        def worker(index, node):
+            with slots:
+                try:
+                    results[index] = self.collect_node(node, patterns)
+                except Exception as err:  # pylint: disable=broad-except
+                    self.logger.warning('Collection from node {} failed. '
+                                        'Details: {}'.format(node.name,
+                                                             str(err)))
+                    results[index] = NodeResult(node.name, None, 0, 0,
+                                                [str(err)])
+
+        workers = [threading.Thread(target=worker, args=(index, node),
+                                    name='BundleStreamer-' + node.name)
+                   for index, node in enumerate(nodes)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        self.write_report(results)
+        return results
+
+    def bundle_path(self, name):
+        """
+        @return: path of the tar of the node name
+        @rtype: str
+        """
+        return os.path.join(self._bucket, self._bundle_name.format(name) +
+                            (self._compression and '.' + self._compression))
+
+    def collect_node(self, node, patterns):
+        """
+        Collect the files matching patterns on node.
+
+        @rtype: NodeResult
+        """
+        path = None
+        bundle_path = self.bundle_path(node.name)
+        partial = bundle_path + self.PARTIAL_SUFFIX
+        if not os.path.isdir(os.path.dirname(bundle_path)):
+            os.makedirs(os.path.dirname(bundle_path))
+        errors = []
+        collected = [0, 0]
+        self.logger.info('Collection from node {} started'.format(node.name))
+        try:
+            node.prepare()
+            options = {'compresslevel': self._compresslevel} \
+                if self._compression else {}
+            with tarfile.open(partial, 'w:' + self._compression,
+                              **options) as bundle:
+                for pattern in patterns:
+                    self._add_pattern(node, pattern, bundle, collected,
+                                      errors)
+            if collected[0]:
+                os.rename(partial, bundle_path)
+                path = bundle_path
+        except node.ERRORS as err:
+            errors.append('Node {} could not be read. Details: {}'.format(
+                node.name, str(err)))
+        finally:
+            try:
+                node.close()
+            except node.ERRORS as err:
+                errors.append('Node {} could not be closed. Details: '
+                              '{}'.format(node.name, str(err)))
+            if os.path.exists(partial):
+                os.remove(partial)
+        for error in errors:
+            self.logger.warning(error)
+        self.logger.info('Collection from node {} completed: {} files, {} '
+                         'bytes, {} errors'.format(node.name, collected[0],
+                                                   collected[1], len(errors)))
+        return NodeResult(node.name, path, collected[0], collected[1],
+                          errors)
+
+    def write_report(self, results):
+        """
+        Write the result of each node to the report of the bucket, and the
+        nodes nothing could be collected from or with errors.
+        """
+        report = {
+            'nodes': dict((result.node, result._asdict())
+                          for result in results),
+            'failed': [result.node for result in results
+                       if result.path is None],
+            'incomplete': [result.node for result in results
+                           if result.path is not None and result.errors]
+        }
+        if report['failed'] or report['incomplete']:
+            self.logger.warning('Partial collection, failed nodes: {}, '
+                                'incomplete nodes: {}'.format(
+                                    report['failed'], report['incomplete']))
+        with open(os.path.join(self._bucket, self.REPORT_FILE), 'w') as out:
+            json.dump(report, out, indent=2, sort_keys=True)
+
+    # pylint: disable=too-many-arguments
+    def _add_pattern(self, node, pattern, bundle, collected, errors):
+        try:
+            for path, attributes in node.find(pattern):
+                if self._add_file(node, path, attributes, bundle, errors):
+                    collected[0] += 1
+                    collected[1] += attributes.st_size
+                    if self._progress:
+                        self._progress(node.name, collected[0], collected[1])
+        except node.ERRORS as err:
+            errors.append('{} could not be listed on {}. Details: {}'.format(
+                pattern, node.name, str(err)))
+
+    # pylint: disable=too-many-arguments
+    @staticmethod
+    def _add_file(node, path, attributes, bundle, errors):
+        try:
+            source = node.open(path)
+        except node.ERRORS as err:
+            errors.append('{} could not be read on {}. Details: {}'.format(
+                path, node.name, str(err)))
+            return False
+        info = tarfile.TarInfo(path.lstrip('/'))
+        info.size = attributes.st_size
+        info.mtime = attributes.st_mtime
+        info.mode = stat.S_IMODE(attributes.st_mode)
+        reader = _MemberReader(source, info.size, node.ERRORS)
+        try:
+            bundle.addfile(info, reader)
+        finally:
+            try:
+                source.close()
+            except node.ERRORS:
+                pass
+        if reader.error is not None:
+            errors.append('{} on {} is incomplete. Details: {}'.format(
+                path, node.name, str(reader.error)))
+        return True
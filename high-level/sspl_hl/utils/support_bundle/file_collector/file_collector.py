@@ -25,7 +25,9 @@ from sspl_hl.utils.cluster_node_manager.node_communication_handler import \
     SSHException
 from sspl_hl.utils.support_bundle.config import \
     ACTION, BUCKET, FILES, MISC, TRACE_ENABLED_SSU_BUNDLING, \
-    LOCAL_CLEANUP, BUNDLE_TMP_DIR, REMOTE_CLEANUP
+    LOCAL_CLEANUP, BUNDLE_TMP_DIR, REMOTE_CLEANUP, NODE_BUNDLE_FILE
+from sspl_hl.utils.support_bundle.file_collector.bundle_streamer import \
+    BundleStreamer, SftpNodeFiles
 from sspl_hl.utils.common import execute_shell
 import os
 import shutil
@@ -198,85 +200,100 @@ class LocalFileCollector(FileCollector):
                                     format(rm_cmd, str(err)))
 
 
-class RemoteFileCollector(FileCollector):
-    # pylint: disable=too-few-public-methods
+class RemoteNodeFiles(SftpNodeFiles):
     """
-    Collects files from the Remote machine
+    Files of a remote node, read over SFTP once the actions of the
+    collection rules have run on it.
     """
 
-    def __init__(self, host, collection_rules):
-        super(RemoteFileCollector, self).__init__(host, collection_rules)
-        self._channel = NodeCommunicationHandler(
-            Node(host))
+    ERRORS = (IOError, OSError, SSHException)
 
-    def collect(self):
+    def __init__(self, host, actions, logger=plex_log):
+        super(RemoteNodeFiles, self).__init__(host)
+        self._channel = NodeCommunicationHandler(Node(host))
+        self._actions = actions
+        self.logger = logger
+
+    def prepare(self):
         """
-        Collect the bundle from the cluster
+        Connect to the node and run the actions
         """
-        try:
-            self._channel.establish_connection()
-            self._channel.open_ftp_channel()
-            self._execute_actions()
-            self._collect_files()
-            self._clean_up()
-            self._channel.close_connection()
-        except (SSHException, IOError) as extra_info:
-            err = 'Error occurred during remote file collection. Details: {}'\
-                .format(str(extra_info))
-            self.logger.warning(err)
+        self._channel.establish_connection()
+        if self._channel.ssh.get_transport() is None:
+            raise IOError('Connection to {} failed'.format(self.name))
+        self._channel.open_ftp_channel()
+        self.sftp = self._channel.sftp
+        if self.sftp is None:
+            raise IOError('SFTP channel to {} failed'.format(self.name))
+        self._run('mkdir -p {}'.format(BUNDLE_TMP_DIR))
+        for action in self._actions:
+            if self._run(action) != 0:
+                self.logger.warning('Action: {} Failed on host: {}'.format(
+                    action, self.name))
 
-    def _collect_files(self):
+    def close(self):
         """
-        Collect files from remote nodes and copy it to bucket
+        Clean all the temp files and the directory and disconnect
         """
-        remote_file = '{}bundle.tar'.format(self._bucket)
-        self._create_bundle_on_remote_host()
-        self._channel.get_file('/tmp/bundle.tar', remote_file)
+        if self.sftp is not None:
+            for _file in REMOTE_CLEANUP:
+                self._run('rm -rf {}'.format(_file))
+        self._channel.close_connection()
 
-    def _create_bundle_on_remote_host(self):
+    def _run(self, command):
         """
-        Copy each file mentioned in the list to remote bundle package
+        Execute command on the node and wait for it to complete.
+
+        @return: exit status of command, None if it could not be executed
         """
-        tar_cmd = 'tar -cf /tmp/bundle.tar -C /tmp bundle'
-        for _file in self._files:
-            cp_file_cmd = 'cp {} /tmp/bundle/'.format(_file)
-            self._channel.execute_command(cp_file_cmd)
-        self._channel.execute_command(tar_cmd)
+        result = self._channel.execute_command(command)
+        if result is None:
+            return None
+        return result[1].channel.recv_exit_status()
 
-    def _execute_actions(self):
+
+class RemoteFileCollector(FileCollector):
+    # pylint: disable=too-few-public-methods
+    """
+    Collects files from the Remote machines, several at once, each into the
+    compressed tar nodes/<host>/bundle.tar.gz of the bundle. The files are
+    streamed over SFTP, nothing is copied on the remote machines.
+    """
+
+    def __init__(self, collection_rules,
+                 max_parallel=BundleStreamer.MAX_PARALLEL):
         """
-        Execute the actions
+        @param collection_rules: rules of each host, by host name
+        @type collection_rules: dict
         """
-        self._create_tmp_bundle_directory()
-        for action in self._actions:
-            try:
-                self._channel.execute_command(action)
-            except SSHException:
-                # todo: Log the failure and continue
-                pass
+        hosts = sorted(collection_rules)
+        rules = dict(collection_rules[hosts[-1]]) if hosts else {}
+        # The bucket of a host is nodes/<host>/ of the bundle
+        rules[BUCKET] = os.path.dirname(rules.get(BUCKET, '').rstrip('/'))
+        super(RemoteFileCollector, self).__init__(hosts, rules)
+        self._max_parallel = max_parallel
+        self.results = []
 
-    def _create_tmp_bundle_directory(self):
+    def collect(self):
         """
-        Create the tmp bundle directory on SSUs
+        Collect the bundle from the cluster
         """
-        bundle_tmp_dir = 'mkdir {}'.format(BUNDLE_TMP_DIR)
-        try:
-            self._channel.execute_command(bundle_tmp_dir)
-        except (SSHException, IOError):
-            self.logger.warning('Unable to create bundle base: {} on host: '
-                                '{}'.format(BUNDLE_TMP_DIR, self.host))
-            raise
+        nodes = [RemoteNodeFiles(host, self._actions, self.logger)
+                 for host in self.host]
+        streamer = BundleStreamer(
+            self._bucket, self.logger, self._max_parallel,
+            progress=self._log_progress,
+            bundle_name=os.path.join('{}', NODE_BUNDLE_FILE[:-len('.gz')]))
+        self.results = streamer.collect(nodes,
+                                        self._files + [BUNDLE_TMP_DIR])
+        self.is_log_collected = any(result.path for result in self.results)
 
-    def _clean_up(self):
-        """Clean all the temp files and the directory"""
-        cleanup_files = REMOTE_CLEANUP
-        for _file in cleanup_files:
-            rm_cmd = 'rm -rf {}'.format(_file)
-            try:
-                self._channel.execute_command(rm_cmd)
-            except SSHException:
-                # todo: necessary logging
-                pass
+    def _log_progress(self, host, files, size):
+        """
+        Log the files and bytes collected so far from host
+        """
+        self.logger.debug('Collected {} files, {} bytes from host: {}'.format(
+            files, size, host))
 
 
 class McoRemoteFileCollector(object):
@@ -33,7 +33,8 @@ from sspl_hl.utils.support_bundle.file_collector.\
 from sspl_hl.utils.support_bundle import config
 from sspl_hl.utils.support_bundle.file_collector.file_collector import \
     LocalFileCollector, \
-    McoRemoteFileCollector
+    McoRemoteFileCollector, \
+    RemoteFileCollector
 import os
 from sspl_hl.utils.common import execute_shell
 from plex.util.concurrent.executor_safe import ExecutorSafe, executorSafe
@@ -102,7 +103,14 @@ class SupportBundleHandler(ExecutorSafe):
                     )
 
         self.collect_files_from_cluster()
+        missing_nodes = bundle_utils.check_node_bundles(bundle_name,
+                                                        self._ssu_list)
         SupportBundleHandler.build_tar_bundle(bundle_dir_info)
+        if missing_nodes:
+            logger.warning('Collection of bundle files has completed '
+                           'without the files of SSUs: {}. Bundle ID: {}'.
+                           format(missing_nodes, bundle_name))
+            return 'partial'
         logger.info('Collection of bundle files has Successfully completed. '
                     'Bundle ID: {}'.format(bundle_name))
         return 'success'
@@ -142,9 +150,13 @@ class SupportBundleHandler(ExecutorSafe):
         This will contain the actual implementation of collecting the
         files from remote hosts. All the collection is based on the remote
         collection rules. Collection will be handled by RemoteFileCollector
-        object.
+        object, or by McoRemoteFileCollector if configured.
         """
-        file_collector = McoRemoteFileCollector(collection_rules)
+        if config.REMOTE_COLLECTION == 'mco':
+            file_collector = McoRemoteFileCollector(collection_rules)
+        else:
+            file_collector = RemoteFileCollector(collection_rules,
+                                                 config.MAX_PARALLEL_NODES)
         file_collector.collect()
 
     @staticmethod
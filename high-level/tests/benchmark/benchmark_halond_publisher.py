@@ -0,0 +1,195 @@
+#!/usr/bin/python
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+Latency benchmark of publishing the status requests to Halon.
+
+Publishes a burst of messages from as many threads as the reactor thread
+pool has, as the status provider does, to a stand-in of the pika blocking
+connection which takes a round trip time for every exchange with the
+broker: 7 to open a connection, 1 for each of channel.open,
+exchange.declare, confirm.select and a confirmed publish.
+
+Compares a connection, channel and declaration for every message, as
+HalondPublisher does, to the ChannelPool of HalondPublisherPool, and
+reports the p50/p99 latency of a publication and the connections opened.
+
+Usage: PYTHONPATH=.:tests python tests/benchmark/benchmark_halond_publisher.py
+           [messages] [threads] [rtt_ms]
+"""
+
+import json
+import sys
+import threading
+import time
+
+from sspl_hl.utils.channel_pool import ChannelPool
+
+# Round trips to open a connection: protocol header, start, tune, open,
+#  and the TCP handshake before them
+CONNECTION_ROUND_TRIPS = 7
+
+
+class BrokerError(Exception):
+    """ Stands for the errors of pika """
+    pass
+
+
+class FakeBroker(object):
+
+    """
+    Counts the connections opened to it and makes every exchange with it
+    take rtt seconds.
+    """
+
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.opened = 0
+        self.published = 0
+        self._lock = threading.Lock()
+
+    def round_trip(self, count=1):
+        time.sleep(self.rtt * count)
+
+    def connect(self):
+        self.round_trip(CONNECTION_ROUND_TRIPS)
+        with self._lock:
+            self.opened += 1
+        return FakeConnection(self)
+
+    def received(self):
+        with self._lock:
+            self.published += 1
+
+
+class FakeConnection(object):
+
+    """ Stand-in of pika.BlockingConnection """
+
+    def __init__(self, broker):
+        self._broker = broker
+
+    def channel(self):
+        self._broker.round_trip()
+        return FakeChannel(self._broker)
+
+    def close(self):
+        self._broker.round_trip()
+
+
+class FakeChannel(object):
+
+    """ Stand-in of the channel of pika.BlockingConnection """
+
+    def __init__(self, broker):
+        self._broker = broker
+        self._confirms = False
+
+    def exchange_declare(self, **_):
+        self._broker.round_trip()
+
+    def confirm_delivery(self):
+        self._broker.round_trip()
+        self._confirms = True
+
+    def basic_publish(self, **_):
+        # Without confirms, sent without waiting for the broker
+        if self._confirms:
+            self._broker.round_trip()
+        self._broker.received()
+        return True
+
+
+def legacy_publish(broker, message):
+    """ HalondPublisher(None).publish_message(message), left open """
+    connection = broker.connect()
+    channel = connection.channel()
+    channel.exchange_declare(exchange='sspl_hl_cmd', type='topic',
+                             auto_delete=False)
+    channel.basic_publish(exchange='sspl_hl_cmd', routing_key='sspl_hl_cmd',
+                          body=json.dumps(message))
+
+
+def pooled_connect(broker):
+    """ HalondPublisherPool._connect """
+    connection = broker.connect()
+    channel = connection.channel()
+    channel.exchange_declare(exchange='sspl_hl_cmd', type='topic',
+                             auto_delete=False)
+    channel.confirm_delivery()
+    return connection, channel
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(name, broker, publish, messages, threads):
+    """ Publish messages from threads at once and report the latencies """
+    latencies = []
+    lock = threading.Lock()
+    remaining = [messages]
+
+    def worker():
+        while True:
+            with lock:
+                if not remaining[0]:
+                    return
+                remaining[0] -= 1
+            message = {'message': {'messageId': remaining[0]}}
+            start = time.time()
+            publish(message)
+            with lock:
+                latencies.append(time.time() - start)
+
+    start = time.time()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    assert broker.published == messages
+    print("{:>8}: {:5d} messages in {:6.2f} secs, latency p50 {:7.2f} "
+          "p99 {:7.2f} ms, {:d} connections opened"
+          .format(name, messages, time.time() - start,
+                  percentile(latencies, 0.5) * 1000,
+                  percentile(latencies, 0.99) * 1000, broker.opened))
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    # Default size of the reactor thread pool
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    rtt = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.0005
+    print("Broker round trip of {} ms, {} publishing threads".format(
+        rtt * 1000, threads))
+
+    broker = FakeBroker(rtt)
+    run("legacy", broker,
+        lambda message: legacy_publish(broker, message), messages, threads)
+
+    broker = FakeBroker(rtt)
+    pool = ChannelPool(lambda: pooled_connect(broker), (BrokerError,))
+    run("pooled", broker,
+        lambda message: pool.publish('sspl_hl_cmd', 'sspl_hl_cmd',
+                                     json.dumps(message)),
+        messages, threads)
+
+
+if __name__ == '__main__':
+    main()
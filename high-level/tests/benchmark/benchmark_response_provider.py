@@ -0,0 +1,177 @@
+#!/usr/bin/python
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+Load test of the Halon response correlation of the ResponseProvider.
+
+Issues concurrent requests, all at once, for which an in-process fake
+consumer delivers a response after a random delay of up to max_delay
+seconds, and reports the p50/p99 latency from request to response, the
+resident memory and the responses still held once all requests were
+answered.
+
+Compares polling a dict of responses with growing sleeps, as before, to
+waiting on Deferreds fired by the delivery. The polling runs on the reactor
+thread pool, it used to run on the reactor thread itself and so served a
+single request at a time. It is too slow for as many requests, only
+legacy_requests are issued.
+
+Usage: PYTHONPATH=.:tests python tests/benchmark/benchmark_response_provider.py
+           [requests] [legacy_requests] [max_delay]
+"""
+
+import heapq
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+
+from twisted.internet import defer, reactor, threads
+from twisted.internet.task import deferLater
+
+from sspl_hl.utils.response_store import ResponseCorrelator
+
+RESPONSE_POLLING_COUNT = 5
+RESPONSE_TIMEOUT = 21
+
+
+class FakeConsumer(threading.Thread):
+
+    """
+    Calls deliver(message_id, message) from its own thread, like the
+    RabbitMQ consumer, once the delay of each response is up.
+    """
+
+    def __init__(self, deliver, max_delay):
+        super(FakeConsumer, self).__init__()
+        self.daemon = True
+        self._deliver = deliver
+        self._max_delay = max_delay
+        self._due = []
+        self._condition = threading.Condition()
+
+    def request(self, message_id):
+        due = time.time() + random.uniform(0, self._max_delay)
+        with self._condition:
+            heapq.heappush(self._due, (due, message_id))
+            self._condition.notify()
+
+    def run(self):
+        while True:
+            with self._condition:
+                while not self._due or self._due[0][0] > time.time():
+                    self._condition.wait(
+                        self._due[0][0] - time.time() if self._due else None)
+                _, message_id = heapq.heappop(self._due)
+            self._deliver(message_id, {"responseId": message_id,
+                                       "status": "ok",
+                                       "payload": "x" * 512})
+
+
+def legacy_check(messages, count_down, message_id):
+    """ _check_and_get_data of ResponseProvider before Deferreds """
+    poll_count = RESPONSE_POLLING_COUNT + 1 - count_down
+    time.sleep(poll_count)
+    if message_id in messages:
+        return json.dumps(messages.get(message_id))
+    elif count_down > 0:
+        return legacy_check(messages, count_down - 1, message_id)
+    return "File System Status couldn't be retrieved"
+
+
+def rss_kb():
+    """ Resident memory of this process in KiB """
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def report(name, latencies, elapsed, rss_before, held):
+    print("{:>8}: {:6d} requests in {:7.2f} secs, latency p50 {:6.3f} "
+          "p99 {:6.3f} secs, RSS {:7d} KiB (+{:d}), {:d} responses held"
+          .format(name, len(latencies), elapsed, percentile(latencies, 0.5),
+                  percentile(latencies, 0.99), rss_kb(),
+                  rss_kb() - rss_before, held))
+
+
+def issue(requests, wait, consumer):
+    """ Issue all requests at once, return their latencies """
+    latencies = []
+    deferreds = []
+    for _ in range(requests):
+        message_id = str(uuid.uuid4())
+        start = time.time()
+        deferred = wait(message_id)
+        deferred.addCallback(
+            lambda _, start=start: latencies.append(time.time() - start))
+        deferreds.append(deferred)
+        consumer.request(message_id)
+    return defer.gatherResults(deferreds).addCallback(lambda _: latencies)
+
+
+@defer.inlineCallbacks
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    legacy_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    max_delay = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+    print("Responses delivered after 0 to {} secs".format(max_delay))
+
+    try:
+        messages = {}
+        consumer = FakeConsumer(messages.__setitem__, max_delay)
+        consumer.start()
+        rss_before = rss_kb()
+        start = time.time()
+        latencies = yield issue(
+            legacy_requests,
+            lambda message_id: deferLater(
+                reactor, 1, threads.deferToThread, legacy_check, messages,
+                RESPONSE_POLLING_COUNT, message_id),
+            consumer)
+        report("legacy", latencies, time.time() - start, rss_before,
+               len(messages))
+
+        correlator = ResponseCorrelator(reactor)
+        consumer = FakeConsumer(
+            lambda message_id, message: reactor.callFromThread(
+                correlator.deliver, message_id, message),
+            max_delay)
+        consumer.start()
+        rss_before = rss_kb()
+        start = time.time()
+        latencies = yield issue(
+            requests,
+            lambda message_id: correlator.wait(message_id, RESPONSE_TIMEOUT),
+            consumer)
+        report("deferred", latencies, time.time() - start, rss_before,
+               correlator.stored())
+    finally:
+        reactor.stop()
+
+
+if __name__ == '__main__':
+    reactor.callWhenRunning(main)
+    reactor.run()
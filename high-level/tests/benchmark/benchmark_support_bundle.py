@@ -0,0 +1,230 @@
+#!/usr/bin/python
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+Benchmark of the collection of the files of the nodes for a support bundle.
+
+Local directories stand in for the nodes, each with log files of file_mb
+MiB, read from the nodes at node_mib_s MiB/s at most, the bandwidth of a
+node over SSH, unbounded if 0. Reports the wall time of the collection and
+the peak disk usage of the staging directories and of the bucket, sampled
+every 10 ms.
+
+Compares copying the files of a node to a staging directory, tarring it
+then copying the tar to the bucket, a node after the other, as
+RemoteFileCollector did, to BundleStreamer streaming the files of
+parallel nodes at once into a compressed tar per node.
+
+Usage: PYTHONPATH=.:tests python tests/benchmark/benchmark_support_bundle.py
+           [nodes] [files] [file_mb] [node_mib_s] [parallel]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+
+from sspl_hl.utils.support_bundle.file_collector.bundle_streamer import \
+    BundleStreamer, LocalNodeFiles
+
+PATTERNS = ['/var/log/*', '/var/crash/*']
+
+
+class NullLogger(object):
+    # pylint: disable=too-few-public-methods
+    """ Drops the log messages """
+
+    def __getattr__(self, _):
+        return lambda *args, **kwargs: None
+
+
+class ThrottledFile(object):
+
+    """ File read at rate bytes per second at most """
+
+    def __init__(self, source, rate):
+        self._source = source
+        self._rate = rate
+        self._start = time.time()
+        self._read = 0
+
+    def read(self, size=-1):
+        data = self._source.read(size)
+        self._read += len(data)
+        if self._rate:
+            time.sleep(max(0, self._start + float(self._read) / self._rate -
+                           time.time()))
+        return data
+
+    def close(self):
+        self._source.close()
+
+
+class ThrottledNodeFiles(LocalNodeFiles):
+
+    """ Local directory standing in for a node read over the network """
+
+    def __init__(self, name, root, rate):
+        super(ThrottledNodeFiles, self).__init__(name, root)
+        self._rate = rate
+
+    def open(self, path):
+        return ThrottledFile(super(ThrottledNodeFiles, self).open(path),
+                             self._rate)
+
+
+class DiskSampler(threading.Thread):
+
+    """ Samples the bytes used below a directory until stopped """
+
+    def __init__(self, path):
+        super(DiskSampler, self).__init__()
+        self.daemon = True
+        self._path = path
+        self._stop = threading.Event()
+        self.peak = 0
+
+    def run(self):
+        while not self._stop.wait(0.01):
+            self.peak = max(self.peak, disk_usage(self._path))
+
+    def stop(self):
+        self._stop.set()
+        self.join()
+        self.peak = max(self.peak, disk_usage(self._path))
+
+
+def disk_usage(path):
+    """ Bytes of the files below path """
+    used = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                used += os.path.getsize(os.path.join(directory, name))
+            except OSError:
+                pass
+    return used
+
+
+def make_nodes(base, nodes, files, file_mb):
+    """ Create the directory of each node, filled with log like files """
+    words = ['motr', 'halon', 'ioservice', 'confd', 'rpc', 'fid', 'sns',
+             'repair', 'ERROR', 'WARNING', 'INFO', 'timeout', 'be_tx']
+    lines = ['{} node{} {}: {} {} {:x}\n'.format(
+        time.ctime(1500000000 + index), index % 7,
+        random.choice(words), random.choice(words), random.choice(words),
+        random.getrandbits(64)) for index in range(4096)]
+    chunk = ''.join(lines)
+    roots = []
+    for node in range(nodes):
+        root = os.path.join(base, 'node{}'.format(node))
+        for directory in ('var/log', 'var/crash'):
+            os.makedirs(os.path.join(root, directory))
+        for index in range(files):
+            directory = 'var/crash' if index % 5 == 4 else 'var/log'
+            path = os.path.join(root, directory, 'file{}.log'.format(index))
+            with open(path, 'w') as out:
+                while out.tell() < file_mb << 20:
+                    out.write(chunk)
+        roots.append(root)
+    return roots
+
+
+def legacy_collect(roots, work, rate):
+    """ Stage, tar then copy the files of a node after the other """
+    bucket = os.path.join(work, 'bucket')
+    os.mkdir(bucket)
+    for root in roots:
+        name = os.path.basename(root)
+        # /tmp/bundle and /tmp/bundle.tar of the node
+        staging = os.path.join(work, 'tmp_' + name)
+        os.mkdir(staging)
+        os.mkdir(os.path.join(staging, 'bundle'))
+        for pattern in PATTERNS:
+            directory = os.path.join(root, os.path.dirname(pattern[1:]))
+            for entry in os.listdir(directory):
+                shutil.copy(os.path.join(directory, entry),
+                            os.path.join(staging, 'bundle'))
+        node_tar = os.path.join(staging, 'bundle.tar')
+        with tarfile.open(node_tar, 'w') as tar:
+            tar.add(os.path.join(staging, 'bundle'), arcname='bundle')
+        # sftp get to the bucket
+        os.mkdir(os.path.join(bucket, name))
+        with open(node_tar, 'rb') as source, \
+                open(os.path.join(bucket, name, 'bundle.tar'), 'wb') as out:
+            shutil.copyfileobj(ThrottledFile(source, rate), out)
+        shutil.rmtree(staging)
+
+
+def streamed_collect(roots, work, rate, parallel):
+    """ Stream the files of parallel nodes at once """
+    bucket = os.path.join(work, 'bucket')
+    os.mkdir(bucket)
+    streamer = BundleStreamer(bucket, NullLogger(), max_parallel=parallel)
+    nodes = [ThrottledNodeFiles(os.path.basename(root), root, rate)
+             for root in roots]
+    results = streamer.collect(nodes, PATTERNS)
+    assert all(not result.errors for result in results)
+
+
+def run(name, collect, work):
+    os.mkdir(work)
+    sampler = DiskSampler(work)
+    sampler.start()
+    start = time.time()
+    collect(work)
+    elapsed = time.time() - start
+    sampler.stop()
+    print('{:>9}: {:7.2f} secs, peak disk {:8.1f} MiB, bucket {:8.1f} MiB'
+          .format(name, elapsed, sampler.peak / 1048576.0,
+                  disk_usage(os.path.join(work, 'bucket')) / 1048576.0))
+    shutil.rmtree(work)
+
+
+def main():
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    file_mb = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    rate = float(sys.argv[4]) * 1048576 if len(sys.argv) > 4 else 0
+    parallel = int(sys.argv[5]) if len(sys.argv) > 5 else \
+        BundleStreamer.MAX_PARALLEL
+
+    base = tempfile.mkdtemp()
+    try:
+        roots = make_nodes(os.path.join(base, 'nodes'), nodes, files,
+                           file_mb)
+        print('{} nodes of {} files of {} MiB, {} MiB in all, read at {} '
+              'MiB/s per node'.format(nodes, files, file_mb,
+                                      nodes * files * file_mb,
+                                      rate / 1048576 or 'any'))
+        run('legacy', lambda work: legacy_collect(roots, work, rate),
+            os.path.join(base, 'legacy'))
+        run('streamed', lambda work: streamed_collect(roots, work, rate, 1),
+            os.path.join(base, 'streamed'))
+        run('parallel', lambda work: streamed_collect(roots, work, rate,
+                                                      parallel),
+            os.path.join(base, 'parallel'))
+    finally:
+        shutil.rmtree(base)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+""" Unit tests for sspl_hl.utils.support_bundle.file_collector.bundle_streamer
+"""
+import json
+import os
+import shutil
+import StringIO
+import tarfile
+import tempfile
+import threading
+import unittest
+import mock
+from sspl_hl.utils.support_bundle.file_collector.bundle_streamer import \
+    BundleStreamer, LocalNodeFiles
+
+
+class ShrinkingNodeFiles(LocalNodeFiles):
+    """ Node whose files are truncated once listed """
+
+    def open(self, path):
+        return StringIO.StringIO('abc')
+
+
+class FailingNodeFiles(LocalNodeFiles):
+    """ Node which cannot be connected to """
+
+    def prepare(self):
+        raise IOError('Connection refused')
+
+
+class TestBundleStreamer(unittest.TestCase):
+    """
+    Test cases for BundleStreamer
+    """
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp()
+        self.bucket = os.path.join(self.base, 'bucket')
+        os.mkdir(self.bucket)
+        self.logger = mock.Mock()
+        self.streamer = BundleStreamer(self.bucket, self.logger)
+
+    def tearDown(self):
+        shutil.rmtree(self.base)
+
+    def _node(self, name, files, node_class=LocalNodeFiles):
+        root = os.path.join(self.base, name)
+        for path, content in files.items():
+            path = os.path.join(root, path.lstrip('/'))
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'w') as out:
+                out.write(content)
+        return node_class(name, root)
+
+    def _members(self, result):
+        with tarfile.open(result.path) as tar:
+            return dict((member.name, tar.extractfile(member).read())
+                        for member in tar.getmembers())
+
+    def test_collect(self):
+        node = self._node('node1', {'/var/log/messages': 'messages',
+                                    '/var/crash/a/core': 'core',
+                                    '/var/crash/b': 'b',
+                                    '/etc/motr/conf': 'conf'})
+        result, = self.streamer.collect(
+            [node], ['/var/log/messages', '/var/crash/*', '/etc/motr/*'])
+        self.assertEqual(result.path,
+                         os.path.join(self.bucket, 'node1.tar.gz'))
+        self.assertEqual(result.files, 4)
+        self.assertEqual(result.bytes, 17)
+        self.assertEqual(result.errors, [])
+        self.assertEqual(self._members(result),
+                         {'var/log/messages': 'messages',
+                          'var/crash/a/core': 'core',
+                          'var/crash/b': 'b',
+                          'etc/motr/conf': 'conf'})
+
+    def test_partial_results(self):
+        nodes = [self._node('node1', {'/var/log/messages': 'messages'}),
+                 self._node('node2', {'/var/log/messages': 'messages'},
+                            FailingNodeFiles),
+                 self._node('node3', {'/var/log/other': 'other'})]
+        results = self.streamer.collect(
+            nodes, ['/var/log/messages', '/var/crash/*'])
+        self.assertEqual([result.files for result in results], [1, 0, 0])
+        self.assertEqual([len(result.errors) for result in results],
+                         [1, 1, 2])
+        self.assertEqual(results[1].path, None)
+        self.assertEqual(results[2].path, None)
+        self.assertEqual(sorted(os.listdir(self.bucket)),
+                         [BundleStreamer.REPORT_FILE, 'node1.tar.gz'])
+        with open(os.path.join(self.bucket,
+                               BundleStreamer.REPORT_FILE)) as report:
+            report = json.load(report)
+        self.assertEqual(sorted(report['nodes']), ['node1', 'node2', 'node3'])
+        self.assertEqual(report['nodes']['node1']['files'], 1)
+        self.assertIn('Connection refused',
+                      report['nodes']['node2']['errors'][0])
+        self.assertEqual(report['failed'], ['node2', 'node3'])
+        self.assertEqual(report['incomplete'], ['node1'])
+
+    def test_shrunk_file_padded(self):
+        node = self._node('node1', {'/var/log/messages': 'abcdef',
+                                    '/var/log/secure': 'secure'},
+                          ShrinkingNodeFiles)
+        result = self.streamer.collect_node(node, ['/var/log/*'])
+        self.assertEqual(result.files, 2)
+        self.assertEqual(len(result.errors), 2)
+        self.assertEqual(self._members(result),
+                         {'var/log/messages': 'abc\0\0\0',
+                          'var/log/secure': 'abc\0\0\0'})
+
+    def test_bundle_name(self):
+        streamer = BundleStreamer(self.bucket, self.logger,
+                                  bundle_name='{}/bundle.tar')
+        node = self._node('node1', {'/a': 'a'})
+        result = streamer.collect_node(node, ['/a'])
+        self.assertEqual(result.path, os.path.join(self.bucket, 'node1',
+                                                   'bundle.tar.gz'))
+        self.assertEqual(os.listdir(os.path.join(self.bucket, 'node1')),
+                         ['bundle.tar.gz'])
+
+    def test_failed_tar_removed(self):
+        class BrokenNodeFiles(LocalNodeFiles):
+            """ Node whose files cannot be read once listed """
+
+            def open(self, path):
+                raise IOError('Connection lost')
+
+        node = self._node('node1', {'/a': 'a'}, BrokenNodeFiles)
+        result = self.streamer.collect_node(node, ['/a'])
+        self.assertEqual(result.path, None)
+        self.assertEqual(os.listdir(self.bucket), [])
+
+    def test_parallel_bound(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        class SlowNodeFiles(LocalNodeFiles):
+            """ Node taking a while to prepare """
+
+            def prepare(self):
+                with lock:
+                    running.append(self.name)
+                    peak.append(len(running))
+                threading.Event().wait(0.05)
+                with lock:
+                    running.remove(self.name)
+
+        nodes = [self._node('node{}'.format(index), {'/f': 'f'},
+                            SlowNodeFiles) for index in range(6)]
+        streamer = BundleStreamer(self.bucket, self.logger, max_parallel=2)
+        results = streamer.collect(nodes, ['/f'])
+        self.assertEqual([result.node for result in results],
+                         ['node{}'.format(index) for index in range(6)])
+        self.assertEqual(max(peak), 2)
+
+    def test_progress(self):
+        progress = mock.Mock()
+        streamer = BundleStreamer(self.bucket, self.logger,
+                                  compression='', progress=progress)
+        node = self._node('node1', {'/a': 'a', '/b': 'bb'})
+        result = streamer.collect_node(node, ['/*'])
+        self.assertEqual(result.path, os.path.join(self.bucket, 'node1.tar'))
+        self.assertEqual(progress.call_args_list,
+                         [mock.call('node1', 1, 1),
+                          mock.call('node1', 2, 3)])
+
+
+if __name__ == '__main__':
+    unittest.main()
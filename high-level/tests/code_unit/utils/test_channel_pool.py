@@ -0,0 +1,135 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+""" Unit tests for sspl_hl.utils.channel_pool """
+import threading
+import unittest
+import mock
+from sspl_hl.utils.channel_pool import ChannelPool, PublishError
+
+
+class BrokerError(Exception):
+    """ Stands for the errors of pika """
+    pass
+
+
+class TestChannelPool(unittest.TestCase):
+    """
+    Test cases for ChannelPool
+    """
+
+    def setUp(self):
+        self.now = 0
+        self.connect_error = None
+        self.connections = []
+        self.pool = ChannelPool(self._connect, (BrokerError,), size=2,
+                                initial_backoff=1, max_backoff=4,
+                                clock=lambda: self.now)
+
+    def _connect(self):
+        if self.connect_error:
+            raise self.connect_error
+        connection = mock.Mock()
+        connection.channel.return_value.basic_publish.return_value = True
+        self.connections.append(connection)
+        return connection, connection.channel()
+
+    def _publish(self):
+        self.pool.publish('xchg', 'key', 'body')
+
+    def test_connection_reused(self):
+        for _ in range(3):
+            self._publish()
+        self.assertEqual(len(self.connections), 1)
+        self.connections[0].channel().basic_publish.assert_called_with(
+            exchange='xchg', routing_key='key', body='body')
+        self.assertEqual(self.pool.connected(), 1)
+
+    def test_connection_per_thread(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def connect():
+            connection, channel = self._connect()
+            if len(self.connections) == 1:
+                started.set()
+                release.wait()
+            return connection, channel
+
+        self.pool = ChannelPool(connect, (BrokerError,), size=2)
+        thread = threading.Thread(target=self._publish)
+        thread.start()
+        started.wait()
+        self._publish()
+        release.set()
+        thread.join()
+        self.assertEqual(len(self.connections), 2)
+        self.assertEqual(self.pool.connected(), 2)
+
+    def test_broken_channel_reopened(self):
+        self._publish()
+        self.connections[0].channel().basic_publish.side_effect = \
+            BrokerError('closed')
+        self._publish()
+        self.assertEqual(len(self.connections), 2)
+        self.connections[0].close.assert_called_once_with()
+
+    def test_new_channel_failing(self):
+        self._publish()
+        self.connections[0].channel().basic_publish.side_effect = \
+            BrokerError('closed')
+
+        def connect():
+            connection, channel = self._connect()
+            channel.basic_publish.side_effect = BrokerError('closed')
+            return connection, channel
+
+        self.pool._connect = connect  # pylint: disable=protected-access
+        self.assertRaises(PublishError, self._publish)
+        self.assertEqual(self.pool.connected(), 0)
+
+    def test_nack(self):
+        self._publish()
+        self.connections[0].channel().basic_publish.return_value = False
+        self.assertRaises(PublishError, self._publish)
+        # The channel is still fine
+        self.assertEqual(self.pool.connected(), 1)
+
+    def test_backoff(self):
+        self.connect_error = BrokerError('refused')
+        attempts = []
+        for self.now in range(0, 20):
+            self.assertRaises(PublishError, self._publish)
+            if self.pool._failures > len(attempts):  # pylint: disable=W0212
+                attempts.append(self.now)
+        # Waits of 1, 2, 4 then 4 secs at most
+        self.assertEqual(attempts, [0, 1, 3, 7, 11, 15, 19])
+
+        self.connect_error = None
+        self.now = 23
+        self._publish()
+        self.assertEqual(self.pool._failures, 0)  # pylint: disable=W0212
+
+    def test_close(self):
+        self._publish()
+        self.pool.close()
+        self.connections[0].close.assert_called_once_with()
+        self.assertEqual(self.pool.connected(), 0)
+        self._publish()
+        self.assertEqual(len(self.connections), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+""" Unit tests for sspl_hl.utils.response_store """
+import unittest
+from twisted.internet import defer
+from twisted.internet.task import Clock
+from sspl_hl.utils.response_store import (ResponseCorrelator,
+                                          ResponseTimeout,
+                                          TTLStore)
+
+
+class TestTTLStore(unittest.TestCase):
+    """
+    Test cases for TTLStore
+    """
+
+    def setUp(self):
+        self.clock = Clock()
+        self.store = TTLStore(self.clock, ttl=10, max_size=3)
+
+    def test_get(self):
+        self.store.put('a', 1)
+        self.assertEqual(self.store.get('a'), 1)
+        self.assertIn('a', self.store)
+        self.assertEqual(self.store.get('b', 'none'), 'none')
+
+    def test_put_pop(self):
+        self.store.put('a', 1)
+        self.assertIn('a', self.store)
+        self.assertEqual(self.store.pop('a'), 1)
+        self.assertNotIn('a', self.store)
+        self.assertEqual(self.store.pop('a', 'none'), 'none')
+
+    def test_ttl(self):
+        self.store.put('a', 1)
+        self.clock.advance(5)
+        self.store.put('b', 2)
+        self.clock.advance(5)
+        self.assertNotIn('a', self.store)
+        self.assertIn('b', self.store)
+        self.clock.advance(5)
+        self.assertEqual(len(self.store), 0)
+
+    def test_put_renews(self):
+        self.store.put('a', 1)
+        self.clock.advance(8)
+        self.store.put('a', 2)
+        self.clock.advance(8)
+        self.assertEqual(self.store.pop('a'), 2)
+
+    def test_max_size(self):
+        for key in 'abcd':
+            self.store.put(key, key)
+        self.assertEqual(len(self.store), 3)
+        self.assertNotIn('a', self.store)
+        self.assertIn('d', self.store)
+
+
+class TestResponseCorrelator(unittest.TestCase):
+    """
+    Test cases for ResponseCorrelator
+    """
+
+    def setUp(self):
+        self.clock = Clock()
+        self.correlator = ResponseCorrelator(self.clock, ttl=60, max_size=2)
+        self.results = []
+
+    def _wait(self, message_id, timeout=20):
+        deferred = self.correlator.wait(message_id, timeout)
+        deferred.addBoth(self.results.append)
+        return deferred
+
+    def test_deliver_fires_waiter(self):
+        self._wait('id1')
+        self._wait('id2')
+        self.assertEqual(self.results, [])
+        self.correlator.deliver('id1', {'status': 'ok'})
+        self.assertEqual(self.results, [{'status': 'ok'}])
+        self.assertEqual(self.correlator.pending(), 1)
+        self.assertEqual(self.correlator.stored(), 1)
+
+    def test_all_waiters_fired(self):
+        self._wait('id1')
+        self._wait('id1')
+        self.correlator.deliver('id1', 'response')
+        self.assertEqual(self.results, ['response', 'response'])
+        self.assertEqual(self.correlator.pending(), 0)
+
+    def test_response_before_wait(self):
+        self.correlator.deliver('id1', 'response')
+        self.assertEqual(self.correlator.stored(), 1)
+        self._wait('id1')
+        self.assertEqual(self.results, ['response'])
+        self.assertEqual(self.correlator.stored(), 1)
+
+    def test_repeat_query(self):
+        self._wait('id1')
+        self.correlator.deliver('id1', 'response')
+        self._wait('id1')
+        self._wait('id1')
+        self.assertEqual(self.results, ['response'] * 3)
+        self.assertEqual(self.correlator.pending(), 0)
+
+        # Until its TTL expires
+        self.clock.advance(60)
+        self.assertEqual(self.correlator.stored(), 0)
+        self._wait('id1')
+        self.assertEqual(self.correlator.pending(), 1)
+
+    def test_timeout(self):
+        self._wait('id1', timeout=20)
+        self.clock.advance(19)
+        self.assertEqual(self.results, [])
+        self.clock.advance(1)
+        self.assertEqual(len(self.results), 1)
+        self.assertTrue(self.results[0].check(ResponseTimeout))
+        self.assertEqual(self.correlator.pending(), 0)
+        self.assertEqual(self.clock.getDelayedCalls(), [])
+
+        # A late response is kept for a retry, until its TTL
+        self.correlator.deliver('id1', 'late')
+        self.assertEqual(self.correlator.stored(), 1)
+        self.clock.advance(60)
+        self.assertEqual(self.correlator.stored(), 0)
+
+    def test_delivery_cancels_timeout(self):
+        self._wait('id1')
+        self.correlator.deliver('id1', 'response')
+        self.assertEqual(self.clock.getDelayedCalls(), [])
+
+    def test_cancel(self):
+        deferred = self._wait('id1')
+        deferred.cancel()
+        self.assertTrue(self.results[0].check(defer.CancelledError))
+        self.assertEqual(self.correlator.pending(), 0)
+        self.assertEqual(self.clock.getDelayedCalls(), [])
+
+    def test_stored_responses_bounded(self):
+        for index in range(5):
+            self.correlator.deliver('id{}'.format(index), index)
+        self.assertEqual(self.correlator.stored(), 2)
+        self._wait('id4')
+        self.assertEqual(self.results, [4])
+
+
+if __name__ == '__main__':
+    unittest.main()
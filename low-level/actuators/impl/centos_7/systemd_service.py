@@ -19,14 +19,13 @@
  ****************************************************************************
 """
 
-import json
-import time
-
 from zope.interface import implementer
 from actuators.IService import IService
 
 from framework.base.debug import Debug
+from framework.utils.config_reader import ConfigReader
 from framework.utils.service_logging import logger
+from framework.utils.systemd_jobs import SystemdJobs, shared_jobs
 
 from dbus import SystemBus, Interface, exceptions as debus_exceptions
 
@@ -36,14 +35,24 @@ class SystemdService(Debug):
 
     ACTUATOR_NAME = "SystemdService"
 
+    # Section and keys in configuration file
+    SYSTEMDSERVICE = ACTUATOR_NAME.upper()
+    JOB_TIMEOUT    = 'job_timeout'
+
     @staticmethod
     def name():
         """ @return: name of the module."""
         return SystemdService.ACTUATOR_NAME
 
-    def __init__(self):
+    def __init__(self, job_timeout=None):
         super(SystemdService, self).__init__()
 
+        # Longest wait for a start, stop or restart to finish
+        if job_timeout is None:
+            job_timeout = ConfigReader()._get_value_with_default(self.SYSTEMDSERVICE,
+                                                self.JOB_TIMEOUT, SystemdJobs.JOB_TIMEOUT)
+        self._job_timeout = float(job_timeout)
+
         # Use d-bus to communicate with systemd
         #  Described at: http://www.freedesktop.org/wiki/Software/systemd/dbus/
 
@@ -54,114 +63,96 @@ class SystemdService(Debug):
         systemd = self._bus.get_object('org.freedesktop.systemd1', '/org/freedesktop/systemd1')
         self._manager = Interface(systemd, dbus_interface='org.freedesktop.systemd1.Manager')
 
-        # Subscribe to signal changes
-        self._manager.Subscribe()
+        # Jobs are waited for with their JobRemoved signal, requests of
+        #  several threads at once, on a connection shared by all instances
+        shared_jobs()
 
     def perform_request(self, jsonMsg):
-        """Performs the service request"""
+        """Performs the service request, safe to call from several threads"""
         self._check_debug(jsonMsg)
 
         # Parse out the service name and request to perform on it
         if jsonMsg.get("actuator_request_type").get("service_controller") is not None:
-            self._service_name = jsonMsg.get("actuator_request_type").get("service_controller").get("service_name")
-            self._service_request = jsonMsg.get("actuator_request_type").get("service_controller").get("service_request")
+            service_name = jsonMsg.get("actuator_request_type").get("service_controller").get("service_name")
+            service_request = jsonMsg.get("actuator_request_type").get("service_controller").get("service_request")
         else:
-            self._service_name = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("service_name")
-            self._service_request = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("service_request")
+            service_name = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("service_name")
+            service_request = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("service_request")
 
-        self._log_debug("perform_request, service_name: %s, service_request: %s" % \
-                        (self._service_name, self._service_request))
+        self._log_debug("perform_request, service_name: %s, service_request: %s",
+                        service_name, service_request)
 
         try:
             # Load the systemd unit for the service
-            systemd_unit = self._manager.LoadUnit(self._service_name)
+            systemd_unit = self._manager.LoadUnit(service_name)
 
             # Get a proxy to systemd for accessing properties of units
-            self._proxy = self._bus.get_object("org.freedesktop.systemd1", str(systemd_unit))
+            proxy = self._bus.get_object("org.freedesktop.systemd1", str(systemd_unit))
 
             # The returned result of the desired action
             result = None
 
-            if self._service_request == "restart":
-                self._manager.RestartUnit(self._service_name, 'replace')
-
-                # Ensure we get an "active" status and not "activating"
-                max_wait = 0
-                while self._get_activestate() != "active":
-                    self._log_debug("status is still activating, pausing")
-                    time.sleep(1)
-                    max_wait += 1
-                    if max_wait > 20:
-                        self._log_debug("maximum wait for service restart reached")
-                        break
-
-            elif self._service_request == "start":
-                self._manager.StartUnit(self._service_name, 'replace')
+            if service_request in SystemdJobs.METHODS:
+                # Wait for the job to finish, an "active" status and not "activating" on restart
+                job_result = shared_jobs().run_job(service_request, service_name,
+                                                   timeout=self._job_timeout)
+                self._log_debug("perform_request, %s job of %s: %s",
+                                service_request, service_name, job_result)
 
-            elif self._service_request == "stop":
-                self._manager.StopUnit(self._service_name, 'replace')
-
-            elif self._service_request == "status":
+            elif service_request == "status":
                 # Return the status below
-                state = self._get_activestate()
-                substate = self._get_active_substate()
-                self._log_debug("perform_request, state: %s, substate: %s" %
-                                (str(state), str(substate)))
-                return (self._service_name, state, substate)
+                pass
 
-            elif self._service_request == "enable":
+            elif service_request == "enable":
                 service_list = []
-                service_list.append(self._service_name)
+                service_list.append(service_name)
 
                 """EnableUnitFiles() function takes second argument as boolean.
                    True will enable a service for runtime only(creates symlink in /run/.. directory)
                    False will enable a service persistently(creates symlink in /etc/.. directory)"""
                 bool_res, result = self._manager.EnableUnitFiles(service_list, False, True)
-                self._log_debug("perform_request, bool: %s, result: %s" % (bool_res, result))
+                self._log_debug("perform_request, bool: %s, result: %s", bool_res, result)
 
-            elif self._service_request == "disable":
+            elif service_request == "disable":
                 service_list = []
-                service_list.append(self._service_name)
+                service_list.append(service_name)
 
                 """DisableUnitFiles() function takes second argument as boolean.
                    True will disable a service for runtime only(removes symlink from /run/.. directory)
                    False will disable a service persistently(removes symlink from /etc/.. directory)"""
                 result = self._manager.DisableUnitFiles(service_list, False)
-                self._log_debug("perform_request, result: %s" % result)
+                self._log_debug("perform_request, result: %s", result)
 
             else:
                 self._log_debug("perform_request, Unknown service request")
-                return (self._service_name, "Unknown service request", None)
+                return (service_name, "Unknown service request", None)
+
+            # Get the current status of the process and return it back if no result
+            if result is None:
+                state = self._get_activestate(proxy)
+                substate = self._get_active_substate(proxy)
+                self._log_debug("perform_request, state: %s, substate: %s",
+                                state, substate)
+                return (service_name, state, substate)
 
         except debus_exceptions.DBusException as error:
             logger.exception("DBus Exception: %r" % error)
-            return (self._service_name, str(error), None)
+            return (service_name, str(error), None)
 
         except Exception as ae:
             logger.exception("Exception: %r" % ae)
-            return (self._service_name, str(ae), None)
-
-        # Give the unit some time to finish starting/stopping to get final status
-        time.sleep(5)
-
-        # Get the current status of the process and return it back if no result
-        if result is None:
-            state = self._get_activestate()
-            substate = self._get_active_substate()
-            self._log_debug("perform_request, state: %s, substate: %s" %
-                                (str(state), str(substate)))
-            return (self._service_name, state, substate)
+            return (service_name, str(ae), None)
 
-        return (self._service_name, str(result), None)
+        return (service_name, str(result), None)
 
-    def _get_activestate(self):
+    def _get_activestate(self, proxy):
         """"Returns the active state of the unit"""
-        return self._proxy.Get('org.freedesktop.systemd1.Unit',
-                                'ActiveState',
-                                dbus_interface='org.freedesktop.DBus.Properties')
+        return proxy.Get('org.freedesktop.systemd1.Unit',
+                         'ActiveState',
+                         dbus_interface='org.freedesktop.DBus.Properties')
 
-    def _get_active_substate(self):
+    def _get_active_substate(self, proxy):
         """"Returns the active state of the unit"""
-        return self._proxy.Get('org.freedesktop.systemd1.Unit',
-                                'SubState',
-                                dbus_interface='org.freedesktop.DBus.Properties')
+        return proxy.Get('org.freedesktop.systemd1.Unit',
+                         'SubState',
+                         dbus_interface='org.freedesktop.DBus.Properties')
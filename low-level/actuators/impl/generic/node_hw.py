@@ -26,6 +26,7 @@ import json
 from actuators.impl.actuator import Actuator
 from framework.base.debug import Debug
 from framework.utils.service_logging import logger
+from framework.utils.ipmi_sensor_cache import sensor_cache
 from framework.base.sspl_constants import AlertTypes, SensorTypes, SeverityTypes, COMMON_CONFIGS
 
 
@@ -38,6 +39,9 @@ class NodeHWactuator(Actuator, Debug):
     SITE_ID = "site_id"
     RACK_ID = "rack_id"
     NODE_ID = "node_id"
+    NODEHWACTUATOR = "NODEHWACTUATOR"
+    SENSOR_CACHE_TTL = "sensor_cache_ttl"
+    DEFAULT_SENSOR_CACHE_TTL = 10
     NODE_REQUEST_MAP = {
         "disk" : "Drive Slot / Bay",
         "fan" : "Fan",
@@ -63,6 +67,11 @@ class NodeHWactuator(Actuator, Debug):
                                                 self.SYSTEM_INFORMATION,
                                                 COMMON_CONFIGS.get(self.SYSTEM_INFORMATION).get(self.NODE_ID),
                                                 '001')
+        # Requests are answered with sensor readings at most this old
+        self._sensor_cache_ttl = int(conf_reader._get_value_with_default(
+                                                self.NODEHWACTUATOR,
+                                                self.SENSOR_CACHE_TTL,
+                                                self.DEFAULT_SENSOR_CACHE_TTL))
         self.host_id = socket.getfqdn()
         self.sensor_id_map = None
         self._executor = executor
@@ -84,10 +93,11 @@ class NodeHWactuator(Actuator, Debug):
         try:
             if self.sensor_id_map:
                 fru_dict = self.sensor_id_map[fru.lower()]
-                for sensor_id in fru_dict.values():
-                    if sensor_id == '':
-                        continue
-                    sensor_common_info, sensor_specific_info = self._executor.get_sensor_props(sensor_id)
+                sensor_ids = [sensor_id for sensor_id in fru_dict.values() if sensor_id != '']
+                sensors_props = self._executor.get_sensors_props(sensor_ids,
+                                                max_age=self._sensor_cache_ttl)
+                for sensor_id in sensor_ids:
+                    sensor_common_info, sensor_specific_info = sensors_props[sensor_id]
                     self.fru_specific_info[sensor_id] = sensor_specific_info
                 if self.fru_specific_info is not None:
                     resource_info = self._parse_fru_info(fru)
@@ -162,7 +172,8 @@ class NodeHWactuator(Actuator, Debug):
         if fru_instance.isdigit() and isinstance(int(fru_instance), int):
             fru_dict = self.sensor_id_map.get(fru.lower())
             sensor_id = fru_dict[int(fru_instance)]
-            common, specific = self._executor.get_sensor_props(sensor_id)
+            common, specific = self._executor.get_sensor_props(sensor_id,
+                                                max_age=self._sensor_cache_ttl)
             response = self._create_node_fru_json_message(specific, sensor_id)
             response['instance_id'] = fru_instance
             response['info']['resource_id'] = sensor_id
@@ -240,7 +251,8 @@ class NodeHWactuator(Actuator, Debug):
          Deassertions Enabled  : unc+ ucr+
         """
         try:
-            sensor_get_response, return_code = self._executor._run_ipmitool_subcommand("sensor get '{0}'".format(sensor_name))
+            sensor_get_response, return_code = sensor_cache.sensor_get([sensor_name],
+                    self._executor._run_ipmitool_subcommand, self._sensor_cache_ttl)[sensor_name]
             if return_code == 0:
                 return self._response_to_dict(sensor_get_response)
             else:
@@ -300,15 +312,18 @@ class NodeHWactuator(Actuator, Debug):
         :return:
         """
         many_sensors = False
+        sdr_type_response, return_code = sensor_cache.sdr_type(sensor_type,
+                self._executor._run_ipmitool_subcommand, self._sensor_cache_ttl)
         if sensor_name == "*":
             many_sensors = True
-            sdr_type_response, return_code = self._executor._run_ipmitool_subcommand(
-                "sdr type '{0}'".format(sensor_type))
 
-        else:
-            sdr_type_response, return_code = self._executor._run_ipmitool_subcommand(
-                "sdr type '{0}'".format(sensor_type),
-                grep_args=sensor_name)
+        elif return_code == 0:
+            # Only the lines of the sensor, like grep would
+            lines = [line for line in sdr_type_response[0].split(b"\n")
+                     if sensor_name.encode() in line]
+            sdr_type_response = (b"\n".join(lines), b"")
+            if not lines:
+                return_code = 1
 
         if return_code != 0:
             msg = "sdr type '{0}' : command failed with error {1}".format(sensor_type, sdr_type_response)
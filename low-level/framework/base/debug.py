@@ -20,6 +20,7 @@
 """
 
 import json
+import logging
 from framework.utils.service_logging import logger
 try:
    from systemd import journal
@@ -36,16 +37,20 @@ class Debug(object):
         self._debug = False
         self._debug_persist = False
 
-    def _log_debug(self, message):
-        """Logging messages"""
+    def _log_debug(self, message, *args):
+        """Logging messages, formatted with args only if debug is logged"""
         # if self._debug:
         #     log_msg = self.name() + ", " + message
         #     if use_journal:
         #         journal.send(log_msg, PRIORITY=7, SYSLOG_IDENTIFIER="sspl-ll")
         #     else:
         #         logger.debug(log_msg)
-        log_msg = self.name() + ", " + message
-        logger.debug(log_msg)
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        if args:
+            logger.debug("%s, " + message, self.name(), *args)
+        else:
+            logger.debug("%s, %s", self.name(), message)
 
     def _set_debug(self, debug):
         """Sets debug flag"""
@@ -0,0 +1,260 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Shared runtime for module threads. One timer thread
+                     keeps the scheduled events of every attached module and
+                     hands due events to a bounded pool of worker threads.
+                     Events of one module never run concurrently.
+
+                     ModuleScheduler is the per module compatibility shim
+                     exposing the parts of sched.scheduler used by modules,
+                     so ScheduledModuleThread subclasses run unchanged.
+                     Queue driven modules are parked while their message
+                     queue is empty and woken up by _write_internal_msgQ.
+ ****************************************************************************
+"""
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+
+from framework.utils.service_logging import logger
+
+# Queue driven module schedulers by module name, used to wake them up on writes
+_queue_driven = {}
+
+
+def notify(module_name):
+    """Called after a message was written to the queue of module_name"""
+    module_scheduler = _queue_driven.get(module_name)
+    if module_scheduler is not None:
+        module_scheduler.wake()
+
+
+class ScheduledEvent(object):
+    """Event handle as returned by ModuleScheduler.enter()"""
+
+    __slots__ = ("time", "priority", "sequence", "action", "argument",
+                 "kwargs", "owner", "cancelled")
+
+    def __init__(self, time, priority, sequence, action, argument, kwargs, owner):
+        self.time = time
+        self.priority = priority
+        self.sequence = sequence
+        self.action = action
+        self.argument = argument
+        self.kwargs = kwargs
+        self.owner = owner
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.time, self.priority, self.sequence) < \
+               (other.time, other.priority, other.sequence)
+
+
+class EventScheduler(object):
+    """Timer thread plus bounded worker pool shared by all attached modules"""
+
+    def __init__(self, worker_threads=4):
+        self._worker_threads = max(1, int(worker_threads))
+        self._timers = []
+        self._sequence = itertools.count()
+        self._cv = threading.Condition()
+        self._ready = queue.Queue()
+        self._running = False
+        self._threads = []
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        timer = threading.Thread(target=self._timer_loop, name="sspl-timer", daemon=True)
+        self._threads.append(timer)
+        for index in range(self._worker_threads):
+            worker = threading.Thread(target=self._worker_loop,
+                                      name=f"sspl-worker-{index}", daemon=True)
+            self._threads.append(worker)
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"EventScheduler, started with {self._worker_threads} worker threads")
+
+    def stop(self):
+        self._running = False
+        with self._cv:
+            self._cv.notify()
+        for _ in range(self._worker_threads):
+            self._ready.put(None)
+
+    def module_scheduler(self, module, queue_driven=False):
+        """Returns the scheduler shim to be used by module"""
+        module_scheduler = ModuleScheduler(self, module, queue_driven)
+        if queue_driven:
+            _queue_driven[module.name()] = module_scheduler
+        return module_scheduler
+
+    def _add_timer(self, event):
+        with self._cv:
+            heapq.heappush(self._timers, event)
+            # Only wake the timer thread if the new event is the next one due
+            if self._timers[0] is event:
+                self._cv.notify()
+
+    def _dispatch(self, module_scheduler):
+        self._ready.put(module_scheduler)
+
+    def _timer_loop(self):
+        while self._running:
+            due = []
+            with self._cv:
+                now = time.time()
+                while self._timers and (self._timers[0].cancelled or self._timers[0].time <= now):
+                    event = heapq.heappop(self._timers)
+                    if not event.cancelled:
+                        due.append(event)
+                if not due:
+                    timeout = self._timers[0].time - now if self._timers else None
+                    self._cv.wait(timeout)
+                    continue
+            for event in due:
+                event.owner._event_due(event)
+
+    def _worker_loop(self):
+        while self._running:
+            module_scheduler = self._ready.get()
+            if module_scheduler is None:
+                break
+            module_scheduler._execute()
+
+
+class ModuleScheduler(object):
+    """sched.scheduler look-alike for one module on the shared runtime"""
+
+    def __init__(self, event_scheduler, module, queue_driven=False):
+        self._event_scheduler = event_scheduler
+        self._module = module
+        self._queue_driven = queue_driven
+        self._lock = threading.Lock()
+        # Events scheduled on the timer and not yet due
+        self._pending = set()
+        # Due events waiting for this module to be free
+        self._due = []
+        # run() events held back while the module's queue is empty
+        self._parked = []
+        self._busy = False
+
+    @property
+    def queue(self):
+        with self._lock:
+            events = list(self._pending) + self._due + self._parked
+        return sorted(events)
+
+    def empty(self):
+        with self._lock:
+            return not (self._pending or self._due or self._parked)
+
+    def enter(self, delay, priority, action, argument=(), kwargs=None):
+        return self.enterabs(time.time() + delay, priority, action, argument, kwargs)
+
+    def enterabs(self, time, priority, action, argument=(), kwargs=None):
+        event = ScheduledEvent(time, priority, next(self._event_scheduler._sequence),
+                               action, argument, kwargs or {}, self)
+        with self._lock:
+            self._pending.add(event)
+        self._event_scheduler._add_timer(event)
+        return event
+
+    def cancel(self, event):
+        with self._lock:
+            if event in self._pending:
+                self._pending.discard(event)
+            elif event in self._due:
+                self._due.remove(event)
+            elif event in self._parked:
+                self._parked.remove(event)
+            else:
+                raise ValueError("event not scheduled")
+            event.cancelled = True
+
+    def run(self, blocking=True):
+        """Events are run by the shared worker pool, nothing to do here"""
+        return None
+
+    def wake(self):
+        """Make the module's parked or pending run() due right away"""
+        with self._lock:
+            woken = self._parked + [event for event in self._pending if self._is_run(event)]
+            self._parked = []
+            # Moved events stay in the timer heap, _event_due() ignores
+            # them once they are no longer pending
+            for event in woken:
+                self._pending.discard(event)
+            self._due.extend(woken)
+        if woken:
+            self._schedule_execution()
+
+    def _is_run(self, event):
+        return self._queue_driven and event.action == self._module.run
+
+    def _has_messages(self):
+        try:
+            return not self._module._is_my_msgQ_empty()
+        except Exception:
+            # Queues are not set up yet, let the module decide
+            return True
+
+    def _event_due(self, event):
+        with self._lock:
+            if event not in self._pending:
+                return
+            self._pending.discard(event)
+            if self._is_run(event) and not self._has_messages():
+                self._parked.append(event)
+                parked = True
+            else:
+                self._due.append(event)
+                parked = False
+        if parked:
+            # A message may have arrived between the check and parking
+            if self._has_messages():
+                self.wake()
+        else:
+            self._schedule_execution()
+
+    def _schedule_execution(self):
+        with self._lock:
+            if self._busy or not self._due:
+                return
+            self._busy = True
+        self._event_scheduler._dispatch(self)
+
+    def _execute(self):
+        """Run due events of this module one after another on a worker"""
+        while True:
+            with self._lock:
+                if not self._due:
+                    self._busy = False
+                    return
+                self._due.sort()
+                event = self._due.pop(0)
+            try:
+                event.action(*event.argument, **event.kwargs)
+            except Exception as ex:
+                logger.exception(f"{self._module.name()} has encountered an error {ex}, "
+                                 f"error is unrecoverable, shutting down {self._module.name()}")
+                self._module.shutdown()
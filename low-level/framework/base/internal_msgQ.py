@@ -18,8 +18,16 @@
   Description:       Base class used for reading and writing to internal
                     message queues for modules to communication with one
                     another.
+
+                    Messages are queued in a MsgEnvelope and modules read
+                    them back as dicts, so JSON text is only made when a
+                    message leaves SSPL-LL or is logged.
  ****************************************************************************
 """
+import queue
+
+from framework.base import event_scheduler
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 
 class InternalMsgQ(object):
@@ -37,23 +45,26 @@ class InternalMsgQ(object):
         q = self._msgQlist[self.name()]
         return q.empty()
 
-    def _read_my_msgQ(self):
-        """Blocks on reading from this module's queue placed by another thread"""
+    def _read_my_msgQ(self, timeout=None):
+        """Blocks on reading from this module's queue placed by another thread,
+        for at most timeout seconds if given"""
         try:
             q = self._msgQlist[self.name()]
-            jsonMsg, event = q.get()
+            msg, event = q.get(timeout=timeout)
 
-            if jsonMsg is None:
+            if msg is None:
                 return None, None
 
             # Check for debugging being activated in the message header
-            global_debug_off, jsonMsg = self._check_debug(jsonMsg)
+            global_debug_off, jsonMsg = self._check_debug(MsgEnvelope.wrap(msg).body)
             if global_debug_off is True:
                  self._debug_off_globally()
 
-            self._log_debug("_read_my_msgQ: %s, Msg:%s" % (self.name(), jsonMsg))
+            self._log_debug("_read_my_msgQ: %s, Msg:%s", self.name(), msg)
             return jsonMsg, event
 
+        except queue.Empty:
+            pass
         except Exception as e:
             logger.exception("_read_my_msgQ: %r" % e)
 
@@ -69,29 +80,34 @@ class InternalMsgQ(object):
                 return None, None
 
             # Don't block waiting for messages
-            jsonMsg, event = q.get_nowait()
+            msg, event = q.get_nowait()
 
-            if jsonMsg is None:
+            if msg is None:
                 return None, None
 
             # Check for debugging being activated in the message header
-            global_debug_off, jsonMsg = self._check_debug(jsonMsg)
+            global_debug_off, jsonMsg = self._check_debug(MsgEnvelope.wrap(msg).body)
             if global_debug_off is True:
                 self._debug_off_globally()
 
-            self._log_debug("_read_my_msgQ_noWait: %s, Msg:%s" % (self.name(), jsonMsg))
+            self._log_debug("_read_my_msgQ_noWait: %s, Msg:%s", self.name(), msg)
             return jsonMsg, event
 
         except Exception as e:
             logger.exception("_read_my_msgQ_noWait: %r" % e)
 
     def _write_internal_msgQ(self, toModule, jsonMsg, event=None):
-        """writes a json message to an internal message queue"""
-        self._log_debug("_write_internal_msgQ: From %s, To %s, Msg:%s" %
-                       (self.name(), toModule, jsonMsg))
+        """writes a message, a MsgEnvelope, dict or json string, to an
+        internal message queue"""
+        if jsonMsg is not None:
+            jsonMsg = MsgEnvelope.wrap(jsonMsg)
+        self._log_debug("_write_internal_msgQ: From %s, To %s, Msg:%s",
+                        self.name(), toModule, jsonMsg)
 
         q = self._msgQlist[toModule]
         q.put((jsonMsg, event))
+        # Wake up the receiver if it waits on the shared runtime
+        event_scheduler.notify(toModule)
 
     def _get_msgQ_copy(self, module_name):
         """Returns a copy of a modules message queue"""
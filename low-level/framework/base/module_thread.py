@@ -65,6 +65,10 @@ class ScheduledModuleThread(ModuleThread, Debug):
     SUSPENDED = 2
     HALTED = 3
 
+    # Set by modules whose run() only processes their message queue. On the
+    # shared runtime such modules are only run once a message is queued.
+    QUEUE_DRIVEN = False
+
     def __init__(self, module_name, priority):
         super(ScheduledModuleThread, self).__init__()
 
@@ -81,8 +85,13 @@ class ScheduledModuleThread(ModuleThread, Debug):
         # Set the scheduler to fire the thread right away
         self._scheduler.enter(1, self._priority, self.run, ())
 
+    def attach_scheduler(self, event_scheduler):
+        """Move this module from its own scheduler and thread to the shared
+        runtime. Must be called before the module is initialized."""
+        self._scheduler = event_scheduler.module_scheduler(self, self.QUEUE_DRIVEN)
+
     def start(self):
-        """Run the scheduler"""
+        """Run the scheduler, returns right away on the shared runtime"""
         self._running = True
         self._scheduler.run()
 
@@ -0,0 +1,71 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Envelope of the messages passed between modules
+
+                     A message is put on an internal queue as the dict its
+                     producer built, or as JSON text by older producers, and
+                     the other form is only made when a module needs it:
+                     the dict is parsed from the text at most once, the
+                     text serialized from the dict at most once, usually by
+                     the egress processor when the message leaves SSPL-LL.
+ ****************************************************************************
+"""
+
+import json
+
+
+class MsgEnvelope(object):
+    """A message as a dict and/or its JSON text, each made from the other
+    once when first needed. The dict must not be changed once the envelope
+    is queued, modules copy it before adding to it."""
+
+    __slots__ = ("_body", "_json")
+
+    def __init__(self, body=None, json_msg=None):
+        self._body = body
+        self._json = json_msg
+
+    @classmethod
+    def wrap(cls, msg):
+        """msg as a MsgEnvelope, msg being one, a dict or JSON text"""
+        if isinstance(msg, cls):
+            return msg
+        if isinstance(msg, dict):
+            return cls(body=msg)
+        if isinstance(msg, bytes):
+            msg = msg.decode("utf-8")
+        return cls(json_msg=msg)
+
+    @property
+    def body(self):
+        """The message as a dict"""
+        if self._body is None:
+            self._body = json.loads(self._json)
+        return self._body
+
+    def to_json(self):
+        """The message as JSON text"""
+        if self._json is None:
+            self._json = json.dumps(self._body)
+        return self._json
+
+    def __str__(self):
+        return self.to_json()
+
+    def __repr__(self):
+        return f"MsgEnvelope({self.to_json()})"
@@ -42,6 +42,8 @@ NODE_ID = "001"
 SITE_ID = "001"
 RACK_ID = "001"
 SSPL_STORE_TYPE = 'consul'
+# Serve configuration reads from an in-memory copy of the consul keys
+SSPL_CONFIG_SNAPSHOT = 'true'
 SYSLOG_HOST = 'localhost'
 SYSLOG_PORT = '514'
 SYSINFO = "SYSTEM_INFORMATION"
@@ -227,6 +229,7 @@ class RaidDataConfig(Enum):
     RAID_RESULT_DIR = "/tmp"
     RAID_RESULT_FILE_PATH = "/tmp/result_raid_health_file"
     RAID_MISMATCH_FAULT_STATUS = "mismatch_cnt_fault_status"
+    RAID_INTEGRITY_STATE_FILE = "raid_integrity_state.json"
     MAX_RETRIES = 10
     NEXT_ITERATION_TIME = 3600
     PRIORITY = 1
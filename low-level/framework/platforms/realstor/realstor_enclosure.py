@@ -22,11 +22,11 @@
 import errno
 import json
 import hashlib
-import time
 
 from framework.target.enclosure import StorageEnclosure
 from framework.utils.service_logging import logger
 from framework.utils.webservices import WebServices
+from framework.platforms.realstor.realstor_poll_coordinator import RealStorPollCoordinator
 from framework.utils.store_factory import store
 from framework.utils import encryptor
 from framework.base.sspl_constants import ServiceTypes, COMMON_CONFIGS
@@ -39,6 +39,7 @@ class RealStorEnclosure(StorageEnclosure):
     WEBSERVICE_TIMEOUT = 20
     PERSISTENT_DATA_UPDATE_TIMEOUT = 5
     MAX_RETRIES = 2
+    MAX_CONNECTIONS_PER_MC = 4
 
     CONF_SECTION_MC = "STORAGE_ENCLOSURE"
     SYSTEM_INFORMATION = "SYSTEM_INFORMATION"
@@ -62,6 +63,7 @@ class RealStorEnclosure(StorageEnclosure):
     # CLI APIs
     URI_CLIAPI_LOGIN = "/login/"
     URI_CLIAPI_SHOWDISKS = "/show/disks"
+    URI_CLIAPI_SHOWDISKSDETAIL = "/show/disks/detail"
     URI_CLIAPI_SHOWSYSTEM = "/show/system"
     URI_CLIAPI_SHOWPSUS = "/show/power-supplies"
     URI_CLIAPI_SHOWCONTROLLERS = "/show/controllers"
@@ -95,7 +97,6 @@ class RealStorEnclosure(StorageEnclosure):
     # once available
     realstor_supported_interfaces = ['cliapi']
 
-    poll_system_ts = 0
     mc_timeout_counter = 0
 
     # resource inmemory cache
@@ -108,9 +109,11 @@ class RealStorEnclosure(StorageEnclosure):
     def __init__(self):
         super(RealStorEnclosure, self).__init__()
 
-        # WS Request common headers
-        self.ws = WebServices()
-        self.common_reqheaders = {}
+        # Keep-alive connections to each controller, shared by all sensors.
+        # Common request headers are set on the controller's session.
+        self.ws = WebServices(int(self.conf_reader._get_value_with_default(
+            self.CONF_REALSTORSENSORS, "max_connections_per_controller",
+            self.MAX_CONNECTIONS_PER_MC)))
 
         self.encl_conf = self.CONF_SECTION_MC
 
@@ -141,6 +144,12 @@ class RealStorEnclosure(StorageEnclosure):
         self.pollfreq = int(self.conf_reader._get_value_with_default(
             self.CONF_REALSTORSENSORS, "polling_frequency", self.DEFAULT_POLL))
 
+        # Fetches CLI API resources once per cycle for all sensors, requests
+        # of one cycle are sent poll_workers at a time
+        self.poller = RealStorPollCoordinator(self, self.conf_reader._get_value_with_default(
+            self.CONF_REALSTORSENSORS, "poll_workers", 1))
+        self._system_snapshot = None
+
         self.site_id = self.conf_reader._get_value_with_default(
                                                 self.SYSTEM_INFORMATION,
                                                 COMMON_CONFIGS.get(self.SYSTEM_INFORMATION).get(self.SITE_ID),
@@ -172,9 +181,9 @@ class RealStorEnclosure(StorageEnclosure):
         self.login()
 
     def _add_request_headers(self, sessionKey):
-        """Add common request headers"""
-        self.common_reqheaders['datatype'] = self.DATA_FORMAT_JSON
-        self.common_reqheaders['sessionKey'] = sessionKey
+        """Add common request headers to the active controller's session"""
+        self.ws.set_default_headers(self.build_url(self.URI_CLIAPI_BASE),
+            {'datatype': self.DATA_FORMAT_JSON, 'sessionKey': sessionKey})
 
     def build_url(self, uri):
         """Build request url"""
@@ -206,7 +215,12 @@ class RealStorEnclosure(StorageEnclosure):
             self.active_ip = self.mc1
             self.active_wsport = self.mc1_wsport
 
-        self.login()
+        # Requests now go through the other controller's session, only log in
+        # if there is no session key for it yet. An expired key is caught by
+        # ws_request, which logs in again.
+        if self.ws.get_default_header(self.build_url(self.URI_CLIAPI_BASE),
+                'sessionKey') is None:
+            self.login()
         logger.debug("Current MC active ip {0}, active wsport {1}. Logged-in\
             ".format(self.active_ip, self.active_wsport))
 
@@ -223,8 +237,7 @@ class RealStorEnclosure(StorageEnclosure):
                 # Extract show fru name from old URL to update alternative IP.
                 url = self.build_url(url[url.index('/api/'):].replace('/api',''))
 
-            response = self.ws.ws_request(method, url,
-                       self.common_reqheaders, post_data,
+            response = self.ws.ws_request(method, url, None, post_data,
                        self.WEBSERVICE_TIMEOUT)
 
             retry_count -= 1
@@ -288,7 +301,7 @@ class RealStorEnclosure(StorageEnclosure):
         headers = {'datatype':'json'}
 
         response = self.ws.ws_get(url + auth_hash, headers, \
-                       self.WEBSERVICE_TIMEOUT)
+                       self.WEBSERVICE_TIMEOUT, self.ws.endpoint(url))
 
         if not response:
             logger.warn("Login webservice request failed {0}".format(url))
@@ -372,47 +385,26 @@ class RealStorEnclosure(StorageEnclosure):
     def get_system_status(self):
         """Retreive realstor system state info using cli api /show/system"""
 
-        # poll system would get invoked through multiple realstor sensors
-        # with less frequency compared to configured polling frequency
-        # adding check to comply with polling frequency
-        elapsed = time.time() - self.poll_system_ts
-
-        if elapsed < self.pollfreq:
-            logger.warn("/show/system request came in {0} seconds,"
-                "while configured polling frequency is {1} seconds,"
-                "ignoring".format(elapsed, self.pollfreq))
-            return
-
         system = None
 
-        # make ws request
-        url = self.build_url(self.URI_CLIAPI_SHOWSYSTEM)
-        #logger.info("show system url: %s" % url)
-
-        response = self.ws_request(url, self.ws.HTTP_GET)
+        # /show/system is polled once per cycle for the sensors subscribed
+        # to it, each snapshot is only processed once
+        snapshot = self.poller.latest(self.URI_CLIAPI_SHOWSYSTEM)
 
-        if not response:
+        if snapshot is None:
             logger.warn("System status unavailable as ws request failed")
             return
 
-        if response.status_code != self.ws.HTTP_OK:
-            logger.info("{0}:: http request {1} polling system status failed"
-                " with http err {2}".format(self.LDR_R1_ENCL, url, \
-                response.status_code))
+        if snapshot is self._system_snapshot:
             return
+        self._system_snapshot = snapshot
 
-        self.poll_system_ts = time.time()
-
-        try:
-            jresponse = json.loads(response.content)
-        except ValueError as badjson:
-            logger.error("%s returned mal-formed json:\n%s" % (url, badjson))
+        jresponse = snapshot.data
 
         if jresponse:
             api_resp = self.get_api_status(jresponse['status'])
 
-            if ((api_resp == -1) and
-                   (response.status_code == self.ws.HTTP_OK)):
+            if api_resp == -1:
                 logger.warn("/show/system api response unavailable, "
                     "marking success as http code is 200")
                 api_resp = 0
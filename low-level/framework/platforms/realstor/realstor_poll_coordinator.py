@@ -0,0 +1,219 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Poll coordinator for the RealStor CLI API
+
+                     Sensors subscribe to the CLI API resources they need
+                     instead of requesting them on their own. Every resource
+                     is fetched once per cycle, the shortest poll interval of
+                     its subscribers, and its json response is parsed once
+                     and published as an immutable snapshot. Resources
+                     whose subscribers are all suspended are not fetched.
+ ****************************************************************************
+"""
+
+import json
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from framework.utils.service_logging import logger
+
+
+class FrozenDict(dict):
+    """dict refusing modification, copies and pickles as a plain dict"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("RealStor snapshot data is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class FrozenList(list):
+    """list refusing modification, copies and pickles as a plain list"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("RealStor snapshot data is read-only")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def freeze(data):
+    """Read-only copy of parsed json data"""
+    if isinstance(data, dict):
+        return FrozenDict((key, freeze(value)) for key, value in data.items())
+    if isinstance(data, list):
+        return FrozenList(freeze(value) for value in data)
+    return data
+
+
+class RealStorSnapshot(namedtuple("RealStorSnapshot", "uri cycle timestamp data")):
+    """Parsed response of one CLI API resource from one poll cycle"""
+    __slots__ = ()
+
+
+class RealStorPollCoordinator(object):
+    """Fetches subscribed CLI API resources on behalf of all sensors"""
+
+    # Longest wait for the first poll of a resource, covering login, retries
+    # and a switch to the other controller
+    FIRST_POLL_TIMEOUT = 60
+
+    def __init__(self, enclosure, workers=1):
+        self._encl = enclosure
+        self._workers = max(1, int(workers))
+        self._executor = None
+        self._cv = threading.Condition()
+        self._intervals = {}
+        self._next_poll = {}
+        self._callbacks = {}
+        self._active = {}
+        self._snapshots = {}
+        self._polled = {}
+        self._cycle = 0
+        self._thread = None
+
+    def subscribe(self, uri, interval, callback=None, active=None):
+        """Have uri polled at least every interval seconds. callback, if
+        given, is called with each new snapshot, or None when the request
+        failed, from the poller thread. active, if given, returns False
+        while the subscriber does not need uri, e.g. when suspended; uri
+        is skipped while no subscriber needs it."""
+        with self._cv:
+            if uri not in self._intervals:
+                self._intervals[uri] = interval
+                self._next_poll[uri] = time.time()
+                self._polled[uri] = threading.Event()
+            elif interval < self._intervals[uri]:
+                self._intervals[uri] = interval
+                self._next_poll[uri] = min(self._next_poll[uri], time.time() + interval)
+            if callback is not None:
+                self._callbacks.setdefault(uri, []).append(callback)
+            if active not in self._active.setdefault(uri, []):
+                self._active[uri].append(active)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                    name="realstor-poller", daemon=True)
+                self._thread.start()
+            self._cv.notify()
+
+    def latest(self, uri, timeout=FIRST_POLL_TIMEOUT):
+        """Most recent snapshot of uri, None if the last request failed.
+        Waits at most timeout seconds for the first poll to complete."""
+        polled = self._polled.get(uri)
+        if polled is None:
+            return None
+        if not polled.is_set():
+            # Skipped while suspended, poll it again right away
+            with self._cv:
+                self._next_poll[uri] = min(self._next_poll[uri], time.time())
+                self._cv.notify()
+        polled.wait(timeout)
+        return self._snapshots.get(uri)
+
+    def poll(self, uris):
+        """Fetch uris now, in parallel if workers allow, and publish them"""
+        if self._workers > 1 and len(uris) > 1:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._workers)
+            results = list(self._executor.map(self._fetch, uris))
+        else:
+            results = [self._fetch(uri) for uri in uris]
+
+        with self._cv:
+            self._cycle += 1
+            snapshots = {}
+            for uri, data in zip(uris, results):
+                snapshot = None
+                if data is not None:
+                    snapshot = RealStorSnapshot(uri, self._cycle, time.time(), data)
+                self._snapshots[uri] = snapshots[uri] = snapshot
+                self._polled.setdefault(uri, threading.Event()).set()
+            callbacks = {uri: list(self._callbacks.get(uri, [])) for uri in uris}
+
+        for uri, snapshot in snapshots.items():
+            for callback in callbacks[uri]:
+                try:
+                    callback(snapshot)
+                except Exception as ex:
+                    logger.exception(f"RealStorPollCoordinator, {uri} subscriber failed: {ex}")
+        return snapshots
+
+    def _fetch(self, uri):
+        """Request uri, returns its parsed and frozen response or None"""
+        url = self._encl.build_url(uri)
+        response = self._encl.ws_request(url, self._encl.ws.HTTP_GET)
+
+        if not response:
+            logger.warn(f"{self._encl.LDR_R1_ENCL}:: ws request {url} failed")
+            return None
+
+        if response.status_code != self._encl.ws.HTTP_OK:
+            if url.find(self._encl.ws.LOOPBACK) == -1:
+                logger.error(f"{self._encl.LDR_R1_ENCL}:: http request {url} failed with "
+                             f"err {response.status_code}")
+            return None
+
+        try:
+            return freeze(json.loads(response.content))
+        except ValueError as badjson:
+            logger.error(f"{url} returned mal-formed json:\n{badjson}")
+        return None
+
+    def _is_needed(self, uri):
+        """True if a subscriber of uri is not suspended"""
+        for active in self._active.get(uri, []):
+            try:
+                if active is None or active():
+                    return True
+            except Exception as ex:
+                logger.exception(f"RealStorPollCoordinator, {uri} subscriber failed: {ex}")
+                return True
+        return False
+
+    def _run(self):
+        while True:
+            with self._cv:
+                now = time.time()
+                due = [uri for uri, due_at in self._next_poll.items() if due_at <= now]
+                if not due:
+                    self._cv.wait(min(self._next_poll.values()) - now)
+                    continue
+                for uri in due:
+                    self._next_poll[uri] = now + self._intervals[uri]
+                # Drop what suspended subscribers would read on resume, the
+                # first latest() after it waits for a fresh poll instead
+                skipped = [uri for uri in due if not self._is_needed(uri)]
+                for uri in skipped:
+                    self._snapshots.pop(uri, None)
+                    self._polled[uri].clear()
+                due = [uri for uri in due if uri not in skipped]
+                if not due:
+                    continue
+            try:
+                self.poll(due)
+            except Exception as ex:
+                logger.exception(f"RealStorPollCoordinator, poll of {due} failed: {ex}")
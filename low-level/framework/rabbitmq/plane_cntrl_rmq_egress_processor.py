@@ -183,7 +183,9 @@ class PlaneCntrlRMQegressProcessor(ScheduledModuleThread, InternalMsgQ):
             logger.exception("PlaneCntrlRMQegressProcessor, _read_config: %r" % ex)
 
     def _add_signature(self):
-        """Adds the authentication signature to the message"""
+        """Adds the authentication signature to a copy of the message,
+        the message itself may still be held by its producer"""
+        self._jsonMsg = dict(self._jsonMsg)
         self._jsonMsg["username"] = self._signature_user
         self._jsonMsg["expires"]  = int(self._signature_expires)
         self._jsonMsg["time"]     = str(int(time.time()))
@@ -264,7 +266,7 @@ class PlaneCntrlRMQegressProcessor(ScheduledModuleThread, InternalMsgQ):
             self._jsonMsg = json.dumps(self._jsonMsg).encode('utf8')
             self._connection.publish(exchange, routing_key, properties, body)
             # No exceptions thrown so success
-            self._log_debug("_transmit_msg_on_exchange, Successfully Sent: %s" % self._jsonMsg)
+            self._log_debug("_transmit_msg_on_exchange, Successfully Sent: %s", self._jsonMsg)
             # If event is added by sensors, set it
             if self._event:
                 self._event.set()
@@ -26,8 +26,7 @@ import os
 
 from socket import gethostname
 
-from jsonschema import Draft3Validator
-from jsonschema import validate
+from json_msgs.schema_registry import registry
 
 from pika.exceptions import AMQPError
 
@@ -89,18 +88,14 @@ class PlaneCntrlRMQingressProcessor(ScheduledModuleThread, InternalMsgQ):
         self._sensor_schema = self._load_schema(schema_file)
 
     def _load_schema(self, schema_file):
-        """Loads a schema from a file and validates
+        """Loads a schema from a file and validates, once per process
 
         @param string schema_file     location of schema on the file system
-        @return string                Trimmed and validated schema
+        @return string                schema_file, to validate messages with
         """
-        with open(schema_file, 'r') as f:
-            schema = json.load(f)
+        registry.validator(schema_file)
 
-        # Validate the schema to conform to Draft 3 specification
-        Draft3Validator.check_schema(schema)
-
-        return schema
+        return schema_file
 
     def initialize(self, conf_reader, msgQlist, products):
         """initialize configuration reader and internal msg queues"""
@@ -174,13 +169,13 @@ class PlaneCntrlRMQingressProcessor(ScheduledModuleThread, InternalMsgQ):
                 msgType = message.get("actuator_request_type")
 
                 # Validate against the actuator schema
-                validate(ingressMsg, self._actuator_schema)
+                registry.validate(ingressMsg, self._actuator_schema)
 
             elif message.get("sensor_request_type") is not None:
                 msgType = message.get("sensor_request_type")
 
                 # Validate against the sensor schema
-                validate(ingressMsg, self._sensor_schema)
+                registry.validate(ingressMsg, self._sensor_schema)
 
             else:
                 # We only handle incoming actuator and sensor requests, ignore everything else
@@ -230,7 +225,7 @@ class PlaneCntrlRMQingressProcessor(ScheduledModuleThread, InternalMsgQ):
 
         except Exception as ex:
             logger.exception("PlaneCntrlRMQingressProcessor, _process_msg unrecognized message: %r" % ingressMsg)
-            ack_msg = AckResponseMsg("Error Processing Msg", "Msg Handler Not Found", uuid).getJson()
+            ack_msg = AckResponseMsg("Error Processing Msg", "Msg Handler Not Found", uuid).getEnvelope()
             self._write_internal_msgQ(PlaneCntrlRMQegressProcessor.name(), ack_msg)
 
         # Acknowledge message was received
@@ -257,7 +252,7 @@ class PlaneCntrlRMQingressProcessor(ScheduledModuleThread, InternalMsgQ):
             ack_type["arguments"] = str(job_uuid)
 
             # The uuid is either not found or it's in the queue to be worked
-            ack_msg = AckResponseMsg(json.dumps(ack_type), response, uuid).getJson()
+            ack_msg = AckResponseMsg(json.dumps(ack_type), response, uuid).getEnvelope()
             self._write_internal_msgQ(PlaneCntrlRMQegressProcessor.name(), ack_msg)
         except Exception as ex:
             logger.exception("PlaneCntrlRMQingressProcessor, _process_job_status exception: %s" % str(ex))
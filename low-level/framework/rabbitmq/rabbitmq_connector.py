@@ -78,6 +78,7 @@ class RabbitMQSafeConnection:
         exchange_name,
         routing_key,
         queue_name,
+        confirm_delivery=False,
     ):
         self.username = username
         self.password = password
@@ -85,6 +86,7 @@ class RabbitMQSafeConnection:
         self.exchange_name = exchange_name
         self.routing_key = routing_key
         self.queue_name = queue_name
+        self.confirm_delivery = confirm_delivery
         self.wait_time = 10
         self.connection = self._establish_connection(raise_err=False)
 
@@ -121,9 +123,44 @@ class RabbitMQSafeConnection:
             self._establish_connection()
             self.publish(exchange, routing_key, properties, body)
 
-    def consume(self, callback):
-        """Consumes based on routing key. Retries if fails."""
+    def publish_batch(self, exchange, routing_key, properties, bodies):
+        """Publishes the messages in order. On a connection failure
+        reconnects and resumes with the first unsent message. Returns the
+        number of messages published, the rest could not be delivered.
+        With confirm_delivery each publish waits for its own confirm, a
+        nacked message and the ones after it are left unsent, the ones
+        confirmed before it are never sent again.
+        """
+        sent = 0
+        while sent < len(bodies):
+            try:
+                self._channel.basic_publish(
+                    exchange=exchange,
+                    routing_key=routing_key,
+                    properties=properties,
+                    body=bodies[sent],
+                )
+                sent += 1
+            except connection_exceptions as e:
+                logger.error(connection_error_msg.format(e))
+                logger.error(f'Connection closed while publishing, {len(bodies) - sent} messages pending')
+                try:
+                    self._establish_connection()
+                except Exception as err:
+                    logger.error(f'Unable to reconnect to RabbitMQ: {err}')
+                    break
+            except (pika.exceptions.NackError, pika.exceptions.UnroutableError) as e:
+                logger.error(f'RabbitMQ did not confirm message: {repr(e)}')
+                break
+        return sent
+
+    def consume(self, callback, prefetch_count=0):
+        """Consumes based on routing key. Retries if fails. At most
+        prefetch_count messages are delivered before they are acked, 0
+        for no limit."""
         try:
+            if prefetch_count:
+                self._channel.basic_qos(prefetch_count=prefetch_count)
             result = self._channel.queue_declare(queue="", exclusive=True)
             self._channel.queue_bind(
                 exchange=self.exchange_name,
@@ -139,18 +176,23 @@ class RabbitMQSafeConnection:
             logger.error(connection_error_msg.format(e))
             logger.error('Connection closed while consuming queue.')
             self._retry_connection()
-            self.consume(callback)
+            self.consume(callback, prefetch_count)
 
-    def ack(self, ch, delivery_tag):
-        """Acknowledges the message on the channel. Retries on connection failure
-        with a new RabbitMQ node.
+    def ack(self, ch, delivery_tag, multiple=False):
+        """Acknowledges the message on the channel, and all the ones before
+        it if multiple. Retries on connection failure with a new RabbitMQ node.
         """
         try:
-            self._channel.basic_ack(delivery_tag)
+            self._channel.basic_ack(delivery_tag, multiple=multiple)
         except connection_exceptions as e:
             logger.error(f'Connection Ack error.: {repr(e)} Retrying...')
             self._retry_connection()
-            self.ack(ch, delivery_tag)
+            self.ack(ch, delivery_tag, multiple)
+
+    def call_threadsafe(self, callback):
+        """Runs callback on the thread consuming the connection, the only
+        one which may use the channel"""
+        self._connection.add_callback_threadsafe(callback)
 
     def _establish_connection(self, raise_err=True):
         """Connects to a RabbitMQ node and binds the queues if available.
@@ -160,6 +202,10 @@ class RabbitMQSafeConnection:
                 self.username, self.password, self.virtual_host
             )
             self._channel = self._connection.channel()
+            if self.confirm_delivery:
+                # basic_publish now returns only once the broker confirmed
+                # the message and raises NackError/UnroutableError otherwise
+                self._channel.confirm_delivery()
             self._channel.exchange_declare(
                 exchange=self.exchange_name, exchange_type='topic', durable=True
             )
@@ -174,6 +220,13 @@ class RabbitMQSafeConnection:
             if raise_err:
                 raise e
 
+    def is_open(self):
+        """Returns True if the connection and its channel are usable"""
+        try:
+            return self._connection.is_open and self._channel.is_open
+        except AttributeError:
+            return False
+
     def cleanup(self):
         """Cleans up the connection.
         """
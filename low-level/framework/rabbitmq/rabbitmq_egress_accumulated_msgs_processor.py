@@ -6,6 +6,11 @@
                     any message to be sent to rabbtmq. If rabbitmq connection
                     is availble message will be sent, else in next iteration
                     it will be retried.
+                    Messages are replayed in batches over a long-lived
+                    channel with publisher confirms, a batch is removed from
+                    consul only once every message in it was confirmed.
+                    Replay is rate limited and backs off while the live
+                    egress queue has messages waiting.
  Creation Date:     03/19/2020
  Author:            Sandeep Anjara
 
@@ -21,7 +26,6 @@
 import sys
 
 import pika
-import json
 import time
 
 from framework.base.module_thread import ScheduledModuleThread
@@ -62,6 +66,8 @@ class RabbitMQEgressAccumulatedMsgsProcessor(ScheduledModuleThread, InternalMsgQ
     SIGNATURE_EXPIRES       = 'message_signature_expires'
     IEM_ROUTE_ADDR          = 'iem_route_addr'
     IEM_ROUTE_EXCHANGE_NAME = 'iem_route_exchange_name'
+    REPLAY_BATCH_SIZE       = 'accumulated_msgs_batch_size'
+    REPLAY_MAX_RATE         = 'accumulated_msgs_max_rate'
 
     SYSTEM_INFORMATION_KEY = 'SYSTEM_INFORMATION'
     CLUSTER_ID_KEY = 'cluster_id'
@@ -69,6 +75,13 @@ class RabbitMQEgressAccumulatedMsgsProcessor(ScheduledModuleThread, InternalMsgQ
     # 300 seconds for 5 mins
     MSG_TIMEOUT = 300
 
+    # Seconds between checks for accumulated messages, and while replaying
+    # the longest time spent in one run before giving other work a turn
+    POLL_INTERVAL = 30
+    REPLAY_SLICE = 5
+    # Name of the live egress module whose queue takes precedence
+    LIVE_EGRESS_MODULE = 'RabbitMQegressProcessor'
+
 
     @staticmethod
     def name():
@@ -91,9 +104,13 @@ class RabbitMQEgressAccumulatedMsgsProcessor(ScheduledModuleThread, InternalMsgQ
 
         self._connection = RabbitMQSafeConnection(
             self._username, self._password, self._virtual_host,
-            self._exchange_name, self._routing_key, self._queue_name
+            self._exchange_name, self._routing_key, self._queue_name,
+            confirm_delivery=True
         )
 
+        self._msg_props = pika.BasicProperties()
+        self._msg_props.content_type = "text/plain"
+
     def read_data(self):
         """This method is part of interface. Currently it is not
         in use.
@@ -114,30 +131,74 @@ class RabbitMQEgressAccumulatedMsgsProcessor(ScheduledModuleThread, InternalMsgQ
                     logger.info("RabbitMQEgressAccumulatedMsgsProcessor, run, received" \
                                     "global shutdown message from sspl_ll_d")
                     self.shutdown()
+        next_run = self.POLL_INTERVAL
         try:
             if not store_queue.is_empty():
                 logger.debug("Found accumulated messages, trying to send again")
-                self._connection._establish_connection()
-                msg_props = pika.BasicProperties()
-                msg_props.content_type = "text/plain"
-                while not store_queue.is_empty():
-                    message = store_queue.get()
-                    dict_msg = json.loads(message)
-                    if "actuator_response_type" in dict_msg["message"]:
-                        event_time = dict_msg["message"]["actuator_response_type"]["info"]["event_time"]
-                        time_diff = int(time.time()) - int(event_time)
-                        if time_diff > self.MSG_TIMEOUT:
-                            continue
-                    self._connection.publish(exchange=self._exchange_name,routing_key=self._routing_key,properties=msg_props,body=message)
-
-                self._connection.cleanup()
+                if not self._replay_accumulated_msgs():
+                    # Not done yet, come back soon
+                    next_run = 1
         except connection_exceptions as e:
             logger.error(connection_error_msg.format(e))
+            self._connection.cleanup()
         except Exception as e:
             logger.error(e)
+            self._connection.cleanup()
         finally:
             logger.debug("Consul accumulated processing ended")
-            self._scheduler.enter(30, self._priority, self.run, ())
+            self._scheduler.enter(next_run, self._priority, self.run, ())
+
+    def _live_egress_pending(self):
+        """Returns True if live messages are waiting to be sent"""
+        live_queue = self._msgQlist.get(self.LIVE_EGRESS_MODULE)
+        return live_queue is not None and not live_queue.empty()
+
+    def _replay_accumulated_msgs(self):
+        """Publish stored messages in confirmed batches. Returns True once
+        the store is drained, False if replay yielded before that.
+
+        pika's BlockingChannel waits for the confirm of each publish, so a
+        message is discarded from the store only once confirmed. A message
+        re-sent after a reconnection may have reached the broker already,
+        delivery is at least once."""
+        if not self._connection.is_open():
+            self._connection._establish_connection()
+
+        slice_end = time.time() + self.REPLAY_SLICE
+        while not store_queue.is_empty():
+            if self._live_egress_pending() or time.time() >= slice_end:
+                return False
+
+            batch_start = time.time()
+            first, entries = store_queue.peek_batch(self._batch_size)
+            now = int(batch_start)
+            expired = 0
+            # Messages confirmed, or dropped as expired, from the start of
+            # the batch. Only those are discarded if one is nacked, the
+            # next run resumes with the nacked message.
+            handled = 0
+            try:
+                for message, event_time in entries:
+                    if event_time is None or now - int(event_time) <= self.MSG_TIMEOUT:
+                        self._connection.publish(exchange=self._exchange_name,
+                                                 routing_key=self._routing_key,
+                                                 properties=self._msg_props,
+                                                 body=message)
+                    else:
+                        expired += 1
+                    handled += 1
+            finally:
+                store_queue.discard(first + handled)
+            logger.debug(f"Replayed {len(entries) - expired} accumulated messages, "
+                         f"dropped {expired} expired, {len(store_queue)} left")
+
+            # Keep the replay rate under the configured limit, if any
+            if self._max_rate > 0:
+                min_duration = len(entries) / self._max_rate
+                elapsed = time.time() - batch_start
+                if elapsed < min_duration:
+                    time.sleep(min_duration - elapsed)
+        return True
 
     def _read_config(self):
         """Configure the RabbitMQ exchange with defaults available"""
@@ -190,6 +251,12 @@ class RabbitMQEgressAccumulatedMsgsProcessor(ScheduledModuleThread, InternalMsgQ
             self._iem_route_exchange_name = self._conf_reader._get_value_with_default(self.RABBITMQPROCESSOR,
                                                                  self.IEM_ROUTE_EXCHANGE_NAME,
                                                                  'sspl-in')
+            self._batch_size = int(self._conf_reader._get_value_with_default(self.RABBITMQPROCESSOR,
+                                                                 self.REPLAY_BATCH_SIZE,
+                                                                 100))
+            self._max_rate = float(self._conf_reader._get_value_with_default(self.RABBITMQPROCESSOR,
+                                                                 self.REPLAY_MAX_RATE,
+                                                                 500))
 
             cluster_id = self._conf_reader._get_value_with_default(self.SYSTEM_INFORMATION_KEY,
                                                                    COMMON_CONFIGS.get(self.SYSTEM_INFORMATION_KEY).get(self.CLUSTER_ID_KEY),
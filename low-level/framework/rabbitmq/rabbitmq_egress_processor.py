@@ -16,6 +16,11 @@
 """
  ****************************************************************************
   Description:       Handles outgoing messages via messaging bus system
+
+                     Each wake-up drains up to egress_batch_size queued
+                     messages and publishes consecutive messages bound for
+                     the same exchange together, optionally with publisher
+                     confirms.
  ****************************************************************************
 """
 
@@ -27,7 +32,7 @@ import sys
 from framework.base.module_thread import ScheduledModuleThread
 from framework.base.internal_msgQ import InternalMsgQ
 from framework.utils.service_logging import logger
-from .rabbitmq_connector import RabbitMQSafeConnection, connection_exceptions
+from .rabbitmq_connector import RabbitMQSafeConnection
 from framework.utils import encryptor
 from framework.utils.store_factory import store
 from framework.utils import mon_utils
@@ -49,6 +54,9 @@ class RabbitMQegressProcessor(ScheduledModuleThread, InternalMsgQ):
     MODULE_NAME = "RabbitMQegressProcessor"
     PRIORITY    = 1
 
+    # Only runs when there are messages on its queue, see EventScheduler
+    QUEUE_DRIVEN = True
+
     # Section and keys in configuration file
     RABBITMQPROCESSOR       = MODULE_NAME.upper()
     VIRT_HOST               = 'virtual_host'
@@ -68,11 +76,18 @@ class RabbitMQegressProcessor(ScheduledModuleThread, InternalMsgQ):
     SIGNATURE_EXPIRES       = 'message_signature_expires'
     IEM_ROUTE_ADDR          = 'iem_route_addr'
     IEM_ROUTE_EXCHANGE_NAME = 'iem_route_exchange_name'
+    BATCH_SIZE              = 'egress_batch_size'
+    PUBLISHER_CONFIRMS      = 'publisher_confirms'
 
     SYSTEM_INFORMATION_KEY = 'SYSTEM_INFORMATION'
     CLUSTER_ID_KEY = 'cluster_id'
     NODE_ID_KEY = 'node_id'
 
+    # Longest wait for a message before run() returns to the scheduler
+    QUEUE_WAIT_TIMEOUT = 1
+    # Interval in seconds at which throughput and queue depth are logged
+    METRICS_INTERVAL = 60
+
     @staticmethod
     def name():
         """ @return: name of the module."""
@@ -96,13 +111,27 @@ class RabbitMQegressProcessor(ScheduledModuleThread, InternalMsgQ):
 
         self._product = product
 
+        # Session token is reused for all messages until it expires
+        self._session_token = None
+        self._session_token_expiry = 0
+
+        self._msgs_sent = 0
+        self._msgs_stored = 0
+        self._metrics_window_start = time.time()
+        self._metrics_window_sent = 0
+        self._msgs_per_sec = 0.0
+
+        self._msg_props = pika.BasicProperties()
+        self._msg_props.content_type = "text/plain"
+
         # Configure RabbitMQ Exchange to transmit messages
         self._connection = None
         self._read_config()
 
         self._connection = RabbitMQSafeConnection(
             self._username, self._password, self._virtual_host,
-            self._exchange_name, self._routing_key, self._queue_name
+            self._exchange_name, self._routing_key, self._queue_name,
+            confirm_delivery=self._publisher_confirms
         )
 
         self._ack_connection = RabbitMQSafeConnection(
@@ -129,18 +158,18 @@ class RabbitMQegressProcessor(ScheduledModuleThread, InternalMsgQ):
         #self._set_debug_persist(True)
 
         try:
-            # Loop thru all messages in queue until and transmit
-            while not self._is_my_msgQ_empty():
-                self._jsonMsg, self._event = self._read_my_msgQ()
-
-                if self._jsonMsg is not None:
-                    self._transmit_msg_on_exchange()
+            # Wait for the next message and transmit it along with
+            #  whatever else is already queued up
+            batch = self._read_batch()
+            if batch:
+                self._transmit_batch(batch)
 
         except Exception:
             # Log it and restart the whole process when a failure occurs
             logger.error("RabbitMQegressProcessor restarting")
 
         self._log_debug("Finished processing successfully")
+        self._update_metrics()
 
         # Shutdown is requested by the sspl_ll_d shutdown handler
         #  placing a 'shutdown' msg into our queue which allows us to
@@ -148,7 +177,42 @@ class RabbitMQegressProcessor(ScheduledModuleThread, InternalMsgQ):
         if self._request_shutdown is True:
             self.shutdown()
         else:
-            self._scheduler.enter(1, self._priority, self.run, ())
+            # Waiting happens on the queue itself in _read_batch()
+            self._scheduler.enter(0, self._priority, self.run, ())
+
+    def _read_batch(self):
+        """Blocks until a message arrives or QUEUE_WAIT_TIMEOUT expires, then
+        returns up to egress_batch_size (jsonMsg, event) pairs"""
+        batch = []
+        jsonMsg, event = self._read_my_msgQ(timeout=self.QUEUE_WAIT_TIMEOUT)
+        while jsonMsg is not None:
+            batch.append((jsonMsg, event))
+            if len(batch) >= self._batch_size:
+                break
+            jsonMsg, event = self._read_my_msgQ_noWait() or (None, None)
+        return batch
+
+    def get_metrics(self):
+        """Returns egress throughput and queue depth"""
+        return {
+            "msgs_per_sec": self._msgs_per_sec,
+            "queue_depth": self._msgQlist[self.name()].qsize(),
+            "msgs_sent": self._msgs_sent,
+            "msgs_stored": self._msgs_stored
+        }
+
+    def _update_metrics(self):
+        """Recompute throughput once per METRICS_INTERVAL and log it"""
+        elapsed = time.time() - self._metrics_window_start
+        if elapsed < self.METRICS_INTERVAL:
+            return
+        self._msgs_per_sec = self._metrics_window_sent / elapsed
+        self._metrics_window_start = time.time()
+        self._metrics_window_sent = 0
+        metrics = self.get_metrics()
+        logger.info(f"RabbitMQegressProcessor, {metrics['msgs_per_sec']:.1f} msgs/sec, "
+                    f"queue depth {metrics['queue_depth']}, sent {metrics['msgs_sent']}, "
+                    f"stored in consul {metrics['msgs_stored']}")
 
     def _read_config(self):
         """Configure the RabbitMQ exchange with defaults available"""
@@ -201,6 +265,12 @@ class RabbitMQegressProcessor(ScheduledModuleThread, InternalMsgQ):
             self._iem_route_exchange_name = self._conf_reader._get_value_with_default(self.RABBITMQPROCESSOR,
                                                                  self.IEM_ROUTE_EXCHANGE_NAME,
                                                                  'sspl-in')
+            self._batch_size = int(self._conf_reader._get_value_with_default(self.RABBITMQPROCESSOR,
+                                                                 self.BATCH_SIZE,
+                                                                 100))
+            self._publisher_confirms = str(self._conf_reader._get_value_with_default(self.RABBITMQPROCESSOR,
+                                                                 self.PUBLISHER_CONFIRMS,
+                                                                 'false')).lower() == 'true'
 
             cluster_id = self._conf_reader._get_value_with_default(self.SYSTEM_INFORMATION_KEY,
                                                                    COMMON_CONFIGS.get(self.SYSTEM_INFORMATION_KEY).get(self.CLUSTER_ID_KEY),
@@ -217,20 +287,16 @@ class RabbitMQegressProcessor(ScheduledModuleThread, InternalMsgQ):
             logger.error("RabbitMQegressProcessor, _read_config: %r" % ex)
 
     def _add_signature(self):
-        """Adds the authentication signature to the message"""
-        self._log_debug("_add_signature, jsonMsg: %s" % self._jsonMsg)
+        """Adds the authentication signature to a copy of the message,
+        the message itself may still be held by its producer"""
+        self._log_debug("_add_signature, jsonMsg: %s", self._jsonMsg)
+        self._jsonMsg = dict(self._jsonMsg)
         self._jsonMsg["username"] = self._signature_user
         self._jsonMsg["expires"]  = int(self._signature_expires)
         self._jsonMsg["time"]     = str(int(time.time()))
 
         if use_security_lib:
-            authn_token_len = len(self._signature_token) + 1
-            session_length  = int(self._signature_expires)
-            token = ctypes.create_string_buffer(SSPL_SEC.sspl_get_token_length())
-
-            SSPL_SEC.sspl_generate_session_token(
-                                    self._signature_user, authn_token_len,
-                                    self._signature_token, session_length, token)
+            token = self._get_session_token()
 
             # Generate the signature
             msg_len = len(self._jsonMsg) + 1
@@ -242,76 +308,131 @@ class RabbitMQegressProcessor(ScheduledModuleThread, InternalMsgQ):
         else:
             self._jsonMsg["signature"] = "SecurityLibNotInstalled"
 
-    def _transmit_msg_on_exchange(self):
-        """Transmit json message onto RabbitMQ exchange"""
-        self._log_debug("_transmit_msg_on_exchange, jsonMsg: %s" % self._jsonMsg)
+    def _get_event_time(self, jsonMsg):
+        """Returns the event_time of an actuator response, stored next to
+        the message so stale responses can be dropped on replay without
+        parsing the message again. Other messages never expire."""
+        actuator_response = jsonMsg.get("message").get("actuator_response_type")
+        if actuator_response is not None and actuator_response.get("info") is not None:
+            return actuator_response.get("info").get("event_time")
+        return None
+
+    def _get_session_token(self):
+        """Returns the session token, generating a new one only once the
+        current one is about to expire"""
+        now = time.time()
+        if self._session_token is None or now >= self._session_token_expiry:
+            authn_token_len = len(self._signature_token) + 1
+            session_length  = int(self._signature_expires)
+            token = ctypes.create_string_buffer(SSPL_SEC.sspl_get_token_length())
 
-        try:
-            # Check for shut down message from sspl_ll_d and set a flag to shutdown
-            #  once our message queue is empty
-            if self._jsonMsg.get("message").get("actuator_response_type") is not None and \
-                self._jsonMsg.get("message").get("actuator_response_type").get("thread_controller") is not None and \
-                self._jsonMsg.get("message").get("actuator_response_type").get("thread_controller").get("thread_response") == \
-                    "SSPL-LL is shutting down":
-                    logger.info("RabbitMQegressProcessor, _transmit_msg_on_exchange, received" \
-                                    "global shutdown message from sspl_ll_d")
-                    self._request_shutdown = True
-
-            msg_props = pika.BasicProperties()
-            msg_props.content_type = "text/plain"
-
-            # Publish json message to the correct channel
-            # NOTE: We need to route ThreadController messages to ACK channel.
-            # We can't modify schema as it will affect other modules too. As a
-            # temporary solution we have added a extra check to see if actuator_response_type
-            # is "thread_controller".
-            # TODO: Find a proper way to solve this issue. Avoid changing
-            # core egress processor code
-            if self._jsonMsg.get("message").get("actuator_response_type") is not None and \
-              (self._jsonMsg.get("message").get("actuator_response_type").get("ack") is not None or \
-                self._jsonMsg.get("message").get("actuator_response_type").get("thread_controller") is not None):
-                self._add_signature()
-                jsonMsg = json.dumps(self._jsonMsg).encode('utf8')
-                self._ack_connection.publish(exchange=self._exchange_name,
-                                             routing_key=self._ack_routing_key,
-                                             properties=msg_props,
-                                             body=jsonMsg)
-
-            # Routing requests for IEM msgs sent from the LoggingMsgHandler
-            elif self._jsonMsg.get("message").get("IEM_routing") is not None:
-                log_msg = self._jsonMsg.get("message").get("IEM_routing").get("log_msg")
-                self._log_debug("Routing IEM: %s" % log_msg)
-                if self._iem_route_addr != "":
-                    self._iem_connection.publish(exchange=self._iem_route_exchange_name,
-                                                 routing_key=self._routing_key,
-                                                 properties=msg_props,
-                                                 body=str(log_msg))
-                else:
-                    logger.warn("RabbitMQegressProcessor, Attempted to route IEM without a valid 'iem_route_addr' set.")
-            else:
-                self._add_signature()
-                jsonMsg = json.dumps(self._jsonMsg).encode('utf8')
-                try:
-                    self._connection.publish(exchange=self._exchange_name,
-                                            routing_key=self._routing_key,
-                                            properties=msg_props,
-                                            body=jsonMsg)
-                except connection_exceptions:
-                    logger.error("RabbitMQegressProcessor, _transmit_msg_on_exchange, rabbitmq connectivity lost, adding message to consul %s" % self._jsonMsg)
-                    store_queue.put(jsonMsg)
-                except Exception as err:
-                    logger.error(f'RabbitMQegressProcessor, _transmit_msg_on_exchange, Unknown error {err} while publishing the message, adding to persistent store {self._jsonMsg}')
-                    store_queue.put(jsonMsg)
-
-
-            # No exceptions thrown so success
-            self._log_debug("_transmit_msg_on_exchange, Successfully Sent: %s" % self._jsonMsg)
-            # If event is added by sensors, set it
+            SSPL_SEC.sspl_generate_session_token(
+                                    self._signature_user, authn_token_len,
+                                    self._signature_token, session_length, token)
+
+            self._session_token = token
+            # Renew at 90% of the session length so no message is signed
+            #  with a token that expires in flight
+            self._session_token_expiry = now + session_length * 0.9
+        return self._session_token
+
+    def _transmit_batch(self, batch):
+        """Publish a batch of messages, consecutive messages bound for the
+        same connection and routing are published together"""
+        group = []
+        for self._jsonMsg, self._event in batch:
+            self._log_debug("_transmit_batch, jsonMsg: %s", self._jsonMsg)
+            try:
+                route = self._prepare_msg()
+            except Exception as ex:
+                logger.error(f'RabbitMQegressProcessor, _transmit_batch, problem while preparing the message:{ex}, dropping: {self._jsonMsg}')
+                continue
+            if route is None:
+                continue
+            if group and group[-1][0][:3] != route[:3]:
+                self._publish_group(group)
+                group = []
+            group.append((route, self._jsonMsg, self._event))
+        if group:
+            self._publish_group(group)
+
+    def _prepare_msg(self):
+        """Signs and serializes the current message. Returns the connection,
+        exchange, routing key and body to publish it with, or None if it
+        should not be published"""
+        # Check for shut down message from sspl_ll_d and set a flag to shutdown
+        #  once our message queue is empty
+        if self._jsonMsg.get("message").get("actuator_response_type") is not None and \
+            self._jsonMsg.get("message").get("actuator_response_type").get("thread_controller") is not None and \
+            self._jsonMsg.get("message").get("actuator_response_type").get("thread_controller").get("thread_response") == \
+                "SSPL-LL is shutting down":
+                logger.info("RabbitMQegressProcessor, _prepare_msg, received" \
+                                "global shutdown message from sspl_ll_d")
+                self._request_shutdown = True
+
+        # Publish json message to the correct channel
+        # NOTE: We need to route ThreadController messages to ACK channel.
+        # We can't modify schema as it will affect other modules too. As a
+        # temporary solution we have added a extra check to see if actuator_response_type
+        # is "thread_controller".
+        # TODO: Find a proper way to solve this issue. Avoid changing
+        # core egress processor code
+        if self._jsonMsg.get("message").get("actuator_response_type") is not None and \
+          (self._jsonMsg.get("message").get("actuator_response_type").get("ack") is not None or \
+            self._jsonMsg.get("message").get("actuator_response_type").get("thread_controller") is not None):
+            self._add_signature()
+            jsonMsg = json.dumps(self._jsonMsg).encode('utf8')
+            return (self._ack_connection, self._exchange_name, self._ack_routing_key, jsonMsg)
+
+        # Routing requests for IEM msgs sent from the LoggingMsgHandler
+        elif self._jsonMsg.get("message").get("IEM_routing") is not None:
+            log_msg = self._jsonMsg.get("message").get("IEM_routing").get("log_msg")
+            self._log_debug("Routing IEM: %s" % log_msg)
+            if self._iem_route_addr != "":
+                return (self._iem_connection, self._iem_route_exchange_name, self._routing_key, str(log_msg))
+            logger.warn("RabbitMQegressProcessor, Attempted to route IEM without a valid 'iem_route_addr' set.")
+            # Nothing to send but whoever waits on it is done
             if self._event:
                 self._event.set()
+            return None
+
+        self._add_signature()
+        jsonMsg = json.dumps(self._jsonMsg).encode('utf8')
+        return (self._connection, self._exchange_name, self._routing_key, jsonMsg)
+
+    def _publish_group(self, group):
+        """Publish messages sharing connection, exchange and routing key.
+        Sensor messages which could not be published are added to the
+        persistent store to be replayed later."""
+        connection, exchange, routing_key = group[0][0][:3]
+        bodies = [route[3] for route, _, _ in group]
+        try:
+            sent = connection.publish_batch(exchange=exchange,
+                                            routing_key=routing_key,
+                                            properties=self._msg_props,
+                                            bodies=bodies)
+        except Exception as err:
+            logger.error(f'RabbitMQegressProcessor, _publish_group, Unknown error {err} while publishing {len(bodies)} messages')
+            sent = 0
+
+        self._msgs_sent += sent
+        self._metrics_window_sent += sent
+        unsent = group[sent:]
+        if unsent:
+            if connection is self._connection:
+                logger.error(f"RabbitMQegressProcessor, _publish_group, rabbitmq connectivity lost, adding {len(unsent)} messages to consul")
+                store_queue.put_batch([route[3] for route, _, _ in unsent],
+                                      [self._get_event_time(jsonMsg) for _, jsonMsg, _ in unsent])
+                self._msgs_stored += len(unsent)
+            else:
+                logger.error(f"RabbitMQegressProcessor, _publish_group, failed to publish {len(unsent)} messages to {exchange}")
+        else:
+            self._log_debug("_publish_group, Successfully Sent %s messages" % sent)
 
-        except Exception as ex:
-            logger.error(f'RabbitMQegressProcessor, _transmit_msg_on_exchange, problem while publishing the message:{ex}, adding message to consul: {self._jsonMsg}')
+        # If event is added by sensors, set it
+        for _, _, event in group:
+            if event:
+                event.set()
 
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread"""
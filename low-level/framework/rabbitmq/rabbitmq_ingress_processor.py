@@ -15,20 +15,28 @@
 
 """
  ****************************************************************************
-  Description:       Handles outgoing messages via messaging bus system
+  Description:       Handles incoming messages via messaging bus system
+
+                     RabbitMQ delivers up to prefetch_count messages ahead.
+                     They are parsed, authenticated and checked against
+                     their schema by worker_threads workers, handed off to
+                     the message handlers in the order they were delivered
+                     and acked ack_batch_size at a time.
  ****************************************************************************
 """
 
 import ctypes
 import json
 import os
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from cortx.utils.security.cipher import Cipher
 import pika
 
-from jsonschema import Draft3Validator
-from jsonschema import validate
+from json_msgs.schema_registry import registry
 from framework.base.module_thread import ScheduledModuleThread
 from framework.base.internal_msgQ import InternalMsgQ
 from framework.utils.service_logging import logger
@@ -64,6 +72,10 @@ class RabbitMQingressProcessor(ScheduledModuleThread, InternalMsgQ):
     USER_NAME = 'username'
     PASSWORD = 'password'
 
+    PREFETCH_COUNT = 'prefetch_count'
+    ACK_BATCH_SIZE = 'ack_batch_size'
+    WORKER_THREADS = 'worker_threads'
+
     SYSTEM_INFORMATION_KEY = 'SYSTEM_INFORMATION'
     CLUSTER_ID_KEY = 'cluster_id'
     NODE_ID_KEY = 'node_id'
@@ -71,6 +83,20 @@ class RabbitMQingressProcessor(ScheduledModuleThread, InternalMsgQ):
     JSON_ACTUATOR_SCHEMA = "SSPL-LL_Actuator_Request.json"
     JSON_SENSOR_SCHEMA = "SSPL-LL_Sensor_Request.json"
 
+    # Module handling each request type, the first type found in a
+    # request decides
+    HANDLERS = (
+        # Actuator requests
+        ("logging", "LoggingMsgHandler"),
+        ("thread_controller", "ThreadController"),
+        ("service_controller", "ServiceMsgHandler"),
+        ("node_controller", "NodeControllerMsgHandler"),
+        ("storage_enclosure", "RealStorActuatorMsgHandler"),
+        # Sensor requests
+        ("node_data", "NodeDataMsgHandler"),
+        ("enclosure_alert", "RealStorEnclMsgHandler"),
+    )
+
     @staticmethod
     def name():
         """ @return: name of the module."""
@@ -100,19 +126,25 @@ class RabbitMQingressProcessor(ScheduledModuleThread, InternalMsgQ):
         self._password = None
         self._channel = None
 
+        self._prefetch_count = 0
+        self._ack_batch_size = 1
+        self._worker_threads = 1
+        self._executor = None
+        # Delivery tags of the messages not handed off yet, in delivery
+        # order, with the outcome of their check once done
+        self._pending = OrderedDict()
+        self._pending_lock = threading.Lock()
+        self._unacked = 0
+
     def _load_schema(self, schema_file):
-        """Loads a schema from a file and validates
+        """Loads a schema from a file and validates, once per process
 
         @param string schema_file     location of schema on the file system
-        @return string                Trimmed and validated schema
+        @return string                schema_file, to validate messages with
         """
-        with open(schema_file, 'r') as f:
-            schema = json.load(f)
-
-        # Validate the schema to conform to Draft 3 specification
-        Draft3Validator.check_schema(schema)
+        registry.validator(schema_file)
 
-        return schema
+        return schema_file
 
     def initialize(self, conf_reader, msgQlist, product):
         """initialize configuration reader and internal msg queues"""
@@ -138,7 +170,10 @@ class RabbitMQingressProcessor(ScheduledModuleThread, InternalMsgQ):
         logger.info("RabbitMQingressProcessor, Initialization complete, accepting requests")
 
         try:
-            self._connection.consume(callback=self._process_msg)
+            if self._worker_threads > 1 and self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._worker_threads)
+            self._connection.consume(callback=self._on_delivery,
+                                     prefetch_count=self._prefetch_count)
         except Exception as e:
             if self.is_running() is True:
                 logger.info("RabbitMQingressProcessor ungracefully breaking out of run loop, restarting.")
@@ -150,8 +185,25 @@ class RabbitMQingressProcessor(ScheduledModuleThread, InternalMsgQ):
 
         self._log_debug("Finished processing successfully")
 
-    def _process_msg(self, ch, method, properties, body):
-        """Parses the incoming message and hands off to the appropriate module"""
+    def _on_delivery(self, ch, method, properties, body):
+        """Hands the message to a worker, or checks it right away without
+        workers. Called by pika for every message delivered."""
+        delivery = (ch, method.delivery_tag)
+        with self._pending_lock:
+            self._pending[delivery] = None
+        if self._executor is None:
+            self._complete(delivery, self._process_msg(body))
+            return
+        future = self._executor.submit(self._process_msg, body)
+        future.add_done_callback(
+            lambda done: self._complete(delivery, done.result()))
+
+    def _process_msg(self, body):
+        """Parses and authenticates the incoming message and checks it
+        against its schema. Returns the module to hand it off to, the
+        message and the uuid of the request. The module is None if the
+        message is to be dropped, and the message an ack to send back if
+        it could not be handled."""
 
         ingressMsg = {}
         uuid = None
@@ -174,69 +226,84 @@ class RabbitMQingressProcessor(ScheduledModuleThread, InternalMsgQ):
             if use_security_lib and \
                SSPL_SEC.sspl_verify_message(msg_len, str(message), username, signature) != 0:
                 logger.warn("RabbitMQingressProcessor, Authentication failed on message: %s" % ingressMsg)
-                return
+                return None, None, uuid
 
             # Get the incoming message type
             if message.get("actuator_request_type") is not None:
                 msgType = message.get("actuator_request_type")
 
                 # Validate against the actuator schema
-                validate(ingressMsg, self._actuator_schema)
+                registry.validate(ingressMsg, self._actuator_schema)
 
             elif message.get("sensor_request_type") is not None:
                 msgType = message.get("sensor_request_type")
 
                 # Validate against the sensor schema
-                validate(ingressMsg, self._sensor_schema)
+                registry.validate(ingressMsg, self._sensor_schema)
 
             else:
                 # We only handle incoming actuator and sensor requests, ignore
                 # everything else.
-                return
-
-            # Check for debugging being activated in the message header
-            self._check_debug(message)
-            self._log_debug("_process_msg, ingressMsg: %s" % ingressMsg)
-
-            # Hand off to appropriate actuator message handler
-            if msgType.get("logging") is not None:
-                self._write_internal_msgQ("LoggingMsgHandler", message)
-
-            elif msgType.get("thread_controller") is not None:
-                self._write_internal_msgQ("ThreadController", message)
-
-            elif msgType.get("service_controller") is not None:
-                self._write_internal_msgQ("ServiceMsgHandler", message)
-
-            elif msgType.get("node_controller") is not None:
-                self._write_internal_msgQ("NodeControllerMsgHandler", message)
+                return None, None, uuid
 
-            elif msgType.get("storage_enclosure") is not None:
-                self._write_internal_msgQ("RealStorActuatorMsgHandler", message)
+            self._log_debug("_process_msg, ingressMsg: %s", ingressMsg)
 
-            # Hand off to appropriate sensor message handler
-            elif msgType.get("node_data") is not None:
-                self._write_internal_msgQ("NodeDataMsgHandler", message)
+            # Hand off to appropriate message handler
+            for request_type, module_name in self.HANDLERS:
+                if msgType.get(request_type) is not None:
+                    return module_name, message, uuid
 
-            elif msgType.get("enclosure_alert") is not None:
-                self._write_internal_msgQ("RealStorEnclMsgHandler", message)
-
-            elif msgType.get("storage_enclosure") is not None:
-                self._write_internal_msgQ("RealStorActuatorMsgHandler", message)
             # ... handle other incoming messages that have been validated
-            else:
-                # Send ack about not finding a msg handler
-                ack_msg = AckResponseMsg("Error Processing Message", "Message Handler Not Found", uuid).getJson()
-                self._write_internal_msgQ(RabbitMQegressProcessor.name(), ack_msg)
-
-            # Acknowledge message was received
-            self._connection.ack(ch, delivery_tag=method.delivery_tag)
+            # Send ack about not finding a msg handler
+            return RabbitMQegressProcessor.name(), AckResponseMsg(
+                "Error Processing Message", "Message Handler Not Found", uuid).getEnvelope(), uuid
 
         except Exception as ex:
             logger.error("RabbitMQingressProcessor, _process_msg unrecognized message: %r" % ingressMsg)
-            ack_msg = AckResponseMsg("Error Processing Msg", "Msg Handler Not Found", uuid).getJson()
+            return RabbitMQegressProcessor.name(), AckResponseMsg(
+                "Error Processing Msg", "Msg Handler Not Found", uuid).getEnvelope(), uuid
+
+    def _complete(self, delivery, result):
+        """Records the outcome of the check of delivery, a (channel,
+        delivery tag) pair. Hands off the messages checked in the order
+        they were delivered, and acks them together every ack_batch_size
+        messages, or once none is left being checked."""
+        with self._pending_lock:
+            self._pending[delivery] = result
+            last = None
+            while self._pending:
+                first = next(iter(self._pending))
+                if self._pending[first] is None:
+                    break
+                self._route(*self._pending.pop(first))
+                self._unacked += 1
+                last = first
+            if last is None or \
+               (self._pending and self._unacked < self._ack_batch_size):
+                return
+            self._unacked = 0
+        self._connection.call_threadsafe(lambda: self._ack(*last))
+
+    def _route(self, module_name, message, uuid):
+        if module_name is None:
+            return
+        try:
+            if isinstance(message, dict):
+                # Check for debugging being activated in the message header
+                self._check_debug(message)
+            self._write_internal_msgQ(module_name, message)
+        except Exception as ex:
+            logger.error(f"RabbitMQingressProcessor, unable to hand off message to {module_name}: {ex!r}")
+            ack_msg = AckResponseMsg("Error Processing Msg", "Msg Handler Not Found", uuid).getEnvelope()
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), ack_msg)
 
+    def _ack(self, ch, tag):
+        """Acks every message delivered up to tag, on the pika thread"""
+        if not ch.is_open:
+            # Delivered on a channel since closed, RabbitMQ delivers them again
+            return
+        self._connection.ack(ch, delivery_tag=tag, multiple=True)
+
     def _configure_exchange(self, retry=False):
         """Configure the RabbitMQ exchange with defaults available"""
         # Make methods locally available
@@ -266,6 +333,15 @@ class RabbitMQingressProcessor(ScheduledModuleThread, InternalMsgQ):
             self._password = get_value_with_default(self.RABBITMQPROCESSOR,
                                                     self.PASSWORD,
                                                     'sspl4ever')
+
+            self._prefetch_count = int(get_value_with_default(
+                self.RABBITMQPROCESSOR, self.PREFETCH_COUNT, 64))
+
+            self._ack_batch_size = max(1, int(get_value_with_default(
+                self.RABBITMQPROCESSOR, self.ACK_BATCH_SIZE, 16)))
+
+            self._worker_threads = int(get_value_with_default(
+                self.RABBITMQPROCESSOR, self.WORKER_THREADS, 4))
             cluster_id = get_value_with_default(self.SYSTEM_INFORMATION_KEY,
                                                 COMMON_CONFIGS.get(self.SYSTEM_INFORMATION_KEY).get(self.CLUSTER_ID_KEY),
                                                 '')
@@ -289,6 +365,8 @@ class RabbitMQingressProcessor(ScheduledModuleThread, InternalMsgQ):
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread"""
         super(RabbitMQingressProcessor, self).shutdown()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
         try:
             self._connection.cleanup()
         except pika.exceptions.ConnectionClosed:
@@ -68,7 +68,7 @@ def _run_thread_capture_errors(curr_module, sspl_modules, msgQlist,
         # Populate an actuator response message and transmit back to HAlon
         error_msg = "SSPL-LL encountered an error, terminating service Error: " + \
                     ", Exception: " + logger.exception(ex)
-        json_msg = ThreadControllerMsg(curr_module.name(), error_msg).getJson()
+        json_msg = ThreadControllerMsg(curr_module.name(), error_msg).getEnvelope()
 
         if product.lower() in [x.lower() for x in enabled_products]:
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
@@ -206,7 +206,7 @@ class ThreadController(ScheduledModuleThread, InternalMsgQ):
 
             # Notify external applications that've started up successfully
             startup_msg = "SSPL-LL service has started successfully"
-            json_msg = ThreadControllerMsg(ThreadController.name(), startup_msg).getJson()
+            json_msg = ThreadControllerMsg(ThreadController.name(), startup_msg).getEnvelope()
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
             self._threads_initialized = True
 
@@ -234,7 +234,7 @@ class ThreadController(ScheduledModuleThread, InternalMsgQ):
 
     def _process_msg(self, jsonMsg):
         """Parses the incoming message and calls the appropriate method"""
-        self._log_debug("_process_msg, jsonMsg: %s" % jsonMsg)
+        self._log_debug("_process_msg, jsonMsg: %s", jsonMsg)
 
         # Check to see if debug mode is being globally turned off on all modules
         if self._check_reset_all_modules(jsonMsg) is True:
@@ -308,7 +308,7 @@ class ThreadController(ScheduledModuleThread, InternalMsgQ):
 
         if uuid is not None:
             threadControllerMsg.set_uuid(uuid)
-        msgString = threadControllerMsg.getJson()
+        msgString = threadControllerMsg.getEnvelope()
         logger.info("ThreadController, response: %s" % str(msgString))
         if self._product.lower() in [x.lower() for x in enabled_products]:
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), msgString)
@@ -445,7 +445,7 @@ class ThreadController(ScheduledModuleThread, InternalMsgQ):
                         self._restart_module(module)
 
                 # Populate an actuator response message and transmit
-                msgString = ThreadControllerMsg("All Modules", "Restarted with debug mode off").getJson()
+                msgString = ThreadControllerMsg("All Modules", "Restarted with debug mode off").getEnvelope()
                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), msgString)
                 return True
 
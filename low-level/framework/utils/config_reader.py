@@ -27,9 +27,10 @@ import time
 import requests
 import salt.client
 from framework.base.sspl_constants import (component, salt_provisioner_pillar_sls, file_store_config_path,
-        SSPL_STORE_TYPE, StoreTypes, salt_uniq_passwd_per_node, COMMON_CONFIGS, SSPL_CONFIGS, CONSUL_PORT,
+        SSPL_STORE_TYPE, SSPL_CONFIG_SNAPSHOT, StoreTypes, salt_uniq_passwd_per_node, COMMON_CONFIGS, SSPL_CONFIGS, CONSUL_PORT,
         MAX_CONSUL_RETRY, WAIT_BEFORE_RETRY, CONSUL_ERR_STRING, CONSUL_HOST)
 from framework.utils.consulstore import ConsulStore
+from framework.utils.config_snapshot import shared_snapshot
 from framework.utils.filestore import FileStore
 
 
@@ -48,6 +49,7 @@ class ConfigReader(object):
         """
         self.store = None
         self.consul_conn = None
+        self.snapshot = None
         self.is_init = is_init
         if is_init:
             self.read_dev_conf()
@@ -143,6 +145,16 @@ class ConfigReader(object):
         print("Running via sspl service and taking key values from store factory")
         from framework.utils.store_factory import store
         self.store = store
+        # One recursive read for all sections instead of a request per key
+        if isinstance(self.store, ConsulStore) and \
+           os.getenv('SSPL_CONFIG_SNAPSHOT', SSPL_CONFIG_SNAPSHOT).lower() == 'true':
+            self.snapshot = shared_snapshot(self.store.consul_conn, component + '/')
+
+    def _get_component_value(self, key):
+        """Read a key of the sspl component from the snapshot if there is one"""
+        if self.snapshot is not None:
+            return self.snapshot.get(key)
+        return self.store.get(key)
 
     def _get_value(self, section, key):
         """Get a single value by section and key
@@ -161,9 +173,9 @@ class ConfigReader(object):
                 value = self.store.get(section, key)
             elif self.store is not None and isinstance(self.store, ConsulStore):
                 if section not in COMMON_CONFIGS:
-                    value = self.store.get(component + '/' + section + '/' + key)
+                    value = self._get_component_value(component + '/' + section + '/' + key)
                 elif key in SSPL_CONFIGS or section.lower() in SSPL_CONFIGS:
-                    value = self.store.get(component + '/' + section + '/' + key)
+                    value = self._get_component_value(component + '/' + section + '/' + key)
                 else:
                     value = self.get_from_common_config(section, key)
             else:
@@ -221,7 +233,9 @@ class ConfigReader(object):
             if self.store is not None and isinstance(self.store, FileStore):
                 pairs = self.store.items(section)
             elif self.store is not None and isinstance(self.store, ConsulStore):
-                if section not in COMMON_CONFIGS:
+                if section not in COMMON_CONFIGS and self.snapshot is not None:
+                    pairs = self.snapshot.items(component + '/' + section + '/')
+                elif section not in COMMON_CONFIGS:
                     pairs = self.store.get(component + '/' + section + '/' , recurse=True)
                 else:
                     pairs = self.get_from_common_config(section)
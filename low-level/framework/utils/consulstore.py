@@ -20,6 +20,7 @@
  ****************************************************************************
 """
 import os
+import base64
 import consul
 from framework.utils.store import Store
 from framework.utils.service_logging import logger
@@ -122,6 +123,83 @@ class ConsulStore(Store):
 
         return data, status
 
+    def get_with_index(self, key):
+        """ Load data from given key along with its ModifyIndex. Index is 0
+        when the key does not exist, which makes a following 'cas' a create.
+        """
+        data = None
+        index = 0
+        for retry_index in range(0, MAX_CONSUL_RETRY):
+            try:
+                key = self._get_key(key)
+                item = self.consul_conn.kv.get(key)[1]
+                if item:
+                    index = item["ModifyIndex"]
+                    data = item["Value"]
+                    try:
+                        data = pickle.loads(data)
+                    except:
+                        pass
+                break
+
+            except requests.exceptions.ConnectionError as connerr:
+                logger.warn("Error[{0}] consul connection refused Retry Index {1}" \
+                    .format(connerr, retry_index))
+                time.sleep(WAIT_BEFORE_RETRY)
+
+            except Exception as gerr:
+                consulerr = str(gerr)
+                if CONSUL_ERR_STRING == consulerr:
+                    logger.warn("Error[{0}] consul connection refused Retry Index {1}" \
+                        .format(gerr, retry_index))
+                    time.sleep(WAIT_BEFORE_RETRY)
+                else:
+                    logger.warn("Error[{0}] consul error".format(gerr))
+                    break
+
+        return data, index
+
+    def txn(self, operations):
+        """ Apply (verb, key, value, index) operations in one consul
+        transaction. Returns the resulting KV entries in operation order,
+        None if a 'cas' check failed and the transaction was rolled back.
+        """
+        payload = []
+        for verb, key, value, index in operations:
+            op = {"Verb": verb, "Key": self._get_key(key)}
+            if value is not None:
+                if isinstance(value, str):
+                    value = value.encode('utf-8')
+                op["Value"] = base64.b64encode(value).decode('ascii')
+            if verb == "cas":
+                op["Index"] = index
+            payload.append({"KV": op})
+
+        for retry_index in range(0, MAX_CONSUL_RETRY):
+            try:
+                response = self.consul_conn.txn.put(payload)
+                return [result["KV"] for result in response.get("Results") or []]
+
+            except requests.exceptions.ConnectionError as connerr:
+                logger.warn("Error[{0}] consul connection refused Retry Index {1}" \
+                    .format(connerr, retry_index))
+                time.sleep(WAIT_BEFORE_RETRY)
+
+            except Exception as gerr:
+                consulerr = str(gerr)
+                if CONSUL_ERR_STRING == consulerr:
+                    logger.warn("Error[{0}] consul connection refused Retry Index {1}" \
+                        .format(gerr, retry_index))
+                    time.sleep(WAIT_BEFORE_RETRY)
+                elif consulerr.startswith("409"):
+                    logger.debug("consul transaction rolled back: {0}".format(gerr))
+                    return None
+                else:
+                    logger.warn("Error[{0}] consul transaction error".format(gerr))
+                    break
+
+        return None
+
     def get(self, key, **kwargs):
         """ Load data from given key"""
         data, _ = self._consul_get(key, **kwargs)
@@ -163,6 +241,43 @@ class ConsulStore(Store):
                         .format(gerr, key))
                     break
 
+    def get_all_with_prefix(self, prefix):
+        """ get values of all keys with given prefix in one recursive read
+        """
+        for retry_index in range(0, MAX_CONSUL_RETRY):
+            try:
+                prefix = self._get_key(prefix)
+                data = self.consul_conn.kv.get(prefix, recurse=True)[1]
+                values = {}
+                for item in data or []:
+                    value = item["Value"]
+                    if value is not None:
+                        try:
+                            value = pickle.loads(value)
+                        except (pickle.UnpicklingError, EOFError, ValueError, TypeError) as err:
+                            logger.debug("Value of {0} kept as stored, not unpickled: {1}" \
+                                .format(item["Key"], err))
+                    values[item["Key"][len(prefix):]] = value
+                return values
+
+            except requests.exceptions.ConnectionError as connerr:
+                logger.warn("Error[{0}] consul connection refused Retry Index {1}" \
+                    .format(connerr, retry_index))
+                time.sleep(WAIT_BEFORE_RETRY)
+
+            except Exception as gerr:
+                consulerr = str(gerr)
+                if CONSUL_ERR_STRING == consulerr:
+                    logger.warn("Error[{0}] consul connection refused Retry Index {1}" \
+                        .format(gerr, retry_index))
+                    time.sleep(WAIT_BEFORE_RETRY)
+                else:
+                    logger.warn("Error[{0}] while getting the values from consul" \
+                        .format(gerr))
+                    break
+
+        return None
+
     def get_keys_with_prefix(self, prefix):
         """ get keys with given prefix
         """
@@ -147,6 +147,15 @@ class FileStore(Store):
         if os.path.exists(key):
             os.remove(key)
 
+    def get_all_with_prefix(self, prefix):
+        """ get values of all files in given directory
+        """
+        if not os.path.isdir(prefix):
+            return {}
+        return {filename: self.get(os.path.join(prefix, filename))
+                for filename in os.listdir(prefix)
+                if os.path.isfile(os.path.join(prefix, filename))}
+
     def get_keys_with_prefix(self, prefix):
         """ get keys with given prefix
         """
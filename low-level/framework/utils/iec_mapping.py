@@ -0,0 +1,106 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Index of the IEC mapping directory
+
+                     The 'components' CSV file maps component ids to names,
+                     and the CSV file of each component maps the component,
+                     module and event id of an IEC to module and event
+                     names. All of them are loaded into dicts at once, and
+                     loaded again when a file in the directory changes.
+ ****************************************************************************
+"""
+
+import csv
+import os
+import time
+
+from framework.utils.service_logging import logger
+
+
+class IecMapping(object):
+    """Component, module and event names of IEC codes"""
+
+    COMPONENTS = "components"
+
+    # Shortest time between two checks of the directory for changes
+    CHECK_INTERVAL = 10
+
+    def __init__(self, path, check_interval=CHECK_INTERVAL):
+        self._path = path
+        self._check_interval = check_interval
+        self._checked = 0
+        self._stamp = None
+        self._components = {}
+        self._events = {}
+
+    def decode(self, code):
+        """(component, module, event) names of the component, module and
+        event id code, e.g. '0040010001'. Ids without a name are returned
+        as they are."""
+        self._reload_if_changed()
+        component_id, module_id, event_id = code[:3], code[3:6], code[6:]
+        component = self._components.get(component_id)
+        if not component:
+            return component_id, module_id, event_id
+        names = self._events.get(component, {}).get(code)
+        if names is None:
+            return component, module_id, event_id
+        return (component,) + names
+
+    def _reload_if_changed(self):
+        now = time.time()
+        if now - self._checked < self._check_interval:
+            return
+        self._checked = now
+        stamp = self._directory_stamp()
+        if stamp != self._stamp:
+            self._load()
+            self._stamp = stamp
+
+    def _directory_stamp(self):
+        """mtime and size of the directory and of every file in it"""
+        try:
+            stamp = [(None, os.stat(self._path).st_mtime_ns)]
+            for name in sorted(os.listdir(self._path)):
+                stat = os.stat(os.path.join(self._path, name))
+                stamp.append((name, stat.st_mtime_ns, stat.st_size))
+            return tuple(stamp)
+        except OSError:
+            return None
+
+    def _load(self):
+        components = dict(self._read_csv(self.COMPONENTS, 2))
+        events = {}
+        for component in set(components.values()):
+            events[component] = {row[0]: (row[1], row[2])
+                                 for row in self._read_csv(component, 3)}
+        self._components = components
+        self._events = events
+        logger.debug(f"IecMapping, loaded {len(components)} components from {self._path}")
+
+    def _read_csv(self, name, columns):
+        """First columns of the rows of the CSV file name having as many"""
+        path = os.path.join(self._path, name)
+        try:
+            with open(path, newline='') as f:
+                return [row[:columns] for row in csv.reader(f) if len(row) >= columns]
+        except FileNotFoundError:
+            return []
+        except OSError as err:
+            logger.warn(f"IecMapping, unable to read {path}: {err}")
+            return []
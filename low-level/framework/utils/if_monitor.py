@@ -0,0 +1,154 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Network interface and BMC state with change detection
+
+                     InterfaceMonitor keeps the link state, address and cable
+                     status of every interface, read from /sys/class/net, and
+                     reads them again only when rtnetlink reports a link or
+                     address change. Without rtnetlink they are read on every
+                     call, which still starts no process. BmcMonitor keeps the
+                     BMC address and reachability for a while instead of
+                     asking ipmitool and ping every time.
+ ****************************************************************************
+"""
+
+import errno
+import os
+import re
+import socket
+import subprocess
+import time
+
+import psutil
+
+from framework.utils.service_logging import logger
+
+
+class InterfaceMonitor(object):
+    """Network interface state, read again on rtnetlink events"""
+
+    NET_PATH = "/sys/class/net"
+
+    # rtnetlink multicast groups of link and address changes
+    RTMGRP_LINK = 0x1
+    RTMGRP_IPV4_IFADDR = 0x10
+    RTMGRP_IPV6_IFADDR = 0x100
+
+    def __init__(self, cable_status, net_path=NET_PATH):
+        """cable_status(interface) returns the cable status of interface"""
+        self._cable_status = cable_status
+        self._net_path = net_path
+        self._socket = self._open_netlink()
+        self._state = None
+
+    def status(self):
+        """{interface: [link state, address, cable status]}, link state in
+        the upper case used by 'ip --brief address', e.g. UP or DOWN"""
+        if self._state is None or self._changed():
+            self._state = self._read()
+        return self._state
+
+    def refresh(self):
+        """Read everything again on the next call"""
+        self._state = None
+
+    def _open_netlink(self):
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            sock.bind((0, self.RTMGRP_LINK | self.RTMGRP_IPV4_IFADDR | self.RTMGRP_IPV6_IFADDR))
+            sock.setblocking(False)
+            return sock
+        except (AttributeError, OSError) as err:
+            logger.warn(f"InterfaceMonitor, rtnetlink is not available, reading "
+                        f"interfaces on every call: {err}")
+            return None
+
+    def _changed(self):
+        """True if rtnetlink reported a change since the last call"""
+        if self._socket is None:
+            return True
+        changed = False
+        while True:
+            try:
+                if not self._socket.recv(65536):
+                    break
+                changed = True
+            except BlockingIOError:
+                break
+            except OSError as err:
+                # ENOBUFS means events were dropped, anything may have changed
+                changed = True
+                if err.errno != errno.ENOBUFS:
+                    break
+        return changed
+
+    def _read(self):
+        addresses = psutil.net_if_addrs()
+        state = {}
+        for interface in sorted(os.listdir(self._net_path)):
+            try:
+                with open(os.path.join(self._net_path, interface, "operstate")) as f:
+                    operstate = f.read().strip().upper()
+            except OSError:
+                operstate = "UNKNOWN"
+            state[interface] = [operstate, self._address(addresses.get(interface, [])),
+                                self._cable_status(interface)]
+        return state
+
+    @staticmethod
+    def _address(addrs):
+        """First IPv4 address, else first IPv6 address, else ''"""
+        for family in (socket.AF_INET, socket.AF_INET6):
+            for addr in addrs:
+                if addr.family == family:
+                    return addr.address.split("%")[0]
+        return ""
+
+
+class BmcMonitor(object):
+    """BMC address from 'ipmitool lan print' and its reachability by ping,
+    each kept for a while"""
+
+    IP_RE = re.compile(r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}")
+
+    def __init__(self, address_ttl=300, ping_interval=60):
+        self._address_ttl = address_ttl
+        self._ping_interval = ping_interval
+        self._address = None
+        self._address_read = 0
+        self._reachable = {}
+
+    def address(self):
+        """BMC IPv4 address, None if there is none"""
+        if time.time() - self._address_read >= self._address_ttl:
+            ipdata = subprocess.Popen("sudo ipmitool lan print", shell=True,
+                        stdout=subprocess.PIPE, stderr=subprocess.PIPE).communicate()[0]
+            bmcip = self.IP_RE.findall(ipdata.decode().strip())
+            self._address = bmcip[0] if bmcip else None
+            self._address_read = time.time()
+        return self._address
+
+    def reachable(self, bmcip):
+        """True if bmcip answered the last ping"""
+        reachable, pinged = self._reachable.get(bmcip, (False, 0))
+        if time.time() - pinged >= self._ping_interval:
+            child = subprocess.Popen(["ping", "-c1", "-W1", "-q", bmcip], stdout=subprocess.PIPE)
+            child.communicate()
+            reachable = child.returncode == 0
+            self._reachable = {bmcip: (reachable, time.time())}
+        return reachable
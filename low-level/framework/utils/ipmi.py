@@ -54,3 +54,10 @@ class IPMI(object):
            sensor id using IPMI
         """
         raise NotImplementedError("sub class should implement this")
+
+    @abc.abstractmethod
+    def get_sensors_props(self, sensor_ids):
+        """Returns the properties of several sensor instances based on
+           their sensor ids using IPMI
+        """
+        raise NotImplementedError("sub class should implement this")
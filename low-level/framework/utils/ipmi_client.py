@@ -17,6 +17,7 @@ import os
 import subprocess
 
 from framework.utils.ipmi import IPMI
+from framework.utils.ipmi_sensor_cache import sensor_cache, FOREVER
 from framework.utils.service_logging import logger
 
 
@@ -44,18 +45,20 @@ class IPMITool(IPMI):
         """
         raise NotImplementedError()
 
-    def get_sensor_list_by_type(self, fru_type):
+    def get_sensor_list_by_type(self, fru_type, max_age=0):
         """Returns the sensor list based on FRU type using ipmitool utility
-           ipmitool sdr type '<FRU>'.
+           ipmitool sdr type '<FRU>', from the IPMI sensor cache if read at
+           most max_age seconds ago.
            Example of output form 'sdr type 'Fan'' command:
            Sys Fan 2B       | 33h | ok  | 29.4 | 5332 RPM
            ( sensor_id | sensor_num | status | entity_id |
             <FRU Specific attribute> )
-            Params : self, fru_type
+            Params : self, fru_type, max_age
             Output Format : List of Tuple
             Output Example : [(HDD 1 Status, F1, ok, 4.2, Drive Present),]
         """
-        sensor_list_out, retcode = self._run_ipmitool_subcommand(f"sdr type '{fru_type.title()}'")
+        sensor_list_out, retcode = sensor_cache.sdr_type(fru_type.title(),
+                                        self._run_ipmitool_subcommand, max_age)
         if retcode != 0:
             if isinstance(sensor_list_out, tuple):
                 sensor_list_out = [val for val in sensor_list_out if val]
@@ -87,16 +90,32 @@ class IPMITool(IPMI):
         """
         raise NotImplementedError()
 
-    def get_sensor_props(self, sensor_id):
+    def get_sensor_props(self, sensor_id, max_age=0):
         """Returns individual sensor instance properties based on
            sensor id using ipmitool utility
            ipmitool sensor get "Sys Fan 1A"
+           from the IPMI sensor cache if read at most max_age seconds ago.
            Returns FRU instance specific information
-           Params : self, sensor_id
+           Params : self, sensor_id, max_age
            Output Format : Tuple inside dictionary of common and specific data
            Output Example : ({common dict data},{specific dict data})
         """
-        props_list_out, retcode = self._run_ipmitool_subcommand("sensor get '{0}'".format(sensor_id))
+        return self.get_sensors_props([sensor_id], max_age)[sensor_id]
+
+    def get_sensors_props(self, sensor_ids, max_age=0):
+        """Returns the properties of several sensors like get_sensor_props()
+           reading those not in the IPMI sensor cache with one
+           ipmitool sensor get "Sys Fan 1A" "Sys Fan 1B" ...
+           Params : self, sensor_ids, max_age
+           Output Format : dictionary of get_sensor_props() tuples by sensor id
+           Output Example : {"Sys Fan 1A": ({common dict data},{specific dict data})}
+        """
+        results = sensor_cache.sensor_get(sensor_ids, self._run_ipmitool_subcommand, max_age)
+        return {sensor_id: self._parse_sensor_props(sensor_id, props_list_out, retcode)
+                for sensor_id, (props_list_out, retcode) in results.items()}
+
+    def _parse_sensor_props(self, sensor_id, props_list_out, retcode):
+        """Parses the output of ipmitool sensor get of one sensor"""
         if retcode != 0:
             if isinstance(props_list_out, tuple):
                 props_list_out = [val for val in props_list_out if val]
@@ -138,7 +157,9 @@ class IPMITool(IPMI):
             Output Example : {"drive slot / bay":{0:"HDD 1 Status",}, "fan":{}}
         """
         for fru in fru_list:
-            fru_detail = self.get_sensor_list_by_type(fru)
+            # Sensor ids only change with the SDR repository, NodeHWsensor
+            # drops the cached listings when it does
+            fru_detail = self.get_sensor_list_by_type(fru, max_age=FOREVER)
             sensor_id_map[fru] = {fru_detail.index(fru): fru[0].strip()
                 for fru in fru_detail}
         return sensor_id_map
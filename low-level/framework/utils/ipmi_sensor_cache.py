@@ -0,0 +1,121 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Process wide cache of IPMI SDR listings and sensor
+                     readings
+
+                     Keeps the output of 'sdr type' and 'sensor get' along
+                     with the time it was read, shared by NodeHWsensor and
+                     the NodeHW actuator. Callers say how old an answer may
+                     be, and sensors missing or too old in the cache are
+                     read with a single 'sensor get' of all of them.
+ ****************************************************************************
+"""
+
+import re
+import threading
+import time
+
+# Use the cached output however old it is
+FOREVER = float("inf")
+
+
+class IpmiSensorCache(object):
+    """Cached ipmitool 'sdr type' and 'sensor get' output"""
+
+    LOCATING = b"Locating sensor record...\n"
+    SENSOR_ID_RE = re.compile(rb"^\s*Sensor ID\s*:\s*(.*?)\s*\(0x[0-9a-fA-F]+\)\s*$")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sdr = {}
+        self._sensors = {}
+
+    def sdr_type(self, fru_type, run, max_age=0):
+        """(res, retcode) of "sdr type '<fru_type>'", from the cache if
+        read at most max_age seconds ago. run(subcommand) runs an ipmitool
+        subcommand and returns its (res, retcode)."""
+        key = fru_type.lower()
+        cached = self._sdr.get(key)
+        if cached is not None and time.time() - cached[0] <= max_age:
+            return cached[1], 0
+
+        res, retcode = run(f"sdr type '{fru_type}'")
+        if retcode == 0:
+            with self._lock:
+                self._sdr[key] = (time.time(), res)
+        return res, retcode
+
+    def sensor_get(self, sensor_ids, run, max_age=0):
+        """{sensor_id: (res, retcode)} of "sensor get '<sensor_id>'" of every
+        sensor in sensor_ids, from the cache if read at most max_age seconds
+        ago. The others are read together in a single 'sensor get'."""
+        now = time.time()
+        results = {}
+        stale = []
+        for sensor_id in sensor_ids:
+            cached = self._sensors.get(sensor_id)
+            if cached is not None and now - cached[0] <= max_age:
+                results[sensor_id] = (cached[1], 0)
+            elif sensor_id not in stale:
+                stale.append(sensor_id)
+
+        if len(stale) > 1:
+            res, _ = run("sensor get " + " ".join(f"'{sensor_id}'" for sensor_id in stale))
+            if isinstance(res, tuple) and res[0]:
+                blocks = self._split(res[0])
+                with self._lock:
+                    for sensor_id in stale:
+                        block = blocks.get(sensor_id.encode())
+                        if block is not None:
+                            self._sensors[sensor_id] = (time.time(), (block, b''))
+                            results[sensor_id] = ((block, b''), 0)
+
+        # Sensors the bulk read did not return are read on their own, to
+        # get the same error as before
+        for sensor_id in stale:
+            if sensor_id in results:
+                continue
+            res, retcode = run(f"sensor get '{sensor_id}'")
+            if retcode == 0:
+                with self._lock:
+                    self._sensors[sensor_id] = (time.time(), res)
+            results[sensor_id] = (res, retcode)
+        return results
+
+    def invalidate(self):
+        """Drop everything, the SDR repository changed"""
+        with self._lock:
+            self._sdr.clear()
+            self._sensors.clear()
+
+    def _split(self, output):
+        """Output of a 'sensor get' of several sensors as the output a
+        'sensor get' of each would have had, by sensor id"""
+        blocks = {}
+        sensor_id = None
+        for line in output.split(b"\n"):
+            match = self.SENSOR_ID_RE.match(line)
+            if match:
+                sensor_id = match.group(1)
+                blocks[sensor_id] = [self.LOCATING.rstrip(b"\n")]
+            if sensor_id is not None:
+                blocks[sensor_id].append(line)
+        return {sensor_id: b"\n".join(lines) for sensor_id, lines in blocks.items()}
+
+
+sensor_cache = IpmiSensorCache()
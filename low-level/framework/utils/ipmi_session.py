@@ -0,0 +1,226 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Long lived ipmitool shell session and SEL/SDR change
+                     tracking
+
+                     IpmiSession keeps one 'ipmitool shell' process open and
+                     runs subcommands through it, so sudo and ipmitool are
+                     not started again for every call. SelCursor and
+                     SdrStamp use 'sel info' and 'sdr info' to tell whether
+                     the SEL and the SDR repository changed since they were
+                     last read.
+ ****************************************************************************
+"""
+
+import os
+import select
+import subprocess
+import threading
+import time
+
+from framework.utils.service_logging import logger
+
+
+class IpmiSessionError(Exception):
+    """The shell session stopped answering"""
+
+
+def parse_info(output):
+    """'key : value' lines of 'sel info' or 'sdr info' as a dict"""
+    info = {}
+    for line in output.split("\n"):
+        if ':' in line:
+            key, val = [f.strip() for f in line.split(":", 1)]
+            info[key] = val
+    return info
+
+
+class IpmiSession(object):
+    """Runs ipmitool subcommands in one long lived 'ipmitool shell'"""
+
+    PROMPT = b"ipmitool> "
+
+    # Longest wait for the output of a single subcommand
+    TIMEOUT = 30
+
+    # Wait before trying again to open a shell which failed to start
+    RETRY_INTERVAL = 300
+
+    def __init__(self, timeout=TIMEOUT):
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._process = None
+        self._argv = None
+        self._failed = {}
+
+    def run(self, argv, subcommand):
+        """Run subcommand in the shell of the tool started with argv, e.g.
+        ['sudo', 'ipmitool', '-I', 'lan', ...]. Returns the same
+        ((stdout, stderr), retcode) as a one-shot call, or None when it
+        could not be run cleanly in a session, including when it wrote
+        anything to stderr, and should be run on its own instead."""
+        argv = tuple(argv)
+        with self._lock:
+            if time.time() < self._failed.get(argv, 0):
+                return None
+            if self._argv != argv or self._process is None or \
+               self._process.poll() is not None:
+                self._close()
+                if not self._open(argv):
+                    self._failed[argv] = time.time() + self.RETRY_INTERVAL
+                    return None
+            try:
+                out, err = self._execute(subcommand)
+            except (IpmiSessionError, OSError) as err:
+                logger.warn(f"IpmiSession, '{subcommand}' failed in {argv[-1]} shell: {err}")
+                self._close()
+                return None
+        if err.strip():
+            return None
+        return (out, err), 0
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _open(self, argv):
+        try:
+            self._process = subprocess.Popen(list(argv) + ["shell"], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+            self._argv = argv
+            # Wait for the first prompt
+            self._read_until_prompt()
+        except (IpmiSessionError, OSError) as err:
+            logger.warn(f"IpmiSession, unable to open {argv[-1]} shell, "
+                        f"running subcommands on their own: {err}")
+            self._close()
+            return False
+        logger.debug(f"IpmiSession, opened {argv[-1]} shell")
+        return True
+
+    def _close(self):
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+                self._process.kill()
+                self._process.wait()
+            except OSError:
+                pass
+            self._process.stdout.close()
+            self._process.stderr.close()
+        self._process = None
+        self._argv = None
+
+    def _execute(self, subcommand):
+        self._process.stdin.write(subcommand.encode() + b"\n")
+        self._process.stdin.flush()
+        out, err = self._read_until_prompt()
+        # Readline may echo the subcommand ahead of its output
+        line, _, rest = out.partition(b"\n")
+        if line.strip() == subcommand.encode().strip():
+            out = rest
+        return out, err
+
+    def _read_until_prompt(self):
+        """stdout and stderr until the shell prompts for the next subcommand"""
+        stdout, stderr = self._process.stdout, self._process.stderr
+        out, err = b"", b""
+        deadline = time.time() + self._timeout
+        while not out.endswith(self.PROMPT):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise IpmiSessionError(f"no prompt within {self._timeout} secs")
+            readable, _, _ = select.select([stdout, stderr], [], [], remaining)
+            for stream in readable:
+                data = os.read(stream.fileno(), 65536)
+                if not data:
+                    raise IpmiSessionError("shell exited")
+                if stream is stdout:
+                    out += data
+                else:
+                    err += data
+        # ipmitool writes errors before prompting again, they are in the pipe
+        while select.select([stderr], [], [], 0)[0]:
+            data = os.read(stderr.fileno(), 65536)
+            if not data:
+                break
+            err += data
+        return out[:-len(self.PROMPT)], err
+
+
+class SelCursor(object):
+    """Tracks the SEL entries already read using 'sel info'. The entries
+    read are a window ending at the newest entry, callers keep the ones
+    with a record ID greater than the last one they processed."""
+
+    ENTRIES = "Entries"
+    LAST_ADD_TIME = "Last Add Time"
+
+    # Entries listed beyond the ones added since the last read, for the
+    # entries added between 'sel info' and 'sel list last'
+    MARGIN = 16
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget what was read, the next read lists the whole SEL"""
+        self._entries = None
+        self._last_add = None
+
+    def next_read(self, info):
+        """The 'sel list' subcommand reading the entries added since the
+        last commit(), and a few before them, given the parsed 'sel info'
+        info. None if there are none."""
+        try:
+            entries = int(info[self.ENTRIES])
+        except (KeyError, ValueError):
+            return "sel list"
+        last_add = info.get(self.LAST_ADD_TIME)
+
+        if self._entries is None or entries < self._entries:
+            # First read, or the SEL was cleared
+            return "sel list"
+        if entries == self._entries:
+            # Same count but a new entry means a full SEL overwrote one
+            return None if last_add == self._last_add else "sel list"
+        return f"sel list last {entries - self._entries + self.MARGIN}"
+
+    def commit(self, info):
+        """Record info as read, once the entries it lists are saved"""
+        try:
+            self._entries = int(info[self.ENTRIES])
+        except (KeyError, ValueError):
+            self._entries = None
+        self._last_add = info.get(self.LAST_ADD_TIME)
+
+
+class SdrStamp(object):
+    """Tells when the SDR repository changed using 'sdr info'"""
+
+    STAMP_KEYS = ("Record Count", "Most recent Addition", "Most recent Erase")
+
+    def __init__(self):
+        self._stamp = None
+
+    def changed(self, info):
+        """True if the parsed 'sdr info' info differs from the last call"""
+        stamp = tuple(info.get(key) for key in self.STAMP_KEYS)
+        changed = self._stamp is not None and stamp != self._stamp
+        self._stamp = stamp
+        return changed
@@ -0,0 +1,243 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Follows a growing log file from a checkpoint
+
+                     LogTailer reads the lines appended to a log since the
+                     (inode, byte offset) it last checkpointed, and follows
+                     the log through rotation: a truncated log (logrotate
+                     copytruncate) is read again from the start, a renamed
+                     one is read to its end before the new log is opened.
+                     It waits for the log to change with inotify when
+                     libc has it, else it checks it again after a timeout.
+ ****************************************************************************
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import time
+
+from framework.utils.service_logging import logger
+
+
+class Inotify(object):
+    """inotify watch of the entries of a directory, through libc"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, directory, mask=IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM |
+                                       IN_MOVED_TO | IN_CREATE | IN_DELETE):
+        """Raises OSError if inotify is not available"""
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("libc has no inotify")
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(err, f"inotify_add_watch of {directory} failed")
+
+    def wait(self, timeout):
+        """Names of the entries changed, waiting at most timeout seconds
+        for the first change. Empty if none changed."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        names = set()
+        while readable:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset + self.EVENT.size <= len(data):
+                _, _, _, length = self.EVENT.unpack_from(data, offset)
+                offset += self.EVENT.size
+                names.add(os.fsdecode(data[offset:offset + length].rstrip(b"\0")))
+                offset += length
+        return names
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+        self._fd = -1
+
+
+class LogTailer(object):
+    """Lines appended to a log, resumed from a persistent checkpoint"""
+
+    # Bytes read from the log at once
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, path, checkpoint_path):
+        self._path = path
+        self._name = os.path.basename(path)
+        self._checkpoint_path = checkpoint_path
+        self._file = None
+        self._inode = None
+        self._offset = 0
+        self._partial = b""
+        self._inotify = None
+        self._checkpointed = None
+        self.has_checkpoint = False
+        self._load_checkpoint()
+
+    def lines(self):
+        """Yields every complete line appended since the last one yielded,
+        without its newline. checkpoint() saves the position right after
+        the last line yielded."""
+        if self._file is None and not self._open():
+            return
+        while True:
+            rotated = self._rotated()
+            yield from self._read_lines()
+            if not rotated:
+                return
+            # The log was renamed and the old one is read to its end
+            self._close()
+            self._inode, self._offset = None, 0
+            if not self._open():
+                return
+            logger.info(f"LogTailer, {self._path} was rotated, reading the new log")
+
+    def wait(self, timeout):
+        """Wait at most timeout seconds for the log to change"""
+        if self._inotify is None:
+            try:
+                self._inotify = Inotify(os.path.dirname(self._path) or ".")
+            except OSError as err:
+                logger.warn(f"LogTailer, unable to watch {self._path} with inotify, "
+                            f"checking it every {timeout} secs: {err}")
+                self._inotify = False
+        if not self._inotify:
+            time.sleep(timeout)
+            return
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0 or self._name in self._inotify.wait(remaining):
+                return
+
+    def checkpoint(self, extra=None):
+        """Persist the current (inode, offset) and extra, a dict of values
+        read back by checkpointed()"""
+        if self._inode is None:
+            return
+        data = {"inode": self._inode, "offset": self._offset}
+        data.update(extra or {})
+        if data == self._checkpointed:
+            return
+        tmp_path = self._checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as checkpoint_file:
+            json.dump(data, checkpoint_file)
+        os.rename(tmp_path, self._checkpoint_path)
+        self._checkpointed = data
+        self.has_checkpoint = True
+
+    def checkpointed(self):
+        """Last checkpoint persisted, a dict, empty if there is none"""
+        return dict(self._checkpointed or {})
+
+    def close(self):
+        self._close()
+        if self._inotify:
+            self._inotify.close()
+        self._inotify = None
+
+    def _load_checkpoint(self):
+        try:
+            with open(self._checkpoint_path, "r") as checkpoint_file:
+                self._checkpointed = json.load(checkpoint_file)
+            self._inode = int(self._checkpointed["inode"])
+            self._offset = int(self._checkpointed["offset"])
+            self.has_checkpoint = True
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            logger.warn(f"LogTailer, ignoring unreadable checkpoint {self._checkpoint_path}: {err}")
+            self._checkpointed = None
+            self._inode, self._offset = None, 0
+
+    def _open(self):
+        try:
+            self._file = open(self._path, "rb")
+        except FileNotFoundError:
+            return False
+        stat = os.fstat(self._file.fileno())
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # Rotated since the checkpoint, read the whole log
+            if self._inode is not None:
+                logger.info(f"LogTailer, {self._path} changed since the checkpoint, reading it all")
+            self._offset = 0
+        self._inode = stat.st_ino
+        self._file.seek(self._offset)
+        return True
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._partial = b""
+
+    def _rotated(self):
+        """True if the log open was renamed away and a new one created.
+        Starts over from the beginning of a truncated log."""
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return False
+        if stat.st_ino != self._inode:
+            return True
+        if stat.st_size < self._offset:
+            logger.info(f"LogTailer, {self._path} was truncated, reading it from the start")
+            self._file.seek(0)
+            self._offset = 0
+            self._partial = b""
+        return False
+
+    def _read_lines(self):
+        try:
+            while True:
+                chunk = self._file.read(self.CHUNK_SIZE)
+                if not chunk:
+                    return
+                data = self._partial + chunk
+                lines = data.split(b"\n")
+                self._partial = lines.pop()
+                for line in lines:
+                    self._offset += len(line) + 1
+                    yield line.decode("utf-8", "replace")
+        finally:
+            # Lines read ahead, or not complete yet, are read again next time
+            self._file.seek(self._offset)
+            self._partial = b""
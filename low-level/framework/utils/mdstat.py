@@ -0,0 +1,234 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Structured md RAID state read from /proc/mdstat
+
+                     parse_mdstat() turns the lines of /proc/mdstat into one
+                     MdArray per array as it reads them. MdstatWatcher keeps
+                     /proc/mdstat open, waits for the kernel to report an md
+                     event on it with poll() and parses again only the
+                     arrays whose lines changed since the last read. MdadmConf reads the arrays listed
+                     in mdadm.conf again only when the file changes.
+ ****************************************************************************
+"""
+
+import os
+import select
+import time
+from collections import namedtuple
+
+from framework.utils.service_logging import logger
+
+
+# A member device of an array, e.g. sdb1[1](F) is
+# MdMember("sdb1", 1, "F"), flags is "" for an active member
+MdMember = namedtuple("MdMember", "name slot flags")
+
+# State of an array. total and working are the [n/m] counts and status is
+# the [UU_] string, brackets included, all None for arrays without
+# redundancy such as raid0. Resync progress is not part of the state.
+MdArray = namedtuple("MdArray", "device state level members total working status")
+
+
+def _parse_member(token):
+    """MdMember of a 'sdb1[1](F)' token, None if it is not a member"""
+    name, bracket, rest = token.partition("[")
+    if not bracket or not name:
+        return None
+    slot, bracket, flags = rest.partition("]")
+    if not bracket or not slot.isdigit():
+        return None
+    return MdMember(name, int(slot), flags.replace("(", "").replace(")", ""))
+
+
+def _parse_status(line):
+    """(total, working, status) of a '... [2/1] [U_]' line, all None if
+    it has no status"""
+    fields = line.split()
+    if len(fields) < 2 or not fields[-1].startswith("[") or "/" not in fields[-2]:
+        return None, None, None
+    total, _, working = fields[-2].strip("[]").partition("/")
+    if not total.isdigit() or not working.isdigit():
+        return None, None, None
+    return int(total), int(working), fields[-1]
+
+
+def parse_array(header, status_line=None):
+    """MdArray of an 'mdX : active raid1 sdb1[1] sda1[0]' header line and
+    the '... [2/2] [UU]' line after it"""
+    name, _, rest = header.partition(" : ")
+    tokens = rest.split()
+    state = tokens[0] if tokens else ""
+    level = None
+    members = []
+    for token in tokens[1:]:
+        member = _parse_member(token)
+        if member is not None:
+            members.append(member)
+        elif level is None and not token.startswith("("):
+            level = token
+    total, working, status = _parse_status(status_line) if status_line else (None, None, None)
+    return MdArray(f"/dev/{name.strip()}", state, level, tuple(members), total, working, status)
+
+
+def mdstat_blocks(lines):
+    """Yields the (header, status line) of every array of the /proc/mdstat
+    lines, e.g. an open file, reading only as far as the array. The status
+    line is None for an array without any line after its header."""
+    header = None
+    for line in lines:
+        first = line[:1]
+        if first == " " or first == "\t":
+            # The first indented line of an array has its [n/m] [UU] status
+            if header is not None:
+                yield header, line
+                header = None
+            continue
+        if first == "\n" or not first:
+            continue
+        if header is not None:
+            yield header, None
+        header = line if line.startswith("md") and " : " in line else None
+    if header is not None:
+        yield header, None
+
+
+def parse_mdstat(lines):
+    """Yields an MdArray for every array of the /proc/mdstat lines"""
+    for header, status_line in mdstat_blocks(lines):
+        yield parse_array(header, status_line)
+
+
+class MdstatWatcher(object):
+    """Reads /proc/mdstat when the md driver reports an event on it"""
+
+    MDSTAT = "/proc/mdstat"
+
+    def __init__(self, path=MDSTAT):
+        self._path = path
+        self._file = None
+        self._poller = None
+        self._blocks = {}
+        self._arrays = {}
+
+    def read(self):
+        """({device: MdArray} of all arrays, list of the devices added,
+        changed or removed since the last read). None instead of the
+        arrays if the file cannot be read."""
+        if self._file is None and not self._open():
+            return None, []
+        try:
+            self._file.seek(0)
+            blocks = {}
+            arrays = {}
+            changed = []
+            # Only arrays whose lines changed are parsed again
+            for block in mdstat_blocks(self._file):
+                name = block[0].partition(" : ")[0]
+                previous = self._blocks.get(name)
+                if previous is not None and previous[0] == block:
+                    array = previous[1]
+                else:
+                    array = parse_array(*block)
+                    if previous is None or previous[1] != array:
+                        changed.append(array.device)
+                blocks[name] = (block, array)
+                arrays[array.device] = array
+        except OSError as err:
+            logger.warn(f"MdstatWatcher, unable to read {self._path}: {err}")
+            self.close()
+            return None, []
+
+        changed.extend(device for device in self._arrays if device not in arrays)
+        self._blocks = blocks
+        self._arrays = arrays
+        return arrays, changed
+
+    def wait(self, timeout):
+        """Wait at most timeout seconds for an md event, True if one was
+        reported. Files without md events, e.g. a copy of mdstat used in
+        testing, always wait for the whole timeout."""
+        if self._poller is None:
+            time.sleep(timeout)
+            return False
+        try:
+            return bool(self._poller.poll(timeout * 1000))
+        except InterruptedError:
+            return False
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._poller = None
+
+    def _open(self):
+        try:
+            self._file = open(self._path, "r")
+        except OSError as err:
+            logger.warn(f"MdstatWatcher, unable to open {self._path}: {err}")
+            return False
+        # /proc/mdstat raises POLLPRI and POLLERR on every md event once it
+        # has been read, regular files never do
+        self._poller = select.poll()
+        self._poller.register(self._file, select.POLLPRI | select.POLLERR)
+        return True
+
+
+class MdadmConf(object):
+    """Arrays listed in mdadm.conf, read again when the file changes"""
+
+    MDADM_CONF = "/etc/mdadm.conf"
+
+    def __init__(self, path=MDADM_CONF):
+        self._path = path
+        self._stamp = None
+        self._devices = None
+
+    @property
+    def path(self):
+        return self._path
+
+    def devices(self):
+        """/dev/mdX device of every ARRAY line, /dev/md/X is listed as
+        /dev/mdX. None if there is no mdadm.conf. The same list is returned
+        for as long as the file does not change."""
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            self._stamp = None
+            self._devices = None
+            return None
+
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if stamp != self._stamp:
+            with open(self._path, "r") as conf_file:
+                self._devices = self._parse(conf_file)
+            self._stamp = stamp
+        return self._devices
+
+    @staticmethod
+    def _parse(lines):
+        devices = []
+        for line in lines:
+            fields = line.split()
+            if len(fields) < 2 or "#" in fields[0] or \
+               "ARRAY" not in fields[0] or "/md" not in fields[1]:
+                continue
+            # /dev/md/1 and /dev/md1 are the same device
+            devices.append(fields[1].replace("/md/", "/md", 1))
+        return devices
@@ -0,0 +1,251 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Background sampler of node metrics read from /proc
+
+                     One thread reads /proc/stat, /proc/meminfo, /proc/net/dev
+                     and statvfs() of a mount point every interval and
+                     publishes them as an immutable NodeSample. Per core cpu
+                     usage is kept in fixed size ring buffers whose rolling
+                     averages are updated as every sample is added.
+ ****************************************************************************
+"""
+
+import os
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+from framework.utils.service_logging import logger
+
+
+CpuTimesPercent = namedtuple("CpuTimesPercent",
+                             "user nice system idle iowait irq softirq steal")
+NetCounters = namedtuple("NetCounters", "bytes_sent bytes_recv packets_sent packets_recv "
+                                        "errin errout dropin dropout")
+DiskUsage = namedtuple("DiskUsage", "total used free percent")
+SwapUsage = namedtuple("SwapUsage", "total used free percent")
+NodeSample = namedtuple("NodeSample", "timestamp cpu_usage cpu_times_percent core_usage "
+                                      "core_averages procs_running memory swap net "
+                                      "disk inodes_total inodes_free")
+
+
+class RingBuffer(object):
+    """Fixed size buffer of floats keeping the mean of its last n values
+    for each of the window sizes n"""
+
+    def __init__(self, size, windows=()):
+        self._size = max([int(size)] + [int(w) for w in windows])
+        self._values = array('d', [0.0] * self._size)
+        self._windows = [max(1, int(w)) for w in windows]
+        self._sums = array('d', [0.0] * len(self._windows))
+        self._count = 0
+
+    def append(self, value):
+        for index, window in enumerate(self._windows):
+            if self._count >= window:
+                self._sums[index] -= self._values[(self._count - window) % self._size]
+            self._sums[index] += value
+        self._values[self._count % self._size] = value
+        self._count += 1
+        # Do not let rounding errors of the running sums pile up
+        if self._count % self._size == 0:
+            self._resum()
+
+    def latest(self):
+        """Last value appended, None if there is none"""
+        if self._count == 0:
+            return None
+        return self._values[(self._count - 1) % self._size]
+
+    def averages(self):
+        """Mean of the last n values for each window size n, of the values
+        appended so far while there are fewer than n, -1 when empty"""
+        return [self._sums[index] / min(self._count, window) if self._count else -1
+                for index, window in enumerate(self._windows)]
+
+    def _resum(self):
+        for index, window in enumerate(self._windows):
+            count = min(self._count, window)
+            self._sums[index] = sum(self._values[(self._count - offset) % self._size]
+                                    for offset in range(1, count + 1))
+
+
+class ProcSampler(object):
+    """Samples node metrics from /proc on its own thread"""
+
+    # Rolling averages of per core cpu usage, in seconds
+    AVERAGE_WINDOWS = (60, 300, 900)
+
+    PROC_STAT = "/proc/stat"
+    PROC_MEMINFO = "/proc/meminfo"
+    PROC_NET_DEV = "/proc/net/dev"
+
+    def __init__(self, interval=1, mount_point="/", windows=AVERAGE_WINDOWS):
+        self._interval = max(0.1, float(interval))
+        self._mount_point = mount_point
+        self._windows = [max(1, int(round(window / self._interval))) for window in windows]
+        self._prev_cpu = None
+        self._prev_cores = {}
+        self._core_buffers = {}
+        self._snapshot = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Take a first sample and keep sampling in the background"""
+        if self._thread is not None:
+            return
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="proc-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def latest(self):
+        """Most recent NodeSample, None if none could be taken yet"""
+        return self._snapshot
+
+    def sample(self):
+        """Read all metrics once and publish them"""
+        cpu, cores, procs_running = self._read_stat()
+        cpu_usage, cpu_times_percent = self._usage(self._prev_cpu, cpu)
+        self._prev_cpu = cpu
+
+        core_usage = []
+        core_averages = []
+        for core, times in sorted(cores.items()):
+            usage, _ = self._usage(self._prev_cores.get(core), times)
+            self._prev_cores[core] = times
+            buffer = self._core_buffers.get(core)
+            if buffer is None:
+                buffer = self._core_buffers[core] = RingBuffer(max(self._windows), self._windows)
+            buffer.append(usage)
+            core_usage.append(usage)
+            core_averages.append(buffer.averages())
+
+        memory, swap = self._read_meminfo()
+        stat = os.statvfs(self._mount_point)
+        total = stat.f_blocks * stat.f_frsize
+        free = stat.f_bavail * stat.f_frsize
+        used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+        percent = round(used * 100.0 / (used + free), 1) if used + free else 0.0
+
+        self._snapshot = NodeSample(time.time(), cpu_usage, cpu_times_percent,
+                                    core_usage, core_averages, procs_running,
+                                    memory, swap, self._read_net_dev(),
+                                    DiskUsage(total, used, free, percent),
+                                    stat.f_files, stat.f_ffree)
+        return self._snapshot
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self.sample()
+            except Exception as err:
+                logger.warn(f"ProcSampler, sampling failed: {err}")
+
+    @staticmethod
+    def _usage(prev, times):
+        """Busy percent and percent of every cpu time field between two
+        reads of the user..steal times, since boot without a previous read"""
+        if prev is None:
+            prev = (0,) * len(times)
+        deltas = [max(0, now - then) for now, then in zip(times, prev)]
+        total = sum(deltas)
+        if total == 0:
+            return 0.0, CpuTimesPercent(*([0.0] * len(deltas)))
+        idle = deltas[3] + deltas[4]
+        return (round((total - idle) * 100.0 / total, 1),
+                CpuTimesPercent(*[round(delta * 100.0 / total, 1) for delta in deltas]))
+
+    def _read_stat(self):
+        """user..steal times of all cpus and of each core, and the number
+        of running and blocked processes"""
+        cpu = None
+        cores = {}
+        procs_running = 0
+        with open(self.PROC_STAT) as f:
+            for line in f:
+                fields = line.split()
+                if not fields:
+                    continue
+                if fields[0] == "cpu":
+                    cpu = tuple(int(value) for value in fields[1:9])
+                elif fields[0].startswith("cpu"):
+                    cores[int(fields[0][3:])] = tuple(int(value) for value in fields[1:9])
+                elif fields[0] in ("procs_running", "procs_blocked"):
+                    procs_running += int(fields[1])
+        return cpu, cores, procs_running
+
+    def _read_meminfo(self):
+        """Memory in the format of psutil.virtual_memory()._asdict(), and
+        swap usage"""
+        info = {}
+        with open(self.PROC_MEMINFO) as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                fields = value.split()
+                if fields:
+                    info[key] = int(fields[0]) * 1024
+
+        total = info.get("MemTotal", 0)
+        free = info.get("MemFree", 0)
+        buffers = info.get("Buffers", 0)
+        cached = info.get("Cached", 0) + info.get("SReclaimable", 0)
+        available = info.get("MemAvailable", free + buffers + cached)
+        used = total - free - cached - buffers
+        if used < 0:
+            used = total - free
+        memory = {
+            "total": total,
+            "available": available,
+            "percent": round((total - available) * 100.0 / total, 1) if total else 0.0,
+            "used": used,
+            "free": free,
+            "active": info.get("Active", 0),
+            "inactive": info.get("Inactive", 0),
+            "buffers": buffers,
+            "cached": cached,
+            "shared": info.get("Shmem", 0),
+            "slab": info.get("Slab", 0),
+        }
+
+        swap_total = info.get("SwapTotal", 0)
+        swap_free = info.get("SwapFree", 0)
+        swap_used = swap_total - swap_free
+        swap = SwapUsage(swap_total, swap_used, swap_free,
+                         round(swap_used * 100.0 / swap_total, 1) if swap_total else 0.0)
+        return memory, swap
+
+    def _read_net_dev(self):
+        """NetCounters of every interface, like psutil.net_io_counters(pernic=True)"""
+        net = {}
+        with open(self.PROC_NET_DEV) as f:
+            for line in f:
+                interface, sep, counters = line.partition(":")
+                if not sep or "|" in interface:
+                    continue
+                fields = [int(value) for value in counters.split()]
+                net[interface.strip()] = NetCounters(
+                    bytes_sent=fields[8], bytes_recv=fields[0],
+                    packets_sent=fields[9], packets_recv=fields[1],
+                    errin=fields[2], errout=fields[10],
+                    dropin=fields[3], dropout=fields[11])
+        return net
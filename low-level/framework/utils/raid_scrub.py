@@ -0,0 +1,254 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Scheduler of md RAID data checks (scrubs)
+
+                     ScrubScheduler starts a 'check' of every array through
+                     its md sysfs attributes and waits for them to finish
+                     with poll() on sync_action. Up to max_concurrent arrays
+                     which share no disk are checked at the same time, and a
+                     total sync_speed_max budget is split between them. The
+                     attributes are written with sudo tee, as sspl-ll does
+                     not run as root.
+                     Returns the mismatch_cnt, duration and throughput of
+                     every check.
+ ****************************************************************************
+"""
+
+import errno
+import os
+import select
+import subprocess
+import time
+from collections import namedtuple
+
+from framework.utils.service_logging import logger
+
+
+# Outcome of the check of an array. size is the KiB checked on each member
+# and throughput the KiB/s it was checked at. error is None unless the
+# check could not be run, then the other fields are None.
+ScrubResult = namedtuple("ScrubResult", "device mismatch_cnt duration size throughput error")
+
+
+class ScrubScheduler(object):
+    """Runs md 'check' actions on several arrays at once"""
+
+    SYSFS_PATH = "/sys/block"
+    TEE = ["sudo", "/bin/tee"]
+    IDLE = "idle"
+    CHECK = "check"
+
+    # Longest wait for a sync_action change md does not report with poll()
+    POLL_INTERVAL = 60
+
+    # Times an array still busy with another sync action is tried again
+    START_RETRIES = 10
+
+    def __init__(self, max_concurrent=1, speed_min=0, speed_max=0,
+                 poll_interval=POLL_INTERVAL, start_retries=START_RETRIES,
+                 sysfs_path=SYSFS_PATH):
+        """speed_min is the sync_speed_min of each array and speed_max the
+        sync_speed_max shared by all arrays being checked, in KiB/s, 0 to
+        keep the system wide limits"""
+        self._max_concurrent = max(1, int(max_concurrent))
+        self._speed_min = int(speed_min)
+        self._speed_max = int(speed_max)
+        self._poll_interval = poll_interval
+        self._start_retries = start_retries
+        self._sysfs_path = sysfs_path
+        self._stopped = False
+
+    def stop(self):
+        """Stop waiting for checks, the ones running are left to md"""
+        self._stopped = True
+
+    def run(self, devices):
+        """Check every md device of devices, e.g. ['md0', 'md1'], and
+        return {device: ScrubResult}"""
+        pending = list(devices)
+        attempts = {}
+        running = {}
+        results = {}
+        self._stopped = False
+        try:
+            while (pending or running) and not self._stopped:
+                retry = self._start_pending(pending, running, attempts, results)
+                self._balance(running)
+                self._wait(running, retry)
+                for device in list(running):
+                    action = self._read_action(running[device]["file"])
+                    if action != self.CHECK:
+                        results[device] = self._finish(device, running.pop(device))
+        finally:
+            for check in running.values():
+                self._release(check)
+        return results
+
+    def _start_pending(self, pending, running, attempts, results):
+        """Start checks of pending arrays while there is room, True if an
+        array was busy and must be tried again"""
+        retry = False
+        busy_disks = set()
+        for check in running.values():
+            busy_disks |= check["disks"]
+        for device in list(pending):
+            if len(running) >= self._max_concurrent:
+                break
+            disks = self._disks(device)
+            if disks & busy_disks:
+                continue
+
+            try:
+                check = self._start(device)
+            except OSError as err:
+                pending.remove(device)
+                results[device] = ScrubResult(device, None, None, None, None, str(err))
+                logger.warn(f"ScrubScheduler, unable to check {device}: {err}")
+                continue
+
+            if check is None:
+                attempts[device] = attempts.get(device, 0) + 1
+                if attempts[device] > self._start_retries:
+                    pending.remove(device)
+                    results[device] = ScrubResult(device, None, None, None, None,
+                                                  "busy with another sync action")
+                else:
+                    retry = True
+                continue
+
+            check["disks"] = disks
+            pending.remove(device)
+            running[device] = check
+            busy_disks |= disks
+        return retry
+
+    def _start(self, device):
+        """Start the check of device, None if it is busy with another sync
+        action"""
+        action_file = open(self._path(device, "sync_action"), "rb", buffering=0)
+        try:
+            if self._read_action(action_file) != self.IDLE:
+                action_file.close()
+                return None
+            self._write(device, "sync_action", self.CHECK)
+            # Reading sync_action again arms poll() for its next change
+            self._read_action(action_file)
+        except OSError as err:
+            action_file.close()
+            if err.errno == errno.EBUSY:
+                return None
+            raise
+        if self._speed_min:
+            try:
+                self._write(device, "sync_speed_min", self._speed_min)
+            except OSError as err:
+                logger.warn(f"ScrubScheduler, unable to set sync_speed_min of {device}: {err}")
+        logger.info(f"ScrubScheduler, started check of {device}")
+        return {"device": device, "file": action_file, "start": time.time(), "speed_max": None}
+
+    def _finish(self, device, check):
+        duration = max(time.time() - check["start"], 0.001)
+        self._release(check)
+        try:
+            mismatch_cnt = int(self._read(device, "mismatch_cnt"))
+            size = int(self._read(device, "component_size"))
+        except (OSError, ValueError) as err:
+            return ScrubResult(device, None, None, None, None, str(err))
+        return ScrubResult(device, mismatch_cnt, duration, size, size / duration, None)
+
+    def _release(self, check):
+        """Give the array back its system wide speed limits"""
+        device = check["device"]
+        check["file"].close()
+        for attr, changed in (("sync_speed_min", self._speed_min),
+                              ("sync_speed_max", check["speed_max"])):
+            if changed:
+                try:
+                    self._write(device, attr, "system")
+                except OSError as err:
+                    logger.warn(f"ScrubScheduler, unable to reset {attr} of {device}: {err}")
+
+    def _balance(self, running):
+        """Split the speed_max budget between the running checks"""
+        if not self._speed_max or not running:
+            return
+        speed_max = max(self._speed_max // len(running), self._speed_min, 1)
+        for device, check in running.items():
+            if check["speed_max"] != speed_max:
+                try:
+                    self._write(device, "sync_speed_max", speed_max)
+                    check["speed_max"] = speed_max
+                except OSError as err:
+                    logger.warn(f"ScrubScheduler, unable to set sync_speed_max of {device}: {err}")
+
+    def _wait(self, running, retry):
+        """Wait for md to report a change of the sync_action of a running
+        check, at most the poll interval"""
+        if self._stopped:
+            return
+        if not running:
+            if retry:
+                time.sleep(self._poll_interval)
+            return
+        poller = select.poll()
+        for check in running.values():
+            poller.register(check["file"], select.POLLPRI | select.POLLERR)
+        try:
+            poller.poll(self._poll_interval * 1000)
+        except InterruptedError:
+            pass
+
+    def _disks(self, device):
+        """Names of the disks the members of device are on"""
+        slaves = self._path(device, "slaves")
+        try:
+            members = os.listdir(slaves)
+        except OSError:
+            return frozenset([device])
+        disks = set()
+        for member in members:
+            path = os.path.realpath(os.path.join(slaves, member))
+            if os.path.exists(os.path.join(path, "partition")):
+                path = os.path.dirname(path)
+            disks.add(os.path.basename(path))
+        return frozenset(disks or [device])
+
+    def _path(self, device, attr):
+        if attr == "slaves":
+            return os.path.join(self._sysfs_path, device, attr)
+        return os.path.join(self._sysfs_path, device, "md", attr)
+
+    @staticmethod
+    def _read_action(action_file):
+        action_file.seek(0)
+        return action_file.read().decode().strip()
+
+    def _read(self, device, attr):
+        with open(self._path(device, attr), "r") as attr_file:
+            return attr_file.read().strip()
+
+    def _write(self, device, attr, value):
+        """Write value to attr of device through sudo tee, raises OSError
+        with the errno of the failed write, e.g. EBUSY"""
+        path = self._path(device, attr)
+        process = subprocess.run(self.TEE + [path], input=str(value), stdout=subprocess.DEVNULL,
+                                 stderr=subprocess.PIPE, encoding='utf-8')
+        if process.returncode != 0:
+            error = process.stderr.strip()
+            code = errno.EBUSY if os.strerror(errno.EBUSY) in error else errno.EIO
+            raise OSError(code, error or f"tee {path} exited with {process.returncode}")
@@ -16,10 +16,20 @@
 """
  ****************************************************************************
   Description:       logging utilities for the daemon services
+
+                     Records are put on a bounded queue by the module
+                     threads and formatted and written in batches to
+                     syslog or journald by a single writer thread. Records
+                     which do not fit in the queue are dropped and counted,
+                     and each call site may only log so many warnings in a
+                     while.
  ****************************************************************************
 """
 
+import atexit
 import logging.handlers
+import queue
+import threading
 import time
 import os
 
@@ -45,6 +55,19 @@ LOG_INFO = "INFO"
 LOG_DEBUG = "DEBUG"
 LOG_NOTSET = "NOTSET"
 
+BACKEND_SYSLOG = "syslog"
+BACKEND_JOURNALD = "journald"
+
+# Records waiting for the writer thread, more are dropped
+DEFAULT_QUEUE_SIZE = 10000
+
+# Records written by the writer thread before flushing
+DEFAULT_BATCH_SIZE = 100
+
+# Warnings one call site may log every rate interval, 0 for no limit
+DEFAULT_RATE_LIMIT = 10
+DEFAULT_RATE_INTERVAL = 60
+
 
 # Dictionary to convert loglevel strings to loglevels
 LOGLEVEL_NAME_TO_LEVEL_DICT = {
@@ -57,8 +80,143 @@ LOGLEVEL_NAME_TO_LEVEL_DICT = {
 }
 
 
-def init_logging(dcs_service_name, log_level=LOG_INFO, syslog_host="localhost", syslog_port=514):
-    """Initialize logging to log to syslog"""
+class RateLimitFilter(logging.Filter):
+    """Lets at most rate_limit records of level or above through from each
+    call site every rate_interval seconds. The first record let through
+    after some were held back says how many."""
+
+    def __init__(self, rate_limit=DEFAULT_RATE_LIMIT,
+                 rate_interval=DEFAULT_RATE_INTERVAL, level=logging.WARNING):
+        super(RateLimitFilter, self).__init__()
+        self._rate_limit = int(rate_limit)
+        self._rate_interval = rate_interval
+        self._level = level
+        self._lock = threading.Lock()
+        # [window start, records let through, records held back] by call site
+        self._windows = {}
+        self.suppressed = 0
+
+    def filter(self, record):
+        if self._rate_limit <= 0 or record.levelno < self._level:
+            return True
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or record.created - window[0] >= self._rate_interval:
+                self._windows[key] = [record.created, 1, 0]
+                if window is not None and window[2]:
+                    record.msg = f"{record.msg} ({window[2]} similar messages " \
+                                 f"suppressed in the last {self._rate_interval} seconds)"
+                return True
+            if window[1] < self._rate_limit:
+                window[1] += 1
+                return True
+            window[2] += 1
+            self.suppressed += 1
+            return False
+
+
+class LoggingStats(object):
+    """Counters of the records queued, written and dropped"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+
+    def add(self, counter, count=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + count)
+
+
+class BatchingQueueHandler(logging.handlers.QueueHandler):
+    """Queues records for the writer thread without formatting them,
+    dropping them when the queue is full"""
+
+    def __init__(self, record_queue, stats):
+        super(BatchingQueueHandler, self).__init__(record_queue)
+        self._stats = stats
+
+    def prepare(self, record):
+        # Formatted by the writer thread, not by the caller
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            self._stats.add("queued")
+        except queue.Full:
+            self._stats.add("dropped")
+
+
+class BatchWriter(threading.Thread):
+    """Writes the queued records to handler in batches"""
+
+    # Shortest time between two reports of dropped records
+    DROP_REPORT_INTERVAL = 10
+
+    _STOP = object()
+
+    def __init__(self, record_queue, handler, stats, batch_size=DEFAULT_BATCH_SIZE):
+        super(BatchWriter, self).__init__(name="sspl-logging", daemon=True)
+        self._queue = record_queue
+        self._handler = handler
+        self._stats = stats
+        self._batch_size = max(1, int(batch_size))
+        self._reported_drops = 0
+        self._reported = 0
+
+    def stop(self, timeout=5):
+        """Write what is queued and stop"""
+        try:
+            self._queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self.join(timeout)
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for record in batch:
+                if record is self._STOP:
+                    stopping = True
+                elif record.levelno >= self._handler.level:
+                    self._handler.handle(record)
+            self._stats.add("written", len(batch) - stopping)
+            self._report_drops()
+            self._handler.flush()
+
+    def _report_drops(self):
+        dropped = self._stats.dropped
+        if dropped == self._reported_drops or \
+           time.time() - self._reported < self.DROP_REPORT_INTERVAL:
+            return
+        record = logging.LogRecord(logger_facility, logging.WARNING, __file__, 0,
+                    "Dropped %d log records as the logging queue was full, %d in total",
+                    (dropped - self._reported_drops, dropped), None)
+        self._handler.handle(record)
+        self._reported_drops = dropped
+        self._reported = time.time()
+
+
+_writer = None
+_stats = LoggingStats()
+_rate_limit_filter = None
+
+
+def init_logging(dcs_service_name, log_level=LOG_INFO, syslog_host="localhost", syslog_port=514,
+                 backend=BACKEND_SYSLOG, queue_size=DEFAULT_QUEUE_SIZE,
+                 batch_size=DEFAULT_BATCH_SIZE, rate_limit=DEFAULT_RATE_LIMIT,
+                 rate_interval=DEFAULT_RATE_INTERVAL):
+    """Initialize logging to log to syslog, or journald, through a queue"""
+    global _writer, _rate_limit_filter
 
     warning_message = None
     if log_level not in list(LOGLEVEL_NAME_TO_LEVEL_DICT.keys()):
@@ -70,31 +228,66 @@ def init_logging(dcs_service_name, log_level=LOG_INFO, syslog_host="localhost",
     num_attempts = 1
     handler = None
 
-    while True:
-        try:
-            handler = logging.handlers.SysLogHandler(
-                address=(syslog_host, syslog_port))
-            syslog_format = "%(name)s[%(process)d]: " \
-                "%(levelname)s %(message)s (%(filename)s:%(lineno)d)"
-            formatter = logging.Formatter(syslog_format)
-            handler.setFormatter(formatter)
-            break
-        except Exception as e:
-            print('Syslog connect exception: {}. Retrying...'.format(e))
-            if num_attempts <= MAX_SYSLOG_CONNECT_ATTEMPTS:
-                num_attempts += 1
-                time.sleep(RECONNECT_DELAY_INTERVAL_SECONDS)
-                continue
-            else:
-                print("Warning: Unable to connect to syslog for logging")
+    if backend == BACKEND_JOURNALD and use_journal:
+        handler = journal.JournalHandler(SYSLOG_IDENTIFIER=SYSLOG_IDENTIFIER)
+        handler.setFormatter(logging.Formatter(
+            "%(levelname)s %(message)s (%(filename)s:%(lineno)d)"))
+    else:
+        if backend == BACKEND_JOURNALD:
+            warning_message = "journald is not available, logging to syslog"
+        while True:
+            try:
+                handler = logging.handlers.SysLogHandler(
+                    address=(syslog_host, syslog_port))
+                syslog_format = "%(name)s[%(process)d]: " \
+                    "%(levelname)s %(message)s (%(filename)s:%(lineno)d)"
+                formatter = logging.Formatter(syslog_format)
+                handler.setFormatter(formatter)
                 break
-    _logger.addHandler(handler)
+            except Exception as e:
+                print('Syslog connect exception: {}. Retrying...'.format(e))
+                if num_attempts <= MAX_SYSLOG_CONNECT_ATTEMPTS:
+                    num_attempts += 1
+                    time.sleep(RECONNECT_DELAY_INTERVAL_SECONDS)
+                    continue
+                else:
+                    print("Warning: Unable to connect to syslog for logging")
+                    break
+
+    if handler is not None:
+        record_queue = queue.Queue(max(1, int(queue_size)))
+        queue_handler = BatchingQueueHandler(record_queue, _stats)
+        _rate_limit_filter = RateLimitFilter(rate_limit, rate_interval)
+        queue_handler.addFilter(_rate_limit_filter)
+        _writer = BatchWriter(record_queue, handler, _stats, batch_size)
+        _writer.start()
+        atexit.register(shutdown_logging)
+        _logger.addHandler(queue_handler)
     _logger.info(f"Logging has been initialized for sspl {dcs_service_name} \
                   service after {num_attempts} attempts to level {log_level}")
     if warning_message is not None:
         _logger.warning(warning_message)
 
 
+def shutdown_logging():
+    """Write the records still queued"""
+    global _writer
+    if _writer is not None:
+        _writer.stop()
+    _writer = None
+
+
+def logging_stats():
+    """Counters of the records queued, written, dropped as the queue was
+    full and held back by rate limits"""
+    return {
+        "queued": _stats.queued,
+        "written": _stats.written,
+        "dropped": _stats.dropped,
+        "rate_limited": _rate_limit_filter.suppressed if _rate_limit_filter else 0
+    }
+
+
 class Logger:
     """
     A wrapper class to wrap logging functionality.
@@ -0,0 +1,132 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       SMART health checks of drives off the caller's thread
+
+                     Checks run smartctl without a shell on a bounded pool
+                     of worker threads. Every drive is checked at most once
+                     per interval, however often schedule() is called.
+ ****************************************************************************
+"""
+
+import json
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from framework.utils.service_logging import logger
+
+
+SmartHealthResult = namedtuple("SmartHealthResult",
+                               "drive device faulty removed timestamp")
+
+
+class SmartHealthEngine(object):
+    """Rate limited smartctl health checks on a worker pool"""
+
+    SMARTCTL = ["sudo", "smartctl"]
+
+    # Longest time a single smartctl call may take
+    SMARTCTL_TIMEOUT = 60
+
+    def __init__(self, workers=4, interval=60, timeout=SMARTCTL_TIMEOUT):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(workers)),
+                                            thread_name_prefix="smart-health")
+        self._interval = int(interval)
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_checked = {}
+
+    def schedule(self, drives):
+        """Queue a check of the drives which are due, drives maps a drive
+        to a (device name, scsi) tuple. Never blocks on smartctl."""
+        now = time.time()
+        with self._lock:
+            for drive, (device, scsi) in drives.items():
+                if drive in self._pending or \
+                   now - self._last_checked.get(drive, 0) < self._interval:
+                    continue
+                self._last_checked[drive] = now
+                self._pending[drive] = self._executor.submit(self._check, drive, device, scsi)
+
+    def collect(self):
+        """Results of the checks completed since the last call"""
+        results = []
+        with self._lock:
+            done = [drive for drive, future in self._pending.items() if future.done()]
+            for drive in done:
+                try:
+                    result = self._pending.pop(drive).result()
+                except Exception as err:
+                    logger.warn(f"SmartHealthEngine, health check of {drive} failed: {err}")
+                    continue
+                if result is not None:
+                    results.append(result)
+        return results
+
+    def forget(self, drive):
+        """Drop everything known about a drive which went away"""
+        with self._lock:
+            future = self._pending.pop(drive, None)
+            if future is not None:
+                future.cancel()
+            self._last_checked.pop(drive, None)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def _check(self, drive, device, scsi):
+        """Run smartctl -H on device, returns a SmartHealthResult or None
+        if the drive's health could not be determined"""
+        command = self.SMARTCTL + ["-H", "--json"]
+        if scsi:
+            command += ["-d", "scsi"]
+        command.append(device)
+
+        start = time.time()
+        try:
+            process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                     encoding='utf-8', timeout=self._timeout)
+        except subprocess.TimeoutExpired:
+            logger.warn(f"SmartHealthEngine, smartctl on {device} timed out after {self._timeout} secs")
+            return None
+        logger.debug(f"SmartHealthEngine, health check of {device} took {time.time() - start:.3f} secs")
+
+        try:
+            response = json.loads(process.stdout)
+        except ValueError:
+            logger.warn(f"SmartHealthEngine, smartctl on {device} returned mal-formed json: "
+                        f"{process.stderr.strip()}")
+            return None
+
+        removed = False
+        try:
+            removed = "No such device" in response["smartctl"]["message"][0]["string"]
+        # If smartctl is not failing there is no message in the response
+        except (KeyError, IndexError):
+            pass
+
+        try:
+            faulty = not response["smart_status"]["passed"]
+        # If ['smart_status']['passed'] is not present in response, consider it as fault
+        except KeyError:
+            faulty = True
+
+        return SmartHealthResult(drive, device, faulty, removed, time.time())
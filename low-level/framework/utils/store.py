@@ -60,3 +60,33 @@ class Store(object):
         """ get keys with given prefix
         """
         raise NotImplementedError("sub class should implement this")
+
+    def get_all_with_prefix(self, prefix):
+        """get {key relative to prefix: value} of all keys with given
+        prefix, None if they could not be read. Stores without recursive
+        reads get the keys one by one.
+        """
+        keys = self.get_keys_with_prefix(prefix)
+        if keys is None:
+            return None
+        return {key: self.get(prefix + key) for key in keys}
+
+    def get_with_index(self, key):
+        """get data from store along with its modification index, used
+        for check-and-set updates. Stores without versioning return 0.
+        """
+        return self.get(key), 0
+
+    def txn(self, operations):
+        """Apply a list of (verb, key, value, index) operations, where verb
+        is one of 'set', 'cas' or 'delete' and value is already serialized.
+        Stores without transaction support apply them one after another and
+        ignore the index. Returns the list of applied operations or None if
+        the transaction was rolled back.
+        """
+        for verb, key, value, _ in operations:
+            if verb == "delete":
+                self.delete(key)
+            else:
+                self.put(value, key, pickled=False)
+        return operations
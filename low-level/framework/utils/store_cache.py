@@ -0,0 +1,135 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Write-behind cache on top of store
+
+                     All keys below a prefix are read with one recursive
+                     load and served from memory afterwards. Writes only
+                     update memory and mark the key dirty when its value
+                     actually changed, flush() then writes every dirty key
+                     in as few store transactions as possible. Used for the
+                     persistent caches of the FRU sensors, which are only
+                     written by their owning sensor.
+ ****************************************************************************
+"""
+
+import copy
+import os
+import pickle
+import threading
+
+from framework.utils.store_factory import store as default_store
+from framework.utils.service_logging import logger
+
+# Marks a dirty key to be deleted on flush
+_DELETED = object()
+
+
+class StoreCache(object):
+    """Write-behind cache of the keys below prefix"""
+
+    # Consul limits a transaction to 64 operations
+    MAX_TXN_OPS = 64
+
+    def __init__(self, prefix, store=None):
+        self._prefix = os.path.join(prefix, "")
+        self._store = store if store is not None else default_store
+        self._lock = threading.RLock()
+        self._values = None
+        self._dirty = {}
+
+    def load(self):
+        """Load the keys below prefix unless loaded already, returns False
+        if the store could not be read"""
+        with self._lock:
+            if self._values is None:
+                values = self._store.get_all_with_prefix(self._prefix)
+                if values is None:
+                    logger.warn(f"StoreCache, unable to load {self._prefix}, "
+                                "using the store directly")
+                    return False
+                self._values = values
+            return True
+
+    def is_loaded(self):
+        return self._values is not None
+
+    def keys(self):
+        """Names of the keys below prefix"""
+        with self._lock:
+            if not self.load():
+                return self._store.get_keys_with_prefix(self._prefix) or []
+            return list(self._values.keys())
+
+    def exists(self, name):
+        with self._lock:
+            if not self.load():
+                return self._store.exists(self._prefix + name)[0]
+            return name in self._values
+
+    def get(self, name):
+        """Copy of the value of name, None when it does not exist"""
+        with self._lock:
+            if not self.load():
+                return self._store.get(self._prefix + name)
+            return copy.deepcopy(self._values.get(name))
+
+    def put(self, value, name):
+        """Set name to value, written by the next flush() if it changed"""
+        with self._lock:
+            if not self.load():
+                self._store.put(value, self._prefix + name)
+                return
+            if name in self._values and self._values[name] == value:
+                return
+            self._values[name] = copy.deepcopy(value)
+            self._dirty[name] = self._values[name]
+
+    def delete(self, name):
+        """Remove name, deleted from the store by the next flush()"""
+        with self._lock:
+            if not self.load():
+                self._store.delete(self._prefix + name)
+                return
+            if self._values.pop(name, _DELETED) is not _DELETED:
+                self._dirty[name] = _DELETED
+
+    def flush(self):
+        """Write the changed keys to the store, returns False if some of
+        them could not be written and are kept for the next flush"""
+        with self._lock:
+            if not self._dirty:
+                return True
+
+            operations = []
+            for name, value in self._dirty.items():
+                if value is _DELETED:
+                    operations.append(("delete", self._prefix + name, None, 0))
+                else:
+                    operations.append(("set", self._prefix + name, pickle.dumps(value), 0))
+
+            flushed = True
+            for start in range(0, len(operations), self.MAX_TXN_OPS):
+                chunk = operations[start:start + self.MAX_TXN_OPS]
+                if self._store.txn(chunk) is None:
+                    logger.warn(f"StoreCache, failed to write {len(chunk)} keys "
+                                f"of {self._prefix}, retrying on next flush")
+                    flushed = False
+                    continue
+                for _, key, _, _ in chunk:
+                    self._dirty.pop(key[len(self._prefix):], None)
+            return flushed
@@ -16,12 +16,23 @@
 """
  ****************************************************************************
   Description:       Queue implementation on top of store
+
+                     Messages are kept in segments, each segment is a list of
+                     messages stored under one key, each message kept with an
+                     optional timestamp so consumers can expire it without
+                     parsing the message itself. Head, tail and memory
+                     usage live together in a single meta key which is only
+                     updated through check-and-set transactions, along with
+                     the segment keys touched by the same operation. An
+                     in-memory mirror of the meta key and of the head and
+                     tail segments makes reads of the indices free.
   ****************************************************************************
  """
 
-import sys
+import pickle
+import threading
 
-from framework.utils.store_factory import store
+from framework.utils.store_factory import store as default_store
 from framework.utils.config_reader import ConfigReader
 from framework.utils.service_logging import logger
 
@@ -29,84 +40,300 @@ class StoreQueue:
 
     RABBITMQPROCESSOR    = 'RABBITMQEGRESSPROCESSOR'
     LIMIT_CONSUL_MEMORY  = 'limit_consul_memory'
+    SEGMENT_SIZE         = 'consul_queue_segment_size'
+
+    META_KEY             = "SSPL_MESSAGE_QUEUE_META"
+    SEGMENT_PREFIX       = "SSPL_UNSENT_SEGMENTS"
+
+    # Keys used by the earlier one-message-per-key layout
+    LEGACY_MEMORY_KEY    = "SSPL_MEMORY_USAGE"
+    LEGACY_HEAD_KEY      = "SSPL_MESSAGE_HEAD_INDEX"
+    LEGACY_TAIL_KEY      = "SSPL_MESSAGE_TAIL_INDEX"
+    LEGACY_MSG_PREFIX    = "SSPL_UNSENT_MESSAGES"
+
+    # Consul limits a value to 512KB and a transaction to 64 operations
+    MAX_SEGMENT_BYTES    = 256 * 1024
+    MAX_TXN_OPS          = 64
+    MAX_CAS_RETRY        = 3
+
+    def __init__(self, store=None, max_size=None, segment_size=None):
+        self._store = store if store is not None else default_store
+        if max_size is None or segment_size is None:
+            self._conf_reader = ConfigReader()
+        if max_size is None:
+            max_size = self._conf_reader._get_value_with_default(self.RABBITMQPROCESSOR,
+                                                self.LIMIT_CONSUL_MEMORY, 50000000)
+        if segment_size is None:
+            segment_size = self._conf_reader._get_value_with_default(self.RABBITMQPROCESSOR,
+                                                self.SEGMENT_SIZE, 100)
+        self._max_size = int(max_size)
+        self._segment_size = max(1, int(segment_size))
 
-    def __init__(self):
-        self._conf_reader = ConfigReader()
-        self._max_size = int(self._conf_reader._get_value_with_default(self.RABBITMQPROCESSOR,
-                                                                self.LIMIT_CONSUL_MEMORY, 50000000))
-        self._current_size = store.get("SSPL_MEMORY_USAGE")
-        if self._current_size is None:
-            store.put(0, "SSPL_MEMORY_USAGE")
+        self._lock = threading.RLock()
+        self._meta = None
+        self._meta_index = 0
+        self._segments = {}
+        self._load()
+        self._migrate_legacy_messages()
 
-        self._head = store.get("SSPL_MESSAGE_HEAD_INDEX")
-        if self._head is None:
-            store.put(0, "SSPL_MESSAGE_HEAD_INDEX")
+    @staticmethod
+    def _new_meta():
+        # head/tail are segment numbers, offset is the number of messages
+        # already consumed from the head segment and first is the sequence
+        # number of the oldest message, tail_bytes the size of the messages
+        # in the tail segment, consumed ones included
+        return {"head": 0, "offset": 0, "tail": 0, "size": 0, "count": 0, "first": 0,
+                "tail_bytes": 0}
 
-        self._tail = store.get("SSPL_MESSAGE_TAIL_INDEX")
-        if self._tail is None:
-            store.put(0, "SSPL_MESSAGE_TAIL_INDEX")
+    @staticmethod
+    def _size_of(entry):
+        item = entry[0]
+        if isinstance(item, str):
+            return len(item.encode('utf-8'))
+        return len(item)
+
+    def _segment_key(self, segment):
+        return f"{self.SEGMENT_PREFIX}/{segment}"
+
+    def _load(self):
+        """Refresh the in-memory mirror from store"""
+        meta, index = self._store.get_with_index(self.META_KEY)
+        if not isinstance(meta, dict):
+            meta = self._new_meta()
+        meta.setdefault("first", 0)
+        self._meta = meta
+        self._meta_index = index
+        self._segments = {}
+        if "tail_bytes" not in meta:
+            meta["tail_bytes"] = sum(self._size_of(entry)
+                                     for entry in self._get_segment(meta["tail"]))
+
+    def _get_segment(self, segment):
+        if segment not in self._segments:
+            messages = self._store.get(self._segment_key(segment))
+            self._segments[segment] = list(messages) if isinstance(messages, list) else []
+        return self._segments[segment]
 
     @property
     def current_size(self):
-        return store.get("SSPL_MEMORY_USAGE")
-
-    @current_size.setter
-    def current_size(self, size):
-        store.put(size, "SSPL_MEMORY_USAGE")
+        return self._meta["size"]
 
     @property
     def head(self):
-        return store.get("SSPL_MESSAGE_HEAD_INDEX")
-
-    @head.setter
-    def head(self, index):
-        store.put(index, "SSPL_MESSAGE_HEAD_INDEX")
+        return self._meta["head"]
 
     @property
     def tail(self):
-        return store.get("SSPL_MESSAGE_TAIL_INDEX")
+        return self._meta["tail"]
 
-    @tail.setter
-    def tail(self, index):
-        store.put(index, "SSPL_MESSAGE_TAIL_INDEX")
+    def __len__(self):
+        return self._meta["count"]
 
     def is_empty(self):
-        if self.tail == self.head:
-            self.head = 0
-            self.tail = 0
-            self.current_size = 0
-            return True
-        else:
-            return False
+        return self._meta["count"] == 0
 
     def is_full(self, size_of_item):
         return (self.current_size + size_of_item) >= self._max_size
 
-    def _create_space(self, size_of_item, reclaimed_space=0):
-        if (self.current_size - reclaimed_space + size_of_item) >= self._max_size:
-            reclaimed_space += sys.getsizeof(self.get())
-            self._create_space(size_of_item, reclaimed_space)
-        else:
-            return
+    def _commit(self, meta, segments):
+        """Write meta along with changed segments (None means delete) and
+        return True once the meta check-and-set went through. Readers only
+        follow the meta key, so new segments may be written ahead of it and
+        dropped segments removed after it."""
+        writes = []
+        deletes = []
+        for segment, messages in segments.items():
+            key = self._segment_key(segment)
+            if messages is None:
+                deletes.append(("delete", key, None, 0))
+            else:
+                writes.append(("set", key, pickle.dumps(messages), 0))
+
+        operations = writes + deletes
+        while len(operations) >= self.MAX_TXN_OPS:
+            if not writes:
+                break
+            chunk = writes[:self.MAX_TXN_OPS]
+            writes = writes[self.MAX_TXN_OPS:]
+            if self._store.txn(chunk) is None:
+                return False
+            operations = writes + deletes
+
+        deferred = operations[self.MAX_TXN_OPS - 1:]
+        operations = operations[:self.MAX_TXN_OPS - 1]
+        operations.append(("cas", self.META_KEY, pickle.dumps(meta), self._meta_index))
+        results = self._store.txn(operations)
+        if results is None:
+            return False
+        while deferred:
+            self._store.txn(deferred[:self.MAX_TXN_OPS])
+            deferred = deferred[self.MAX_TXN_OPS:]
+
+        self._meta = meta
+        self._meta_index = results[-1].get("ModifyIndex", 0) if isinstance(results[-1], dict) else 0
+        for segment, messages in segments.items():
+            if messages is None:
+                self._segments.pop(segment, None)
+            else:
+                self._segments[segment] = messages
+        # Only head and tail segments are worth keeping around
+        for segment in list(self._segments):
+            if segment not in (meta["head"], meta["tail"]):
+                del self._segments[segment]
+        return True
+
+    def _apply(self, mutation, *args):
+        """Run mutation(meta, segments, *args) against a copy of the mirror
+        and commit it, reloading and retrying if another writer got there
+        first."""
+        with self._lock:
+            for _ in range(self.MAX_CAS_RETRY):
+                meta = dict(self._meta)
+                segments = {}
+                result = mutation(meta, segments, *args)
+                if not segments and meta == self._meta:
+                    return result
+                if self._commit(meta, segments):
+                    return result
+                logger.warn("StoreQueue, check-and-set on queue meta failed, reloading")
+                self._load()
+            logger.error("StoreQueue, giving up updating persistent queue after "
+                         f"{self.MAX_CAS_RETRY} attempts")
+        return None
+
+    def _working_segment(self, segments, segment):
+        """Copy-on-write access to a segment inside a mutation"""
+        if segment not in segments or segments[segment] is None:
+            segments[segment] = list(self._get_segment(segment))
+        return segments[segment]
+
+    def _pop(self, meta, segments, max_items):
+        """Remove up to max_items oldest entries, returns them"""
+        items = []
+        while meta["count"] > 0 and len(items) < max_items:
+            head = meta["head"]
+            messages = segments.get(head)
+            if messages is None:
+                messages = self._get_segment(head)
+            available = messages[meta["offset"]:meta["offset"] + max_items - len(items)]
+            items.extend(available)
+            meta["offset"] += len(available)
+            meta["count"] -= len(available)
+            meta["size"] -= sum(self._size_of(entry) for entry in available)
+            meta["first"] += len(available)
+
+            if meta["offset"] < len(messages):
+                break
+            segments[head] = None
+            meta["offset"] = 0
+            if head == meta["tail"]:
+                if meta["count"] != 0:
+                    logger.warn(f"StoreQueue, meta count {meta['count']} out of sync with segments, resetting")
+                    meta["count"] = 0
+                # Indices only move forward so a stale cached segment can
+                # never be mistaken for the new tail
+                meta["tail"] = head + 1
+                meta["tail_bytes"] = 0
+            meta["head"] = head + 1
+        if meta["count"] == 0:
+            meta["size"] = 0
+        return items
+
+    def _push(self, meta, segments, entries):
+        for entry in entries:
+            size_of_item = self._size_of(entry)
+            if (meta["size"] + size_of_item) >= self._max_size:
+                logger.debug("StoreQueue, put, consul memory usage exceded limit, \
+                    removing old message")
+                while meta["count"] > 0 and (meta["size"] + size_of_item) >= self._max_size:
+                    self._pop(meta, segments, 1)
+
+            tail = self._working_segment(segments, meta["tail"])
+            if tail and (len(tail) >= self._segment_size or
+                         meta["tail_bytes"] + size_of_item > self.MAX_SEGMENT_BYTES):
+                meta["tail"] += 1
+                meta["tail_bytes"] = 0
+                segments[meta["tail"]] = tail = []
+            tail.append(entry)
+            meta["tail_bytes"] += size_of_item
+            meta["count"] += 1
+            meta["size"] += size_of_item
+        return len(entries)
+
+    def _peek(self, meta, segments, max_items):
+        items = []
+        segment = meta["head"]
+        offset = meta["offset"]
+        while len(items) < min(max_items, meta["count"]) and segment <= meta["tail"]:
+            messages = self._get_segment(segment)
+            items.extend(messages[offset:offset + max_items - len(items)])
+            segment += 1
+            offset = 0
+        return items
 
     def get(self):
+        items = self.get_batch(1)
+        if items:
+            return items[0]
+
+    def get_batch(self, max_items):
+        """Remove and return up to max_items messages in one update"""
         if self.is_empty():
-            return
-        item = store.get(f"SSPL_UNSENT_MESSAGES/{self.head}")
-        store.delete(f"SSPL_UNSENT_MESSAGES/{self.head}")
-        self.head += 1
-        self.current_size -= sys.getsizeof(item)
-        return item
-
-    def put(self, item):
-        size_of_item = sys.getsizeof(item)
-        if self.is_full(size_of_item):
-            logger.debug("StoreQueue, put, consul memory usage exceded limit, \
-                removing old message")
-            self._create_space(size_of_item)
-        store.put(item, f"SSPL_UNSENT_MESSAGES/{self.tail}", pickled=False)
-        self.tail += 1
-        self.current_size += size_of_item
+            return []
+        return [entry[0] for entry in self._apply(self._pop, max_items) or []]
+
+    def peek_batch(self, max_items):
+        """Return (sequence number of the first entry, [(message, timestamp)])
+        for up to max_items oldest messages without removing them. Pass the
+        sequence number plus the entries handled to discard() once done."""
+        with self._lock:
+            return self._meta["first"], self._peek(dict(self._meta), {}, max_items)
+
+    def _discard(self, meta, segments, sequence):
+        return len(self._pop(meta, segments, sequence - meta["first"]))
+
+    def discard(self, sequence):
+        """Remove every message older than sequence. Messages already
+        dropped meanwhile, e.g. to make space, are not counted twice."""
+        if sequence <= self._meta["first"]:
+            return 0
+        return self._apply(self._discard, sequence) or 0
+
+    def put(self, item, timestamp=None):
+        self.put_batch([item], [timestamp])
         logger.debug("StoreQueue, put, current memory usage %s" % self.current_size)
 
+    def put_batch(self, items, timestamps=None):
+        """Append messages, persisting them together with the meta update"""
+        if not items:
+            return
+        if timestamps is None:
+            timestamps = [None] * len(items)
+        entries = [(item, timestamp) for item, timestamp in zip(items, timestamps)]
+        if self._apply(self._push, entries) is None:
+            logger.error(f"StoreQueue, put, failed to persist {len(items)} message(s)")
+
+    def _migrate_legacy_messages(self):
+        """Move messages left behind by the one-message-per-key layout"""
+        head = self._store.get(self.LEGACY_HEAD_KEY)
+        tail = self._store.get(self.LEGACY_TAIL_KEY)
+        if head is None or tail is None:
+            return
+        head, tail = int(head), int(tail)
+        if tail > head:
+            logger.info(f"StoreQueue, migrating {tail - head} accumulated message(s)")
+        messages = []
+        for index in range(head, tail):
+            key = f"{self.LEGACY_MSG_PREFIX}/{index}"
+            message = self._store.get(key)
+            if message is not None:
+                messages.append(message)
+            if len(messages) >= self._segment_size:
+                self.put_batch(messages)
+                messages = []
+            self._store.delete(key)
+        self.put_batch(messages)
+        for key in (self.LEGACY_HEAD_KEY, self.LEGACY_TAIL_KEY, self.LEGACY_MEMORY_KEY):
+            self._store.delete(key)
+
 store_queue = StoreQueue()
@@ -0,0 +1,169 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Runs systemd unit jobs and waits for them to finish
+
+                     SystemdJobs starts, stops or restarts a unit through the
+                     systemd Manager and waits for the JobRemoved signal of
+                     the job it queued, up to a deadline. Signals arrive on a
+                     GDBus connection of its own, dispatched by a thread with
+                     its own GLib main context, so they do not depend on the
+                     dbus-python main loop iterated by SystemdWatchdog. Any
+                     number of threads can wait for their jobs at once, and
+                     a single instance is shared by the whole process.
+ ****************************************************************************
+"""
+
+import threading
+from collections import OrderedDict
+
+from gi.repository import Gio, GLib
+
+from framework.utils.service_logging import logger
+
+
+class SystemdJobs(object):
+    """Unit jobs of systemd and their results"""
+
+    SYSTEMD_BUS_NAME = "org.freedesktop.systemd1"
+    SYSTEMD_PATH = "/org/freedesktop/systemd1"
+    MANAGER_IFACE = "org.freedesktop.systemd1.Manager"
+
+    # Manager method queuing the job of each request
+    METHODS = {"start": "StartUnit",
+               "stop": "StopUnit",
+               "restart": "RestartUnit"}
+
+    # Longest wait for a job to finish, in seconds
+    JOB_TIMEOUT = 30
+
+    # Longest wait for the reply to a method call, in seconds
+    CALL_TIMEOUT = 25
+
+    # Results kept of jobs nobody waits for yet, the jobs of other clients
+    #  of systemd included
+    MAX_RESULTS = 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self._waiters = {}
+        self._connection = None
+        self._context = GLib.MainContext()
+        self._loop = GLib.MainLoop(self._context)
+        self._thread = None
+
+    def start(self):
+        """Connect to the system bus and subscribe to the signals of systemd"""
+        address = Gio.dbus_address_get_for_bus_sync(Gio.BusType.SYSTEM, None)
+        self._connection = Gio.DBusConnection.new_for_address_sync(
+                                address,
+                                Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT |
+                                Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+                                None, None)
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,),
+                                        name="SystemdJobs", daemon=True)
+        self._thread.start()
+        ready.wait()
+        self._call("Subscribe", None)
+
+    def run_job(self, request, unit, timeout=JOB_TIMEOUT, mode="replace"):
+        """Queue the job of request, 'start', 'stop' or 'restart', on unit
+        and wait at most timeout seconds for it to finish. Returns the
+        result of the job, e.g. 'done' or 'failed', or None if it did not
+        finish in time. Raises GLib.Error if systemd refused the job."""
+        job = self._call(self.METHODS[request], GLib.Variant("(ss)", (unit, mode)))[0]
+        with self._lock:
+            # The job may be over before its path is known here
+            if job in self._results:
+                return self._results.pop(job)
+            event = self._waiters[job] = threading.Event()
+
+        if not event.wait(timeout):
+            logger.warn(f"SystemdJobs, {request} of {unit} not finished after {timeout} secs")
+
+        with self._lock:
+            del self._waiters[job]
+            return self._results.pop(job, None)
+
+    def stop(self):
+        if self._connection is None:
+            return
+        try:
+            self._call("Unsubscribe", None)
+        except GLib.Error:
+            pass
+        self._loop.quit()
+        self._thread.join()
+        self._connection.close_sync(None)
+        self._connection = None
+
+    def _run(self, ready):
+        """Dispatch the signals on this thread until stopped"""
+        self._context.push_thread_default()
+        subscription = self._connection.signal_subscribe(
+                            self.SYSTEMD_BUS_NAME, self.MANAGER_IFACE, "JobRemoved",
+                            self.SYSTEMD_PATH, None, Gio.DBusSignalFlags.NONE,
+                            self._on_job_removed)
+        ready.set()
+        try:
+            self._loop.run()
+        finally:
+            self._connection.signal_unsubscribe(subscription)
+            self._context.pop_thread_default()
+
+    def _on_job_removed(self, connection, sender, path, interface, signal, parameters):
+        _, job, _, result = parameters.unpack()
+        with self._lock:
+            self._results[job] = result
+            while len(self._results) > self.MAX_RESULTS:
+                self._results.popitem(last=False)
+            event = self._waiters.get(job)
+        if event is not None:
+            event.set()
+
+    def _call(self, method, parameters):
+        reply = self._connection.call_sync(self.SYSTEMD_BUS_NAME, self.SYSTEMD_PATH,
+                                           self.MANAGER_IFACE, method, parameters,
+                                           None, Gio.DBusCallFlags.NONE,
+                                           self.CALL_TIMEOUT * 1000, None)
+        return reply.unpack()
+
+
+_shared_jobs = None
+_shared_jobs_lock = threading.Lock()
+
+
+def shared_jobs():
+    """Started SystemdJobs shared by the whole process"""
+    global _shared_jobs
+    with _shared_jobs_lock:
+        if _shared_jobs is None:
+            jobs = SystemdJobs()
+            jobs.start()
+            _shared_jobs = jobs
+        return _shared_jobs
+
+
+def stop_shared_jobs():
+    """Stop the shared SystemdJobs if it was started"""
+    global _shared_jobs
+    with _shared_jobs_lock:
+        jobs, _shared_jobs = _shared_jobs, None
+    if jobs is not None:
+        jobs.stop()
@@ -0,0 +1,286 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Tracks the state of systemd service units over D-Bus
+
+                     SystemdUnitTracker subscribes to the systemd Manager and
+                     follows the monitored units with its UnitNew, UnitRemoved
+                     and JobRemoved signals and a single PropertiesChanged
+                     match for all of systemd, filtered by object path. The
+                     properties of new units are read with GetAll calls all
+                     sent at once, and every reconcile_interval one ListUnits
+                     sweep catches changes whose signals were missed.
+ ****************************************************************************
+"""
+
+import time
+from collections import namedtuple
+
+import dbus
+
+from framework.utils.service_logging import logger
+
+
+# Last known state of a unit. path is None while the unit is not loaded,
+# pid the ExecMainPID of the service as a string.
+UnitState = namedtuple("UnitState", "name path state substate pid")
+
+
+class SystemdUnitTracker(object):
+    """State of the monitored systemd services, updated from signals"""
+
+    SYSTEMD_BUS_NAME = "org.freedesktop.systemd1"
+    SYSTEMD_PATH = "/org/freedesktop/systemd1"
+    MANAGER_IFACE = "org.freedesktop.systemd1.Manager"
+    UNIT_IFACE = "org.freedesktop.systemd1.Unit"
+    SERVICE_IFACE = "org.freedesktop.systemd1.Service"
+
+    # State of a unit systemd has not loaded
+    NOT_LOADED = ("inactive", "dead", "0")
+
+    # Seconds between two ListUnits sweeps
+    RECONCILE_INTERVAL = 300
+
+    # Seconds to wait for the replies of the GetAll calls
+    CALL_TIMEOUT = 25
+
+    def __init__(self, bus, context, services, on_change,
+                 reconcile_interval=RECONCILE_INTERVAL, call_timeout=CALL_TIMEOUT):
+        """Track the service units named in services, which may end with a
+        '*' wildcard, or all services if it is empty. on_change(unit,
+        previous) is called with the UnitState of a unit whose state or
+        substate changed and its previous UnitState. bus must be attached
+        to the GLib main context, which the caller iterates to dispatch
+        the signals and must not be dispatching when process() is called."""
+        self._bus = bus
+        self._context = context
+        self._on_change = on_change
+        self._reconcile_interval = reconcile_interval
+        self._call_timeout = call_timeout
+
+        self._names = set()
+        self._prefixes = []
+        for service in services:
+            if "*" in service:
+                self._prefixes.append(service.split("*")[0])
+            else:
+                self._names.add(service)
+
+        self._manager = None
+        self._receivers = []
+        self._units = {}
+        self._paths = {}
+        self._dirty = set()
+        self._next_reconcile = 0
+        # Units whose state a signal changed while their properties were read
+        self._changed_while_reading = None
+
+    @property
+    def units(self):
+        """{name: UnitState} of the monitored units"""
+        return dict(self._units)
+
+    def is_monitored(self, name):
+        if not name.endswith(".service"):
+            return False
+        if not self._names and not self._prefixes:
+            return True
+        return name in self._names or \
+               any(name.startswith(prefix) for prefix in self._prefixes)
+
+    def start(self):
+        """Subscribe to systemd and read the state of the monitored units,
+        returns their UnitStates, the ones of loaded units first"""
+        systemd = self._bus.get_object(self.SYSTEMD_BUS_NAME, self.SYSTEMD_PATH)
+        self._manager = dbus.Interface(systemd, dbus_interface=self.MANAGER_IFACE)
+
+        # Receivers are in place before the subscription so no signal is lost
+        self._receivers = [
+            self._manager.connect_to_signal("UnitNew", self._on_unit_new),
+            self._manager.connect_to_signal("UnitRemoved", self._on_unit_removed),
+            self._manager.connect_to_signal("JobRemoved", self._on_job_removed),
+            self._bus.add_signal_receiver(self._on_properties_changed,
+                                          signal_name="PropertiesChanged",
+                                          dbus_interface=dbus.PROPERTIES_IFACE,
+                                          bus_name=self.SYSTEMD_BUS_NAME,
+                                          path_keyword="path")
+        ]
+        self._manager.Subscribe()
+
+        paths = {}
+        for unit in self._manager.ListUnits():
+            name, path = str(unit[0]), str(unit[6])
+            if self.is_monitored(name):
+                paths[name] = path
+        loaded = self._read_units(paths)
+        self._units.update(loaded)
+        for unit in loaded.values():
+            self._paths[unit.path] = unit.name
+
+        # Named services systemd has not loaded are inactive until a UnitNew
+        for name in self._names - set(loaded):
+            self._units[name] = UnitState(name, None, *self.NOT_LOADED)
+
+        self._next_reconcile = time.time() + self._reconcile_interval
+        return list(loaded.values()) + \
+               [self._units[name] for name in sorted(self._names - set(loaded))]
+
+    def process(self):
+        """Read the units the signals dispatched since the last call left
+        unsure of, and sweep all units when the reconcile interval is up"""
+        if time.time() >= self._next_reconcile:
+            self.reconcile()
+        if not self._dirty:
+            return
+        names, self._dirty = self._dirty, set()
+        paths = {name: self._units[name].path for name in names
+                 if name in self._units and self._units[name].path}
+        for name, unit in self._read_units(paths).items():
+            self._update(unit)
+
+    def reconcile(self):
+        """Compare the state of every loaded unit to the one tracked, with
+        a single ListUnits call"""
+        self._next_reconcile = time.time() + self._reconcile_interval
+        try:
+            units = self._manager.ListUnits()
+        except dbus.DBusException as err:
+            logger.warn(f"SystemdUnitTracker, unable to list units: {err}")
+            return
+        for unit in units:
+            name, state, substate, path = str(unit[0]), str(unit[3]), str(unit[4]), str(unit[6])
+            if not self.is_monitored(name):
+                continue
+            tracked = self._units.get(name)
+            if tracked is None or tracked.path != path:
+                logger.info(f"SystemdUnitTracker, tracking missed unit: {name}")
+                self._track(name, path)
+            elif (tracked.state, tracked.substate) != (state, substate):
+                logger.info(f"SystemdUnitTracker, missed a state change of {name}")
+                self._dirty.add(name)
+
+    def stop(self):
+        for receiver in self._receivers:
+            receiver.remove()
+        self._receivers = []
+        if self._manager is not None:
+            try:
+                self._manager.Unsubscribe()
+            except dbus.DBusException:
+                pass
+            self._manager = None
+
+    def _track(self, name, path):
+        tracked = self._units.get(name)
+        if tracked is not None and tracked.path in self._paths:
+            del self._paths[tracked.path]
+        if tracked is None:
+            tracked = UnitState(name, path, *self.NOT_LOADED)
+        self._units[name] = tracked._replace(path=path)
+        self._paths[path] = name
+        self._dirty.add(name)
+
+    def _update(self, unit):
+        previous = self._units.get(unit.name)
+        self._units[unit.name] = unit
+        if previous is None or (previous.state, previous.substate) != (unit.state, unit.substate):
+            self._on_change(unit, previous)
+
+    def _on_unit_new(self, name, path):
+        name = str(name)
+        if self.is_monitored(name) and \
+           (name not in self._units or self._units[name].path != str(path)):
+            self._track(name, str(path))
+
+    def _on_unit_removed(self, name, path):
+        # Unloaded, its object path may come back for another unit
+        name = self._paths.pop(str(path), None)
+        if name is not None:
+            self._units[name] = self._units[name]._replace(path=None)
+            self._dirty.discard(name)
+
+    def _on_job_removed(self, job_id, job, name, result):
+        # A job that left the unit as it was sends no PropertiesChanged
+        name = str(name)
+        if name in self._units and self._units[name].path:
+            self._dirty.add(name)
+
+    def _on_properties_changed(self, interface, changed, invalidated, path=None):
+        name = self._paths.get(str(path))
+        if name is None:
+            return
+        unit = self._units[name]
+        if self._changed_while_reading is not None:
+            self._changed_while_reading.add(name)
+        if invalidated:
+            self._dirty.add(name)
+        if interface == self.SERVICE_IFACE:
+            if "ExecMainPID" in changed:
+                self._units[name] = unit._replace(pid=str(changed["ExecMainPID"]))
+        elif interface == self.UNIT_IFACE:
+            if "ActiveState" in changed or "SubState" in changed:
+                self._update(unit._replace(state=str(changed.get("ActiveState", unit.state)),
+                                           substate=str(changed.get("SubState", unit.substate))))
+
+    def _read_units(self, paths):
+        """{name: UnitState} of the units at paths, {name: path}, read with
+        all the GetAll calls in flight at once"""
+        replies = {}
+        pending = set()
+        self._changed_while_reading = set()
+
+        def on_reply(key, properties):
+            replies[key] = properties
+            pending.discard(key)
+
+        def on_error(key, err):
+            # Units not found or not services have no Service properties
+            if key[1] == self.UNIT_IFACE:
+                logger.warn(f"SystemdUnitTracker, unable to read {key[0]}: {err}")
+            pending.discard(key)
+
+        for name, path in paths.items():
+            unit = self._bus.get_object(self.SYSTEMD_BUS_NAME, path, introspect=False)
+            for interface in (self.UNIT_IFACE, self.SERVICE_IFACE):
+                key = (name, interface)
+                pending.add(key)
+                unit.GetAll(interface, dbus_interface=dbus.PROPERTIES_IFACE,
+                            timeout=self._call_timeout,
+                            reply_handler=lambda properties, key=key: on_reply(key, properties),
+                            error_handler=lambda err, key=key: on_error(key, err))
+
+        # Every call gets its reply or error within the timeout
+        while pending:
+            self._context.iteration(True)
+
+        # The signals dispatched meanwhile are newer than the replies
+        changed, self._changed_while_reading = self._changed_while_reading, None
+        units = {}
+        for name, path in paths.items():
+            if name in changed:
+                # Read again by the next process()
+                self._dirty.add(name)
+                continue
+            unit_properties = replies.get((name, self.UNIT_IFACE))
+            if unit_properties is None:
+                continue
+            service_properties = replies.get((name, self.SERVICE_IFACE), {})
+            units[name] = UnitState(name, path,
+                                    str(unit_properties.get("ActiveState", "inactive")),
+                                    str(unit_properties.get("SubState", "dead")),
+                                    str(service_properties.get("ExecMainPID", 0)))
+        return units
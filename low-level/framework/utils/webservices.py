@@ -17,11 +17,19 @@
  ****************************************************************************
   Description:       Webservice Class to abstract over actual python lib or web
                     framework used to handle generic web services
+
+                    Requests go through one keep-alive session per host, with
+                    a bounded connection pool, default headers and latency
+                    and connection reuse counters kept per endpoint.
  ****************************************************************************
 """
 
+import threading
+import time
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import Timeout, ConnectionError, HTTPError
 from framework.utils.service_logging import logger
 
@@ -44,23 +52,119 @@ class WebServices(object):
 
     LOOPBACK = "127.0.0.1"
 
-    def __init__(self):
+    # Connections kept open per host, further concurrent requests wait
+    MAX_CONNECTIONS = 4
+
+    def __init__(self, max_connections=MAX_CONNECTIONS):
         super(WebServices, self).__init__()
 
         self.http_methods = [self.HTTP_GET, self.HTTP_POST]
 
-    def ws_request(self, method, url, hdrs, postdata, tout):
-        """Make webservice request"""
+        self._max_connections = max(1, int(max_connections))
+        self._sessions = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url):
+        return urlsplit(url).netloc
+
+    @staticmethod
+    def endpoint(url):
+        """Name counters of url are kept under, host and path"""
+        parts = urlsplit(url)
+        return parts.netloc + parts.path
+
+    def session(self, url):
+        """Keep-alive session of the host serving url"""
+        host = self._host(url)
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=self._max_connections,
+                                      pool_block=True)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+        return session
+
+    def set_default_headers(self, url, headers):
+        """Headers sent with every request to the host serving url"""
+        self.session(url).headers.update(headers)
+
+    def get_default_header(self, url, name):
+        return self.session(url).headers.get(name)
+
+    def close(self, url=None):
+        """Close the connections to the host serving url, or to all hosts"""
+        with self._lock:
+            if url is None:
+                sessions, self._sessions = list(self._sessions.values()), {}
+            else:
+                session = self._sessions.pop(self._host(url), None)
+                sessions = [session] if session is not None else []
+        for session in sessions:
+            session.close()
+
+    def _connections_opened(self, session, url):
+        """Connections opened so far by session, which serves a single host"""
+        try:
+            pools = session.get_adapter(url).poolmanager.pools
+            return sum(pools[key].num_connections for key in pools.keys())
+        except Exception:
+            return 0
+
+    def _update_stats(self, endpoint, latency, new_connection, failed):
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = {"requests": 0, "failures": 0,
+                    "new_connections": 0, "reused_connections": 0,
+                    "total_latency": 0.0, "max_latency": 0.0}
+            stats["requests"] += 1
+            if failed:
+                stats["failures"] += 1
+            if new_connection:
+                stats["new_connections"] += 1
+            else:
+                stats["reused_connections"] += 1
+            stats["total_latency"] += latency
+            stats["max_latency"] = max(stats["max_latency"], latency)
+
+    def get_metrics(self):
+        """Request, failure, connection reuse and latency (seconds) counters
+        by endpoint. Reuse is approximate while requests to the same host
+        overlap."""
+        metrics = {}
+        with self._lock:
+            for endpoint, stats in self._stats.items():
+                metrics[endpoint] = dict(stats)
+                metrics[endpoint]["avg_latency"] = stats["total_latency"] / stats["requests"]
+        return metrics
+
+    def ws_request(self, method, url, hdrs, postdata, tout, endpoint=None):
+        """Make webservice request. Counters are kept under endpoint, which
+        defaults to the host and path of url."""
         wsresponse = None
+        failed = True
+
+        if endpoint is None:
+            endpoint = self.endpoint(url)
+        session = self.session(url)
+        opened = self._connections_opened(session, url)
+        start = time.time()
 
         try:
             if method == self.HTTP_GET:
-                wsresponse = requests.get(url, headers=hdrs, timeout=tout)
+                wsresponse = session.get(url, headers=hdrs, timeout=tout)
             elif method == self.HTTP_POST:
-                wsresponse = requests.post(url, headers=hdrs, data=postdata,
+                wsresponse = session.post(url, headers=hdrs, data=postdata,
                                timeout=tout)
 
             wsresponse.raise_for_status()
+            failed = False
 
         except (ConnectionError, HTTPError, Timeout, Exception) as err:
 
@@ -106,12 +210,14 @@ class WebServices(object):
                         ", defaulting to err {2}"\
                         .format(url,err,wsresponse.status_code))
 
+        self._update_stats(endpoint, time.time() - start,
+                           self._connections_opened(session, url) > opened, failed)
         return wsresponse
 
-    def ws_get(self, url, headers, timeout):
+    def ws_get(self, url, headers, timeout, endpoint=None):
         """Webservice GET request"""
-        return  self.ws_request(self.HTTP_GET, url, headers, None, timeout)
+        return  self.ws_request(self.HTTP_GET, url, headers, None, timeout, endpoint)
 
-    def ws_post(self, url, headers, postdata, timeout):
+    def ws_post(self, url, headers, postdata, timeout, endpoint=None):
         """Webservice POST request"""
-        return self.ws_request(self.HTTP_POST, url, headers, postdata, timeout)
+        return self.ws_request(self.HTTP_POST, url, headers, postdata, timeout, endpoint)
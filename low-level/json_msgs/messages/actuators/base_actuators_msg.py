@@ -21,11 +21,9 @@
 """
 
 import os
-import json
-from jsonschema import Draft3Validator
-from jsonschema import validate
 
 from json_msgs.messages.base_msg import BaseMsg
+from json_msgs.schema_registry import registry
 from json_msgs.schemas import actuators
 from framework.base.sspl_constants import RESOURCE_PATH
 
@@ -40,20 +38,15 @@ class BaseActuatorMsg(BaseMsg):
 
 
     def __init__(self):
-        """Reads in the json schema for all actuator response messages"""
+        """Actuator response messages share the compiled schema of the registry"""
         super(BaseActuatorMsg, self).__init__()
 
-        # Read in the schema for validating messages
-        fileName = os.path.join(RESOURCE_PATH + '/actuators',
-                                self.JSON_ACTUATOR_SCHEMA)
-        with open(fileName, 'r') as f:
-            self._schema = json.load(f)
-
-        # Validate the schema
-        Draft3Validator.check_schema(self._schema)
+        # Actuator schema for validating messages, read and checked once per process
+        self._schema_file = os.path.join(RESOURCE_PATH + '/actuators',
+                                         self.JSON_ACTUATOR_SCHEMA)
 
     def validateMsg(self, _jsonMsg):
         """Validate the json message against the schema"""
         _jsonMsg = self.normalize_kv(_jsonMsg)
-        validate(_jsonMsg, self._schema)
+        registry.validate(_jsonMsg, self._schema_file)
         return _jsonMsg
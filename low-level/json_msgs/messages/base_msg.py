@@ -22,6 +22,8 @@
 
 import abc
 
+from framework.base.msg_envelope import MsgEnvelope
+
 class BaseMsg(metaclass=abc.ABCMeta):
     '''
     The base class for all JSON messages transmitted by SSPL-LL
@@ -39,6 +41,11 @@ class BaseMsg(metaclass=abc.ABCMeta):
     def getJson(self):
         raise NotImplementedError("Subclasses should implement this!")
 
+    def getEnvelope(self):
+        """Return the validated message in a MsgEnvelope, serialized
+        only when it leaves SSPL-LL"""
+        return MsgEnvelope(self.validateMsg(self._json))
+
     def normalize_kv(self, item):
         """Normalize all keys coming from firmware from - to _"""
         if isinstance(item, dict):
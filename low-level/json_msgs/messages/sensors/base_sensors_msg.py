@@ -21,11 +21,9 @@
 """
 
 import os
-import json
-from jsonschema import Draft3Validator
-from jsonschema import validate
 
 from json_msgs.messages.base_msg import BaseMsg
+from json_msgs.schema_registry import registry
 from json_msgs.schemas import sensors
 from framework.base.sspl_constants import RESOURCE_PATH
 
@@ -40,23 +38,15 @@ class BaseSensorMsg(BaseMsg):
 
 
     def __init__(self):
-        """Reads in the json schema for all sensor response messages"""
+        """Sensor response messages share the compiled schema of the registry"""
         super(BaseSensorMsg, self).__init__()
 
-        # Read in the sensor schema for validating messages
-        fileName = os.path.join(RESOURCE_PATH + '/sensors',
-                                self.JSON_SENSOR_SCHEMA)
-        with open(fileName, 'r') as f:
-            _schema = f.read()
-
-        # Remove tabs and newlines
-        self._schema = json.loads(' '.join(_schema.split()))
-
-        # Validate the schema
-        Draft3Validator.check_schema(self._schema)
+        # Sensor schema for validating messages, read and checked once per process
+        self._schema_file = os.path.join(RESOURCE_PATH + '/sensors',
+                                         self.JSON_SENSOR_SCHEMA)
 
     def validateMsg(self, _jsonMsg):
         """Validate the json message against the schema"""
         _jsonMsg = self.normalize_kv(_jsonMsg)
-        validate(_jsonMsg, self._schema)
+        registry.validate(_jsonMsg, self._schema_file)
         return _jsonMsg
@@ -0,0 +1,93 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Process wide registry of compiled JSON schema validators
+
+                     Every schema file is read and checked once, compiled
+                     into a validator and shared by all message classes and
+                     processors using it. Validation can be done for every
+                     message, for one in every sample_rate messages or not
+                     at all.
+ ****************************************************************************
+"""
+
+import itertools
+import json
+import threading
+
+from jsonschema import Draft3Validator
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+
+# Validation modes
+FULL    = "full"
+SAMPLED = "sampled"
+OFF     = "off"
+MODES   = (FULL, SAMPLED, OFF)
+
+
+class SchemaRegistry(object):
+    """Compiled validators by schema file"""
+
+    def __init__(self, mode=FULL, sample_rate=100):
+        self._lock = threading.Lock()
+        self._validators = {}
+        self._counter = itertools.count()
+        self.configure(mode, sample_rate)
+
+    def configure(self, mode=FULL, sample_rate=100):
+        """Set the validation mode, one of full, sampled or off. In sampled
+        mode one in every sample_rate messages is validated."""
+        mode = str(mode).lower()
+        if mode not in MODES:
+            raise ValueError(f"Invalid message validation mode: {mode}")
+        self.mode = mode
+        self.sample_rate = max(1, int(sample_rate))
+
+    def schema(self, schema_file):
+        """The loaded and checked schema in schema_file"""
+        return self.validator(schema_file).schema
+
+    def validator(self, schema_file):
+        """The compiled validator of the schema in schema_file"""
+        validator = self._validators.get(schema_file)
+        if validator is None:
+            with self._lock:
+                validator = self._validators.get(schema_file)
+                if validator is None:
+                    with open(schema_file, 'r') as f:
+                        schema = json.load(f)
+                    cls = validator_for(schema, default=Draft3Validator)
+                    # Validate the schema to conform to its draft specification
+                    cls.check_schema(schema)
+                    validator = cls(schema)
+                    self._validators[schema_file] = validator
+        return validator
+
+    def validate(self, message, schema_file):
+        """Validate message against the schema in schema_file, raises the
+        same ValidationError as jsonschema.validate()"""
+        if self.mode == OFF:
+            return
+        if self.mode == SAMPLED and next(self._counter) % self.sample_rate:
+            return
+        error = best_match(self.validator(schema_file).iter_errors(message))
+        if error is not None:
+            raise error
+
+
+registry = SchemaRegistry()
@@ -27,6 +27,7 @@ import subprocess
 
 from framework.base.module_thread import ScheduledModuleThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from framework.rabbitmq.rabbitmq_egress_processor import RabbitMQegressProcessor
 
@@ -47,6 +48,9 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
     MODULE_NAME = "DiskMsgHandler"
     PRIORITY    = 2
 
+    # Only runs when there are messages on its queue, see EventScheduler
+    QUEUE_DRIVEN = True
+
     # Section and keys in configuration file
     DISKMSGHANDLER    = MODULE_NAME.upper()
     DMREPORT_FILE     = 'dmreport_file'
@@ -155,7 +159,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
     def _process_msg(self, jsonMsg):
         """Parses the incoming message and hands off to the appropriate logger"""
-        self._log_debug(f"_process_msg, jsonMsg: {jsonMsg}")
+        self._log_debug("_process_msg, jsonMsg: %s", jsonMsg)
 
         if isinstance(jsonMsg, dict) is False:
             jsonMsg = json.loads(jsonMsg)
@@ -197,7 +201,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
             elif sensor_response_type == "node_disk":
                 node_disk_msg = NodeIPMIDataMsg(jsonMsg.get("response"))
-                self._write_internal_msgQ(RabbitMQegressProcessor.name(), node_disk_msg.getJson())
+                self._write_internal_msgQ(RabbitMQegressProcessor.name(), node_disk_msg.getEnvelope())
             # ... handle other disk sensor response types
             else:
                 logger.warn(f"DiskMsgHandler, received unknown sensor response msg: {jsonMsg}")
@@ -239,7 +243,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
                         request = f"SMART_TEST: {drive.getSerialNumber()}"
 
-                        json_msg = AckResponseMsg(request, response, uuid).getJson()
+                        json_msg = AckResponseMsg(request, response, uuid).getEnvelope()
                         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
                     return
@@ -255,7 +259,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     self._log_debug("_processMsg, disk smart test data not yet available")
                     response = "Error: SMART results not yet available for drive, please try again later."
 
-                json_msg = AckResponseMsg(node_request, response, uuid).getJson()
+                json_msg = AckResponseMsg(node_request, response, uuid).getEnvelope()
                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
             elif sensor_request_type == "drvmngr_status":
@@ -265,15 +269,15 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                         drive = self._drvmngr_drives[serial_number]
 
                         # Obtain json message containing all relevant data
-                        internal_json_msg = drive.toDriveMngrJsonMsg(uuid=uuid).getJson()
+                        internal_json_msg = drive.toDriveMngrJsonMsg(uuid=uuid).getEnvelope()
 
                         # Send the json message to the RabbitMQ processor to transmit out
-                        self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
+                        self._log_debug("_process_msg, internal_json_msg: %s", internal_json_msg)
                         self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
 
                     # Send over a msg on the ACK channel notifying success
                     response = "All Drive manager data sent successfully"
-                    json_msg = AckResponseMsg(node_request, response, uuid).getJson()
+                    json_msg = AckResponseMsg(node_request, response, uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
                 elif serial_number == "serialize":
@@ -283,21 +287,21 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 elif self._drvmngr_drives.get(serial_number) is not None:
                     drive = self._drvmngr_drives[serial_number]
                     # Obtain json message containing all relevant data
-                    internal_json_msg = drive.toDriveMngrJsonMsg(uuid=uuid).getJson()
+                    internal_json_msg = drive.toDriveMngrJsonMsg(uuid=uuid).getEnvelope()
 
                     # Send the json message to the RabbitMQ processor to transmit out
-                    self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
+                    self._log_debug("_process_msg, internal_json_msg: %s", internal_json_msg)
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
 
                     # Send over a msg on the ACK channel notifying success
                     response = "Drive manager data sent successfully"
-                    json_msg = AckResponseMsg(node_request, response, uuid).getJson()
+                    json_msg = AckResponseMsg(node_request, response, uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
                 else:
                     # Send over a msg on the ACK channel notifying failure
                     response = "Drive not found in drive manager data"
-                    json_msg = AckResponseMsg(node_request, response, uuid).getJson()
+                    json_msg = AckResponseMsg(node_request, response, uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
             elif sensor_request_type == "hpi_status":
@@ -307,15 +311,15 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                         drive = self._hpi_drives[serial_number]
 
                         # Obtain json message containing all relevant data
-                        internal_json_msg = drive.toHPIjsonMsg(uuid=uuid).getJson()
+                        internal_json_msg = drive.toHPIjsonMsg(uuid=uuid).getEnvelope()
 
                         # Send the json message to the RabbitMQ processor to transmit out
-                        self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
+                        self._log_debug("_process_msg, internal_json_msg: %s", internal_json_msg)
                         self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
 
                     # Send over a msg on the ACK channel notifying success
                     response = "All HPI data sent successfully"
-                    json_msg = AckResponseMsg(node_request, response, uuid).getJson()
+                    json_msg = AckResponseMsg(node_request, response, uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
                 elif serial_number == "serialize":
@@ -325,21 +329,21 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 elif self._hpi_drives.get(serial_number) is not None:
                     drive = self._hpi_drives[serial_number]
                     # Obtain json message containing all relevant data
-                    internal_json_msg = drive.toHPIjsonMsg(uuid=uuid).getJson()
+                    internal_json_msg = drive.toHPIjsonMsg(uuid=uuid).getEnvelope()
 
                     # Send the json message to the RabbitMQ processor to transmit out
-                    self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
+                    self._log_debug("_process_msg, internal_json_msg: %s", internal_json_msg)
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
 
                     # Send over a msg on the ACK channel notifying success
                     response = "HPI data sent successfully"
-                    json_msg = AckResponseMsg(node_request, response, uuid).getJson()
+                    json_msg = AckResponseMsg(node_request, response, uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
                 else:
                     # Send over a msg on the ACK channel notifying failure
                     response = "Drive not found in HPI data"
-                    json_msg = AckResponseMsg(node_request, response, uuid).getJson()
+                    json_msg = AckResponseMsg(node_request, response, uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
             elif sensor_request_type == "sim_event":
@@ -366,14 +370,14 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
             # Send over a msg on the ACK channel notifying failure
             response = f"DiskMsgHandler, received unknown msg: {jsonMsg}"
-            json_msg = AckResponseMsg(node_request, response, uuid).getJson()
+            json_msg = AckResponseMsg(node_request, response, uuid).getEnvelope()
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
     def _sim_exp_reset(self, serial_number):
         """Handle simulating an expander reset"""
         # Send the expander reset message
         expanderResetMsg = ExpanderResetMsg()
-        internal_json_msg = expanderResetMsg.getJson()
+        internal_json_msg = expanderResetMsg.getEnvelope()
 
         # Send the json message to the RabbitMQ processor to transmit out
         self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
@@ -385,7 +389,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Obtain json message containing all relevant data
             json_msg = drive.toDriveMngrJsonMsg()
             json_msg.setStatus("EMPTY_None")
-            internal_json_msg = json_msg.getJson()
+            internal_json_msg = json_msg.getEnvelope()
 
             # Send the json message to the RabbitMQ processor to transmit out
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
@@ -397,7 +401,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Obtain json message containing all relevant data
             json_msg = drive.toDriveMngrJsonMsg()
             json_msg.setStatus("OK_None")
-            internal_json_msg = json_msg.getJson()
+            internal_json_msg = json_msg.getEnvelope()
 
             # Send the json message to the RabbitMQ processor to transmit out
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
@@ -410,10 +414,10 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Obtain json message containing all relevant data
             json_msg = drive.toDriveMngrJsonMsg()
             json_msg.setStatus("EMPTY_None")
-            internal_json_msg = json_msg.getJson()
+            internal_json_msg = json_msg.getEnvelope()
 
             # Send the json message to the RabbitMQ processor to transmit out
-            self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
+            self._log_debug("_process_msg, internal_json_msg: %s", internal_json_msg)
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
 
         if self._hpi_drives.get(serial_number) is not None:
@@ -423,10 +427,10 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             json_msg = drive.toHPIjsonMsg()
             json_msg.setDiskPowered(False)
             json_msg.setDiskInstalled(False)
-            internal_json_msg = json_msg.getJson()
+            internal_json_msg = json_msg.getEnvelope()
 
             # Send the json message to the RabbitMQ processor to transmit out
-            self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
+            self._log_debug("_process_msg, internal_json_msg: %s", internal_json_msg)
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
 
     def _sim_drive_install(self, serial_number):
@@ -437,10 +441,10 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Obtain json message containing all relevant data
             json_msg = drive.toDriveMngrJsonMsg()
             json_msg.setStatus("OK_None")
-            internal_json_msg = json_msg.getJson()
+            internal_json_msg = json_msg.getEnvelope()
 
             # Send the json message to the RabbitMQ processor to transmit out
-            self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
+            self._log_debug("_process_msg, internal_json_msg: %s", internal_json_msg)
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
 
         if self._hpi_drives.get(serial_number) is not None:
@@ -450,10 +454,10 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             json_msg = drive.toHPIjsonMsg()
             json_msg.setDiskPowered(True)
             json_msg.setDiskInstalled(True)
-            internal_json_msg = json_msg.getJson()
+            internal_json_msg = json_msg.getEnvelope()
 
             # Send the json message to the RabbitMQ processor to transmit out
-            self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
+            self._log_debug("_process_msg, internal_json_msg: %s", internal_json_msg)
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
 
 
@@ -482,7 +486,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Transmit all drivemanager data for every drive"""
         for drive in self._drvmngr_drives:
             # Obtain json message containing all relevant data
-            internal_json_msg = drive.toDriveMngrJsonMsg().getJson()
+            internal_json_msg = drive.toDriveMngrJsonMsg().getEnvelope()
 
             # Send the json message to the RabbitMQ processor to transmit out
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
@@ -491,7 +495,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Transmit all HPI data for every drive"""
         for drive in self._hpi_drives:
             # Obtain json message containing all relevant data
-            internal_json_msg = drive.toHPIjsonMsg().getJson()
+            internal_json_msg = drive.toHPIjsonMsg().getEnvelope()
 
             # Send the json message to the RabbitMQ processor to transmit out
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
@@ -568,7 +572,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 self._log_IEM(drive)
 
         # Obtain json message containing all relevant data
-        internal_json_msg = drive.toDriveMngrJsonMsg().getJson()
+        internal_json_msg = drive.toDriveMngrJsonMsg().getEnvelope()
 
         # Send the json message to the RabbitMQ processor to transmit out
         self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
@@ -609,10 +613,10 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
         self._hpi_drives[serial_number] = drive
 
         # Obtain json message containing all relevant data
-        internal_json_msg = drive.toHPIjsonMsg().getJson()
+        internal_json_msg = drive.toHPIjsonMsg().getEnvelope()
 
         # Send the json message to the RabbitMQ processor to transmit out
-        self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
+        self._log_debug("_process_msg, internal_json_msg: %s", internal_json_msg)
         self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
 
         # See if there is a drivemanager drive available and update its HPI data if changed
@@ -626,7 +630,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 drivemngr_drive.set_drive_num(drive.get_drive_num())
 
                 # Obtain json message containing all relevant data
-                internal_json_msg = drivemngr_drive.toDriveMngrJsonMsg().getJson()
+                internal_json_msg = drivemngr_drive.toDriveMngrJsonMsg().getEnvelope()
 
                 # Send the json message to the RabbitMQ processor to transmit out
                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
@@ -639,7 +643,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
         # Have the drivemanager resend the drive's state in the OS
         if self._drvmngr_drives:
-            internal_json_msg = json.dumps(
+            internal_json_msg = MsgEnvelope(
                 {"sensor_request_type" : "resend_drive_status",
                     "serial_number" : serial_number
                 })
@@ -745,10 +749,10 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 self._hpi_drives[serial_number] = drive
 
                 # Obtain json message containing all relevant data
-                internal_json_msg = drive.toHPIjsonMsg().getJson()
+                internal_json_msg = drive.toHPIjsonMsg().getEnvelope()
 
                 # Send the json message to the RabbitMQ processor to transmit out
-                self._log_debug(f"_process_hpi_response_ZBX_NOTPRESENT, internal_json_msg: {internal_json_msg}")
+                self._log_debug("_process_hpi_response_ZBX_NOTPRESENT, internal_json_msg: %s", internal_json_msg)
                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
 
     def _write_file(self, file_path, contents):
@@ -799,8 +803,8 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             json_dict = {}
             for serial_number, drive in list(self._hpi_drives.items()):
                 # Obtain json message containing all relevant HPI data
-                hpi_msg = drive.toHPIjsonMsg().getJson()
-                hpi_json_msg = json.loads(hpi_msg).get("message").get("sensor_response_type").get("disk_status_hpi")
+                hpi_msg = drive.toHPIjsonMsg().getEnvelope()
+                hpi_json_msg = hpi_msg.body.get("message").get("sensor_response_type").get("disk_status_hpi")
 
                 status = "N/A"
                 reason = "N/A"
@@ -862,7 +866,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                          }
 
         self._log_debug(f"_log_IEM, log_msg: %{log_msg}:{json.dumps(json_data, sort_keys=True)}")
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
                     {"actuator_request_type" : {
                         "logging": {
                             "log_level": "LOG_WARNING",
@@ -955,7 +959,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Create and transmit an expander reset JSON msg"""
         # Build JSON message, currently no data but following same pattern
         expanderResetMsg = ExpanderResetMsg()
-        internal_json_msg = expanderResetMsg.getJson()
+        internal_json_msg = expanderResetMsg.getEnvelope()
 
         # Send the json message to the RabbitMQ processor to transmit out
         self._write_internal_msgQ(RabbitMQegressProcessor.name(), internal_json_msg)
@@ -964,7 +968,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
         json_data = {"scsi_generic_device": self._scsi_generic}
 
         # Log an IEM
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
                     {"actuator_request_type" : {
                         "logging": {
                             "log_level": "LOG_WARNING",
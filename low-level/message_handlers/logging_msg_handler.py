@@ -23,6 +23,7 @@ import json
 
 from framework.base.module_thread import ScheduledModuleThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from framework.base.sspl_constants import enabled_products
 
@@ -38,6 +39,9 @@ class LoggingMsgHandler(ScheduledModuleThread, InternalMsgQ):
     MODULE_NAME = "LoggingMsgHandler"
     PRIORITY    = 2
 
+    # Only runs when there are messages on its queue, see EventScheduler
+    QUEUE_DRIVEN = True
+
     # Section and keys in configuration file
     LOGGINGMSGHANDLER   = MODULE_NAME.upper()
     IEM_ROUTING_ENABLED = 'iem_routing_enabled'
@@ -106,7 +110,7 @@ class LoggingMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
     def _process_msg(self, jsonMsg):
         """Parses the incoming message and hands off to the appropriate logger"""
-        self._log_debug(f"_process_msg, jsonMsg: {jsonMsg}")
+        self._log_debug("_process_msg, jsonMsg: %s", jsonMsg)
 
         if isinstance(jsonMsg, dict) is False:
             jsonMsg = json.loads(jsonMsg)
@@ -142,7 +146,7 @@ class LoggingMsgHandler(ScheduledModuleThread, InternalMsgQ):
             self._log_debug(f"_processMsg, serial_number: {serial_number}, status:{status}, reason: {reason}")
 
             # Send a message to the disk manager handler to create and transmit json msg
-            internal_json_msg = json.dumps(
+            internal_json_msg = MsgEnvelope(
                  {"sensor_response_type" : "disk_status_HDS",
                   "object_path" : "HDS",
                   "status" : status,
@@ -158,7 +162,7 @@ class LoggingMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # result = self._iem_logger.log_msg(jsonMsg)
 
             # Send ack about logging msg
-            ack_msg = AckResponseMsg(log_type, result, uuid).getJson()
+            ack_msg = AckResponseMsg(log_type, result, uuid).getEnvelope()
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), ack_msg)
 
         # ... handle other logging types
@@ -180,7 +184,7 @@ class LoggingMsgHandler(ScheduledModuleThread, InternalMsgQ):
         # Get the message to log in format "IEC: EVENT_CODE: EVENT_STRING: JSON DATA"
         log_msg = f"{log_level} {jsonMsg.get('actuator_request_type').get('logging').get('log_msg')}"
 
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
                  {"message": {
                     "IEM_routing": {
                         "log_msg": log_msg
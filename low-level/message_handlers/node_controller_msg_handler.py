@@ -25,6 +25,7 @@ import socket
 
 from framework.base.module_thread import ScheduledModuleThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from framework.base.sspl_constants import enabled_products, COMMON_CONFIGS
 
@@ -45,6 +46,9 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
     MODULE_NAME = "NodeControllerMsgHandler"
     PRIORITY    = 2
 
+    # Only runs when there are messages on its queue, see EventScheduler
+    QUEUE_DRIVEN = True
+
     SYS_INFORMATION = 'SYSTEM_INFORMATION'
     SETUP = 'setup'
     NODE_HW_ACTUATOR = 'NODEHWACTUATOR'
@@ -144,7 +148,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
     def _process_msg(self, jsonMsg):
         """Parses the incoming message and handles appropriately"""
-        self._log_debug(f"_process_msg, jsonMsg: {jsonMsg}")
+        self._log_debug("_process_msg, jsonMsg: %s", jsonMsg)
 
         if isinstance(jsonMsg, dict) is False:
             jsonMsg = json.loads(jsonMsg)
@@ -174,7 +178,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                         self._command_line_actuator = command_line_actuator_class(self._conf_reader)
                     else:
                         logger.warn("CommandLine Actuator not loaded")
-                        json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getJson()
+                        json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getEnvelope()
                         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                         return
 
@@ -182,7 +186,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 command_line_response = self._command_line_actuator.perform_request(jsonMsg).strip()
                 self._log_debug(f"_process_msg, command line response: {command_line_response}")
 
-                json_msg = AckResponseMsg(node_request, command_line_response, uuid).getJson()
+                json_msg = AckResponseMsg(node_request, command_line_response, uuid).getEnvelope()
                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
             # Handle LED effects using the HPI actuator
@@ -202,7 +206,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     else:
                         logger.warn("HPIActuator not loaded")
                         if self._product.lower() in [x.lower() for x in enabled_products]:
-                            json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getJson()
+                            json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getEnvelope()
                             self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                         return
 
@@ -212,7 +216,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     hpi_response = self._HPI_actuator.perform_request(jsonMsg).strip()
                     self._log_debug(f"_process_msg, hpi_response: {hpi_response}")
 
-                    json_msg = AckResponseMsg(node_request, hpi_response, uuid).getJson()
+                    json_msg = AckResponseMsg(node_request, hpi_response, uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
             # Set the Bezel LED color using the GEM interface
@@ -226,7 +230,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 gem_response = self._GEM_actuator.perform_request(jsonMsg).strip()
                 self._log_debug(f"_process_msg, gem_response: {gem_response}")
 
-                json_msg = AckResponseMsg(node_request, gem_response, uuid).getJson()
+                json_msg = AckResponseMsg(node_request, gem_response, uuid).getEnvelope()
                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
             elif component == "PDU:":
@@ -240,7 +244,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                         self._PDU_actuator = PDU_actuator_class(self._conf_reader)
                     else:
                         logger.warn("RaritanPDU Actuator not loaded")
-                        json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getJson()
+                        json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getEnvelope()
                         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                         return
 
@@ -248,7 +252,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 pdu_response = self._PDU_actuator.perform_request(jsonMsg).strip()
                 self._log_debug(f"_process_msg, pdu_response: {pdu_response}")
 
-                json_msg = AckResponseMsg(node_request, pdu_response, uuid).getJson()
+                json_msg = AckResponseMsg(node_request, pdu_response, uuid).getEnvelope()
                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
             elif component == "RAID":
@@ -264,7 +268,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     # This state will not be reached. Kept here for consistency.
                     logger.info("RAID actuator is initializing")
                     busy_json_msg = AckResponseMsg(
-                        node_request, "BUSY", uuid, error_no=errno.EBUSY).getJson()
+                        node_request, "BUSY", uuid, error_no=errno.EBUSY).getEnvelope()
                     self._write_internal_msgQ(
                         "RabbitMQegressProcessor", busy_json_msg)
 
@@ -308,7 +312,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                         self._IPMI_actuator = IPMI_actuator_class(self._conf_reader)
                     else:
                         logger.warn("IPMI Actuator not loaded")
-                        json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getJson()
+                        json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getEnvelope()
                         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                         return
 
@@ -316,7 +320,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 ipmi_response = self._IPMI_actuator.perform_request(jsonMsg).strip()
                 self._log_debug(f"_process_msg, ipmi_response: {ipmi_response}")
 
-                json_msg = AckResponseMsg(node_request, ipmi_response, uuid).getJson()
+                json_msg = AckResponseMsg(node_request, ipmi_response, uuid).getEnvelope()
                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
             elif component == "STOP":
@@ -335,7 +339,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     else:
                         logger.warn("HPIActuator not loaded")
                         if self._product.lower() in [x.lower() for x in enabled_products]:
-                            json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getJson()
+                            json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getEnvelope()
                             self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                         return
 
@@ -348,7 +352,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     # Append POWER_OFF to notify HPI actuator of desired state
                     jsonMsg["actuator_request_type"]["node_controller"]["node_request"] = \
                             f"DISK: set {drive_request} POWER_OFF"
-                    self._log_debug(f"_process_msg, jsonMsg: {jsonMsg}")
+                    self._log_debug("_process_msg, jsonMsg: %s", jsonMsg)
 
                     # Perform the request using HPI and get the response
                     hpi_response = self._HPI_actuator.perform_request(jsonMsg).strip()
@@ -358,7 +362,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     if "Success" in hpi_response:
                         hpi_response = "Successful"
 
-                    json_msg = AckResponseMsg(node_request, hpi_response, uuid).getJson()
+                    json_msg = AckResponseMsg(node_request, hpi_response, uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
             elif component == "STAR":
@@ -377,7 +381,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     else:
                         logger.warn("HPIActuator not loaded")
                         if self._product.lower() in [x.lower() for x in enabled_products]:
-                            json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getJson()
+                            json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getEnvelope()
                             self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                         return
 
@@ -390,7 +394,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     # Append POWER_ON to notify HPI actuator of desired state
                     jsonMsg["actuator_request_type"]["node_controller"]["node_request"] = \
                             f"DISK: set {drive_request} POWER_ON"
-                    self._log_debug(f"_process_msg, jsonMsg: {jsonMsg}")
+                    self._log_debug("_process_msg, jsonMsg: %s", jsonMsg)
 
                     # Perform the request using HPI and get the response
                     hpi_response = self._HPI_actuator.perform_request(jsonMsg).strip()
@@ -400,7 +404,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     if "Success" in hpi_response:
                         hpi_response = "Successful"
 
-                    json_msg = AckResponseMsg(node_request, hpi_response, uuid).getJson()
+                    json_msg = AckResponseMsg(node_request, hpi_response, uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
 
@@ -420,7 +424,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     else:
                         logger.warn("HPIActuator not loaded")
                         if self._product.lower() in [x.lower() for x in enabled_products]:
-                            json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getJson()
+                            json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getEnvelope()
                             self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                         return
 
@@ -433,7 +437,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     # Append POWER_OFF and then POWER_ON to notify HPI actuator of desired state
                     jsonMsg["actuator_request_type"]["node_controller"]["node_request"] = \
                             f"DISK: set {drive_request} POWER_OFF"
-                    self._log_debug(f"_process_msg, jsonMsg: {jsonMsg}")
+                    self._log_debug("_process_msg, jsonMsg: %s", jsonMsg)
 
                     # Perform the request using HPI and get the response
                     hpi_response = self._HPI_actuator.perform_request(jsonMsg).strip()
@@ -444,7 +448,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                         # Append POWER_ON to notify HPI actuator of desired state
                         jsonMsg["actuator_request_type"]["node_controller"]["node_request"] = \
                                    f"DISK: set {drive_request} POWER_ON"
-                        self._log_debug(f"_process_msg, jsonMsg: {jsonMsg}")
+                        self._log_debug("_process_msg, jsonMsg: %s", jsonMsg)
 
                         # Perform the request using HPI and get the response
                         hpi_response = self._HPI_actuator.perform_request(jsonMsg).strip()
@@ -454,7 +458,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                         if "Success" in hpi_response:
                             hpi_response = "Successful"
 
-                    json_msg = AckResponseMsg(node_request, hpi_response, uuid).getJson()
+                    json_msg = AckResponseMsg(node_request, hpi_response, uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
             elif component == "HDPA":
@@ -466,7 +470,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     hdparm_response = self._hdparm_actuator.perform_request(jsonMsg).strip()
                     self._log_debug(f"_process_msg, hdparm_response: {hdparm_response}")
 
-                    json_msg = AckResponseMsg(node_request, hdparm_response, uuid).getJson()
+                    json_msg = AckResponseMsg(node_request, hdparm_response, uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
                 # If the state is INITIALIZING, need to send message
@@ -474,7 +478,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     # This state will not be reached. Kept here for consistency.
                     logger.info("Hdparm actuator is initializing")
                     busy_json_msg = AckResponseMsg(
-                        node_request, "BUSY", uuid, error_no=errno.EBUSY).getJson()
+                        node_request, "BUSY", uuid, error_no=errno.EBUSY).getEnvelope()
                     self._write_internal_msgQ(
                         "RabbitMQegressProcessor", busy_json_msg)
 
@@ -499,7 +503,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                         hdparm_response = self._hdparm_actuator.perform_request(jsonMsg).strip()
                         self._log_debug(f"_process_msg, hdparm_response: {hdparm_response}")
 
-                        json_msg = AckResponseMsg(node_request, hdparm_response, uuid).getJson()
+                        json_msg = AckResponseMsg(node_request, hdparm_response, uuid).getEnvelope()
                         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                         actuator_state_manager.set_state(
                             "Hdparm", actuator_state_manager.INITIALIZED)
@@ -520,7 +524,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 # If the drive field is an asterisk then send all the smart results for all drives available
                 if drive_request == "*":
                     # Send the event to SystemdWatchdog to schedule SMART test
-                    internal_json_msg = json.dumps(
+                    internal_json_msg = MsgEnvelope(
                         {"sensor_request_type" : "disk_smart_test",
                          "serial_number" : "*",
                          "node_request" : self.host_id,
@@ -536,7 +540,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
                     # Send error response back on ack channel
                     if error != "":
-                        json_msg = AckResponseMsg(node_request, error, uuid).getJson()
+                        json_msg = AckResponseMsg(node_request, error, uuid).getEnvelope()
                         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                         return
                 else:
@@ -550,14 +554,14 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                             logger.error(" No module Smartctl is present to load")
                     serial_compare = self._smartctl_actuator._check_serial_number(drive_request)
                     if not serial_compare:
-                        json_msg = AckResponseMsg(node_request, "Drive Not Found", uuid).getJson()
+                        json_msg = AckResponseMsg(node_request, "Drive Not Found", uuid).getEnvelope()
                         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                         return
                     else:
                         serial_number = drive_request
 
                     # Send the event to SystemdWatchdog to schedule SMART test
-                    internal_json_msg = json.dumps(
+                    internal_json_msg = MsgEnvelope(
                         {"sensor_request_type" : "disk_smart_test",
                             "serial_number" : serial_number,
                             "node_request" : node_request,
@@ -576,7 +580,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 # If the drive field is an asterisk then send all the drivemanager results for all drives available
                 if drive_request == "*":
                     # Send a message to the disk message handler to lookup the drivemanager status and send it out
-                    internal_json_msg = json.dumps(
+                    internal_json_msg = MsgEnvelope(
                         {"sensor_request_type" : "drvmngr_status",
                          "serial_number" : "*",
                          "node_request" : self.host_id,
@@ -593,14 +597,14 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
                     # Send error response back on ack channel
                     if error != "":
-                        json_msg = AckResponseMsg(node_request, error, uuid).getJson()
+                        json_msg = AckResponseMsg(node_request, error, uuid).getEnvelope()
                         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                         return
                 else:
                     serial_number = drive_request
 
                 # Send a message to the disk message handler to lookup the smart status and send it out
-                internal_json_msg = json.dumps(
+                internal_json_msg = MsgEnvelope(
                     {"sensor_request_type" : "drvmngr_status",
                      "serial_number" : serial_number,
                      "node_request" : node_request,
@@ -619,7 +623,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
                 if self.setup == 'cortx':
                     logger.warn("HPIMonitor not loaded")
-                    json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getJson()
+                    json_msg = AckResponseMsg(node_request, NodeControllerMsgHandler.UNSUPPORTED_REQUEST, uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                     return
 
@@ -630,7 +634,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 # If the drive field is an asterisk then send all the hpi results for all drives available
                 if drive_request == "*":
                     # Send a message to the disk message handler to lookup the hpi status and send it out
-                    internal_json_msg = json.dumps(
+                    internal_json_msg = MsgEnvelope(
                         {"sensor_request_type" : "hpi_status",
                          "serial_number" : "*",
                          "node_request" : self.host_id,
@@ -647,14 +651,14 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
                     # Send error response back on ack channel
                     if error != "":
-                        json_msg = AckResponseMsg(node_request, error, uuid).getJson()
+                        json_msg = AckResponseMsg(node_request, error, uuid).getEnvelope()
                         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                         return
                 else:
                     serial_number = drive_request
 
                 # Send a message to the disk message handler to lookup the smart status and send it out
-                internal_json_msg = json.dumps(
+                internal_json_msg = MsgEnvelope(
                     {"sensor_request_type" : "hpi_status",
                      "serial_number" : serial_number,
                      "node_request" : node_request,
@@ -677,7 +681,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
                     # Send error response back on ack channel
                     if error != "":
-                        json_msg = AckResponseMsg(node_request, error, uuid).getJson()
+                        json_msg = AckResponseMsg(node_request, error, uuid).getEnvelope()
                         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                         return
                 else:
@@ -687,7 +691,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 if sim_request[0] == "SMART_FAILURE":
                     logger.info(f"NodeControllerMsgHandler, simulating SMART_FAILURE on drive: {serial_number}")
 
-                    internal_json_msg = json.dumps(
+                    internal_json_msg = MsgEnvelope(
                         {"sensor_request_type" : "simulate_failure",
                          "serial_number" : serial_number,
                          "node_request" : sim_request[0],
@@ -699,7 +703,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
                 else:
                     # Send a message to the disk message handler to handle simulation request
-                    internal_json_msg = json.dumps(
+                    internal_json_msg = MsgEnvelope(
                         {"sensor_request_type" : "sim_event",
                          "serial_number" : serial_number,
                          "node_request" : sim_request[0],
@@ -734,7 +738,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                     #TODO: Send message to Ack as well as Sensor in their respective channel.
                     node_hw_response = self._NodeHW_actuator.perform_request(node_request)
                     self._log_debug(f"_process_msg, node_hw_response: {node_hw_response}")
-                    json_msg = NodeHwAckResponseMsg(node_request, node_hw_response, uuid).getJson()
+                    json_msg = NodeHwAckResponseMsg(node_request, node_hw_response, uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                 except ImportError as e:
                     logger.error(f"Modules could not be loaded: {e}")
@@ -747,7 +751,7 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 response = f"NodeControllerMsgHandler, _process_msg, unknown node controller msg: {node_request}"
                 self._log_debug(response)
 
-                json_msg = AckResponseMsg(node_request, response, uuid).getJson()
+                json_msg = AckResponseMsg(node_request, response, uuid).getEnvelope()
                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
             # ... handle other node message types
@@ -804,14 +808,14 @@ class NodeControllerMsgHandler(ScheduledModuleThread, InternalMsgQ):
         raid_response = actuator_instance.perform_request(json_msg).strip()
         self._log_debug(f"_process_msg, raid_response: {raid_response}")
 
-        json_msg = AckResponseMsg(node_request, raid_response, uuid).getJson()
+        json_msg = AckResponseMsg(node_request, raid_response, uuid).getEnvelope()
         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
         # Restart openhpid to update HPI data only if it is a H/W environment
         if self.setup in [ "hw", "ssu" ]:
             self._log_debug("restarting openhpid service to update HPI data")
             if "assemble" in json_msg.get("actuator_request_type").get("node_controller").get("node_request").lower():
-                internal_json_msg = json.dumps(
+                internal_json_msg = MsgEnvelope(
                                     {"actuator_request_type": {
                                     "service_controller": {
                                         "service_name" : "openhpid.service",
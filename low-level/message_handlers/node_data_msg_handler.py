@@ -260,7 +260,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
     def _process_msg(self, jsonMsg):
         """Parses the incoming message and generate the desired data message"""
-        self._log_debug("_process_msg, jsonMsg: %s" % jsonMsg)
+        self._log_debug("_process_msg, jsonMsg: %s", jsonMsg)
 
         if isinstance(jsonMsg, dict) is False:
             jsonMsg = json.loads(jsonMsg)
@@ -408,12 +408,12 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 # Add in uuid if it was present in the json request
                 if self._uuid is not None:
                     hostUpdateMsg.set_uuid(self._uuid)
-                jsonMsg = hostUpdateMsg.getJson()
+                jsonMsg = hostUpdateMsg.getEnvelope()
                 # Transmit it out over rabbitMQ channel
                 self.host_sensor_data = jsonMsg
                 self.os_sensor_type["system"] = self.host_sensor_data
                 # RAAL stands for - RAise ALert
-                logger.info(f"RAAL: {jsonMsg}")
+                logger.info("RAAL: %s", jsonMsg)
                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), jsonMsg)
 
         if (self._node_sensor.total_memory["percent"] < self._host_memory_usage_threshold) and (self.host_fault == True):
@@ -438,11 +438,11 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 # Add in uuid if it was present in the json request
                 if self._uuid is not None:
                     hostUpdateMsg.set_uuid(self._uuid)
-                jsonMsg = hostUpdateMsg.getJson()
+                jsonMsg = hostUpdateMsg.getEnvelope()
                 # Transmit it out over rabbitMQ channel
                 self.host_sensor_data = jsonMsg
                 self.os_sensor_type["system"] = self.host_sensor_data
-                logger.info(f"RAAL: {jsonMsg}")
+                logger.info("RAAL: %s", jsonMsg)
                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), jsonMsg)
                 self.host_fault = False
 
@@ -468,9 +468,9 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
         # Add in uuid if it was present in the json request
         if self._uuid is not None:
             localMountDataMsg.set_uuid(self._uuid)
-        jsonMsg = localMountDataMsg.getJson()
+        jsonMsg = localMountDataMsg.getEnvelope()
 
-        logger.info(f"RAAL: {jsonMsg}")
+        logger.info("RAAL: %s", jsonMsg)
         # Transmit it out over rabbitMQ channel
         self._write_internal_msgQ(RabbitMQegressProcessor.name(), jsonMsg)
 
@@ -526,10 +526,10 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 # Add in uuid if it was present in the json request
                 if self._uuid is not None:
                     cpuDataMsg.set_uuid(self._uuid)
-                jsonMsg = cpuDataMsg.getJson()
+                jsonMsg = cpuDataMsg.getEnvelope()
                 self.cpu_sensor_data = jsonMsg
                 self.os_sensor_type["cpu"] = self.cpu_sensor_data
-                logger.info(f"RAAL: {jsonMsg}")
+                logger.info("RAAL: %s", jsonMsg)
                 # Transmit it out over rabbitMQ channel
                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), jsonMsg)
 
@@ -562,10 +562,10 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Add in uuid if it was present in the json request
             if self._uuid is not None:
                 cpuDataMsg.set_uuid(self._uuid)
-            jsonMsg = cpuDataMsg.getJson()
+            jsonMsg = cpuDataMsg.getEnvelope()
             self.cpu_sensor_data = jsonMsg
             self.os_sensor_type["cpu"] = self.cpu_sensor_data
-            logger.info(f"RAAL: {jsonMsg}")
+            logger.info("RAAL: %s", jsonMsg)
             # Transmit it out over rabbitMQ channel
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), jsonMsg)
             self.cpu_fault = False
@@ -581,12 +581,12 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
         # Add in uuid if it was present in the json request
         if self._uuid is not None:
             ifDataMsg.set_uuid(self._uuid)
-        jsonMsg = ifDataMsg.getJson()
+        jsonMsg = ifDataMsg.getEnvelope()
         self.if_sensor_data = jsonMsg
         self.os_sensor_type[sensor_type] = self.if_sensor_data
 
         # Send the event to logging msg handler to send IEM message to journald
-        #internal_json_msg=json.dumps({
+        #internal_json_msg=MsgEnvelope({
         #                        'actuator_request_type': {
         #                            'logging': {
         #                                'log_level': 'LOG_WARNING',
@@ -594,7 +594,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
         #                                'log_msg': '{}'.format(jsonMsg)}}})
         #self._write_internal_msgQ(LoggingMsgHandler.name(), internal_json_msg)
 
-        logger.info(f"RAAL: {jsonMsg}")
+        logger.info("RAAL: %s", jsonMsg)
         # Transmit it out over rabbitMQ channel
         self._write_internal_msgQ(RabbitMQegressProcessor.name(), jsonMsg)
 
@@ -782,10 +782,10 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 # Add in uuid if it was present in the json request
                 if self._uuid is not None:
                     diskSpaceAlertMsg.set_uuid(self._uuid)
-                jsonMsg = diskSpaceAlertMsg.getJson()
+                jsonMsg = diskSpaceAlertMsg.getEnvelope()
                 self.disk_sensor_data = jsonMsg
                 self.os_sensor_type["disk_space"] = self.disk_sensor_data
-                logger.info(f"RAAL: {jsonMsg}")
+                logger.info("RAAL: %s", jsonMsg)
                 # Transmit it out over rabbitMQ channel
                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), jsonMsg)
 
@@ -809,10 +809,10 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Add in uuid if it was present in the json request
             if self._uuid is not None:
                 diskSpaceAlertMsg.set_uuid(self._uuid)
-            jsonMsg = diskSpaceAlertMsg.getJson()
+            jsonMsg = diskSpaceAlertMsg.getEnvelope()
             self.disk_sensor_data = jsonMsg
             self.os_sensor_type["disk_space"] = self.disk_sensor_data
-            logger.info(f"RAAL: {jsonMsg}")
+            logger.info("RAAL: %s", jsonMsg)
             # Transmit it out over rabbitMQ channel
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), jsonMsg)
             self.disk_fault = False
@@ -840,7 +840,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Add in uuid if it was present in the json request
             if self._uuid is not None:
                 raidDataMsg.set_uuid(self._uuid)
-            jsonMsg = raidDataMsg.getJson()
+            jsonMsg = raidDataMsg.getEnvelope()
             self.raid_sensor_data = jsonMsg
             self.os_sensor_type["raid_data"] = self.raid_sensor_data
 
@@ -885,7 +885,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Add in uuid if it was present in the json request
             if self._uuid is not None:
                 RAIDintegrityMsg.set_uuid(self._uuid)
-            jsonMsg = RAIDintegrityMsg.getJson()
+            jsonMsg = RAIDintegrityMsg.getEnvelope()
             self.raid_integrity_data = jsonMsg
             self.os_sensor_type["raid_integrity"] = self.raid_integrity_data
              
@@ -907,7 +907,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
         if self._uuid is not None:
             node_ipmi_data_msg.set_uuid(self._uuid)
-        jsonMsg = node_ipmi_data_msg.getJson()
+        jsonMsg = node_ipmi_data_msg.getEnvelope()
         self._write_internal_msgQ(RabbitMQegressProcessor.name(), jsonMsg)
 
     def suspend(self):
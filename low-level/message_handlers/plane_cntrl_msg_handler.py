@@ -154,7 +154,7 @@ class PlaneCntrlMsgHandler(ScheduledModuleThread, InternalMsgQ):
             ack_type["errors"] = str(hostname, 'utf-8'), self._command, self._parameters,  \
             status, str(errors, 'utf-8')
         ack_msg = AckResponseMsg(json.dumps(ack_type), \
-                                 str(response), self._uuid).getJson()
+                                 str(response), self._uuid).getEnvelope()
         self._write_internal_msgQ(PlaneCntrlRMQegressProcessor.name(), ack_msg)
 
     def _parse_jsonMsg(self, jsonMsg):
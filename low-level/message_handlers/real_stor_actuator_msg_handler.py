@@ -37,6 +37,9 @@ class RealStorActuatorMsgHandler(ScheduledModuleThread, InternalMsgQ):
     MODULE_NAME = "RealStorActuatorMsgHandler"
     PRIORITY    = 2
 
+    # Only runs when there are messages on its queue, see EventScheduler
+    QUEUE_DRIVEN = True
+
     SYS_INFORMATION = 'SYSTEM_INFORMATION'
     SETUP = 'setup'
 
@@ -124,7 +127,7 @@ class RealStorActuatorMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
     def _process_msg(self, jsonMsg):
         """Parses the incoming message and handles appropriately"""
-        self._log_debug(f"RealStorActuatorMsgHandler, _process_msg, jsonMsg: {jsonMsg}")
+        self._log_debug("RealStorActuatorMsgHandler, _process_msg, jsonMsg: %s", jsonMsg)
 
         if isinstance(jsonMsg, dict) is False:
             jsonMsg = json.loads(jsonMsg)
@@ -158,7 +161,7 @@ class RealStorActuatorMsgHandler(ScheduledModuleThread, InternalMsgQ):
             real_stor_response = self._real_stor_actuator.perform_request(jsonMsg)
             self._log_debug(f"_process_msg, RealStor response: {real_stor_response}")
 
-            json_msg = RealStorActuatorMsg(real_stor_response, uuid).getJson()
+            json_msg = RealStorActuatorMsg(real_stor_response, uuid).getEnvelope()
             self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
     def suspend(self):
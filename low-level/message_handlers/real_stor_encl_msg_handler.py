@@ -45,6 +45,9 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
     # TODO increase the priority
     PRIORITY = 2
 
+    # Only runs when there are messages on its queue, see EventScheduler
+    QUEUE_DRIVEN = True
+
     # Dependency list
     DEPENDENCIES = {
                     "plugins": ["RabbitMQegressProcessor"],
@@ -138,7 +141,7 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
     def _process_msg(self, json_msg):
         """Parses the incoming message and generate the desired data message"""
-        self._log_debug(f"RealStorEnclMsgHandler, _process_msg, json_msg: {json_msg}")
+        self._log_debug("RealStorEnclMsgHandler, _process_msg, json_msg: %s", json_msg)
 
         if json_msg.get("sensor_request_type").get("enclosure_alert") is not None:
             internal_sensor_request = json_msg.get("sensor_request_type").\
@@ -178,7 +181,7 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Extracts specific field from json message and propagates
            json message based on sensor type"""
 
-        self._log_debug(f"RealStorEnclMsgHandler, _propagate_alert, json_msg {json_msg}")
+        self._log_debug("RealStorEnclMsgHandler, _propagate_alert, json_msg %s", json_msg)
 
         sensor_request = json_msg.get("sensor_request_type").get("enclosure_alert")
         host_name = sensor_request.get("host_id")
@@ -204,12 +207,12 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Parses the json message, also validates it and then send it to the
            RabbitMQ egress processor"""
 
-        self._log_debug(f"RealStorEnclMsgHandler, _generate_disk_alert,\
-            json_msg {json_msg}")
+        self._log_debug("RealStorEnclMsgHandler, _generate_disk_alert,\
+            json_msg %s", json_msg)
 
         real_stor_disk_data_msg = \
             RealStorDiskDataMsg(host_name, alert_type, alert_id, severity, info, specific_info)
-        json_msg = real_stor_disk_data_msg.getJson()
+        json_msg = real_stor_disk_data_msg.getEnvelope()
 
         # save the json message in memory to serve sspl CLI sensor request
         self._disk_sensor_message = json_msg
@@ -221,12 +224,12 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Parses the json message, also validates it and then send it to the
            RabbitMQ egress processor"""
 
-        self._log_debug(f"RealStorEnclMsgHandler, _generate_psu_alert,\
-            json_msg {json_msg}")
+        self._log_debug("RealStorEnclMsgHandler, _generate_psu_alert,\
+            json_msg %s", json_msg)
 
         real_stor_psu_data_msg = \
             RealStorPSUDataMsg(host_name, alert_type, alert_id, severity, info, specific_info)
-        json_msg = real_stor_psu_data_msg.getJson()
+        json_msg = real_stor_psu_data_msg.getEnvelope()
 
         # Saves the json message in memory to serve sspl CLI sensor request
         self._psu_sensor_message = json_msg
@@ -238,12 +241,12 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Parses the json message, also validates it and then send it to the
            RabbitMQ egress processor"""
 
-        self._log_debug(f"RealStorEnclMsgHandler, _generate_fan_alert,\
-            json_msg {json_msg}")
+        self._log_debug("RealStorEnclMsgHandler, _generate_fan_alert,\
+            json_msg %s", json_msg)
 
         real_stor_fan_data_msg = \
             RealStorFanDataMsg(host_name, alert_type, alert_id, severity, info, specific_info)
-        json_msg = real_stor_fan_data_msg.getJson()
+        json_msg = real_stor_fan_data_msg.getEnvelope()
 
         # save the json message in memory to serve sspl CLI sensor request
         self._fan_module_sensor_message = json_msg
@@ -256,13 +259,13 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Parses the json message, also validates it and then send it to the
            RabbitMQ egress processor"""
 
-        self._log_debug(f"RealStorEnclMsgHandler, _generate_controller_alert,\
-            json_msg {json_msg}")
+        self._log_debug("RealStorEnclMsgHandler, _generate_controller_alert,\
+            json_msg %s", json_msg)
 
         real_stor_controller_data_msg = \
             RealStorControllerDataMsg(host_name, alert_type, alert_id, severity, info,
                                       specific_info)
-        json_msg = real_stor_controller_data_msg.getJson()
+        json_msg = real_stor_controller_data_msg.getEnvelope()
 
         # save the json message in memory to serve sspl CLI sensor request
         self._controller_sensor_message = json_msg
@@ -275,13 +278,13 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Parses the json message, also validates it and then send it to the
            RabbitMQ egress processor"""
 
-        self._log_debug(f"RealStorEnclMsgHandler, _generate_expander_alert,\
-            json_msg {json_msg}")
+        self._log_debug("RealStorEnclMsgHandler, _generate_expander_alert,\
+            json_msg %s", json_msg)
 
         real_stor_expander_data_msg = \
             RealStorSideplaneExpanderDataMsg(host_name, alert_type, alert_id, severity, info,
                                              specific_info)
-        json_msg = real_stor_expander_data_msg.getJson()
+        json_msg = real_stor_expander_data_msg.getEnvelope()
 
         # save the json message in memory to serve sspl CLI sensor request
         self._expander_sensor_message = json_msg
@@ -294,13 +297,13 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Parses the json message, also validates it and then send it to the
            RabbitMQ egress processor"""
 
-        self._log_debug(f"RealStorEnclMsgHandler, _generate_logical_volume_alert,\
-            json_msg {json_msg}")
+        self._log_debug("RealStorEnclMsgHandler, _generate_logical_volume_alert,\
+            json_msg %s", json_msg)
 
         real_stor_logical_volume_data_msg = \
             RealStorLogicalVolumeDataMsg(host_name, alert_type, alert_id, severity, info,
                                       specific_info)
-        json_msg = real_stor_logical_volume_data_msg.getJson()
+        json_msg = real_stor_logical_volume_data_msg.getEnvelope()
 
         # save the json message in memory to serve sspl CLI sensor request
         self._logical_volume_sensor_message = json_msg
@@ -313,12 +316,12 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Parses the json message, also validates it and then send it to the
             RabbitMQ egress processor"""
 
-        self._log_debug(f"RealStorEnclMsgHandler, _generate_enclosure_alert,\
-            json_msg {json_msg}")
+        self._log_debug("RealStorEnclMsgHandler, _generate_enclosure_alert,\
+            json_msg %s", json_msg)
 
         real_stor_encl_msg = RealStorEnclDataMsg(host_name, alert_type, alert_id, severity,
                                                 info, specific_info)
-        json_msg = real_stor_encl_msg.getJson()
+        json_msg = real_stor_encl_msg.getEnvelope()
         self._enclosure_message = json_msg
         self._fru_type[sensor_type] = self._enclosure_message
         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg, self._event)
@@ -21,10 +21,12 @@
 
 import errno
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 from framework.actuator_state_manager import actuator_state_manager
 from framework.base.module_thread import ScheduledModuleThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from framework.base.sspl_constants import enabled_products
 from json_msgs.messages.actuators.service_controller import ServiceControllerMsg
@@ -40,6 +42,13 @@ class ServiceMsgHandler(ScheduledModuleThread, InternalMsgQ):
     MODULE_NAME = "ServiceMsgHandler"
     PRIORITY = 2
 
+    # Only runs when there are messages on its queue, see EventScheduler
+    QUEUE_DRIVEN = True
+
+    # Section and keys in configuration file
+    SERVICEMSGHANDLER = MODULE_NAME.upper()
+    REQUEST_WORKERS = 'request_workers'
+
     # Dependency list
     DEPENDENCIES = {
         "plugins": [
@@ -65,6 +74,7 @@ class ServiceMsgHandler(ScheduledModuleThread, InternalMsgQ):
                                                 self.PRIORITY)
         self._service_actuator = None
         self._query_utility = None
+        self._workers = []
 
         # Flag to indicate suspension of module
         self._suspended = False
@@ -79,6 +89,13 @@ class ServiceMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
         self._import_products(product)
 
+        # Requests of a service run in order on one worker, the ones of
+        #  different services at the same time on different workers
+        request_workers = int(self._conf_reader._get_value_with_default(
+                                    self.SERVICEMSGHANDLER, self.REQUEST_WORKERS, 4))
+        self._workers = [ThreadPoolExecutor(max_workers=1)
+                         for _ in range(max(1, request_workers))]
+
     def _import_products(self, product):
         """Import classes based on which product is being used"""
         if product.lower() in [x.lower() for x in enabled_products]:
@@ -119,7 +136,7 @@ class ServiceMsgHandler(ScheduledModuleThread, InternalMsgQ):
     def _process_msg(self, jsonMsg):
         """Parses the incoming message and hands off to the appropriate logger
         """
-        self._log_debug(f"_process_msg, jsonMsg: {jsonMsg}")
+        self._log_debug("_process_msg, jsonMsg: %s", jsonMsg)
 
         if isinstance(jsonMsg, dict) is False:
             jsonMsg = json.loads(jsonMsg)
@@ -152,7 +169,7 @@ class ServiceMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 # This state will not be reached. Kept here for consistency.
                 logger.info("Service actuator is initializing")
                 busy_json_msg = AckResponseMsg(
-                    request, "BUSY", uuid, error_no=errno.EBUSY).getJson()
+                    request, "BUSY", uuid, error_no=errno.EBUSY).getEnvelope()
                 self._write_internal_msgQ(
                     "RabbitMQegressProcessor", busy_json_msg)
 
@@ -187,64 +204,91 @@ class ServiceMsgHandler(ScheduledModuleThread, InternalMsgQ):
         elif jsonMsg.get("actuator_request_type").get("service_watchdog_controller") is not None:
             self._log_debug("_processMsg, msg_type: service_watchdog_controller")
 
-            # Parse out values to be sent
             service_name = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("service_name")
-            state = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("state")
-            prev_state = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("previous_state")
-            substate = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("substate")
-            prev_substate = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("previous_substate")
-            pid = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("pid")
-            prev_pid = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("previous_pid")
-
-            # Pull out the service_request and if it's equal to "status" then get current status (state, substate)
             service_request = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("service_request")
-            if service_request != "None":
-                # Query the Zope GlobalSiteManager for an object implementing IService
-                if self._service_actuator is None:
-                    from actuators.IService import IService
-                    self._service_actuator = self._query_utility(IService)()
-                    self._log_debug(f"_process_msg, service_actuator name: {self._service_actuator.name()}")
-                service_name, state, substate = self._service_actuator.perform_request(jsonMsg)
-
-                self._log_debug(f"_processMsg, service_name: {service_name}, state: {state}, substate: {substate}")
-                self._log_debug(f"_processMsg, prev state: {prev_state}, prev substate: {prev_substate}")
-
-            # Create a service watchdog message and send it out
-            jsonMsg = ServiceWatchdogMsg(service_name, state, prev_state, substate, prev_substate, pid, prev_pid).getJson()
-            self._write_internal_msgQ("RabbitMQegressProcessor", jsonMsg)
-
-            # Create an IEM if the resulting service state is failed
-            if "fail" in state.lower() or \
-                "fail" in substate.lower():
-                json_data = {"service_name": service_name,
-                             "state": state,
-                             "previous_state": prev_state,
-                             "substate": substate,
-                             "previous_substate": prev_substate,
-                             "pid": pid,
-                             "previous_pid": prev_pid
-                            }
-
-                internal_json_msg = json.dumps(
-                    {"actuator_request_type" : {
-                        "logging": {
-                            "log_level": "LOG_WARNING",
-                            "log_type": "IEM",
-                            "log_msg": f"IEC: 020003001: Service entered a Failed state : {json.dumps(json_data, sort_keys=True)}"
-                            }
-                        }
-                    })
 
-                # Send the event to logging msg handler to send IEM message to journald
-                self._write_internal_msgQ(
-                    LoggingMsgHandler.name(), internal_json_msg)
+            # Query the Zope GlobalSiteManager for an object implementing IService
+            if service_request != "None" and self._service_actuator is None:
+                from actuators.IService import IService
+                self._service_actuator = self._query_utility(IService)()
+                self._log_debug(f"_process_msg, service_actuator name: {self._service_actuator.name()}")
+
+            self._submit(service_name, self._process_watchdog_msg, jsonMsg)
 
         # ... handle other service message types
 
+    def _process_watchdog_msg(self, jsonMsg):
+        """Sends out a service watchdog event, after performing its
+        service_request if any"""
+        # Parse out values to be sent
+        service_name = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("service_name")
+        state = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("state")
+        prev_state = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("previous_state")
+        substate = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("substate")
+        prev_substate = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("previous_substate")
+        pid = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("pid")
+        prev_pid = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("previous_pid")
+
+        # Pull out the service_request and if it's equal to "status" then get current status (state, substate)
+        service_request = jsonMsg.get("actuator_request_type").get("service_watchdog_controller").get("service_request")
+        if service_request != "None":
+            service_name, state, substate = self._service_actuator.perform_request(jsonMsg)
+
+            self._log_debug(f"_processMsg, service_name: {service_name}, state: {state}, substate: {substate}")
+            self._log_debug(f"_processMsg, prev state: {prev_state}, prev substate: {prev_substate}")
+
+        # Create a service watchdog message and send it out
+        jsonMsg = ServiceWatchdogMsg(service_name, state, prev_state, substate, prev_substate, pid, prev_pid).getEnvelope()
+        self._write_internal_msgQ("RabbitMQegressProcessor", jsonMsg)
+
+        # Create an IEM if the resulting service state is failed
+        if "fail" in state.lower() or \
+            "fail" in substate.lower():
+            json_data = {"service_name": service_name,
+                         "state": state,
+                         "previous_state": prev_state,
+                         "substate": substate,
+                         "previous_substate": prev_substate,
+                         "pid": pid,
+                         "previous_pid": prev_pid
+                        }
+
+            internal_json_msg = MsgEnvelope(
+                {"actuator_request_type" : {
+                    "logging": {
+                        "log_level": "LOG_WARNING",
+                        "log_type": "IEM",
+                        "log_msg": f"IEC: 020003001: Service entered a Failed state : {json.dumps(json_data, sort_keys=True)}"
+                        }
+                    }
+                })
+
+            # Send the event to logging msg handler to send IEM message to journald
+            self._write_internal_msgQ(
+                LoggingMsgHandler.name(), internal_json_msg)
+
     def _execute_request(self, actuator_instance, json_msg, uuid):
-        """Calls perform_request method of an actuator and sends response to
-           output channel.
+        """Calls perform_request method of an actuator on the worker of the
+           service and sends response to output channel.
         """
+        service_name = json_msg.get("actuator_request_type") \
+            .get("service_controller").get("service_name")
+        self._submit(service_name, self._perform_request,
+                     actuator_instance, json_msg, uuid)
+
+    def _submit(self, service_name, fn, *args):
+        """Run fn(*args) after the other requests of service_name"""
+        worker = self._workers[hash(service_name) % len(self._workers)]
+        worker.submit(self._run_request, fn, *args)
+
+    def _run_request(self, fn, *args):
+        try:
+            fn(*args)
+        except Exception as ae:
+            logger.exception(f"ServiceMsgHandler, request failed: {ae}")
+
+    def _perform_request(self, actuator_instance, json_msg, uuid):
+        """Performs a service request and sends its response"""
         service_name, state, substate = \
             actuator_instance.perform_request(json_msg)
 
@@ -259,7 +303,7 @@ class ServiceMsgHandler(ScheduledModuleThread, InternalMsgQ):
         service_controller_msg = ServiceControllerMsg(service_name, result)
         if uuid is not None:
             service_controller_msg.set_uuid(uuid)
-        json_msg = service_controller_msg.getJson()
+        json_msg = service_controller_msg.getEnvelope()
         self._write_internal_msgQ("RabbitMQegressProcessor", json_msg)
 
     def suspend(self):
@@ -274,4 +318,10 @@ class ServiceMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread"""
+        for worker in self._workers:
+            worker.shutdown(wait=False)
+        if self._service_actuator is not None:
+            # Connection the SystemdService instances wait for their jobs on
+            from framework.utils.systemd_jobs import stop_shared_jobs
+            stop_shared_jobs()
         super(ServiceMsgHandler, self).shutdown()
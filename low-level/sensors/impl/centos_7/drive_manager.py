@@ -25,13 +25,13 @@
 """
 
 import os
-import json
 import time
 import subprocess
 import pyinotify
 
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from framework.base.sspl_constants import PRODUCT_FAMILY
 
@@ -198,7 +198,7 @@ class DriveManager(SensorThread, InternalMsgQ):
                     data_str = status_file[len(self._drive_mngr_base_dir)+1:]
 
                     # Send a message to the disk manager handler to create and transmit json msg
-                    internal_json_msg = json.dumps(
+                    internal_json_msg = MsgEnvelope(
                         {"sensor_response_type" : "disk_status_drivemanager",
                          "event_path" : data_str,
                          "status" : self._drive_status[pathname],
@@ -293,7 +293,7 @@ class DriveManager(SensorThread, InternalMsgQ):
         data_str = status_file[len(self._drive_mngr_base_dir)+1:]
 
         # Send a message to the disk manager handler to create and transmit json msg
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
             {"sensor_response_type" : "disk_status_drivemanager",
                 "event_path" : data_str,
                 "status" : status,
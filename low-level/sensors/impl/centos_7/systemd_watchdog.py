@@ -25,7 +25,6 @@ import re
 import os
 import json
 import time
-import copy
 import subprocess
 import threading
 import uuid
@@ -35,10 +34,13 @@ from datetime import datetime, timedelta
 from framework.rabbitmq.rabbitmq_egress_processor import RabbitMQegressProcessor
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from framework.base.sspl_constants import cs_products, COMMON_CONFIGS
 from framework.utils.severity_reader import SeverityReader
 from framework.utils.store_factory import file_store
+from framework.utils.smart_health import SmartHealthEngine
+from framework.utils.systemd_units import SystemdUnitTracker
 
 # Modules that receive messages from this module
 from message_handlers.service_msg_handler import ServiceMsgHandler
@@ -50,7 +52,6 @@ from json_msgs.messages.actuators.ack_response import AckResponseMsg
 from zope.interface import implementer
 from sensors.IService_watchdog import IServiceWatchdog
 
-import dbus
 from dbus import SystemBus, Interface, Array
 from gi.repository import GObject as gobject
 from dbus.mainloop.glib import DBusGMainLoop
@@ -70,6 +71,9 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
     MONITORED_SERVICES = 'monitored_services'
     SMART_TEST_INTERVAL= 'smart_test_interval'
     SMART_ON_START     = 'run_smart_on_start'
+    SMART_HEALTH_INTERVAL = 'smart_health_check_interval'
+    SMART_HEALTH_WORKERS  = 'smart_health_workers'
+    SERVICE_RECONCILE_INTERVAL = 'service_reconcile_interval'
     SYSTEM_INFORMATION = 'SYSTEM_INFORMATION'
     SETUP              = 'setup'
 
@@ -112,9 +116,8 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
         # Mapping of services and their status'
         self._service_status = {}
 
-        self._monitored_services = []
-        self._inactive_services  = []
-        self._wildcard_services  = []
+        # Tracker of the monitored services, set up in run()
+        self._units = None
 
         # Mapping of current service PIDs
         self._service_pids = {}
@@ -155,6 +158,20 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
         self._smart_supported = self._is_smart_supported()
         self._log_debug(f"SystemdWatchdog, SMART supported: {self._smart_supported}")
 
+        # Health checks run on their own workers and interval, apart from the dbus loop
+        self._smart_health = SmartHealthEngine(
+            self._conf_reader._get_value_with_default(self.SYSTEMDWATCHDOG,
+                                                      self.SMART_HEALTH_WORKERS, 4),
+            self._conf_reader._get_value_with_default(self.SYSTEMDWATCHDOG,
+                                                      self.SMART_HEALTH_INTERVAL, 60))
+
+        # Services are followed with systemd signals, all of them are only
+        #  listed again every reconcile interval in case a signal was missed
+        self._reconcile_interval = int(self._conf_reader._get_value_with_default(
+                                            self.SYSTEMDWATCHDOG,
+                                            self.SERVICE_RECONCILE_INTERVAL,
+                                            SystemdUnitTracker.RECONCILE_INTERVAL))
+
         # Dict of drives by-id symlink from systemd
         self._drive_by_id = {}
 
@@ -208,7 +225,8 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
         if self._existing_drive is None:
             self._existing_drive = {}
             store.put(self._existing_drive, self.disk_cache_path)
-
+        # Fault map as last written to the cache
+        self._saved_drive = dict(self._existing_drive)
 
         # Integrate into the main dbus loop to catch events
         DBusGMainLoop(set_as_default=True)
@@ -244,12 +262,6 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
             # Connect to dbus system wide
             self._bus = SystemBus()
 
-            # Get an instance of systemd1
-            systemd = self._bus.get_object("org.freedesktop.systemd1", "/org/freedesktop/systemd1")
-
-            # Use the systemd object to get an interface to the Manager
-            self._manager = Interface(systemd, dbus_interface='org.freedesktop.systemd1.Manager')
-
             # Obtain a disk manager interface for monitoring drives
             disk_systemd = self._bus.get_object('org.freedesktop.UDisks2', '/org/freedesktop/UDisks2')
             self._disk_manager = Interface(disk_systemd, dbus_interface='org.freedesktop.DBus.ObjectManager')
@@ -274,83 +286,45 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
                         self._send_msg(self.DISK_INSERTED_ALERT_TYPE, resource_type, resource_id, specific_info)
                         self._existing_drive.update({drive_path: False})
                 self._update_drive_faults()
-                store.put(self._existing_drive, self.disk_cache_path)
-
-            # Read in the list of services to monitor
-            self._monitored_services = self._get_monitored_services()
+                self._save_existing_drive()
 
-            # Retrieve a list of all the service units
-            units = self._manager.ListUnits()
-
-            # Update the list of monitored services with wildcard entries
-            self._add_wildcard_services()
+            # Retrieve the main loop which will be called in the run method
+            self._loop = gobject.MainLoop()
 
-            #  Start out assuming their all inactive
-            self._inactive_services = list(self._monitored_services)
+            # Follow the services to monitor with systemd signals
+            self._units = SystemdUnitTracker(self._bus, self._loop.get_context(),
+                                             self._get_monitored_services(),
+                                             self._on_service_changed,
+                                             self._reconcile_interval)
 
             logger.info("Monitoring the following services listed in /etc/sspl.conf:")
-            for unit in units:
+            for unit in self._units.start():
+                logger.debug(f"    {unit.name}")
 
-                if ".service" in unit[0]:
-                    unit_name = unit[0]
+                # Update the mapping of current pids
+                self._service_pids[unit.name] = unit.pid
 
-                    # Apply the filter from config file if present
-                    if self._monitored_services:
-                        if unit_name not in self._monitored_services:
-                            continue
-                    logger.debug(f"    {unit_name}")
-
-                    # Retrieve an object representation of the systemd unit
-                    unit = self._bus.get_object('org.freedesktop.systemd1',
-                                                self._manager.GetUnit(unit_name))
-
-                    state = unit.Get('org.freedesktop.systemd1.Unit', 'ActiveState',
-                             dbus_interface='org.freedesktop.DBus.Properties')
-
-                    substate = unit.Get('org.freedesktop.systemd1.Unit', 'SubState',
-                             dbus_interface='org.freedesktop.DBus.Properties')
-
-                    self._service_status[str(unit_name)] = str(state) + ":" + str(substate)
-
-                    # Remove it from our inactive list; it's alive and well
-                    if state == "active":
-                        if unit_name in self._inactive_services:
-                            self._inactive_services.remove(unit_name)
-
-                    # Use the systemd unit to get an Interface to call methods
-                    Iunit = Interface(unit,
-                                      dbus_interface='org.freedesktop.systemd1.Manager')
-
-                    # Connect the PropertiesChanged signal to the unit and assign a callback
-                    Iunit.connect_to_signal('PropertiesChanged',
-                                            lambda a, b, c, p = unit :
-                                            self._on_prop_changed(a, b, c, p),
-                                            dbus_interface=dbus.PROPERTIES_IFACE)
-
-                    # Get the current PID of the service
-                    curr_pid = self._get_service_pid(unit)
-
-                    # Update the mapping of current pids
-                    self._service_pids[str(unit_name)] = curr_pid
-
-                    # Setting service_request to 'status' will case msg handler to retrieve current values
-                    msgString = json.dumps({"actuator_request_type": {
-                                    "service_watchdog_controller": {
-                                        "service_name" : unit_name,
-                                        "service_request" : "None",
-                                        "state" : state,
-                                        "previous_state" : "N/A",
-                                        "substate" : substate,
-                                        "previous_substate" : "N/A",
-                                        "pid" : curr_pid,
-                                        "previous_pid" : "N/A"
-                                        }
-                                    }
-                                 })
-                    self._write_internal_msgQ(ServiceMsgHandler.name(), msgString)
+                # Services not loaded are reported once they get started
+                if unit.path is None:
+                    continue
 
-            # Retrieve the main loop which will be called in the run method
-            self._loop = gobject.MainLoop()
+                self._service_status[unit.name] = f"{unit.state}:{unit.substate}"
+
+                # Setting service_request to 'status' will case msg handler to retrieve current values
+                msgString = MsgEnvelope({"actuator_request_type": {
+                                "service_watchdog_controller": {
+                                    "service_name" : unit.name,
+                                    "service_request" : "None",
+                                    "state" : unit.state,
+                                    "previous_state" : "N/A",
+                                    "substate" : unit.substate,
+                                    "previous_substate" : "N/A",
+                                    "pid" : unit.pid,
+                                    "previous_pid" : "N/A"
+                                    }
+                                }
+                             })
+                self._write_internal_msgQ(ServiceMsgHandler.name(), msgString)
 
             # Initialize the gobject threads and get its context
             gobject.threads_init()
@@ -363,29 +337,22 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
             self._set_debug_persist(True)
 
             # Loop forever iterating over the context
-            step = 0
             while self._running == True:
                 context.iteration(False)
                 time.sleep(self._thread_sleep)
 
-                if len(self._inactive_services) > 0:
-                    self._examine_inactive_services()
+                # Read the services signals left unsure of, and all of them now and then
+                self._units.process()
 
                 # Perform SMART tests and refresh drive list on a regular interval
                 if datetime.now() > self._next_smart_tm:
                     self._init_drives(stagger=True)
 
-                # Search for new wildcard services suddenly appearing, ie m0d@<fid>
-                step += 1
-                if len(self._wildcard_services) > 0 and step >= 15:
-                    step : int = 0
-                    self._search_new_services()
-
                 # Process any msgs sent to us
                 self._check_msg_queue()
                 with self._drive_info_lock:
                     self._update_drive_faults()
-                    store.put(self._existing_drive, self.disk_cache_path)
+                    self._save_existing_drive()
 
                 # Safe guard to slow the thread down after busy exp resets
                 # self._thread_speed_safeguard += 1
@@ -488,7 +455,7 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
                     # Create the request to be sent back
                     request = f"SMART_TEST: {jsonMsg_serial_number}"
                     # Send an Ack msg back with SMART results as Unsupported
-                    json_msg = AckResponseMsg(request, self.SMART_STATUS_UNSUPPORTED, "").getJson()
+                    json_msg = AckResponseMsg(request, self.SMART_STATUS_UNSUPPORTED, "").getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
                     return
 
@@ -540,7 +507,7 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
                                 response = "Failed"
 
                                 # Send an Ack msg back with SMART results
-                                json_msg = AckResponseMsg(request, response, uuid).getJson()
+                                json_msg = AckResponseMsg(request, response, uuid).getEnvelope()
                                 self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
                                 # Remove from our list if it's present
@@ -551,54 +518,6 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
                         except Exception as e:
                             self._log_debug(f"_process_msg, Exception: {e}")
 
-    def _add_wildcard_services(self):
-        """Update the list of monitored services with wildcard entries"""
-        units = self._manager.ListUnits()
-        try:
-            # Look for wildcards in monitored services list and expandit
-            examined_services = copy.deepcopy(self._monitored_services)
-            for service in examined_services:
-                if "*" in service:
-                    # Remove service name from monitored_services and add to wildcard services list
-                    self._monitored_services.remove(service)
-                    self._wildcard_services.append(service)
-                    logger.info(f"Processing wildcard service: {service}")
-
-                    # Search thru list of services on the system that match the starting chars
-                    start_chars = service.split("*")[0]
-                    logger.info(f"Searching for services starting with: {start_chars}")
-                    for unit in units:
-                        unit_name = str(unit[0]).split("/")[-1]
-                        if unit_name.startswith(start_chars):
-                            logger.info(f"    {unit_name}")
-                            self._monitored_services.append(unit_name)
-        except Exception as ae:
-            logger.exception(ae)
-
-    def _search_new_services(self):
-        """Look for any new wildcard services, ie m0d@<fid>"""
-        units = self._manager.ListUnits()
-        #logger.info("Searching for new services")
-        #logger.info("inactive_services: %s" % str(self._inactive_services))
-        #logger.info("monitored_services: %s" % str(self._monitored_services))
-        #logger.info("wildcard_services: %s" % str(self._wildcard_services))
-
-        try:
-            for service in self._wildcard_services:
-                # Search thru list of services on the system that match the starting chars
-                start_chars = service.split("*")[0]
-                for unit in units:
-                    unit_name = str(unit[0]).split("/")[-1]
-
-                    if unit_name.startswith(start_chars) and \
-                       unit_name not in self._monitored_services and \
-                       unit_name not in self._inactive_services:
-                        logger.info(f"Adding newly found wildcard service: {unit_name}")
-                        self._inactive_services.append(unit_name)
-
-        except Exception as ae:
-            logger.exception(ae)
-
     def _update_by_id_paths(self):
         """Updates the global dict of by-id symlinks for each drive"""
 
@@ -696,7 +615,7 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
                     serial_number == uuid_serial_number:
 
                     # Send an Ack msg back with SMART results
-                    json_msg = AckResponseMsg(request, ack_response, smart_uuid).getJson()
+                    json_msg = AckResponseMsg(request, ack_response, smart_uuid).getEnvelope()
                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
                     # Remove from our list
@@ -820,145 +739,49 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
         # Update the next time to run SMART tests
         self._next_smart_tm = datetime.now() + timedelta(seconds=self._smart_interval)
 
-    def _examine_inactive_services(self):
-        """See if an inactive service has been successfully started
-            and if so attach a callback method to its properties
-            to detect changes
-        """
-        examined_services = copy.deepcopy(self._inactive_services)
-        for disabled_service in examined_services:
-            # Retrieve an object representation of the systemd unit
-            unit = self._bus.get_object('org.freedesktop.systemd1',
-                                        self._manager.LoadUnit(disabled_service))
-
-            state = unit.Get('org.freedesktop.systemd1.Unit', 'ActiveState',
-                             dbus_interface='org.freedesktop.DBus.Properties')
-
-            substate = unit.Get('org.freedesktop.systemd1.Unit', 'SubState',
-                             dbus_interface='org.freedesktop.DBus.Properties')
-
-            if state == "active":
-                self._log_debug(f"Service: {disabled_service} is now active and being monitored!")
-                self._service_status[str(disabled_service)] = str(state) + ":" + str(substate)
-
-                # Use the systemd unit to get an Interface to call methods
-                Iunit = Interface(unit,
-                                  dbus_interface='org.freedesktop.systemd1.Manager')
-
-                # Connect the PropertiesChanged signal to the unit and assign a callback
-                Iunit.connect_to_signal('PropertiesChanged',
-                                         lambda a, b, c, p = unit :
-                                         self._on_prop_changed(a, b, c, p),
-                                         dbus_interface=dbus.PROPERTIES_IFACE)
-
-                # Remove the service from the inactive list and add it to our currently monitored list
-                self._inactive_services.remove(disabled_service)
-                if disabled_service not in self._monitored_services:
-                    self._monitored_services.append(disabled_service)
-
-                # Get the current PID of the service
-                curr_pid = self._get_service_pid(unit)
-
-                # Retrieve the previous pid of the service
-                prev_pid = self._service_pids.get(str(disabled_service), "N/A")
-
-                # Update the mapping of current pids
-                self._service_pids[str(disabled_service)] = curr_pid
-
-                # Send out notification of the state change
-                msgString = json.dumps({"actuator_request_type": {
-                                    "service_watchdog_controller": {
-                                        "service_name" : disabled_service,
-                                        "service_request" : "None",
-                                        "state" : state,
-                                        "previous_state" : "inactive",
-                                        "substate" : substate,
-                                        "previous_substate" : "dead",
-                                        "pid" : curr_pid,
-                                        "previous_pid" : prev_pid
-                                        }
-                                    }
-                                 })
-                self._write_internal_msgQ(ServiceMsgHandler.name(), msgString)
-
-        if len(self._inactive_services) == 0:
-            self._log_debug("Successfully monitoring all services now!")
-
-    def _get_service_pid(self, unit):
-        """Returns the current PID of the service"""
-        # Get the interface for the unit
-        Iunit = Interface(unit, dbus_interface='org.freedesktop.DBus.Properties')
-
-        curr_pid = Iunit.Get('org.freedesktop.systemd1.Service', 'ExecMainPID')
-        return str(curr_pid)
-
-    def _get_prop_changed(self, unit, interface, prop_name, changed_properties, invalidated_properties):
-        """Retrieves the property that changed"""
-        if prop_name in invalidated_properties:
-            return unit.Get(interface, prop_name, dbus_interface=dbus.PROPERTIES_IFACE)
-        elif prop_name in changed_properties:
-            return changed_properties[prop_name]
-        else:
-            return None
-
-    def _on_prop_changed(self, interface, changed_properties, invalidated_properties, unit):
+    def _on_service_changed(self, unit, previous):
         """Callback to handle state changes in services"""
-        # We currently only care about the unit interface
-        if interface != 'org.freedesktop.systemd1.Unit':
-            return
-
-        # Get the interface for the unit
-        Iunit = Interface(unit, dbus_interface='org.freedesktop.DBus.Properties')
-
-        # Always call methods on the interface not the actual object
-        unit_name = str(Iunit.Get(interface, "Id"))
-
-        # Get the state and substate for the service
-        state = self._get_prop_changed(unit, interface, "ActiveState",
-                                       changed_properties, invalidated_properties)
-
-        substate = self._get_prop_changed(unit, interface, "SubState",
-                                          changed_properties, invalidated_properties)
-
-        # Compare prev to curr pids to see if the service restarted abruptly
-        curr_pid = self._get_service_pid(unit)
-
         # Retrieve the previous pid of the service
-        prev_pid = self._service_pids.get(unit_name, "N/A")
+        prev_pid = self._service_pids.get(unit.name, "N/A")
 
         # Update the mapping of current pids
-        self._service_pids[unit_name] = curr_pid
+        self._service_pids[unit.name] = unit.pid
 
         # The state can change from an incoming json msg to the service msg handler
         #  This provides a catch to make sure that we don't send redundant msgs
-        if self._service_status.get(unit_name, "") == str(state) + ":" + str(substate):
-            #self._log_debug("_on_prop_changed, No service state change detected: %s" % unit_name)
-            #self._log_debug("\tstate: %s, substate: %s" % (state, substate))
+        status = f"{unit.state}:{unit.substate}"
+        if self._service_status.get(unit.name, "") == status:
             return
 
-        self._log_debug(f"_on_prop_changed, Service state change detected on unit: {unit_name}")
+        self._log_debug("_on_service_changed, Service state change detected on unit: %s", unit.name)
 
-        # get the previous state and substate for the service
-        previous_state = self._service_status.get(unit_name, "N/A:N/A").split(":")[0]
-        previous_substate = self._service_status.get(unit_name, "N/A:N/A").split(":")[1]
+        # get the previous state and substate for the service, services
+        #  not loaded before were inactive
+        if unit.name in self._service_status:
+            previous_state, previous_substate = self._service_status[unit.name].split(":")
+        elif previous is not None:
+            previous_state, previous_substate = previous.state, previous.substate
+        else:
+            previous_state, previous_substate = "N/A", "N/A"
 
-        self._log_debug(f"_on_prop_changed, State: {state}, Substate: {substate}")
-        self._log_debug(f"_on_prop_changed, Previous State: {previous_state}, Previous Substate: {previous_substate}")
+        self._log_debug("_on_service_changed, State: %s, Substate: %s", unit.state, unit.substate)
+        self._log_debug("_on_service_changed, Previous State: %s, Previous Substate: %s",
+                        previous_state, previous_substate)
 
         # Update the state in the global dict for later use
-        self._service_status[unit_name] = str(state) + ":" + str(substate)
+        self._service_status[unit.name] = status
 
         # Notify the service message handler to transmit the status of the service
-        msgString = json.dumps(
+        msgString = MsgEnvelope(
                     {"actuator_request_type": {
                         "service_watchdog_controller": {
-                            "service_name" : unit_name,
+                            "service_name" : unit.name,
                             "service_request" : "None",
-                            "state" : state,
+                            "state" : unit.state,
                             "previous_state" : previous_state,
-                            "substate" : substate,
+                            "substate" : unit.substate,
                             "previous_substate" : previous_substate,
-                            "pid" : curr_pid,
+                            "pid" : unit.pid,
                             "previous_pid" : prev_pid
                             }
                         }
@@ -1006,7 +829,7 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
                     # Update cache with latest info
                     self._existing_drive.update({object_path: False})
                     self._update_drive_faults()
-                    store.put(self._existing_drive, self.disk_cache_path)
+                    self._save_existing_drive()
 
             # Handle jobs like SMART tests being initiated
             elif interfaces_and_properties.get("org.freedesktop.UDisks2.Job") is not None:
@@ -1065,8 +888,9 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
 
                         # Update cache with latest info
                         del self._existing_drive[object_path]
+                        self._smart_health.forget(object_path)
                         self._update_drive_faults()
-                        store.put(self._existing_drive, self.disk_cache_path)
+                        self._save_existing_drive()
 
                 # Handle jobs completed like SMART tests
                 elif interface == "org.freedesktop.UDisks2.Job":
@@ -1133,7 +957,7 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
                                     serial_number == uuid_serial_number:
 
                                     # Send an Ack msg back with SMART results
-                                    json_msg = AckResponseMsg(request, response, smart_uuid).getJson()
+                                    json_msg = AckResponseMsg(request, response, smart_uuid).getEnvelope()
                                     self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
                                     # Remove from our list
@@ -1217,7 +1041,7 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
                     "specific_info": specific_info
                     }
                 }
-        logger.info(f"RAAL: {msg}")
+        logger.info("RAAL: %s", msg)
         # Send the event to disk message handler to generate json message
         self._write_internal_msgQ(DiskMsgHandler.name(), msg)
 
@@ -1352,28 +1176,26 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
         if not self._smart_supported:
             return
 
-        for object_path in self._drives.keys():
+        # Queue checks of the drives which are due, then act on the finished ones
+        self._smart_health.schedule({object_path: (self._drive_by_device_name[object_path],
+                                                   not self._drives[object_path].get("node_disk"))
+                                     for object_path in self._drives.keys()
+                                     if object_path in self._drive_by_device_name})
+
+        for result in self._smart_health.collect():
+            object_path = result.drive
+
+            # Drive went away while it was being checked
+            if object_path not in self._drives or object_path not in self._existing_drive:
+                continue
 
             # To handle case when drvie is removed, but interface_removed function is not yet
             # called, so drive will be still in self._drives, but smartctl command will fail as
             # device is removed.
-            if not self._drives[object_path]["node_disk"]:
-                cmd = f"sudo smartctl -d scsi -H {self._drive_by_device_name[object_path]} --json"
-            else:
-                cmd = f"sudo smartctl -H {self._drive_by_device_name[object_path]} --json"
-            response, _, _ = self._run_command(cmd)
-            response = json.loads(response)
-            try:
-                if "No such device" in response["smartctl"]["message"][0]["string"]:
-                    logger.debug(f"SystemdWatchdog, _update_drive_faults, drive {object_path} is removed, ignoring SMART test")
-                    continue
-            # If smratctl command is not failing there will be no ["smartctl"]["message"][0]["string"] in response
-            except (KeyError, IndexError):
-                try:
-                    is_drive_faulty = not response['smart_status']['passed']
-                # If ['smart_status']['passed'] not present in response, consider it as fault
-                except KeyError:
-                    is_drive_faulty = True
+            if result.removed:
+                logger.debug(f"SystemdWatchdog, _update_drive_faults, drive {object_path} is removed, ignoring SMART test")
+                continue
+            is_drive_faulty = result.faulty
 
             if not self._existing_drive[object_path] and is_drive_faulty:
                 self._existing_drive[object_path] = True
@@ -1399,6 +1221,12 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
                                specific_info)
             # else no change
 
+    def _save_existing_drive(self):
+        """Write the drive fault map to the cache if it changed"""
+        if self._existing_drive != self._saved_drive:
+            store.put(self._existing_drive, self.disk_cache_path)
+            self._saved_drive = dict(self._existing_drive)
+
     def _is_drive_faulty(self, path):
         if not self._drives[path]["node_disk"]:
             cmd = f"sudo smartctl -d scsi -H {self._drive_by_device_name[path]} --json"
@@ -1444,6 +1272,7 @@ class SystemdWatchdog(SensorThread, InternalMsgQ):
 
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread"""
+        self._smart_health.shutdown()
         super(SystemdWatchdog, self).shutdown()
 
 def is_physical_drive(interfaces_and_property):
@@ -23,6 +23,7 @@ import json
 
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 
 # Modules that receive messages from this module
@@ -229,7 +230,7 @@ class SNMPtraps(SensorThread, InternalMsgQ):
     def _log_iem(self, json_data):
         """Create IEM and send to logging msg handler"""
         log_msg = f"IEC: 020004001: SNMP Trap Received, {self._trap_name}"
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
                     {"actuator_request_type" : {
                         "logging": {
                             "log_level": "LOG_WARNING",
@@ -245,7 +246,7 @@ class SNMPtraps(SensorThread, InternalMsgQ):
     def _transmit_json_msg(self, json_data):
         """Transmit message to halon by passing it to egress msg handler"""
         json_data["trapName"] = self._trap_name
-        json_msg = SNMPtrapMsg(json_data).getJson()
+        json_msg = SNMPtrapMsg(json_data).getEnvelope()
         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
     def _get_config(self):
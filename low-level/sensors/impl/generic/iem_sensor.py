@@ -16,23 +16,19 @@
 """
  ****************************************************************************
   Description:       Reads IEMs from RSyslog filtered file and sends
-                    to RabbitMQ sensor channel.
+                    to RabbitMQ sensor channel. Follows the file from a
+                    checkpointed byte offset as it grows and rotates.
   ****************************************************************************
 """
 import errno
-import select
-import subprocess
-import datetime
 import os
-import csv
 import time
-import threading
-
-from functools import lru_cache
 
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
 from framework.base.sspl_constants import iem_severity_types, iem_source_types, iem_severity_to_alert_mapping, COMMON_CONFIGS
+from framework.utils.iec_mapping import IecMapping
+from framework.utils.log_tail import LogTailer
 from framework.utils.service_logging import logger
 from framework.base.sspl_constants import PRODUCT_FAMILY
 
@@ -50,6 +46,9 @@ class IEMSensor(SensorThread, InternalMsgQ):
     # Keys for config settings
     LOG_FILE_PATH_KEY = "log_file_path"
     TIMESTAMP_FILE_PATH_KEY = "timestamp_file_path"
+    CHECKPOINT_FILE_PATH_KEY = "checkpoint_file_path"
+    CHECKPOINT_LINES_KEY = "checkpoint_lines"
+    CHECKPOINT_INTERVAL_KEY = "checkpoint_interval"
     SITE_ID_KEY = "site_id"
     RACK_ID_KEY = "rack_id"
     NODE_ID_KEY = "node_id"
@@ -58,6 +57,9 @@ class IEMSensor(SensorThread, InternalMsgQ):
     # Default values for config  settings
     DEFAULT_LOG_FILE_PATH = f"/var/log/{PRODUCT_FAMILY}/iem/iem_messages"
     DEFAULT_TIMESTAMP_FILE_PATH = f"/var/{PRODUCT_FAMILY}/sspl/data/iem/last_processed_msg_time"
+    DEFAULT_CHECKPOINT_FILE_PATH = f"/var/{PRODUCT_FAMILY}/sspl/data/iem/checkpoint"
+    DEFAULT_CHECKPOINT_LINES = 1000
+    DEFAULT_CHECKPOINT_INTERVAL = 5
     DEFAULT_SITE_ID = "001"
     DEFAULT_RACK_ID = "001"
     DEFAULT_NODE_ID = "001"
@@ -110,8 +112,9 @@ class IEMSensor(SensorThread, InternalMsgQ):
         self._rack_id = None
         self._node_id = None
         self._cluster_id = None
-        self._iem_logs = None
-        self._iem_log_file_lock = threading.Lock()
+        self._tailer = None
+        self._iec_mapping = None
+        self._last_processed_log_timestamp = None
 
     def initialize(self, conf_reader, msgQlist, products):
         """initialize configuration reader and internal msg queues"""
@@ -131,6 +134,22 @@ class IEMSensor(SensorThread, InternalMsgQ):
             self.SENSOR_NAME.upper(), self.TIMESTAMP_FILE_PATH_KEY,
             self.DEFAULT_TIMESTAMP_FILE_PATH)
 
+        # The position in the log file is saved every checkpoint_lines
+        # lines or checkpoint_interval seconds
+        self._checkpoint_file_path = self._conf_reader._get_value_with_default(
+            self.SENSOR_NAME.upper(), self.CHECKPOINT_FILE_PATH_KEY,
+            self.DEFAULT_CHECKPOINT_FILE_PATH)
+
+        self._checkpoint_lines = int(self._conf_reader._get_value_with_default(
+            self.SENSOR_NAME.upper(), self.CHECKPOINT_LINES_KEY,
+            self.DEFAULT_CHECKPOINT_LINES))
+
+        self._checkpoint_interval = int(self._conf_reader._get_value_with_default(
+            self.SENSOR_NAME.upper(), self.CHECKPOINT_INTERVAL_KEY,
+            self.DEFAULT_CHECKPOINT_INTERVAL))
+
+        self._iec_mapping = IecMapping(self.IEC_MAPPING_DIR_PATH)
+
         self._site_id = self._conf_reader._get_value_with_default(
             self.SYSTEM_INFORMATION.upper(), COMMON_CONFIGS.get(self.SYSTEM_INFORMATION.upper()).get(self.SITE_ID_KEY), self.DEFAULT_SITE_ID)
 
@@ -157,25 +176,23 @@ class IEMSensor(SensorThread, InternalMsgQ):
         # Check for debug mode being activated
         self._read_my_msgQ_noWait()
         try:
-            with self._iem_log_file_lock:
-                self._iem_logs = open(self._log_file_path)
-            self._create_file(self._timestamp_file_path)
-
-            with open(self._timestamp_file_path, "r") as timestamp_file:
-                last_processed_log_timestamp = timestamp_file.read().strip()
-
-            # Read and send unprocessed messages
-            with self._iem_log_file_lock:
-                for iem_log in self._iem_logs:
-                    log = iem_log.rstrip()
-                    log_timestamp = log[:log.index(" ")]
-                    if not last_processed_log_timestamp or log_timestamp > last_processed_log_timestamp:
-                        self._process_iem(log)
+            if self._tailer is None:
+                os.makedirs(os.path.dirname(self._checkpoint_file_path), exist_ok=True)
+                self._tailer = LogTailer(self._log_file_path, self._checkpoint_file_path)
+                if not self._tailer.has_checkpoint:
+                    # Without a checkpoint skip the messages processed
+                    # before, as saved by earlier versions
+                    self._create_file(self._timestamp_file_path)
+                    with open(self._timestamp_file_path, "r") as timestamp_file:
+                        self._last_processed_log_timestamp = timestamp_file.read().strip()
+                else:
+                    self._last_processed_log_timestamp = \
+                        self._tailer.checkpointed().get("timestamp")
 
             # Reset debug mode if persistence is not enabled
             self._disable_debug_if_persist_false()
 
-            # Read new messages
+            # Read unprocessed and new messages
             self._read_iem()
 
         except IOError as io_error:
@@ -192,9 +209,9 @@ class IEMSensor(SensorThread, InternalMsgQ):
 
     def _read_iem(self):
         try:
-            with self._iem_log_file_lock:
-                for iem_log in self._iem_logs:
-                    self._process_iem(iem_log.rstrip())
+            self._process_new_iems()
+            # Wait for the log file to change
+            self._tailer.wait(10)
         except IOError as io_error:
             if io_error.errno == errno.ENOENT:
                 logger.error(f"IEMSensor, self._read_iem, {io_error.args} {io_error.filename}")
@@ -202,10 +219,43 @@ class IEMSensor(SensorThread, InternalMsgQ):
                 logger.error(f"IEMSensor, self._read_iem, {io_error.args} {io_error.filename}")
             else:
                 logger.error(f"IEMSensor, self._read_iem, {io_error.args} {io_error.filename}")
+            time.sleep(10)
         except Exception as exception:
             logger.error(f"IEMSensor, self._read_iem, {exception.args}")
+            time.sleep(10)
+        finally:
+            self._scheduler.enter(0, self._priority, self._read_iem, ())
+
+    def _process_new_iems(self):
+        """Process the lines appended to the log file, saving the position
+            reached every checkpoint_lines lines or checkpoint_interval secs"""
+        processed = 0
+        last_checkpoint = time.time()
+        try:
+            for iem_log in self._tailer.lines():
+                if not iem_log.strip():
+                    continue
+                log_timestamp = iem_log[:iem_log.find(" ")]
+                if self._last_processed_log_timestamp and \
+                    log_timestamp <= self._last_processed_log_timestamp and \
+                    not self._tailer.has_checkpoint:
+                    continue
+                try:
+                    self._process_iem(iem_log)
+                    self._last_processed_log_timestamp = log_timestamp
+                except Exception as exception:
+                    logger.error(f"IEMSensor, unable to process {iem_log}, {exception.args}")
+                processed += 1
+                if processed >= self._checkpoint_lines or \
+                    time.time() - last_checkpoint >= self._checkpoint_interval:
+                    self._checkpoint()
+                    processed = 0
+                    last_checkpoint = time.time()
         finally:
-            self._scheduler.enter(10, self._priority, self._read_iem, ())
+            self._checkpoint()
+
+    def _checkpoint(self):
+        self._tailer.checkpoint({"timestamp": self._last_processed_log_timestamp})
 
     def _process_iem(self, iem_log):
         log_timestamp = iem_log[:iem_log.index(" ")]
@@ -214,8 +264,6 @@ class IEMSensor(SensorThread, InternalMsgQ):
         if iem_components:
             logger.debug("IEM mesage {} {}".format(log_timestamp, iem_components))
             self._send_msg(iem_components, log_timestamp)
-        with open(self._timestamp_file_path, "w") as timestamp_file:
-            timestamp_file.write(log_timestamp)
 
     def _send_msg(self, iem_components, log_timestamp):
         """Creates JSON message from iem components and sends to RabbitMQ
@@ -279,44 +327,14 @@ class IEMSensor(SensorThread, InternalMsgQ):
             "IEC": "".join(iem_components[:-1])
         }
         iem_data_msg = IEMDataMsg(info)
-        json_msg = iem_data_msg.getJson()
+        json_msg = iem_data_msg.getEnvelope()
         # RAAL stands for - RAise ALert
-        logger.info(f"RAAL: {json_msg}")
+        logger.info("RAAL: %s", json_msg)
         self._write_internal_msgQ(RabbitMQegressProcessor.name(), json_msg)
 
-    def _get_component(self, component):
-        "Decode a component"
-        if os.path.exists(f"{self.IEC_MAPPING_DIR_PATH}/components"):
-            with open(f"{self.IEC_MAPPING_DIR_PATH}/components", newline='') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if component == row[0]:
-                        return row[1]
-                else:
-                    return None
-        else:
-            return None
-
-
-    @lru_cache(maxsize=32)
     def _decode_msg(self, code):
         "Decode a msg"
-
-        component_id, module_id, event_id = code[:3], code[3:6], code[6:]
-        component = self._get_component(component_id)
-        if component:
-            if os.path.exists(f"{self.IEC_MAPPING_DIR_PATH}/{component}"):
-                with open(f"{self.IEC_MAPPING_DIR_PATH}/{component}", newline='') as f:
-                    reader = csv.reader(f)
-                    for row in reader:
-                        if code == row[0]:
-                            return component, row[1], row[2]
-                    else:
-                       return component, module_id, event_id
-            else:
-                return component, module_id, event_id
-        else:
-            return component_id, module_id, event_id
+        return self._iec_mapping.decode(code)
 
     def _get_iem(self, log):
         """Returns a string starting from the word <IEC> from a syslog
@@ -417,12 +435,12 @@ class IEMSensor(SensorThread, InternalMsgQ):
             return None
 
     def refresh_file(self):
-        if os.path.exists(self._log_file_path):
-            with self._iem_log_file_lock:
-                if self._iem_logs:
-                    self._iem_logs.close()
-                    self._iem_logs = open(self._log_file_path)
+        """Called once the log file was rotated. The tailer notices rotation
+        by itself when it next reads the file."""
+        logger.debug(f"IEMSensor, {self._log_file_path} was rotated")
 
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread"""
         super(IEMSensor, self).shutdown()
+        if self._tailer is not None:
+            self._tailer.close()
@@ -23,9 +23,6 @@ import os
 import math
 import socket
 import psutil
-import threading
-import subprocess as sp
-import re
 import errno
 
 from datetime import datetime
@@ -38,6 +35,8 @@ from sensors.INode_data import INodeData
 from framework.utils.sysfs_interface import SysFS
 from framework.utils.tool_factory import ToolFactory
 from framework.utils.config_reader import ConfigReader
+from framework.utils.proc_sampler import ProcSampler
+from framework.utils.if_monitor import InterfaceMonitor, BmcMonitor
 
 @implementer(INodeData)
 class NodeData(Debug):
@@ -47,7 +46,14 @@ class NodeData(Debug):
     SENSOR_NAME = "NodeData"
 
     # conf attribute initialization
+    NODEDATA = 'NODEDATA'
     PROBE = 'probe'
+    SAMPLING_INTERVAL = 'sampling_interval'
+    DEFAULT_SAMPLING_INTERVAL = 1
+    BMC_ADDRESS_TTL = 'bmc_address_ttl'
+    DEFAULT_BMC_ADDRESS_TTL = 300
+    BMC_PING_INTERVAL = 'bmc_ping_interval'
+    DEFAULT_BMC_PING_INTERVAL = 60
 
     @staticmethod
     def name():
@@ -62,17 +68,19 @@ class NodeData(Debug):
         # Total number of CPUs
         self.cpus = psutil.cpu_count()
 
-        # Calculate the load averages on separate blocking threads
-        self.load_1min_average  = []
-        self.load_5min_average  = []
-        self.load_15min_average = []
         self.prev_bmcip = None
-        load_1min_avg  = threading.Thread(target=self._load_1min_avg).start()
-        load_5min_avg  = threading.Thread(target=self._load_5min_avg).start()
-        load_15min_avg = threading.Thread(target=self._load_15min_avg).start()
 
         self.conf_reader = ConfigReader()
 
+        # Cpu, memory, network and disk space are sampled in the background,
+        # keeping rolling averages of the load of every core
+        sampling_interval = float(self.conf_reader._get_value_with_default(
+                                              self.NODEDATA,
+                                              self.SAMPLING_INTERVAL,
+                                              self.DEFAULT_SAMPLING_INTERVAL))
+        self._sampler = ProcSampler(sampling_interval)
+        self._sampler.start()
+
         nw_fault_utility = self.conf_reader._get_value_with_default(
                                               self.name().capitalize(),
                                               self.PROBE,
@@ -94,6 +102,14 @@ class NodeData(Debug):
         except Exception as err:
             logger.error(f'NodeData, Problem occured while getting the instance of {nw_fault_utility}')
 
+        # Interfaces are read again only when their link or address changes
+        self._if_monitor = InterfaceMonitor(self.fetch_nw_cable_conn_status)
+        self._bmc_monitor = BmcMonitor(
+                        int(self.conf_reader._get_value_with_default(self.NODEDATA,
+                                    self.BMC_ADDRESS_TTL, self.DEFAULT_BMC_ADDRESS_TTL)),
+                        int(self.conf_reader._get_value_with_default(self.NODEDATA,
+                                    self.BMC_PING_INTERVAL, self.DEFAULT_BMC_PING_INTERVAL)))
+
     def read_data(self, subset, debug, units="MB"):
         """Updates data based on a subset"""
         self._set_debug(debug)
@@ -146,38 +162,34 @@ class NodeData(Debug):
         """Retrieves node information for the host_update json message"""
         logged_in_users = []
         uname_keys = ("sysname", "nodename", "version", "release", "machine")
+        sample = self._sampler.latest()
         self.up_time         = int(psutil.boot_time())
         self.boot_time       = self._epoch_time
         self.uname           = dict(zip(uname_keys, os.uname()))
-        self.total_memory = dict(psutil.virtual_memory()._asdict())
+        self.total_memory = dict(sample.memory)
         self.process_count   = len(psutil.pids())
         for users in psutil.users():
             logged_in_users.append(dict(users._asdict()))
         self.logged_in_users = logged_in_users
-        # Calculate the current number of running processes at this moment
-        total_running_proc = 0
-        for proc in psutil.process_iter():
-            pinfo = proc.as_dict(attrs=['status'])
-            if pinfo['status'] not in (psutil.STATUS_ZOMBIE, psutil.STATUS_DEAD,
-                                       psutil.STATUS_STOPPED, psutil.STATUS_IDLE,
-                                       psutil.STATUS_SLEEPING):
-                total_running_proc += 1
-        self.running_process_count = total_running_proc
+        # Number of running and blocked processes from the last sample
+        self.running_process_count = sample.procs_running
 
     def _get_local_mount_data(self):
         """Retrieves node information for the local_mount_data json message"""
-        self.total_space = int(psutil.disk_usage("/")[0])//int(self.units_factor)
-        self.free_space  = int(psutil.disk_usage("/")[2])//int(self.units_factor)
-        self.total_swap  = int(psutil.swap_memory()[0])//int(self.units_factor)
-        self.free_swap   = int(psutil.swap_memory()[2])//int(self.units_factor)
-        self.free_inodes = int(100 - math.ceil((float(os.statvfs("/").f_files - os.statvfs("/").f_ffree) \
-                             / os.statvfs("/").f_files) * 100))
+        sample = self._sampler.latest()
+        self.total_space = int(sample.disk[0])//int(self.units_factor)
+        self.free_space  = int(sample.disk[2])//int(self.units_factor)
+        self.total_swap  = int(sample.swap[0])//int(self.units_factor)
+        self.free_swap   = int(sample.swap[2])//int(self.units_factor)
+        self.free_inodes = int(100 - math.ceil((float(sample.inodes_total - sample.inodes_free) \
+                             / sample.inodes_total) * 100))
 
     def _get_cpu_data(self):
         """Retrieves node information for the cpu_data json message"""
         cpu_core_usage_dict = dict()
-        cpu_data = psutil.cpu_times_percent()
-        self._log_debug("_get_cpu_data, cpu_data: %s %s %s %s %s %s %s %s %s %s" % cpu_data)
+        sample = self._sampler.latest()
+        cpu_data = sample.cpu_times_percent
+        self._log_debug("_get_cpu_data, cpu_data: %s" % (cpu_data,))
 
         self.csps           = 0  # What the hell is csps - cycles per second?
         self.user_time      = int(cpu_data[0])
@@ -189,21 +201,23 @@ class NodeData(Debug):
         self.softirq_time   = int(cpu_data[6])
         self.steal_time     = int(cpu_data[7])
 
-        self.cpu_usage = psutil.cpu_percent(interval=1, percpu=False)
+        self.cpu_usage = sample.cpu_usage
         # Array to hold data about each CPU core
         self.cpu_core_data = []
         index = 0
-        while index < self.cpus:
+        while index < len(sample.core_averages):
+            load_1min_average, load_5min_average, load_15min_average = \
+                sample.core_averages[index]
             self._log_debug("_get_cpu_data, index: %s, 1 min: %s, 5 min: %s, 15 min: %s" %
                             (index,
-                            self.load_1min_average[index],
-                            self.load_5min_average[index],
-                            self.load_15min_average[index]))
+                            load_1min_average,
+                            load_5min_average,
+                            load_15min_average))
 
             cpu_core_data = {"coreId"      : index,
-                             "load1MinAvg" : int(self.load_1min_average[index]),
-                             "load5MinAvg" : int(self.load_5min_average[index]),
-                             "load15MinAvg": int(self.load_15min_average[index]),
+                             "load1MinAvg" : int(load_1min_average),
+                             "load5MinAvg" : int(load_5min_average),
+                             "load15MinAvg": int(load_15min_average),
                              "ips" : 0
                              }
             self.cpu_core_data.append(cpu_core_data)
@@ -211,14 +225,20 @@ class NodeData(Debug):
 
     def _get_if_data(self):
         """Retrieves node information for the if_data json message"""
-        net_data = psutil.net_io_counters(pernic=True)
+        net_data = self._sampler.latest().net
         # Array to hold data about each network interface
         self.if_data = []
         bmc_data = self._get_bmc_info()
+        nw_status = self._if_monitor.status()
         for interface, if_data in net_data.items():
             self._log_debug("_get_if_data, interface: %s %s" % (interface, net_data))
-            nw_status = self._fetch_nw_status()
-            nw_cable_conn_status = self.fetch_nw_cable_conn_status(interface)
+            if interface not in nw_status:
+                # The interface appeared since the last change was seen
+                self._if_monitor.refresh()
+                nw_status = self._if_monitor.status()
+            # An interface gone from /sys/class/net since it was sampled
+            if_status = nw_status.get(interface, ["UNKNOWN", "", "UNKNOWN"])
+            nw_cable_conn_status = if_status[2]
             if_data = {"ifId" : interface,
                        "networkErrors"      : (net_data[interface].errin +
                                                net_data[interface].errout),
@@ -228,25 +248,13 @@ class NodeData(Debug):
                        "droppedPacketsOut"  : net_data[interface].dropout,
                        "packetsOut"         : net_data[interface].packets_sent,
                        "trafficOut"         : net_data[interface].bytes_sent,
-                       "nwStatus"           : nw_status[interface][0],
-                       "ipV4"               : nw_status[interface][1],
+                       "nwStatus"           : if_status[0],
+                       "ipV4"               : if_status[1],
                        "nwCableConnStatus"  : nw_cable_conn_status
                        }
             self.if_data.append(if_data)
         self.if_data.append(bmc_data)
 
-    def _fetch_nw_status(self):
-        nw_dict = {}
-        nws = os.popen("ip --br a | awk '{print $1, $2, $3}'").read().split('\n')[:-1]
-        for nw in nws:
-            if nw.split(' ')[2]:
-                ip = nw.split(' ')[2].split("/")[0]
-            else:
-                ip = ""
-            nw_dict[nw.split(' ')[0]] = [nw.split(' ')[1], ip]
-        logger.debug("network info going is : {}".format(nw_dict))
-        return nw_dict
-
     def fetch_nw_cable_conn_status(self, interface):
         carrier_status = None
         try:
@@ -280,21 +288,17 @@ class NodeData(Debug):
         """
         try:
             bmcdata = {'ifId': 'ebmc0', 'ipV4Prev': "", 'ipV4': "", 'nwStatus': "DOWN", 'nwCableConnStatus': 'UNKNOWN'}
-            ipdata = sp.Popen("sudo ipmitool lan print", shell=True, stdout=sp.PIPE, stderr=sp.PIPE).communicate()[0].decode().strip()
-            bmcip = re.findall("\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}", ipdata)
+            # Address and reachability are cached, see bmc_address_ttl
+            # and bmc_ping_interval
+            bmcip = self._bmc_monitor.address()
             if bmcip:
-                bmcip = bmcip[0]
-                pingbmchost = "ping -c1 -W1 -q "+bmcip
-                child = sp.Popen(pingbmchost.split(), stdout=sp.PIPE)
-                streamdata = child.communicate()[0] #child must be communicated before fetching return code.
-                retcode = child.returncode
                 if self.prev_bmcip is not None and self.prev_bmcip != bmcip:
                     bmcdata['ipV4Prev'] = self.prev_bmcip
                     bmcdata['ipV4'] = bmcip
                     self.prev_bmcip = bmcip
                 else:
                     self.prev_bmcip = bmcdata['ipV4Prev'] = bmcdata['ipV4'] = bmcip
-                if retcode == 0:
+                if self._bmc_monitor.reachable(bmcip):
                     bmcdata['nwStatus'] = "UP"
                 else:
                     logger.warning("BMC Host:{0} is not reachable".format(bmcip))
@@ -304,42 +308,7 @@ class NodeData(Debug):
 
     def _get_disk_space_alert_data(self):
         """Retrieves node information for the disk_space_alert_data json message"""
-        self.total_space = int(psutil.disk_usage("/")[0])//int(self.units_factor)
-        self.free_space  = int(psutil.disk_usage("/")[2])//int(self.units_factor)
-        self.disk_used_percentage  = psutil.disk_usage("/")[3]
-
-    def _load_1min_avg(self):
-        """Loop forever calculating the one minute average load"""
-        # Initialize list to -1 indicating the time interval has not occurred yet
-        index = 0
-        while index < self.cpus:
-            self.load_1min_average.append(-1)
-            index += 1
-
-        while True:
-            # API call blocks for one minute and then returns the value
-            self.load_1min_average = psutil.cpu_percent(interval=1, percpu=True)
-
-    def _load_5min_avg(self):
-        """Loop forever calculating the five minute average load"""
-        # Initialize list to -1 indicating the time interval has not occurred yet
-        index = 0
-        while index < self.cpus:
-            self.load_5min_average.append(-1)
-            index += 1
-
-        while True:
-            # API call blocks for five minutes and then returns the value
-            self.load_5min_average = psutil.cpu_percent(interval=5, percpu=True)
-
-    def _load_15min_avg(self):
-        """Loop forever calculating the fifteen minute average load"""
-        # Initialize list to -1 indicating the time interval has not occurred yet
-        index = 0
-        while index < self.cpus:
-            self.load_15min_average.append(-1)
-            index += 1
-
-        while True:
-            # API call blocks for fifteen minutes and then returns the value
-            self.load_15min_average = psutil.cpu_percent(interval=15, percpu=True)
+        sample = self._sampler.latest()
+        self.total_space = int(sample.disk[0])//int(self.units_factor)
+        self.free_space  = int(sample.disk[2])//int(self.units_factor)
+        self.disk_used_percentage  = sample.disk[3]
@@ -37,11 +37,14 @@ from message_handlers.logging_msg_handler import LoggingMsgHandler
 from framework.base.debug import Debug
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.base.sspl_constants import PRODUCT_FAMILY
 from framework.base.sspl_constants import COMMON_CONFIGS,ServiceTypes,node_key_id
 from framework.utils.config_reader import ConfigReader
 from framework.utils.service_logging import logger
 from framework.utils import encryptor
+from framework.utils.ipmi_sensor_cache import sensor_cache
+from framework.utils.ipmi_session import IpmiSession, SelCursor, SdrStamp, parse_info
 from sensors.INode_hw import INodeHWsensor
 from framework.utils.store_factory import file_store
 
@@ -135,6 +138,7 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
     lan_cmd_retcode = 1
 
     sdr_reset_required = False
+    sdr_info_supported = True
     request_shutdown = False
     sel_last_queried = None
     SEL_QUERY_FREQ = 300
@@ -142,6 +146,8 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
     NODEHWSENSOR = "NODEHWSENSOR"
     POLLING_INTERVAL = "polling_interval"
     DEFAULT_POLLING_INTERVAL = "30"
+    IPMITOOL_SESSION = "ipmitool_session"
+    DEFAULT_IPMITOOL_SESSION = "true"
 
     IPMITOOL = "sudo ipmitool "
     IPMISIMTOOL = "ipmisimtool "
@@ -191,6 +197,19 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
         self.polling_interval = int(self.conf_reader._get_value_with_default(
             self.NODEHWSENSOR, self.POLLING_INTERVAL, self.DEFAULT_POLLING_INTERVAL))
 
+        # Run ipmitool subcommands in one long lived 'ipmitool shell'
+        self._ipmi_session = None
+        if str(self.conf_reader._get_value_with_default(self.NODEHWSENSOR,
+                self.IPMITOOL_SESSION, self.DEFAULT_IPMITOOL_SESSION)).lower() == "true":
+            self._ipmi_session = IpmiSession()
+
+        # Read only the SEL entries added since the last poll and the SDRs
+        # only when the SDR repository changed
+        self._sel_cursor = SelCursor()
+        self._sdr_stamp = SdrStamp()
+        # The list file holds a window of the newest SEL entries
+        self._sel_window = False
+
     def _get_file(self, name):
         if os.path.exists(name):
             mode = self.UPDATE_ONLY_MODE
@@ -330,6 +349,23 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
             self.lan_cmd_retcode = retcode
 
     def _update_list_file(self):
+        sel_info, retcode = self._run_ipmitool_subcommand("sel info")
+        if retcode != 0:
+            if isinstance(sel_info, tuple):
+                sel_info = [val for val in sel_info if val]
+            msg = f"ipmitool sel info command failed: {b''.join(sel_info)}"
+            logger.error(msg)
+            raise Exception(msg)
+        info = parse_info(b''.join(sel_info).decode(self.IPMI_ENCODING))
+
+        # 'sel list' when the SEL was never read or was cleared, otherwise
+        # 'sel list last <n>' for the entries added since the last poll and
+        # a margin before them, the ones already processed are skipped by
+        # record ID
+        subcommand = self._sel_cursor.next_read(info)
+        if subcommand is None:
+            return
+
         with open(self.list_file_collect_name, self.UPDATE_CREATE_MODE) as f:
             # make sel list filter only for available frus. no extra data needed
             # 'Power Supply|Power Unit|Fan|Drive Slot / Bay'
@@ -337,12 +373,12 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
             f.truncate()
             available_fru = '|'.join(self.fru_types.keys())
             sel_out, retcode = self._run_ipmitool_subcommand(
-                    "sel list", grep_args=f"{available_fru}",
+                    subcommand, grep_args=f"{available_fru}",
                     out_file=f)
             if retcode != 0:
                 if isinstance(sel_out, tuple):
                     sel_out = [val for val in sel_out if val]
-                msg = f"ipmitool sel list command failed: {b''.join(sel_out)}"
+                msg = f"ipmitool {subcommand} command failed: {b''.join(sel_out)}"
                 logger.error(msg)
                 raise Exception(msg)
 
@@ -355,6 +391,8 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
 
         self.list_file.close()
         self.list_file = self._get_file(self.list_file_name)
+        self._sel_window = subcommand != "sel list"
+        self._sel_cursor.commit(info)
 
     def _check_and_clear_sel(self):
         """ Clear SEL Table if SEL used memory seen above threshold
@@ -416,11 +454,28 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
 
                 #reset last processed SEL index in cached index file
                 self._write_index_file(0)
+                self._sel_cursor.reset()
 
         except Exception as ae:
             logger.exception(ae)
 
+    def _sdr_changed(self):
+        """True if the SDR repository changed since the last call"""
+        if not self.sdr_info_supported:
+            return False
+        sdr_info, retcode = self._run_ipmitool_subcommand("sdr info")
+        if retcode != 0:
+            logger.warning("ipmitool sdr info command failed, sensor list is "
+                           "not refreshed on SDR repository changes")
+            self.sdr_info_supported = False
+            return False
+        return self._sdr_stamp.changed(
+                    parse_info(b''.join(sdr_info).decode(self.IPMI_ENCODING)))
+
     def _read_sensor_list(self):
+        self._sdr_changed()
+        # Sensor ids and readings shared with the NodeHW actuator are stale
+        sensor_cache.invalidate()
         self.sensor_id_map = dict()
         for fru in self.fru_types:
             self.sensor_id_map[fru] = { sensor_num: sensor_id
@@ -452,6 +507,11 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
                             self.sdr_reset_required = False
                             self._read_sensor_list()
 
+                # Sensor numbers are kept until the SDR repository changes
+                if self.channel_err is False and self._sdr_changed():
+                    logger.info("SDR repository changed, reading sensor list")
+                    self._read_sensor_list()
+
                 if self.channel_err is False:
                     # Check for a change in ipmi sel list and notify the node data
                     # msg handler
@@ -478,28 +538,31 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
     def _get_sel_event(self):
         last_index = self._read_index_file()
 
-        # TODO: See if the following 2 loops can be reduced to
-        # a single loop using mmap() and a fixed file format like
-        # the one produced by the 'ipmitool sel file' or
-        # 'ipmitool sel writeraw' commands.
-        found = False
         self.list_file.seek(0, os.SEEK_SET)
-        for line in self.list_file:
-            if not found:
-                if line.split("|")[0].strip() == "{0:x}".format(last_index):
-                    found = True
-                continue
+        sel_events = [self._make_sel_event(line) for line in self.list_file]
+        found = any(self._record_id(sel_event[0]) == last_index
+                    for sel_event in sel_events)
+
+        if found or self._sel_window:
+            # Only the records newer than the last one processed, a window
+            # of the newest entries may start before or after it
+            return [sel_event for sel_event in sel_events
+                    if self._record_id(sel_event[0]) > last_index]
+
+        # This can mean one of a few things:
+        # 1. The SEL has been cleared beyond the last index we saw
+        # 2. It has rotated to beyond the last index we saw
+        # 3. self.list_file is empty
+        return sel_events
 
-            yield self._make_sel_event(line)
-
-        if not found:
-            # This can mean one of a few things:
-            # 1. The SEL has been cleared beyond the last index we saw
-            # 2. It has rotated to beyond the last index we saw
-            # 3. self.list_file is empty
-            self.list_file.seek(0, os.SEEK_SET)
-            for line in self.list_file:
-                yield self._make_sel_event(line)
+    @staticmethod
+    def _record_id(index):
+        """SEL record ID of the hex index of a 'sel list' line, -1 if it
+        is not one"""
+        try:
+            return int(index, base=16)
+        except ValueError:
+            return -1
 
     def _make_sel_event(self, sel_line):
             # Separate out the components of the sel event
@@ -521,15 +584,17 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
         """See if there is any new event gets generated in the sel and notify
             node data message handler for generating JSON message"""
 
+        sel_events = list(self._get_sel_event())
+
         last_fru_index = {}
         last_index = None
         for (index, date, event_time, device_id, device_type, sensor_num, event, status) \
-                in self._get_sel_event():
+                in sel_events:
             last_fru_index[device_type] = index
             last_index = index
 
         for (index, date, event_time, device_id, device_type, sensor_num, event, status) \
-                in self._get_sel_event():
+                in sel_events:
 
             is_last = (last_fru_index[device_type] == index)
             logger.debug(f"_notify_NodeDataMsgHandler '{device_type}': is_last: \
@@ -566,7 +631,7 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
         # A dummy file path check to select ipmi simulator if
         # simulator is required, otherwise default ipmitool.
         if os.path.exists("/tmp/activate_ipmisimtool"):
-            res, retcode = self._run_command(command=f"{self.IPMISIMTOOL} sel info")
+            res, retcode = self._run_tool(self.IPMISIMTOOL.split(), "sel info")
             # ipmisimtool returns retcode 2 for channel interface alert
             if retcode == 0 or retcode == 2:
                 ipmi_tool = self.IPMISIMTOOL
@@ -574,17 +639,17 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
                 self.sdr_reset_required = True
 
         if ipmi_tool==self.IPMISIMTOOL:
-            command = ipmi_tool + subcommand
+            argv = ipmi_tool.split()
         else:
             if self._channel_interface == self.SYSTEM_IF or self.active_bmc_if==self.SYSTEM_IF:
-                command = ipmi_tool + subcommand
+                argv = ipmi_tool.split()
             elif self._channel_interface == self.LAN_IF and self.active_bmc_if != self.SYSTEM_IF:
-                command = ipmi_tool + " -H " + self._bmc_ip + " -U " + self._bmc_user + \
-                        " -P " + self._bmc_passwd + " -I " + "lan " + subcommand
+                argv = ipmi_tool.split() + ["-H", self._bmc_ip, "-U", self._bmc_user,
+                        "-P", self._bmc_passwd, "-I", "lan"]
             else:
                 logger.error("Invalid BMC channel interface")
 
-        res, retcode = self._run_command(command, subprocess.PIPE)
+        res, retcode = self._run_tool(argv, subcommand)
 
         # check channel fault and fault resolved alert
         self._check_channel_error(res,retcode)
@@ -618,6 +683,15 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
 
         return res, retcode
 
+    def _run_tool(self, argv, subcommand):
+        """Runs subcommand in the ipmitool shell session, or on its own
+        when the session is disabled or did not run it cleanly"""
+        if self._ipmi_session is not None:
+            result = self._ipmi_session.run(argv, subcommand)
+            if result is not None:
+                return result
+        return self._run_command(" ".join(argv) + " " + subcommand, subprocess.PIPE)
+
     def _check_channel_error(self, res, retcode):
         # check res present in possible errors or not
         resource_id = None
@@ -745,7 +819,8 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
            the first element is the sensor id and
            the second is the number."""
 
-        sensor_list_out, retcode = self._run_ipmitool_subcommand(f"sdr type '{sensor_type}'")
+        sensor_list_out, retcode = sensor_cache.sdr_type(sensor_type,
+                                        self._run_ipmitool_subcommand)
         out = []
 
         if retcode != 0:
@@ -843,7 +918,8 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
            common is a dict of common sensor properties and
            their values for this sensor, and
            specific is a dict of the properties specific to this sensor"""
-        props_list_out, retcode = self._run_ipmitool_subcommand(f"sensor get '{sensor_id}'")
+        props_list_out, retcode = sensor_cache.sensor_get([sensor_id],
+                                        self._run_ipmitool_subcommand)[sensor_id]
         if retcode != 0:
             if isinstance(props_list_out, tuple):
                 props_list_out = [val for val in props_list_out if val]
@@ -1267,7 +1343,7 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
         """Transmit data to NodeDataMsgHandler which takes two arguments.
            device will be device name and data will consist of relevant data"""
 
-        internal_json_msg = json.dumps({
+        internal_json_msg = MsgEnvelope({
             "sensor_request_type" : {
                 "node_data":{
                     "alert_type": alert_type,
@@ -1281,7 +1357,7 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
           })
 
         # RAAL stands for - RAise ALert
-        logger.info(f"RAAL: {internal_json_msg}")
+        logger.info("RAAL: %s", internal_json_msg)
 
         # Send the event to node data message handler to generate json message and send out
         self._write_internal_msgQ(NodeDataMsgHandler.name(), internal_json_msg)
@@ -1303,7 +1379,7 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
             }, sort_keys=True)
 
         # Send the event to node data message handler to generate json message and send out
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
                 {'actuator_request_type': {'logging': {'log_level': 'LOG_WARNING', 'log_type': 'IEM', 'log_msg': f'{json_data}'}}})
 
         # Send the event to logging msg handler to send IEM message to journald
@@ -1337,4 +1413,6 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
 
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread"""
+        if self._ipmi_session is not None:
+            self._ipmi_session.close()
         super(NodeHWsensor, self).shutdown()
@@ -18,13 +18,13 @@ Sensor Module Thread responsible for sensing RAM memory faults on the Node serve
 
 """
 
-import json
 import socket
 import time
 import uuid
 import os
 
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from message_handlers.logging_msg_handler import LoggingMsgHandler
 from message_handlers.node_data_msg_handler import NodeDataMsgHandler
@@ -250,7 +250,7 @@ class MemFaultSensor(SensorThread, InternalMsgQ):
             "event_time": epoch_time
             }
 
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
             {"sensor_request_type": {
                 "node_data": {
                     "status": "update",
@@ -280,7 +280,7 @@ class MemFaultSensor(SensorThread, InternalMsgQ):
         json_msg = self._create_json_message(alert_type)
         if json_msg:
             # RAAL stands for - RAise ALert
-            logger.info(f"RAAL: {json_msg}")
+            logger.info("RAAL: %s", json_msg)
             self._write_internal_msgQ(NodeDataMsgHandler.name(), json_msg)
 
     def suspend(self):
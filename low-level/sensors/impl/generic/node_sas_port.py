@@ -19,7 +19,6 @@ on the Node server
 """
 
 import errno
-import json
 import socket
 import time
 import uuid
@@ -28,6 +27,7 @@ import os
 from framework.utils.config_reader import ConfigReader
 from framework.base.debug import Debug
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from message_handlers.logging_msg_handler import LoggingMsgHandler
 from message_handlers.node_data_msg_handler import NodeDataMsgHandler
@@ -472,7 +472,7 @@ causes could be missing SAS cable, bad cable connection, faulty cable or SAS por
                     "event_time": epoch_time
                     }
 
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
             {"sensor_request_type": {
                 "node_data": {
                         "status": "update",
@@ -502,7 +502,7 @@ causes could be missing SAS cable, bad cable connection, faulty cable or SAS por
         json_msg = self._create_json_message(alert_type, port)
         if json_msg:
             # RAAL stands for - RAise ALert
-            logger.info(f"RAAL: {json_msg}")
+            logger.info("RAAL: %s", json_msg)
             self._write_internal_msgQ(NodeDataMsgHandler.name(), json_msg)
 
     def suspend(self):
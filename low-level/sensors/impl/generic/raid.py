@@ -16,7 +16,9 @@
 """
  ****************************************************************************
   Description:       Monitors /proc/mdstat for changes and notifies
-                    the node_data_msg_handler when a change is detected
+                    the node_data_msg_handler when a change is detected.
+                    Waits for md events on /proc/mdstat and processes only
+                    the arrays which changed.
  ****************************************************************************
 """
 import os
@@ -28,7 +30,9 @@ import uuid
 
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.base.sspl_constants import COMMON_CONFIGS
+from framework.utils.mdstat import MdadmConf, MdstatWatcher
 from framework.utils.service_logging import logger
 from framework.utils.severity_reader import SeverityReader
 
@@ -50,8 +54,10 @@ class RAIDsensor(SensorThread, InternalMsgQ):
     # Section and keys in configuration file
     RAIDSENSOR        = SENSOR_NAME.upper()
     RAID_STATUS_FILE  = 'RAID_status_file'
+    POLL_INTERVAL     = 'poll_interval'
 
     RAID_CONF_FILE    = '/etc/mdadm.conf'
+    MD_SYSFS_PATH     = '/sys/block'
     RAID_DOWN_DRIVE_STATUS = [ { "status" : "Down/Missing" }, { "status" : "Down/Missing" } ]
 
     SYSTEM_INFORMATION = "SYSTEM_INFORMATION"
@@ -103,8 +109,19 @@ class RAIDsensor(SensorThread, InternalMsgQ):
         self._RAID_status_file = self._get_RAID_status_file()
         logger.info(f"Monitoring RAID status file: {self._RAID_status_file}")
 
-        # The status file contents
-        self._RAID_status_contents = "N/A"
+        # Longest wait for an md event before the status file is read again
+        self._poll_interval = int(self._conf_reader._get_value_with_default(
+                                        self.RAIDSENSOR, self.POLL_INTERVAL, 30))
+
+        # Arrays in the status file, tells which changed since the last read
+        self._mdstat = MdstatWatcher(self._RAID_status_file)
+
+        # Arrays listed in mdadm.conf, read again only when it changes
+        self._mdadm_conf = MdadmConf(self.RAID_CONF_FILE)
+        self._conf_devices = None
+
+        # Member drive names of every array
+        self._drive_dict = {}
 
         # The mdX status line in the status file
         self._RAID_status = {}
@@ -164,8 +181,10 @@ class RAIDsensor(SensorThread, InternalMsgQ):
         # Reset debug mode if persistence is not enabled
         self._disable_debug_if_persist_false()
 
-        # Fire every 30 seconds to see if there's a change in RAID status file
-        self._scheduler.enter(30, self._priority, self.run, ())
+        # Wait for md to report a change in RAID status file, reading it
+        # again at least every poll interval
+        self._mdstat.wait(self._poll_interval)
+        self._scheduler.enter(0, self._priority, self.run, ())
 
     def _notify_NodeDataMsgHandler(self):
         """See if the status files changed and notify node data message handler
@@ -175,28 +194,33 @@ class RAIDsensor(SensorThread, InternalMsgQ):
         resource_id = None
         if not os.path.isfile(self._RAID_status_file):
             logger.warn(f"status_file: {self._RAID_status_file} does not exist, ignoring.")
+            self._mdstat.close()
             return
 
-        # Read in status and see if it has changed
-        with open(self._RAID_status_file, "r") as datafile:
-            status = datafile.read()
-
-        # Do nothing if the RAID status file has not changed
-        if self._RAID_status_contents == status:
-            self._log_debug(f"_notify_NodeDataMsgHandler status unchanged, ignoring: {status}")
+        # Read in status and see which arrays changed
+        arrays, changed = self._mdstat.read()
+        if arrays is None:
             return
 
-        # Update the RAID status contents of file
-        self._RAID_status_contents = status
+        conf_devices = self._mdadm_conf.devices()
+        conf_changed = conf_devices is not self._conf_devices
+        self._conf_devices = conf_devices
 
-        # Process mdstat file and send json msg to NodeDataMsgHandler
-        md_device_list, drive_dict, drive_status_changed = self._process_mdstat()
+        # Do nothing if neither an array nor the RAID conf file has changed
+        if not changed and not conf_changed:
+            self._log_debug("_notify_NodeDataMsgHandler status unchanged, ignoring")
+            return
+
+        # Process changed arrays and send json msg to NodeDataMsgHandler
+        md_device_list, drive_dict, drive_status_changed = self._process_mdstat(arrays, changed)
 
         # checks mdadm conf file for missing raid array and send json message to NodeDataMsgHandler
         self._process_missing_md_devices(md_device_list, drive_dict)
 
         for device in md_device_list:
-            if drive_dict:
+            if device not in drive_status_changed:
+                continue
+            if drive_dict and device in self._total_drives:
                 if len(drive_dict[device]) < self._total_drives[device] and \
                     device in self.prev_alert_type and self.prev_alert_type[device] != self.MISSING:
                     self.alert_type = self.MISSING
@@ -250,73 +274,49 @@ class RAIDsensor(SensorThread, InternalMsgQ):
                                 self._prev_drive_dict[device] = drive_dict[device]
                                 self._send_json_msg(self.alert_type, resource_id, device, self._drives[device])
 
-    def _process_mdstat(self):
-        """Parse out status' and path info for each drive"""
-        # Replace new line chars with spaces
-        mdstat = self._RAID_status_contents.strip().split("\n")
-        md_device_list = []
-        drive_dict = {}
-        monitored_device = mdstat
+    def _process_mdstat(self, arrays, changed):
+        """Parse out status' and path info for each drive of the changed arrays"""
+        md_device_list = list(arrays)
         drive_status_changed = {}
         # Array of optional identity json sections for drives in array
         self._identity = {}
 
-        # Read in each line looking for a 'mdXXX' value
-        md_line_parsed = False
-
-        for line in monitored_device:
-            # The line following the mdXXX : ... contains the [UU] status that we need
-            if md_line_parsed is True:
-                # Format is [x/y][UUUU____...]
-                drive_status_changed[self._device] = self._parse_raid_status(line, self._device)
-                # Reset in case their are multiple configs in file
-                md_line_parsed = False
-
-            # Break the  line apart into separate fields
-            fields = line.split(" ")
-
-            # Parse out status' and path info for each drive
-            if "md" in fields[0]:
-                self._device = f"/dev/{fields[0]}"
-                self._devices.append(self._device)
-                self._log_debug(f"md device found: {self._device}")
-                md_device_list.append(self._device)
-                drive_dict[self._device] = []
-                if self._device not in self.prev_alert_type:
-                    self.prev_alert_type[self._device] = None
-                if self._device not in self._faulty_drive_list:
-                    self._faulty_drive_list[self._device] = {}
-
-                # Parse out raid drive paths if they're present
-                self._identity[self._device] = {}
-                for field in fields:
-                    if "[" in field:
-                        if field not in drive_dict[self._device]:
-                            index = field.find("[")
-                            drive_name = field[:index]
-                            drive_dict[self._device].append(drive_name)
-                        self._add_drive(field, self._device)
-                md_line_parsed = True
-
-        return md_device_list, drive_dict, drive_status_changed
-
-    def _add_drive(self, field, device):
+        for device in changed:
+            array = arrays.get(device)
+            if array is None:
+                # The array was stopped, its state is gone with it
+                self._drive_dict.pop(device, None)
+                self._RAID_status.pop(device, None)
+                continue
+
+            self._log_debug(f"md device found: {device}")
+            if device not in self._devices:
+                self._devices.append(device)
+            if device not in self.prev_alert_type:
+                self.prev_alert_type[device] = None
+            if device not in self._faulty_drive_list:
+                self._faulty_drive_list[device] = {}
+
+            # Parse out raid drive paths if they're present
+            self._identity[device] = {}
+            self._drive_dict[device] = []
+            for member in array.members:
+                if member.name not in self._drive_dict[device]:
+                    self._drive_dict[device].append(member.name)
+                self._add_drive(member.name, device)
+
+            # Format is [x/y][UUUU____...]
+            drive_status_changed[device] = self._parse_raid_status(array, device)
+
+        return md_device_list, self._drive_dict, drive_status_changed
+
+    def _add_drive(self, drive_name, device):
         """Adds a drive to the list"""
-        first_bracket_index = field.find('[')
-
         # Parse out the drive path
-        drive_path = f"/dev/{field[: first_bracket_index]}"
+        drive_path = f"/dev/{drive_name}"
 
-        # Parse out the drive index into [UU] status which is Device Role field
-        detail_command = f"/usr/sbin/mdadm --examine {drive_path} | grep 'Device Role'"
-        response, error = self._run_command(detail_command)
-
-        if error:
-            self._log_debug(f"_add_drive, Error retrieving drive index into status, example: [U_]: {str(error)}")
-        try:
-            drive_index = int(response.split(" ")[-1])
-        except Exception as ae:
-            self._log_debug(f"_add_drive, get drive_index error: {str(ae)}")
+        drive_index = self._get_drive_index(drive_name, device)
+        if drive_index is None:
             return
         self._log_debug(f"_add_drive, drive index: {drive_index}, path: {drive_path}")
 
@@ -327,25 +327,43 @@ class RAIDsensor(SensorThread, InternalMsgQ):
                         }
         self._identity[device][drive_index] = identity_data
 
-    def _parse_raid_status(self, status_line, device):
+    def _get_drive_index(self, drive_name, device):
+        """Index of the drive into [UU] status which is Device Role field,
+            read from the md sysfs slot of the drive when there is one"""
+        slot_file = os.path.join(self.MD_SYSFS_PATH, os.path.basename(device),
+                                 "md", f"dev-{drive_name}", "slot")
+        try:
+            with open(slot_file, "r") as slot:
+                return int(slot.read().strip())
+        except OSError:
+            pass
+        except ValueError:
+            # 'none' for spare and faulty drives, which have no role
+            self._log_debug(f"_add_drive, {drive_name} has no slot in {device}")
+            return None
+
+        detail_command = f"/usr/sbin/mdadm --examine /dev/{drive_name} | grep 'Device Role'"
+        response, error = self._run_command(detail_command)
+
+        if error:
+            self._log_debug(f"_add_drive, Error retrieving drive index into status, example: [U_]: {str(error)}")
+        try:
+            return int(response.split(" ")[-1])
+        except Exception as ae:
+            self._log_debug(f"_add_drive, get drive_index error: {str(ae)}")
+            return None
+
+    def _parse_raid_status(self, array, device):
         """Parses the status of each drive denoted by U & _
             for drive being Up or Down in raid
         """
-        # Parse out x for total number of drives
-        first_bracket_index = status_line.find('[')
-
-        # If no '[' found, return
-        if first_bracket_index == -1:
+        # No [x/y] [UU] status, e.g. raid0 arrays
+        if array.status is None:
+            self._total_drives.pop(device, None)
             return False
 
-        self._total_drives[device] = int(status_line[first_bracket_index + 1])
-        self._log_debug("_parse_raid_status, total_drives: %d" % self._total_drives[device])
-
-        # Break the line apart into separate fields
-        fields = status_line.split(" ")
-
-        # The last field is the list of U & _
-        status = fields[-1]
+        self._total_drives[device] = array.total
+        status = array.status
         self._log_debug("_parse_raid_status, status: %s, total drives: %d" %
                         (status, self._total_drives[device]))
 
@@ -388,30 +406,11 @@ class RAIDsensor(SensorThread, InternalMsgQ):
             entries with list of arrays from mdstat file and sends
             missing entry in RabbitMQ channel
         """
-
-        if not os.path.isfile(self.RAID_CONF_FILE):
+        conf_device_list = self._conf_devices
+        if conf_device_list is None:
             logger.warn(f"_process_missing_md_devices, MDRaid configuration file {self.RAID_CONF_FILE} is missing")
             return
 
-        conf_device_list = []
-        with open(self.RAID_CONF_FILE, 'r') as raid_conf_file:
-            raid_conf_data = raid_conf_file.read().strip().split("\n")
-        for line in raid_conf_data:
-            try:
-                raid_conf_field = line.split(" ")
-                if "#" not in raid_conf_field[0] and "ARRAY" in raid_conf_field[0] and \
-                    "/md" in raid_conf_field[1]:
-                    # Mapped the device i.e. /dev/md/1 and /dev/md1 will be the same device.
-                    map_device = raid_conf_field[1].split('md/')
-                    if len(map_device)>1:
-                        conf_device_list.append(map_device[0]+'md'+map_device[1])
-                    else:
-                        conf_device_list.append(raid_conf_field[1])
-            except Exception as ae:
-                self._log_debug(f"_process_missing_md_devices, error retrieving raid entry    \
-                 from {self.RAID_CONF_FILE} file: {str(ae)}")
-                return
-
         # compare conf file raid array list with mdstat raid array list
         for device in conf_device_list:
             if device not in md_device_list and device not in self._faulty_device_list:
@@ -420,7 +419,8 @@ class RAIDsensor(SensorThread, InternalMsgQ):
                 self._send_json_msg(self.alert_type, device, device, self.RAID_DOWN_DRIVE_STATUS)
                 self._faulty_device_list[device] = self.FAULT
 
-            elif device in md_device_list and device in self._faulty_device_list:
+            elif device in md_device_list and device in self._faulty_device_list and \
+                device in self._drives:
                 # add that missing raid array entry into the list of raid devices
                 self.alert_type = self.FAULT_RESOLVED
                 self._map_drive_status(device, drive_dict, "Down/Recovery")
@@ -467,7 +467,7 @@ class RAIDsensor(SensorThread, InternalMsgQ):
             "drives": drives
                 }
 
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
             {"sensor_request_type" : {
                 "node_data": {
                     "status": "update",
@@ -484,7 +484,7 @@ class RAIDsensor(SensorThread, InternalMsgQ):
         self.prev_alert_type[device] = alert_type
         self.alert_type = None
         # RAAL stands for - RAise ALert
-        logger.info(f"RAAL: {internal_json_msg}")
+        logger.info("RAAL: %s", internal_json_msg)
 
         # Send the event to node data message handler to generate json message and send out
         self._write_internal_msgQ(NodeDataMsgHandler.name(), internal_json_msg)
@@ -503,7 +503,7 @@ class RAIDsensor(SensorThread, InternalMsgQ):
             }, sort_keys=True)
 
         # Send the event to node data message handler to generate json message and send out
-        internal_json_msg=json.dumps(
+        internal_json_msg=MsgEnvelope(
                 {'actuator_request_type': {'logging': {'log_level': 'LOG_WARNING', 'log_type': 'IEM', 'log_msg': f'{json_data}'}}})
 
         # Send the event to logging msg handler to send IEM message to journald
@@ -547,3 +547,4 @@ class RAIDsensor(SensorThread, InternalMsgQ):
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread"""
         super(RAIDsensor, self).shutdown()
+        self._mdstat.close()
@@ -16,20 +16,22 @@
 """
  ****************************************************************************
   Description:       Validates raid data for data corruption.
+                    Checks the md arrays through sysfs, several at once,
+                    and keeps their fault state in a single file.
  ****************************************************************************
 """
 import os
 import json
 import time
-import subprocess
 import socket
 import uuid
 
-from datetime import datetime
-
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
-from framework.base.sspl_constants import COMMON_CONFIGS, RaidDataConfig, RaidAlertMsgs, WAIT_BEFORE_RETRY, PRODUCT_FAMILY
+from framework.base.msg_envelope import MsgEnvelope
+from framework.base.sspl_constants import COMMON_CONFIGS, RaidDataConfig, RaidAlertMsgs, PRODUCT_FAMILY
+from framework.utils.mdstat import parse_mdstat
+from framework.utils.raid_scrub import ScrubScheduler
 from framework.utils.severity_reader import SeverityReader
 from framework.utils.service_logging import logger
 
@@ -57,6 +59,9 @@ class RAIDIntegritySensor(SensorThread, InternalMsgQ):
     RACK_ID = "rack_id"
     POLLING_INTERVAL = "polling_interval"
     TIMESTAMP_FILE_PATH_KEY = "timestamp_file_path"
+    MAX_CONCURRENT_SCRUBS = "max_concurrent_scrubs"
+    SYNC_SPEED_MIN = "sync_speed_min"
+    SYNC_SPEED_MAX = "sync_speed_max"
 
     # check once a week (below time is in seconds), the integrity of raid data
     DEFAULT_POLLING_INTERVAL = "604800"
@@ -106,6 +111,22 @@ class RAIDIntegritySensor(SensorThread, InternalMsgQ):
                                     self.RAIDIntegritySensor, self.TIMESTAMP_FILE_PATH_KEY, self.DEFAULT_TIMESTAMP_FILE_PATH)
         self._polling_interval = int(self._conf_reader._get_value_with_default(
                                 self.RAIDIntegritySensor, self.POLLING_INTERVAL, self.DEFAULT_POLLING_INTERVAL))
+
+        # Checks arrays sharing no disk at the same time, within the
+        # sync_speed_min/max budgets (KiB/s, 0 keeps the system limits)
+        self._scrubber = ScrubScheduler(
+            max_concurrent=int(self._conf_reader._get_value_with_default(
+                                self.RAIDIntegritySensor, self.MAX_CONCURRENT_SCRUBS, 2)),
+            speed_min=int(self._conf_reader._get_value_with_default(
+                                self.RAIDIntegritySensor, self.SYNC_SPEED_MIN, 0)),
+            speed_max=int(self._conf_reader._get_value_with_default(
+                                self.RAIDIntegritySensor, self.SYNC_SPEED_MAX, 0)),
+            sysfs_path=RaidDataConfig.DIR.value)
+        self._rescrub_event = None
+
+        # Fault state and last check of every device
+        self._integrity_state_file = self.DEFAULT_RAID_DATA_PATH + RaidDataConfig.RAID_INTEGRITY_STATE_FILE.value
+        self._integrity_state = self._load_integrity_state()
         return True
 
     def read_data(self):
@@ -158,62 +179,82 @@ class RAIDIntegritySensor(SensorThread, InternalMsgQ):
             if len(devices) == 0:
                 return
             logger.debug("Fetched devices:{}".format(devices))
-            
-            for device in devices:
-                # Update the state as 'check' for RAID device file
-                result = self._update_raid_device_file(device)
-                if result == "failed":
-                    self._retry_execution(self._update_raid_device_file, device)
-                logger.info("RAID device state is changed to 'check'")
-    
-                # Check RAID device array state is 'idle' or not
-                result = self._check_raid_state(device)
-                if result == "failed":
-                    logger.warning("'Idle' state not found for RAID device:{}"
-                                    .format(device))
-                    # Retry to check RAID state
-                    self._retry_execution(self._check_raid_state, device)
-                logger.info("'idle' state is found in Raid device:{}."
-                             .format(device))
+            self._scrub(devices)
+        except Exception as ae:
+            logger.error("Failed in monitoring RAID health. ERROR:{}"
+                         .format(str(ae)))
 
-                # Check Mismatch count in RAID device files.
-                result = self._check_mismatch_count(device)
-                if result == "failed":
-                    # Persist RAID device fault state and send alert
-                    fault_status_file = self.DEFAULT_RAID_DATA_PATH + device + "_" + RaidDataConfig.RAID_MISMATCH_FAULT_STATUS.value
-                    if os.path.exists(fault_status_file):
-                        with open(fault_status_file, 'r') as fs:
-                            data = fs.read().rstrip()
-                        if self.FAULT_RESOLVED in data:
-                            self.alert_type = self.FAULT
-                            self._alert_msg = RaidAlertMsgs.MISMATCH_MSG.value
-                            self._send_json_msg(self.alert_type, device, self._alert_msg)
-                            self._update_fault_state_file(device, self.FAULT, fault_status_file)
-                    else:
-                        self.alert_type = self.FAULT
-                        self._alert_msg = RaidAlertMsgs.MISMATCH_MSG.value
-                        self._send_json_msg(self.alert_type, device, self._alert_msg)
-                        self._update_fault_state_file(device, self.FAULT, fault_status_file)
-
-                    # Retry to check mismatch_cnt
-                    self._retry_execution(self._check_mismatch_count, device)
+    def _scrub(self, devices):
+        """Check the data of devices, alert on mismatches found or gone and
+            check the faulty ones again after a while"""
+        results = self._scrubber.run(devices)
+        for device in devices:
+            result = results.get(device)
+            if result is None:
+                # Shutting down
+                continue
+            if result.error is not None:
+                logger.error("Failed in checking RAID device:{}. ERROR:{}"
+                             .format(device, result.error))
+                continue
+
+            logger.info("RAID device:{} checked in {:.0f} secs at {:.0f} KiB/s, mismatch_cnt:{}"
+                        .format(device, result.duration, result.throughput, result.mismatch_cnt))
+            state = self._integrity_state.setdefault(device, {})
+            if result.mismatch_cnt != 0:
+                logger.debug("Mismatch found in {} file in raid_integrity_data!"
+                             .format(RaidDataConfig.MISMATCH_COUNT_FILE.value))
+                if state.get("fault_state") != self.FAULT:
+                    self.alert_type = self.FAULT
+                    self._alert_msg = RaidAlertMsgs.MISMATCH_MSG.value
+                    self._send_json_msg(self.alert_type, device, self._alert_msg)
+                    state["fault_state"] = self.FAULT
+            else:
                 logger.debug("No mismatch count is found in Raid device:{}"
-                            .format(device))
-
+                             .format(device))
+                if state.get("fault_state") == self.FAULT:
+                    self.alert_type = self.FAULT_RESOLVED
+                    self._alert_msg = "Mismatch_cnt found '0' for " + device
+                    self._send_json_msg(self.alert_type, device, self._alert_msg)
+                    state["fault_state"] = self.FAULT_RESOLVED
+            state.update({
+                "mismatch_cnt": result.mismatch_cnt,
+                "checked": int(time.time()),
+                "duration": round(result.duration, 1),
+                "size": result.size,
+                "throughput": round(result.throughput, 1)
+            })
+        self._cache_state = results
+        self._save_integrity_state()
+
+        # Check the faulty devices again until their mismatch count is '0'
+        faulty = [device for device in devices
+                  if self._integrity_state.get(device, {}).get("fault_state") == self.FAULT]
+        if faulty and self._rescrub_event is None:
+            logger.debug("Checking faulty RAID devices:{} again after {} secs"
+                         .format(faulty, RaidDataConfig.NEXT_ITERATION_TIME.value))
+            self._rescrub_event = self._scheduler.enter(RaidDataConfig.NEXT_ITERATION_TIME.value,
+                                        self._priority, self._rescrub, (faulty,))
+
+    def _rescrub(self, devices):
+        self._rescrub_event = None
+        if self._suspended == True:
+            self._rescrub_event = self._scheduler.enter(RaidDataConfig.NEXT_ITERATION_TIME.value,
+                                        self._priority, self._rescrub, (devices,))
+            return
+        try:
+            self._scrub(devices)
         except Exception as ae:
-            logger.error("Failed in monitoring RAID health. ERROR:{}"
+            logger.error("Failed in checking faulty RAID devices again. ERROR:{}"
                          .format(str(ae)))
 
     def _get_devices(self):
+        """md devices with redundancy to check, e.g. ['md0', 'md1']"""
         try:
             mdstat_file = RaidDataConfig.MDSTAT_FILE.value
             with open (mdstat_file, 'r') as fp:
-                content = fp.readlines()
-            device_array = []
-            for line in content:
-                if "active" in line:
-                    device = line.split(":")[0].rstrip()
-                    device_array.append(device)
+                device_array = [os.path.basename(array.device) for array in parse_mdstat(fp)
+                                if array.state == "active" and array.status is not None]
             if len(device_array) == 0:
                 logger.error("No RAID device found in mdstat file.")
             return device_array
@@ -222,113 +263,37 @@ class RAIDIntegritySensor(SensorThread, InternalMsgQ):
                         .format(str(ae)))
             raise
 
-    def _check_mismatch_count(self, device):
-        try:
-            status = None
-            raid_dir = RaidDataConfig.DIR.value
-            mismatch_cnt_file = RaidDataConfig.MISMATCH_COUNT_FILE.value
-            MISMATCH_COUNT_COMMAND = 'cat ' + raid_dir + device + mismatch_cnt_file
-            logger.debug('Executing MISMATCH_CNT_COMMAND:{}'
-                         .format(MISMATCH_COUNT_COMMAND))
-            response, error = self._run_command(MISMATCH_COUNT_COMMAND)
-            if error:
-                logger.error("Error in cmd{} in raid health monitor"
-                            .format(MISMATCH_COUNT_COMMAND))
-            if response == RaidDataConfig.MISMATCH_COUNT_RESPONSE.value:
-                logger.debug("No mismatch count is found")
-                status = "success"
-                with open(self.output_file, 'a') as raid_file:
-                    raid_file.write(RaidDataConfig.MISMATCH_COUNT_RESPONSE.value)
-                fault_status_file = self.DEFAULT_RAID_DATA_PATH + device + "_"+ RaidDataConfig.RAID_MISMATCH_FAULT_STATUS.value
-                if os.path.exists(fault_status_file):
-                    with open(fault_status_file, 'r') as fs:
-                        data = fs.read().rstrip()
-                    if self.FAULT in data:
-                        faulty_device = data.split(":")[0].rstrip()
-                        if device == faulty_device:
-                            self.alert_type = self.FAULT_RESOLVED
-                            self._alert_msg = "Mismatch_cnt found '0' for " + device
-                            self._send_json_msg(self.alert_type, device, self._alert_msg)
-                            self._update_fault_state_file(device, self.FAULT_RESOLVED, fault_status_file)
-            else:
-                status = "failed"
-                logger.debug("Mismatch found in {} file in raid_integrity_data!"
-                             .format(mismatch_cnt_file))
-            return status
-        except Exception as ae:
-            logger.error("Failed in checking mismatch_cnt in RAID file. ERROR:{}"
-                         .format(str(ae)))
-            raise
-
-    def _check_raid_state(self, device):
-        try:
-            status = None
-            raid_check = 0
-            raid_dir = RaidDataConfig.DIR.value
-            sync_action_file = RaidDataConfig.SYNC_ACTION_FILE.value
-            while raid_check <= RaidDataConfig.MAX_RETRIES.value:
-                self.output_file = self._get_unique_filename(RaidDataConfig.RAID_RESULT_FILE_PATH.value, device)
-                STATE_COMMAND = 'cat ' + raid_dir + device + sync_action_file
-                logger.debug('Executing STATE_COMMAND:{}'.format(STATE_COMMAND))
-                response, error = self._run_command(STATE_COMMAND)
-                if error:
-                    logger.warn("Error in cmd{} in raid health monitor"
-                                .format(STATE_COMMAND))
-                    raid_check += 1
-                else:
-                    if response == RaidDataConfig.STATE_COMMAND_RESPONSE.value:
-                        status = "success"
-                        with open(self.output_file, 'w') as raid_file:
-                            raid_file.write(RaidDataConfig.STATE_COMMAND_RESPONSE.value + "\n")
-                        break
-                    else:
-                        status = "failed"
-                        raid_check += 1
-                        time.sleep(WAIT_BEFORE_RETRY)
-            return status
-        except Exception as ae:
-            logger.error("Failed in checking RAID device state. ERROR:{}"
-                        .format(str(ae)))
-            raise
-
-    def _update_raid_device_file(self, device):
-        try:
-            status = "failed"
-            raid_check = 0
-            raid_dir = RaidDataConfig.DIR.value
-            sync_action_file = RaidDataConfig.SYNC_ACTION_FILE.value
-            while raid_check <= RaidDataConfig.MAX_RETRIES.value:
-                CHECK_COMMAND = "echo 'check' |sudo tee " + raid_dir + device + sync_action_file + " > /dev/null"
-                logger.debug('Executing CHECK_COMMAND:{}'.format(CHECK_COMMAND))
-                response, error = self._run_command(CHECK_COMMAND)
-                if error:
-                    logger.warn("Failed in executing command:{}."
-                                .format(error))
-                    raid_check += 1
-                    time.sleep(1)
-                else:
-                    logger.debug("RAID device state is changed to 'check' with response : {}".format(response))
-                    status = "success"
-                    break
-            return status
-        except Exception as ae:
-            logger.error("Failed to update RAID File. ERROR:{}"
-                         .format(str(ae)))
-            raise
-
-    def _retry_execution(self, function_call, device):
-        while True:
-            logger.debug("Executing function:{} after {} time interval"
-                         .format(function_call, RaidDataConfig.NEXT_ITERATION_TIME.value))
-            time.sleep(RaidDataConfig.NEXT_ITERATION_TIME.value)
-            result = function_call(device)
-            if result == self.SUCCESS:
-                return
-
-    def _get_unique_filename(self, filename, device):
-        unique_timestamp = datetime.now().strftime("%d-%m-%Y_%I-%M-%S-%p")
-        unique_filename = f"{filename}_{device}_{unique_timestamp}.txt"
-        return unique_filename
+    def _load_integrity_state(self):
+        """Fault state and last check of every device, including the ones
+            kept in a file per device before"""
+        state = {}
+        if os.path.exists(self._integrity_state_file):
+            try:
+                with open(self._integrity_state_file, 'r') as state_file:
+                    state = json.load(state_file)
+            except (OSError, ValueError) as ae:
+                logger.warn("Unable to read RAID integrity state from {}. ERROR:{}"
+                            .format(self._integrity_state_file, str(ae)))
+
+        suffix = "_" + RaidDataConfig.RAID_MISMATCH_FAULT_STATUS.value
+        if os.path.isdir(self.DEFAULT_RAID_DATA_PATH):
+            for file_name in os.listdir(self.DEFAULT_RAID_DATA_PATH):
+                if not file_name.endswith(suffix):
+                    continue
+                fault_status_file = os.path.join(self.DEFAULT_RAID_DATA_PATH, file_name)
+                with open(fault_status_file, 'r') as fs:
+                    device, _, fault_state = fs.read().strip().partition(":")
+                if device and device not in state:
+                    state[device] = {"fault_state": fault_state}
+                os.remove(fault_status_file)
+        return state
+
+    def _save_integrity_state(self):
+        self._create_file(self._integrity_state_file)
+        tmp_file = self._integrity_state_file + ".tmp"
+        with open(tmp_file, 'w') as state_file:
+            json.dump(self._integrity_state, state_file, indent=2, sort_keys=True)
+        os.rename(tmp_file, self._integrity_state_file)
 
     def _send_json_msg(self, alert_type, resource_id, error_msg):
         """Transmit data to NodeDataMsgHandler to be processed and sent out"""
@@ -352,7 +317,7 @@ class RAIDIntegritySensor(SensorThread, InternalMsgQ):
             "error": error_msg
                 }
 
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
             {"sensor_request_type" : {
                 "node_data": {
                     "status": "update",
@@ -368,7 +333,7 @@ class RAIDIntegritySensor(SensorThread, InternalMsgQ):
             })
         self.alert_type = None
         # RAAL stands for - RAise ALert
-        logger.info(f"RAAL: {internal_json_msg}")
+        logger.info("RAAL: %s", internal_json_msg)
 
         # Send the event to node data message handler to generate json message and send out
         self._write_internal_msgQ(NodeDataMsgHandler.name(), internal_json_msg)
@@ -391,21 +356,10 @@ class RAIDIntegritySensor(SensorThread, InternalMsgQ):
         super(RAIDIntegritySensor, self).resume()
         self._suspended = False
 
-    def _run_command(self, command):
-        """Run the command and get the response and error returned"""
-        logger.debug(f"_run_command: {command}")
-        process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        response, error = process.communicate()
-        if response:
-            logger.debug(f"_run_command, response: {str(response)}")
-        if error:
-            logger.debug(f"_run_command: error: {str(error)}")
-
-        return response.decode().rstrip('\n'), error.decode().rstrip('\n')
-
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread"""
         super(RAIDIntegritySensor, self).shutdown()
+        self._scrubber.stop()
 
     def _create_file(self, path):
         dir_path = path[:path.rindex("/")]
@@ -422,20 +376,15 @@ class RAIDIntegritySensor(SensorThread, InternalMsgQ):
         with open(self._timestamp_file_path, "w") as timestamp_file:
             timestamp_file.write(current_time)
 
-    def _update_fault_state_file(self, device, fstate, fault_state_file):
-        self._fault_state = fstate
-        data = device + ":" + self._fault_state
-        self._create_file(fault_state_file)
-        with open(fault_state_file, 'w') as fs:
-            fs.write(data)
- 
     def _cleanup(self):
-        """Clean up the validate raid result files"""
+        """Clean up the validate raid result files written by earlier versions"""
         if os.path.exists(self._timestamp_file_path):
             os.remove(self._timestamp_file_path)
         path = RaidDataConfig.RAID_RESULT_DIR.value
+        prefix = os.path.basename(RaidDataConfig.RAID_RESULT_FILE_PATH.value)
         current_time = time.time()
-        result_files = [file for file in os.listdir(path) if file.endswith(".txt")]
+        result_files = [file for file in os.listdir(path)
+                        if file.startswith(prefix) and file.endswith(".txt")]
         for file in result_files:
             if os.path.getmtime(os.path.join(path, file)) < (current_time - 24*60*60) :
                 if os.path.isfile(os.path.join(path, file)):
@@ -18,7 +18,6 @@
   Description:       Monitors Controller data using RealStor API.
  ****************************************************************************
 """
-import json
 import os
 import socket
 import time
@@ -29,10 +28,11 @@ from zope.interface import implementer
 
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from framework.utils.severity_reader import SeverityReader
 from framework.platforms.realstor.realstor_enclosure import singleton_realstorencl
-from framework.utils.store_factory import store
+from framework.utils.store_cache import StoreCache
 
 # Modules that receive messages from this module
 from message_handlers.real_stor_encl_msg_handler import RealStorEnclMsgHandler
@@ -59,6 +59,7 @@ class RealStorControllerSensor(SensorThread, InternalMsgQ):
 
     # Controllers directory name
     CONTROLLERS_DIR = "controllers"
+    FAULTY_CONTROLLERS_FILE = "controllerdata.json"
 
     @staticmethod
     def name():
@@ -108,21 +109,25 @@ class RealStorControllerSensor(SensorThread, InternalMsgQ):
         # Initialize internal message queues for this module
         super(RealStorControllerSensor, self).initialize_msgQ(msgQlist)
 
+        # Have the enclosure poll the resources this sensor reads
+        self.rssencl.poller.subscribe(self.rssencl.URI_CLIAPI_SHOWCONTROLLERS, self.pollfreq_controllersensor,
+                                      active=lambda: not self._suspended)
+
         self._controller_prcache = os.path.join(self.rssencl.frus,\
              self.CONTROLLERS_DIR)
 
         # Persistence file location. This file stores faulty Controller data
         self._faulty_controller_file_path = os.path.join(
-            self._controller_prcache, "controllerdata.json")
+            self._controller_prcache, self.FAULTY_CONTROLLERS_FILE)
+        self._controller_cache = StoreCache(self._controller_prcache)
 
         # Load faulty Controller data from file if available
-        self._previously_faulty_controllers = store.get(\
-                                                  self._faulty_controller_file_path)
+        self._previously_faulty_controllers = self._controller_cache.get(self.FAULTY_CONTROLLERS_FILE)
 
         if self._previously_faulty_controllers is None:
             self._previously_faulty_controllers = {}
-            store.put(self._previously_faulty_controllers,\
-                self._faulty_controller_file_path)
+            self._controller_cache.put(self._previously_faulty_controllers, self.FAULTY_CONTROLLERS_FILE)
+            self._controller_cache.flush()
 
         return True
 
@@ -161,25 +166,16 @@ class RealStorControllerSensor(SensorThread, InternalMsgQ):
                 self._priority, self.run, ())
 
     def _get_controllers(self):
-        """Receives list of Controllers from API.
+        """Receives list of Controllers from the latest snapshot of
            URL: http://<host>/api/show/controllers
         """
-        url = self.rssencl.build_url(self.rssencl.URI_CLIAPI_SHOWCONTROLLERS)
-
-        response = self.rssencl.ws_request(url, self.rssencl.ws.HTTP_GET)
-
-        if not response:
-            logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: Controllers status unavailable as ws request {url}")
-            return
+        snapshot = self.rssencl.poller.latest(self.rssencl.URI_CLIAPI_SHOWCONTROLLERS)
 
-        if response.status_code != self.rssencl.ws.HTTP_OK:
-            if url.find(self.rssencl.ws.LOOPBACK) == -1:
-                logger.error(f"{self.rssencl.LDR_R1_ENCL}:: http request {url} to get controllers failed with \
-                     err {response.status_code}")
+        if snapshot is None:
+            logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: Controllers status unavailable as ws request failed")
             return
 
-        response_data = json.loads(response.text)
-        controllers = response_data.get("controllers")
+        controllers = snapshot.data.get("controllers")
         return controllers
 
     def _get_msgs_for_faulty_controllers(self, controllers, send_message=True):
@@ -282,10 +278,10 @@ class RealStorControllerSensor(SensorThread, InternalMsgQ):
                 # If timed out, do not update cache and revert in-memory cache.
                 # So, in next iteration change can be detected
                 if self._event.wait(self.rssencl.PERSISTENT_DATA_UPDATE_TIMEOUT):
-                    store.put(self._previously_faulty_controllers,\
-                        self._faulty_controller_file_path)
+                    self._controller_cache.put(self._previously_faulty_controllers, self.FAULTY_CONTROLLERS_FILE)
+                    self._controller_cache.flush()
                 else:
-                    self._previously_faulty_controllers = store.get(self._faulty_controller_file_path)
+                    self._previously_faulty_controllers = self._controller_cache.get(self.FAULTY_CONTROLLERS_FILE)
                 state_changed = False
             alert_type = ""
         return faulty_controller_messages
@@ -314,7 +310,7 @@ class RealStorControllerSensor(SensorThread, InternalMsgQ):
                 "event_time": epoch_time
                 }
 
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
             {"sensor_request_type": {
                 "enclosure_alert": {
                     "host_id": host_name,
@@ -343,7 +339,7 @@ class RealStorControllerSensor(SensorThread, InternalMsgQ):
             return
         self._event.clear()
         # RAAL stands for - RAise ALert
-        logger.info(f"RAAL: {json_msg}")
+        logger.info("RAAL: %s", json_msg)
         self._write_internal_msgQ(RealStorEnclMsgHandler.name(), json_msg, self._event)
 
     def suspend(self):
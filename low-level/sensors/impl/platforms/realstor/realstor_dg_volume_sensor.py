@@ -18,7 +18,6 @@
   Description:       Monitors Logical Volume data using RealStor API.
  ****************************************************************************
 """
-import json
 import os
 import socket
 import time
@@ -29,10 +28,11 @@ from zope.interface import implementer
 
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from framework.utils.severity_reader import SeverityReader
 from framework.platforms.realstor.realstor_enclosure import singleton_realstorencl
-from framework.utils.store_factory import store
+from framework.utils.store_cache import StoreCache
 
 # Modules that receive messages from this module
 from message_handlers.real_stor_encl_msg_handler import RealStorEnclMsgHandler
@@ -99,8 +99,10 @@ class RealStorLogicalVolumeSensor(SensorThread, InternalMsgQ):
 
     # Logical Volumes directory name
     LOGICAL_VOLUMES_DIR = "logical_volumes"
+    FAULTY_LOGICAL_VOLUMES_FILE = "logical_volume_data.json"
     # Disk Groups directory name
     DISK_GROUPS_DIR = "disk_groups"
+    FAULTY_DISK_GROUPS_FILE = "disk_group_data.json"
 
     @staticmethod
     def name():
@@ -155,6 +157,12 @@ class RealStorLogicalVolumeSensor(SensorThread, InternalMsgQ):
         # Initialize internal message queues for this module
         super(RealStorLogicalVolumeSensor, self).initialize_msgQ(msgQlist)
 
+        # Have the enclosure poll the resources this sensor reads
+        self.rssencl.poller.subscribe(self.rssencl.URI_CLIAPI_SHOWDISKGROUPS, self.pollfreq_logical_volume_sensor,
+                                      active=lambda: not self._suspended)
+        self.rssencl.poller.subscribe(self.rssencl.URI_CLIAPI_SHOWVOLUMES, self.pollfreq_logical_volume_sensor,
+                                      active=lambda: not self._suspended)
+
         self._logical_volume_prcache = os.path.join(self.rssencl.frus,\
              self.LOGICAL_VOLUMES_DIR)
         self._disk_group_prcache = os.path.join(self.rssencl.frus,\
@@ -162,27 +170,27 @@ class RealStorLogicalVolumeSensor(SensorThread, InternalMsgQ):
 
         # Persistence file location. This file stores faulty Logical Volume data
         self._faulty_logical_volume_file_path = os.path.join(
-            self._logical_volume_prcache, "logical_volume_data.json")
+            self._logical_volume_prcache, self.FAULTY_LOGICAL_VOLUMES_FILE)
+        self._logical_volume_cache = StoreCache(self._logical_volume_prcache)
         # Persistence file location. This file stores faulty Disk Group data
         self._faulty_disk_group_file_path = os.path.join(
-            self._disk_group_prcache, "disk_group_data.json")
+            self._disk_group_prcache, self.FAULTY_DISK_GROUPS_FILE)
+        self._disk_group_cache = StoreCache(self._disk_group_prcache)
 
         # Load faulty Logical Volume data from file if available
-        self._previously_faulty_logical_volumes = store.get(\
-                                                  self._faulty_logical_volume_file_path)
+        self._previously_faulty_logical_volumes = self._logical_volume_cache.get(self.FAULTY_LOGICAL_VOLUMES_FILE)
         # Load faulty Disk Group data from file if available
-        self._previously_faulty_disk_groups = store.get(\
-                                                  self._faulty_disk_group_file_path)
+        self._previously_faulty_disk_groups = self._disk_group_cache.get(self.FAULTY_DISK_GROUPS_FILE)
 
         if self._previously_faulty_logical_volumes is None:
             self._previously_faulty_logical_volumes = {}
-            store.put(self._previously_faulty_logical_volumes,\
-                self._faulty_logical_volume_file_path)
+            self._logical_volume_cache.put(self._previously_faulty_logical_volumes, self.FAULTY_LOGICAL_VOLUMES_FILE)
+            self._logical_volume_cache.flush()
 
         if self._previously_faulty_disk_groups is None:
             self._previously_faulty_disk_groups = {}
-            store.put(self._previously_faulty_disk_groups,\
-                self._faulty_disk_group_file_path)
+            self._disk_group_cache.put(self._previously_faulty_disk_groups, self.FAULTY_DISK_GROUPS_FILE)
+            self._disk_group_cache.flush()
 
         return True
 
@@ -227,49 +235,33 @@ class RealStorLogicalVolumeSensor(SensorThread, InternalMsgQ):
                 self._priority, self.run, ())
 
     def _get_disk_groups(self):
-        """Receives list of Disk Groups from API.
+        """Receives list of Disk Groups from the latest snapshot of
            URL: http://<host>/api/show/disk-groups
         """
-        url = self.rssencl.build_url(self.rssencl.URI_CLIAPI_SHOWDISKGROUPS)
-
-        response = self.rssencl.ws_request(url, self.rssencl.ws.HTTP_GET)
-
-        if not response:
-            logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: Disk Groups status unavailable as ws request {url} failed")
-            return
+        snapshot = self.rssencl.poller.latest(self.rssencl.URI_CLIAPI_SHOWDISKGROUPS)
 
-        if response.status_code != self.rssencl.ws.HTTP_OK:
-            if url.find(self.rssencl.ws.LOOPBACK) == -1:
-                logger.error(f"{self.rssencl.LDR_R1_ENCL}:: http request {url} to get disk groups failed with  \
-                     err {response.status_code}")
+        if snapshot is None:
+            logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: Disk Groups status unavailable as ws request failed")
             return
 
-        response_data = json.loads(response.text)
-        disk_groups = response_data.get("disk-groups")
+        disk_groups = snapshot.data.get("disk-groups")
         return disk_groups
 
     def _get_logical_volumes(self, pool_serial_number):
-        """Receives list of Logical Volumes from API.
-           URL: http://<host>/api/show/volumes/pool/<pool_serial_number>
+        """Receives list of Logical Volumes of the pool from the latest
+           snapshot of
+           URL: http://<host>/api/show/volumes
         """
-        url = self.rssencl.build_url(self.rssencl.URI_CLIAPI_SHOWVOLUMES)
+        snapshot = self.rssencl.poller.latest(self.rssencl.URI_CLIAPI_SHOWVOLUMES)
 
-        url = f"{url}/pool/{pool_serial_number}"
-
-        response = self.rssencl.ws_request(url, self.rssencl.ws.HTTP_GET)
-
-        if not response:
-            logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: Logical Volume status unavailable as ws request {url}"
+        if snapshot is None:
+            logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: Logical Volume status unavailable as ws request"
                 " failed")
             return
 
-        if response.status_code != self.rssencl.ws.HTTP_OK:
-            logger.error(f"{self.rssencl.LDR_R1_ENCL}:: http request {url} to get logical volumes failed with \
-                 err {response.status_code}")
-            return
-
-        response_data = json.loads(response.text)
-        logical_volumes = response_data.get("volumes")
+        # The container of a volume is its pool, as /show/volumes/pool/<serial> filters
+        logical_volumes = [volume for volume in snapshot.data.get("volumes", [])
+                           if volume.get("container-serial") == pool_serial_number]
         return logical_volumes
 
     def _get_msgs_for_faulty_disk_groups(self, disk_groups, send_message=True):
@@ -334,10 +326,10 @@ class RealStorLogicalVolumeSensor(SensorThread, InternalMsgQ):
                 # If timed out, do not update cache and revert in-memory cache.
                 # So, in next iteration change can be detected
                 if self._event.wait(self.rssencl.PERSISTENT_DATA_UPDATE_TIMEOUT):
-                    store.put(self._previously_faulty_disk_groups,\
-                        self._faulty_disk_group_file_path)
+                    self._disk_group_cache.put(self._previously_faulty_disk_groups, self.FAULTY_DISK_GROUPS_FILE)
+                    self._disk_group_cache.flush()
                 else:
-                    self._previously_faulty_disk_groups = store.get(self._faulty_disk_group_file_path)
+                    self._previously_faulty_disk_groups = self._disk_group_cache.get(self.FAULTY_DISK_GROUPS_FILE)
                 state_changed = False
             alert_type = ""
         return faulty_disk_group_messages
@@ -405,10 +397,10 @@ class RealStorLogicalVolumeSensor(SensorThread, InternalMsgQ):
                 # If timed out, do not update cache and revert in-memory cache.
                 # So, in next iteration change can be detected
                 if self._event.wait(self.rssencl.PERSISTENT_DATA_UPDATE_TIMEOUT):
-                    store.put(self._previously_faulty_logical_volumes,\
-                        self._faulty_logical_volume_file_path)
+                    self._logical_volume_cache.put(self._previously_faulty_logical_volumes, self.FAULTY_LOGICAL_VOLUMES_FILE)
+                    self._logical_volume_cache.flush()
                 else:
-                    self._previously_faulty_logical_volumes = store.get(self._faulty_logical_volume_file_path)
+                    self._previously_faulty_logical_volumes = self._logical_volume_cache.get(self.FAULTY_LOGICAL_VOLUMES_FILE)
                 state_changed = False
             alert_type = ""
 
@@ -455,7 +447,7 @@ class RealStorLogicalVolumeSensor(SensorThread, InternalMsgQ):
                 "event_time": epoch_time
                 }
 
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
             {"sensor_request_type": {
                 "enclosure_alert": {
                     "host_id": host_name,
@@ -505,7 +497,7 @@ class RealStorLogicalVolumeSensor(SensorThread, InternalMsgQ):
                 "event_time": epoch_time
                 }
 
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
             {"sensor_request_type": {
                 "enclosure_alert": {
                     "host_id": host_name,
@@ -534,7 +526,7 @@ class RealStorLogicalVolumeSensor(SensorThread, InternalMsgQ):
 
         self._event.clear()
         # RAAL stands for - RAise ALert
-        logger.info(f"RAAL: {json_msg}")
+        logger.info("RAAL: %s", json_msg)
         self._write_internal_msgQ(RealStorEnclMsgHandler.name(), json_msg, self._event)
 
     def suspend(self):
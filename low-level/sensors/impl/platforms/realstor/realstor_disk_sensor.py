@@ -30,10 +30,11 @@ import re
 
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from framework.utils.severity_reader import SeverityReader
 from framework.platforms.realstor.realstor_enclosure import singleton_realstorencl
-from framework.utils.store_factory import store
+from framework.utils.store_cache import StoreCache
 
 # Modules that receive messages from this module
 from message_handlers.real_stor_encl_msg_handler import RealStorEnclMsgHandler
@@ -98,6 +99,7 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
 
         # disks persistent cache
         self.disks_prcache = f"{self.rssencl.frus}disks/"
+        self.disks_cache = StoreCache(self.disks_prcache)
 
         self.pollfreq_disksensor = \
             int(self.rssencl.conf_reader._get_value_with_default(\
@@ -122,6 +124,12 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
         # Initialize internal message queues for this module
         super(RealStorDiskSensor, self).initialize_msgQ(msgQlist)
 
+        # Have the enclosure poll the resources this sensor reads
+        self.rssencl.poller.subscribe(self.rssencl.URI_CLIAPI_SHOWDISKSDETAIL, self.pollfreq_disksensor,
+                                      active=lambda: not self._suspended)
+        self.rssencl.poller.subscribe(self.rssencl.URI_CLIAPI_SHOWSYSTEM, self.rssencl.pollfreq,
+                                      active=lambda: not self._suspended)
+
         return True
 
     def read_data(self):
@@ -247,26 +255,26 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
         self._event = Event()
         for slot in removed_disks:
             #get removed drive data from disk cache
-            disk_datafile = f"{self.disks_prcache}disk_{slot}.json.prev"
+            disk_datafile = f"disk_{slot}.json.prev"
 
-            path_exists, _ = store.exists(disk_datafile)
-            if not path_exists:
-                disk_datafile = f"{self.disks_prcache}disk_{slot}.json"
+            if not self.disks_cache.exists(disk_datafile):
+                disk_datafile = f"disk_{slot}.json"
 
-            disk_info = store.get(disk_datafile)
+            disk_info = self.disks_cache.get(disk_datafile)
 
             #raise alert for missing drive
             self._rss_raise_disk_alert(self.rssencl.FRU_MISSING, disk_info)
             # Wait till msg is sent to rabbitmq or added in consul for resending.
             # If timed out, do not update cache
             if self._event.wait(self.rssencl.PERSISTENT_DATA_UPDATE_TIMEOUT):
-                store.delete(disk_datafile)
+                self.disks_cache.delete(disk_datafile)
             self._event.clear()
         self._event = None
+        self.disks_cache.flush()
 
         for slot in inserted_disks:
             #get inserted drive data from disk cache
-            disk_info = store.get(f"{self.disks_prcache}disk_{slot}.json")
+            disk_info = self.disks_cache.get(f"disk_{slot}.json")
 
             #raise alert for added drive
             self._rss_raise_disk_alert(self.rssencl.FRU_INSERTION, disk_info)
@@ -277,18 +285,27 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
 
         return
 
-    def rss_cliapi_poll_disks(self, disk):
-        """Retreive realstor disk info using cli api /show/disks"""
+    def _get_disks(self, disk):
+        """Retreive realstor disk info using cli api /show/disks, all disks
+           come from the latest /show/disks/detail snapshot"""
+
+        if disk == self.RSS_DISK_GET_ALL:
+            snapshot = self.rssencl.poller.latest(self.rssencl.URI_CLIAPI_SHOWDISKSDETAIL)
+
+            if snapshot is None:
+                logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: Disks status unavailable as ws request failed")
+                return
+
+            return snapshot.data
 
         # make ws request
         url = self.rssencl.build_url(
                   self.rssencl.URI_CLIAPI_SHOWDISKS)
 
-        if(disk != self.RSS_DISK_GET_ALL):
-           diskId = disk.partition("0.")[2]
+        diskId = disk.partition("0.")[2]
 
-           if(diskId.isdigit()):
-               url = f"{url}/{disk}"
+        if(diskId.isdigit()):
+            url = f"{url}/{disk}"
         url = f"{url}/detail"
 
         response = self.rssencl.ws_request(
@@ -305,16 +322,21 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
             return
 
         try:
-            jresponse = json.loads(response.content)
+            return json.loads(response.content)
         except ValueError as badjson:
             logger.error(f"{url} returned mal-formed json:\n{badjson}")
 
+    def rss_cliapi_poll_disks(self, disk):
+        """Retreive realstor disk info and update the disk caches"""
+
+        jresponse = self._get_disks(disk)
+
         if jresponse:
             api_resp = self.rssencl.get_api_status(jresponse['status'])
             #logger.debug("%s api response:%d" % (url.format(),api_resp))
 
-            if ((api_resp == -1) and
-                   (response.status_code == self.rssencl.ws.HTTP_OK)):
+            # Only successful (http 200) responses are published or returned
+            if api_resp == -1:
                 logger.warn("/show/disks api response unavailable, "
                     "marking success as http code is 200")
                 api_resp = 0
@@ -326,6 +348,13 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
                 self.latest_disks = {}
                 self.invalidate_latest_disks_info = False
 
+                # Persistent cache is read once and then served from memory
+                if not self.disks_cache.load():
+                    logger.warn(f"Unable to load {self.disks_prcache}, "
+                        "unable to check drive presence change")
+                    drives = []
+                    self.invalidate_latest_disks_info = True
+
                 for drive in drives:
                     slot = drive.get("slot", -1)
                     sn = drive.get("serial-number", "NA")
@@ -335,14 +364,13 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
                         self.latest_disks[slot] = {"serial-number":sn, "health":health}
 
                         #dump drive data to persistent cache
-                        dcache_path = f"{self.disks_prcache}disk_{slot}.json"
+                        dcache_path = f"disk_{slot}.json"
 
                         # If drive is replaced, previous drive info needs
                         # to be retained in disk_<slot>.json.prev file and
                         # then only dump new data to disk_<slot>.json
-                        path_exists, ret_val = store.exists(dcache_path)
-                        if path_exists and ret_val == "Success":
-                            prevdrive = store.get(dcache_path)
+                        if self.disks_cache.exists(dcache_path):
+                            prevdrive = self.disks_cache.get(dcache_path)
 
                             if prevdrive is not None:
                                 prevsn = prevdrive.get("serial-number","NA")
@@ -350,17 +378,13 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
 
                                 if prevsn != sn or prevhealth != health:
                                     # Rename path
-                                    store.put(store.get(dcache_path), dcache_path + ".prev")
-                                    store.delete(dcache_path)
-
-                                    store.put(drive, dcache_path)
-                        elif not path_exists and ret_val == "Success":
-                            store.put(drive, dcache_path)
+                                    self.disks_cache.put(prevdrive, dcache_path + ".prev")
+                                    self.disks_cache.put(drive, dcache_path)
                         else:
-                            # Invalidate latest disks info if persistence store error encountered
-                            logger.warn(f"store.exists {dcache_path} return value {ret_val}")
-                            self.invalidate_latest_disks_info = True
-                            break
+                            self.disks_cache.put(drive, dcache_path)
+
+                # Write changed slots only, in as few transactions as possible
+                self.disks_cache.flush()
 
                 if self.invalidate_latest_disks_info is True:
                     # Reset latest disks info
@@ -378,7 +402,7 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
     def _rss_build_disk_cache_from_persistent_cache(self):
         """Retreive realstor system state info using cli api /show/system"""
 
-        files = store.get_keys_with_prefix(self.disks_prcache)
+        files = self.disks_cache.keys()
 
         if not files:
             logger.debug("No files in Disk cache folder, ignoring")
@@ -388,7 +412,7 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
             if filename.startswith('disk_') and filename.endswith('.json'):
                 if f"{filename}.prev" in files:
                     filename = f"{filename}.prev"
-                drive = store.get(self.disks_prcache + filename)
+                drive = self.disks_cache.get(filename)
                 slotstr = re.findall("disk_(\d+).json", filename)[0]
 
                 if not slotstr.isdigit():
@@ -434,8 +458,8 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
                             # Alert send only if disks_prcache updated with latest disk data
                             if self.latest_disks[int(slot)]["health"] != "OK":
                                 #get drive data from disk cache
-                                disk_info = store.get(
-                                    self.disks_prcache+"disk_{0}.json".format(slot))
+                                disk_info = self.disks_cache.get(
+                                    "disk_{0}.json".format(slot))
 
                                 # raise alert for disk fault
                                 self._rss_raise_disk_alert(self.rssencl.FRU_FAULT, disk_info)
@@ -456,8 +480,8 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
                     # Alert send only if disks_prcache updated with latest disk data
                     if self.latest_disks[int(slot)]["health"] == "OK":
                         # get drive data from disk cache
-                        disk_info = store.get(
-                            self.disks_prcache+"disk_{0}.json".format(slot))
+                        disk_info = self.disks_cache.get(
+                            "disk_{0}.json".format(slot))
                         # raise alert for resolved disk fault
                         self._rss_raise_disk_alert(self.rssencl.FRU_FAULT_RESOLVED, disk_info)
                         # To ensure all msg is sent to rabbitmq or added in consul for resending.
@@ -534,7 +558,7 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
         internal_json_msg = self._gen_json_msg(alert_type, details, ext)
         self.last_alert = internal_json_msg
         # RAAL stands for - RAise ALert
-        logger.info(f"RAAL: {internal_json_msg}")
+        logger.info("RAAL: %s", internal_json_msg)
         # Send the event to storage encl message handler to generate json message and send out
         self._write_internal_msgQ(RealStorEnclMsgHandler.name(), internal_json_msg, self._event)
 
@@ -544,7 +568,7 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
 
         # Send the event to storage encl message handler to generate json message
         # and send out
-        internal_json_msg=json.dumps(
+        internal_json_msg=MsgEnvelope(
                 {'actuator_request_type':
                     {'logging':
                         {'log_level': 'LOG_WARNING', 'log_type': 'IEM',
@@ -28,6 +28,7 @@ from zope.interface import implementer
 
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from framework.utils.severity_reader import SeverityReader
 from framework.platforms.realstor.realstor_enclosure import singleton_realstorencl
@@ -200,7 +201,7 @@ class RealStorEnclosureSensor(SensorThread, InternalMsgQ):
                 "event_time": epoch_time
             }
 
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
             {"sensor_request_type": {
                 "enclosure_alert": {
                     "host_id": host_name,
@@ -217,7 +218,7 @@ class RealStorEnclosureSensor(SensorThread, InternalMsgQ):
 
         self.previous_alert_type = alert_type
         # RAAL stands for - RAise ALert
-        logger.info(f"RAAL: {internal_json_msg}")
+        logger.info("RAAL: %s", internal_json_msg)
         self._write_internal_msgQ(RealStorEnclMsgHandler.name(), internal_json_msg)
 
     def _get_alert_id(self, epoch_time):
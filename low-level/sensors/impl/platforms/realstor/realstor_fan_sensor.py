@@ -30,10 +30,11 @@ from zope.interface import implementer
 
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from framework.utils.severity_reader import SeverityReader
 from framework.platforms.realstor.realstor_enclosure import singleton_realstorencl
-from framework.utils.store_factory import store
+from framework.utils.store_cache import StoreCache
 
 # Modules that receive messages from this module
 from message_handlers.real_stor_encl_msg_handler import RealStorEnclMsgHandler
@@ -52,6 +53,7 @@ class RealStorFanSensor(SensorThread, InternalMsgQ):
 
     # Fan Modules directory name
     FAN_MODULES_DIR = "fanmodules"
+    FAULTY_FAN_MODULES_FILE = "fanmodule_data.json"
 
     # Dependency list
     DEPENDENCIES = {
@@ -105,22 +107,26 @@ class RealStorFanSensor(SensorThread, InternalMsgQ):
         # Initialize internal message queues for this module
         super(RealStorFanSensor, self).initialize_msgQ(msgQlist)
 
+        # Have the enclosure poll the resources this sensor reads
+        self.rssencl.poller.subscribe(self.rssencl.URI_CLIAPI_SHOWFANMODULES, self.pollfreq_fansensor,
+                                      active=lambda: not self._suspended)
+
 
         self._fanmodule_prcache = os.path.join(self.rssencl.frus, \
                                       self.FAN_MODULES_DIR)
 
         # Persistence file location. This file stores faulty FanModule data
         self._faulty_fan_file_path = os.path.join(
-            self._fanmodule_prcache, "fanmodule_data.json")
+            self._fanmodule_prcache, self.FAULTY_FAN_MODULES_FILE)
+        self._fan_module_cache = StoreCache(self._fanmodule_prcache)
 
         # Load faulty Fan Module data from file if available
-        self._faulty_fan_modules_list = store.get(\
-                                           self._faulty_fan_file_path)
+        self._faulty_fan_modules_list = self._fan_module_cache.get(self.FAULTY_FAN_MODULES_FILE)
 
         if self._faulty_fan_modules_list is None:
             self._faulty_fan_modules_list = {}
-            store.put(self._faulty_fan_modules_list,\
-                self._faulty_fan_file_path)
+            self._fan_module_cache.put(self._faulty_fan_modules_list, self.FAULTY_FAN_MODULES_FILE)
+            self._fan_module_cache.flush()
 
         return True
 
@@ -201,10 +207,10 @@ class RealStorFanSensor(SensorThread, InternalMsgQ):
                     # If timed out, do not update cache and revert in-memory cache.
                     # So, in next iteration change can be detectedcted
                     if self._event.wait(self.rssencl.PERSISTENT_DATA_UPDATE_TIMEOUT):
-                        store.put(self._faulty_fan_modules_list,\
-                            self._faulty_fan_file_path)
+                        self._fan_module_cache.put(self._faulty_fan_modules_list, self.FAULTY_FAN_MODULES_FILE)
+                        self._fan_module_cache.flush()
                     else:
-                        self._faulty_fan_modules_list = store.get(self._faulty_fan_file_path)
+                        self._faulty_fan_modules_list = self._fan_module_cache.get(self.FAULTY_FAN_MODULES_FILE)
                     alert_type = None
         except Exception as e:
             logger.exception(e)
@@ -218,28 +224,15 @@ class RealStorFanSensor(SensorThread, InternalMsgQ):
         return bool(re.search(not_installed_health_string, health_reason))
 
     def _get_fan_modules_list(self):
-        """Returns fan module list using API /show/fan-modules"""
-
-        url = self.rssencl.build_url(
-                  self.rssencl.URI_CLIAPI_SHOWFANMODULES)
+        """Returns fan module list from the latest /show/fan-modules snapshot"""
 
-        response = self.rssencl.ws_request(
-                        url, self.rssencl.ws.HTTP_GET)
+        snapshot = self.rssencl.poller.latest(self.rssencl.URI_CLIAPI_SHOWFANMODULES)
 
-        if not response:
-            logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: Fan-modules status unavailable as ws request {url} failed")
+        if snapshot is None:
+            logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: Fan-modules status unavailable as ws request failed")
             return
 
-        if response.status_code != self.rssencl.ws.HTTP_OK:
-            if url.find(self.rssencl.ws.LOOPBACK) == -1:
-                logger.error(
-                    f"{self.rssencl.LDR_R1_ENCL}:: http request {url} to get fan-modules failed with http err  \
-                               {response.status_code}")
-            return
-
-        response_data = json.loads(response.text)
-
-        fan_modules_list = response_data["fan-modules"]
+        fan_modules_list = snapshot.data["fan-modules"]
         return fan_modules_list
 
     def _get_fan_attributes(self, fan_module):
@@ -302,7 +295,7 @@ class RealStorFanSensor(SensorThread, InternalMsgQ):
 
         # Creates internal json message request structure.
         # this message will be passed to the StorageEnclHandler
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
             {"sensor_request_type": {
                 "enclosure_alert": {
                         "status": "update",
@@ -330,7 +323,7 @@ class RealStorFanSensor(SensorThread, InternalMsgQ):
 
         self._event.clear()
         # RAAL stands for - RAise ALert
-        logger.info(f"RAAL: {json_msg}")
+        logger.info("RAAL: %s", json_msg)
         # Send the event to real stor message handler
         # to generate json message and send out
         self._write_internal_msgQ(RealStorEnclMsgHandler.name(), json_msg, self._event)
@@ -352,7 +345,7 @@ class RealStorFanSensor(SensorThread, InternalMsgQ):
 
         # Send the event to real stor message handler
         # to generate json message and send out
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
                 {'actuator_request_type':
                     {'logging':
                         {'log_level': 'LOG_WARNING', 'log_type': 'IEM',
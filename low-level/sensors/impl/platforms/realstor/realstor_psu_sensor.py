@@ -18,7 +18,6 @@
   Description:       Monitors PSU using RealStor API.
  ****************************************************************************
 """
-import json
 import os
 import re
 import socket
@@ -30,10 +29,11 @@ from zope.interface import implementer
 
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from framework.utils.severity_reader import SeverityReader
 from framework.platforms.realstor.realstor_enclosure import singleton_realstorencl
-from framework.utils.store_factory import store
+from framework.utils.store_cache import StoreCache
 
 # Modules that receive messages from this module
 from message_handlers.real_stor_encl_msg_handler import RealStorEnclMsgHandler
@@ -52,6 +52,7 @@ class RealStorPSUSensor(SensorThread, InternalMsgQ):
 
     # PSUs directory name
     PSUS_DIR = "psus"
+    FAULTY_PSUS_FILE = "psudata.json"
 
     # Dependency list
     DEPENDENCIES = {
@@ -107,22 +108,26 @@ class RealStorPSUSensor(SensorThread, InternalMsgQ):
         # Initialize internal message queues for this module
         super(RealStorPSUSensor, self).initialize_msgQ(msgQlist)
 
+        # Have the enclosure poll the resources this sensor reads
+        self.rssencl.poller.subscribe(self.rssencl.URI_CLIAPI_SHOWPSUS, self.pollfreq_psusensor,
+                                      active=lambda: not self._suspended)
+
         self.psu_prcache = os.path.join(self.rssencl.frus, self.PSUS_DIR)
 
         # Persistence file location. This file stores faulty PSU data
         self._faulty_psu_file_path = os.path.join(
-            self.psu_prcache, "psudata.json")
+            self.psu_prcache, self.FAULTY_PSUS_FILE)
+        self._psu_cache = StoreCache(self.psu_prcache)
         self._log_debug(
             f"_faulty_psu_file_path: {self._faulty_psu_file_path}")
 
         # Load faulty PSU data from file if available
-        self._previously_faulty_psus = store.get(\
-                                           self._faulty_psu_file_path)
+        self._previously_faulty_psus = self._psu_cache.get(self.FAULTY_PSUS_FILE)
 
         if self._previously_faulty_psus is None:
             self._previously_faulty_psus = {}
-            store.put(self._previously_faulty_psus,\
-                self._faulty_psu_file_path)
+            self._psu_cache.put(self._previously_faulty_psus, self.FAULTY_PSUS_FILE)
+            self._psu_cache.flush()
 
         return True
 
@@ -159,27 +164,16 @@ class RealStorPSUSensor(SensorThread, InternalMsgQ):
                 self._priority, self.run, ())
 
     def _get_psus(self):
-        """Receives list of PSUs from API.
+        """Receives list of PSUs from the latest snapshot of
            URL: http://<host>/api/show/power-supplies
         """
-        url = self.rssencl.build_url(
-                  self.rssencl.URI_CLIAPI_SHOWPSUS)
-
-        response = self.rssencl.ws_request(
-                        url, self.rssencl.ws.HTTP_GET)
-
-        if not response:
-            logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: PSUs status unavailable as ws request {url} failed")
-            return
+        snapshot = self.rssencl.poller.latest(self.rssencl.URI_CLIAPI_SHOWPSUS)
 
-        if response.status_code != self.rssencl.ws.HTTP_OK:
-            if url.find(self.rssencl.ws.LOOPBACK) == -1:
-                logger.error(f"{self.rssencl.LDR_R1_ENCL}:: http request {url} to get power-supplies failed   \
-                                       with err {response.status_code}")
+        if snapshot is None:
+            logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: PSUs status unavailable as ws request failed")
             return
 
-        response_data = json.loads(response.text)
-        psus = response_data.get("power-supplies")
+        psus = snapshot.data.get("power-supplies")
         return psus
 
     def _get_msgs_for_faulty_psus(self, psus, send_message = True):
@@ -258,10 +252,10 @@ class RealStorPSUSensor(SensorThread, InternalMsgQ):
                 # If timed out, do not update cache and revert in-memory cache.
                 # So, in next iteration change can be detected
                 if self._event.wait(self.rssencl.PERSISTENT_DATA_UPDATE_TIMEOUT):
-                    store.put(self._previously_faulty_psus,\
-                        self._faulty_psu_file_path)
+                    self._psu_cache.put(self._previously_faulty_psus, self.FAULTY_PSUS_FILE)
+                    self._psu_cache.flush()
                 else:
-                    self._previously_faulty_psus = store.get(self._faulty_psu_file_path)
+                    self._previously_faulty_psus = self._psu_cache.get(self.FAULTY_PSUS_FILE)
                 state_changed = False
             alert_type = ""
         return faulty_psu_messages
@@ -352,7 +346,7 @@ class RealStorPSUSensor(SensorThread, InternalMsgQ):
 
         # Creates internal json message request structure.
         # this message will be passed to the StorageEnclHandler
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
             {"sensor_request_type": {
                 "enclosure_alert": {
                         "status": "update",
@@ -378,12 +372,12 @@ class RealStorPSUSensor(SensorThread, InternalMsgQ):
     def _send_json_msg(self, json_msg):
         """Sends JSON message to Handler"""
         self._log_debug(
-            "RealStorPSUSensor._send_json_msg -> {0}".format(json_msg))
+            "RealStorPSUSensor._send_json_msg -> %s", json_msg)
         if not json_msg:
             return
         self._event.clear()
         # RAAL stands for - RAise ALert
-        logger.info(f"RAAL: {json_msg}")
+        logger.info("RAAL: %s", json_msg)
         self._write_internal_msgQ(RealStorEnclMsgHandler.name(), json_msg, self._event)
 
     def _check_if_psu_not_installed(self, health_reason):
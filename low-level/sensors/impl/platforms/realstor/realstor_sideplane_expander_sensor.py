@@ -18,7 +18,6 @@
   Description:       Monitors Sideplane Expander data using RealStor API
   ****************************************************************************
 """
-import json
 import os
 import socket
 import time
@@ -29,10 +28,11 @@ from zope.interface import implementer
 
 from framework.base.module_thread import SensorThread
 from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.msg_envelope import MsgEnvelope
 from framework.utils.service_logging import logger
 from framework.utils.severity_reader import SeverityReader
 from framework.platforms.realstor.realstor_enclosure import singleton_realstorencl
-from framework.utils.store_factory import store
+from framework.utils.store_cache import StoreCache
 
 # Modules that receive messages from this module
 from message_handlers.real_stor_encl_msg_handler import RealStorEnclMsgHandler
@@ -52,6 +52,7 @@ class RealStorSideplaneExpanderSensor(SensorThread, InternalMsgQ):
 
     # Fan Modules directory name
     SIDEPLANE_EXPANDERS_DIR = "sideplane_expanders"
+    FAULTY_SIDEPLANE_EXPANDERS_FILE = "sideplane_expanders_data.json"
 
     # Dependency list
     DEPENDENCIES = {
@@ -105,24 +106,27 @@ class RealStorSideplaneExpanderSensor(SensorThread, InternalMsgQ):
         # Initialize internal message queues for this module
         super(RealStorSideplaneExpanderSensor, self).initialize_msgQ(msgQlist)
 
+        # Have the enclosure poll the resources this sensor reads
+        self.rssencl.poller.subscribe(self.rssencl.URI_CLIAPI_SHOWENCLOSURE, self.pollfreq_sideplane_expander_sensor,
+                                      active=lambda: not self._suspended)
+
         self._sideplane_exp_prcache = os.path.join(self.rssencl.frus,\
                                           self.SIDEPLANE_EXPANDERS_DIR)
 
         # Persistence file location.
         # This file stores faulty sideplane expander data
         self._faulty_sideplane_expander_file_path = os.path.join(
-            self._sideplane_exp_prcache, "sideplane_expanders_data.json")
+            self._sideplane_exp_prcache, self.FAULTY_SIDEPLANE_EXPANDERS_FILE)
+        self._sideplane_expander_cache = StoreCache(self._sideplane_exp_prcache)
 
         # Load faulty sideplane expander data from file if available
         self._faulty_sideplane_expander_dict = \
-            store.get(\
-               self._faulty_sideplane_expander_file_path)
+            self._sideplane_expander_cache.get(self.FAULTY_SIDEPLANE_EXPANDERS_FILE)
 
         if self._faulty_sideplane_expander_dict is None:
             self._faulty_sideplane_expander_dict = {}
-            store.put(\
-                self._faulty_sideplane_expander_dict,\
-                self._faulty_sideplane_expander_file_path)
+            self._sideplane_expander_cache.put(self._faulty_sideplane_expander_dict, self.FAULTY_SIDEPLANE_EXPANDERS_FILE)
+            self._sideplane_expander_cache.flush()
 
         return True
 
@@ -150,28 +154,17 @@ class RealStorSideplaneExpanderSensor(SensorThread, InternalMsgQ):
                 self._priority, self.run, ())
 
     def _get_sideplane_expander_list(self):
-        """return sideplane expander list using API /show/enclosure"""
+        """return sideplane expander list from the latest /show/enclosure snapshot"""
 
         sideplane_expanders = []
 
-        url = self.rssencl.build_url(
-                  self.rssencl.URI_CLIAPI_SHOWENCLOSURE)
-
-        response = self.rssencl.ws_request(
-                        url, self.rssencl.ws.HTTP_GET)
-
-        if not response:
-            logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: Enclosure status unavailable as ws request {url} failed")
-            return
+        snapshot = self.rssencl.poller.latest(self.rssencl.URI_CLIAPI_SHOWENCLOSURE)
 
-        if response.status_code != self.rssencl.ws.HTTP_OK:
-            if url.find(self.rssencl.ws.LOOPBACK) == -1:
-                logger.error(f"{self.rssencl.LDR_R1_ENCL}:: http request {url} to get enclosure failed with  \
-                                      err {response.status_code}")
+        if snapshot is None:
+            logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: Enclosure status unavailable as ws request failed")
             return
 
-        response_data = json.loads(response.text)
-        encl_drawers = response_data["enclosures"][0]["drawers"]
+        encl_drawers = snapshot.data["enclosures"][0]["drawers"]
         if encl_drawers:
             for drawer in encl_drawers:
                 sideplane_list = drawer["sideplanes"]
@@ -239,11 +232,10 @@ class RealStorSideplaneExpanderSensor(SensorThread, InternalMsgQ):
                     # If timed out, do not update cache and revert in-memory cache.
                     # So, in next iteration change can be detected
                     if self._event.wait(self.rssencl.PERSISTENT_DATA_UPDATE_TIMEOUT):
-                        store.put(\
-                            self._faulty_sideplane_expander_dict,\
-                            self._faulty_sideplane_expander_file_path)
+                        self._sideplane_expander_cache.put(self._faulty_sideplane_expander_dict, self.FAULTY_SIDEPLANE_EXPANDERS_FILE)
+                        self._sideplane_expander_cache.flush()
                     else:
-                        self._faulty_sideplane_expander_dict = store.get(self._faulty_sideplane_expander_file_path)
+                        self._faulty_sideplane_expander_dict = self._sideplane_expander_cache.get(self.FAULTY_SIDEPLANE_EXPANDERS_FILE)
                     alert_type = None
 
             except Exception as ae:
@@ -259,7 +251,9 @@ class RealStorSideplaneExpanderSensor(SensorThread, InternalMsgQ):
         unhealthy_component_list = ['health', 'health-reason',
                                         'health-recommendation', 'component-id']
 
-        for unhealthy_component in unhealthy_components:
+        for component in unhealthy_components:
+            # Snapshot data is read-only, work on a copy
+            unhealthy_component = dict(component)
             for unhealthy_key in filter(lambda common_key: common_key in unhealthy_component, unhealthy_component_list):
                 unhealthy_component[unhealthy_key] = unhealthy_component.get(unhealthy_key, "")
             sideplane_unhealthy_components.append(unhealthy_component)
@@ -309,7 +303,7 @@ class RealStorSideplaneExpanderSensor(SensorThread, InternalMsgQ):
                 "event_time": epoch_time
                 }
 
-        internal_json_msg = json.dumps(
+        internal_json_msg = MsgEnvelope(
             {"sensor_request_type": {
                 "enclosure_alert": {
                         "status": "update",
@@ -339,7 +333,7 @@ class RealStorSideplaneExpanderSensor(SensorThread, InternalMsgQ):
         # and send out
         self._event.clear()
         # RAAL stands for - RAise ALert
-        logger.info(f"RAAL: {json_msg}")
+        logger.info("RAAL: %s", json_msg)
         self._write_internal_msgQ(RealStorEnclMsgHandler.name(), json_msg, self._event)
 
     def suspend(self):
@@ -0,0 +1,130 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of configuration reads done while modules
+                     initialize, reading every key from consul compared to
+                     reading them from a ConfigSnapshot.
+
+                     Runs against the in-process consul stand-in of
+                     benchmark_store_queue.py, which adds a fixed round trip
+                     time to every call, extended here with the blocking
+                     queries the snapshot watch uses. Also checks that a
+                     change made in consul reaches the snapshot through its
+                     watch.
+
+  Usage:             SSPL_STORE_TYPE=file ./benchmark_config_reader.py [sections] [keys] [rtt_ms]
+ ****************************************************************************
+"""
+
+import sys
+import threading
+import time
+
+sys.path.insert(0, '../..')
+from benchmark_store_queue import FakeConsul, make_store
+from framework.base.sspl_constants import component
+from framework.utils.config_reader import ConfigReader
+from framework.utils.config_snapshot import ConfigSnapshot
+
+
+class BlockingFakeConsul(FakeConsul):
+    """FakeConsul also answering consul blocking queries"""
+
+    class _KV(FakeConsul._KV):
+        def get(self, key, recurse=False, index=None, wait=None):
+            if index is not None:
+                self._parent._block(index, wait)
+            return super().get(key, recurse)
+
+    def __init__(self, rtt):
+        super().__init__(rtt)
+        self.changed = threading.Condition()
+        self.kv = BlockingFakeConsul._KV(self)
+
+    def _block(self, index, wait):
+        """Blocking query, returns once the index moved past index"""
+        timeout = float(wait.rstrip('s')) if wait else 300
+        with self.changed:
+            self.changed.wait_for(lambda: self.index > index, timeout)
+
+    def _set(self, key, value, cas=None):
+        with self.changed:
+            done = super()._set(key, value, cas)
+            self.changed.notify_all()
+        return done
+
+
+def make_reader(store, snapshot):
+    reader = ConfigReader.__new__(ConfigReader)
+    reader.store = store
+    reader.consul_conn = None
+    reader.is_init = False
+    reader.snapshot = snapshot
+    return reader
+
+
+def startup(reader, sections, keys):
+    """Read every key the way module initialize() methods do"""
+    for section in sections:
+        for key in keys:
+            reader._get_value_with_default(section, key, '')
+
+
+def main():
+    section_count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    key_count = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    rtt = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.5 / 1000
+    sections = [f"SENSOR{index}" for index in range(section_count)]
+    keys = [f"key{index}" for index in range(key_count)]
+
+    store = make_store(0)
+    store.consul_conn = BlockingFakeConsul(0)
+    for section in sections:
+        for key in keys:
+            store.put(f"{section}-{key}", f"{component}/{section}/{key}")
+    store.consul_conn.rtt = rtt
+    print(f"{section_count * key_count} keys, {rtt * 1000} ms per consul call")
+
+    store.consul_conn.calls = 0
+    start = time.time()
+    startup(make_reader(store, None), sections, keys)
+    print(f"{'per key':>10}: {(time.time() - start) * 1000:8.1f} ms ({store.consul_conn.calls} calls)")
+
+    store.consul_conn.calls = 0
+    start = time.time()
+    snapshot = ConfigSnapshot(store.consul_conn, component + '/')
+    snapshot.load()
+    reader = make_reader(store, snapshot)
+    startup(reader, sections, keys)
+    print(f"{'snapshot':>10}: {(time.time() - start) * 1000:8.1f} ms ({store.consul_conn.calls} calls)")
+
+    snapshot.watch()
+    time.sleep(0.1)
+    start = time.time()
+    store.put("changed", f"{component}/{sections[0]}/{keys[0]}")
+    while reader._get_value(sections[0], keys[0]) != "changed":
+        if time.time() - start > 5:
+            print("watch: change was not picked up")
+            return
+        time.sleep(0.001)
+    print(f"{'watch':>10}: change visible after {(time.time() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
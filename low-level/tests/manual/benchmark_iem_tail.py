@@ -0,0 +1,151 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Throughput benchmark of IEM log reading, in IEM lines
+                     per second, up to the message sent by IEMSensor.
+
+                     Compares iterating the log with a timestamp file
+                     written after every line and IEC codes decoded by
+                     scanning the mapping CSV files behind an lru_cache(32),
+                     as before, to LogTailer with checkpoints every 1000
+                     lines and IecMapping. Both parse IEMs the same way.
+                     The old way only reads the first legacy_lines lines,
+                     it is too slow for the whole log.
+
+  Usage:             ./benchmark_iem_tail.py [log_size_mb] [legacy_lines]
+ ****************************************************************************
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+from functools import lru_cache
+
+sys.path.insert(0, '../..')
+from framework.utils.iec_mapping import IecMapping
+from framework.utils.log_tail import LogTailer
+from sensors.impl.generic.iem_sensor import IEMSensor
+
+IEC_MAPPING = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                "../../files/iec_mapping"))
+
+
+def generate(path, size):
+    """IEM log of about size bytes with codes of every component"""
+    lines = []
+    for index in range(4096):
+        code = f"{index % 6 + 1:03x}{index % 15 + 1:03x}{index % 64 + 1:04x}"
+        lines.append(f"2020-08-10T10:{index // 600 % 60:02d}:{index // 10 % 60:02d}."
+                     f"{index:06d}+05:30 srvnode-1 motr[1234]: IEC: EO{code}:"
+                     f"Error {index} reported by the component\n")
+    block = "".join(lines).encode()
+    with open(path, "wb") as f:
+        for _ in range(max(1, size // len(block))):
+            f.write(block)
+    return os.path.getsize(path)
+
+
+class LegacyDecoder(object):
+    """IEC decoding of IEMSensor before IecMapping"""
+
+    def _get_component(self, component):
+        if os.path.exists(f"{IEC_MAPPING}/components"):
+            with open(f"{IEC_MAPPING}/components", newline='') as f:
+                for row in csv.reader(f):
+                    if component == row[0]:
+                        return row[1]
+        return None
+
+    @lru_cache(maxsize=32)
+    def decode(self, code):
+        component_id, module_id, event_id = code[:3], code[3:6], code[6:]
+        component = self._get_component(component_id)
+        if component and os.path.exists(f"{IEC_MAPPING}/{component}"):
+            with open(f"{IEC_MAPPING}/{component}", newline='') as f:
+                for row in csv.reader(f):
+                    if code == row[0]:
+                        return component, row[1], row[2]
+            return component, module_id, event_id
+        return component or component_id, module_id, event_id
+
+
+def decode_line(sensor, decode, iem_log):
+    iem_components = sensor._extract_iem_components(sensor._get_iem(iem_log))
+    return decode("".join(iem_components[2:5]))
+
+
+def legacy(sensor, path, workdir, max_lines):
+    decoder = LegacyDecoder()
+    timestamp_path = os.path.join(workdir, "last_processed_msg_time")
+    open(timestamp_path, "w").close()
+    count = 0
+    start = time.time()
+    with open(path) as iem_logs:
+        for iem_log in iem_logs:
+            log = iem_log.rstrip()
+            log_timestamp = log[:log.index(" ")]
+            decode_line(sensor, decoder.decode, log)
+            with open(timestamp_path, "w") as timestamp_file:
+                timestamp_file.write(log_timestamp)
+            count += 1
+            if count >= max_lines:
+                break
+    return count, time.time() - start
+
+
+def tailing(sensor, path, workdir):
+    mapping = IecMapping(IEC_MAPPING)
+    tailer = LogTailer(path, os.path.join(workdir, "checkpoint"))
+    count = 0
+    start = time.time()
+    for iem_log in tailer.lines():
+        log_timestamp = iem_log[:iem_log.find(" ")]
+        decode_line(sensor, mapping.decode, iem_log)
+        count += 1
+        if count % 1000 == 0:
+            tailer.checkpoint({"timestamp": log_timestamp})
+    tailer.checkpoint({"timestamp": log_timestamp})
+    tailer.close()
+    return count, time.time() - start
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    legacy_lines = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+
+    workdir = tempfile.mkdtemp(prefix="iemtail")
+    path = os.path.join(workdir, "iem_messages")
+    try:
+        size = generate(path, size_mb * 1024 * 1024)
+        print(f"IEM log of {size / 1024 / 1024:.0f} MB")
+        sensor = IEMSensor()
+        for name, (count, elapsed) in (
+                ("legacy", legacy(sensor, path, workdir, legacy_lines)),
+                ("tailing", tailing(sensor, path, workdir))):
+            print(f"{name:>8}: {count:10d} lines in {elapsed:8.2f} secs, "
+                  f"{count / elapsed:10.0f} lines/sec")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
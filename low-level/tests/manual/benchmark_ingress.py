@@ -0,0 +1,167 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Throughput benchmark of RabbitMQingressProcessor on a
+                     burst of actuator requests, delivered by an in-memory
+                     stand-in for the RabbitMQ connection.
+
+                     Compares checking the requests one at a time on the
+                     consuming thread and acking each of them, as before,
+                     to prefetching, checking them on worker threads and
+                     acking them in batches. The time the signature check
+                     of libsspl_sec and an ack take can be simulated, both
+                     default to 0. Also checks the requests were handed
+                     off in the order they were delivered and all acked.
+                     Schemas are read from the source tree.
+
+  Usage:             ./benchmark_ingress.py [requests] [verify_usec] [ack_usec]
+ ****************************************************************************
+"""
+
+import json
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, '../..')
+from framework.rabbitmq import rabbitmq_ingress_processor
+from framework.rabbitmq.rabbitmq_ingress_processor import RabbitMQingressProcessor
+
+rabbitmq_ingress_processor.RESOURCE_PATH = os.path.abspath('../../json_msgs/schemas')
+
+HANDLER = "ServiceMsgHandler"
+
+
+class Method(object):
+    __slots__ = ("delivery_tag",)
+
+    def __init__(self, delivery_tag):
+        self.delivery_tag = delivery_tag
+
+
+class Channel(object):
+    is_open = True
+
+
+class InMemoryConnection(object):
+    """Delivers bodies to the consumer like RabbitMQ through pika would,
+    at most prefetch_count unacked, and runs the callbacks of other threads
+    between deliveries"""
+
+    def __init__(self, bodies, ack_usec):
+        self._bodies = bodies
+        self._ack_delay = ack_usec / 1e6
+        self._callbacks = queue.Queue()
+        self._channel = Channel()
+        self.acks = 0
+        self.acked = 0
+
+    def consume(self, callback, prefetch_count=0):
+        delivered = 0
+        while self.acked < len(self._bodies):
+            while delivered < len(self._bodies) and \
+                  (not prefetch_count or delivered - self.acked < prefetch_count):
+                delivered += 1
+                callback(self._channel, Method(delivered), None, self._bodies[delivered - 1])
+            try:
+                self._callbacks.get(timeout=10)()
+                while True:
+                    self._callbacks.get_nowait()()
+            except queue.Empty:
+                pass
+
+    def call_threadsafe(self, callback):
+        self._callbacks.put(callback)
+
+    def ack(self, ch, delivery_tag, multiple=False):
+        if self._ack_delay:
+            time.sleep(self._ack_delay)
+        self.acks += 1
+        self.acked = delivery_tag if multiple else self.acked + 1
+
+
+class SecurityLib(object):
+    """libsspl_sec, which releases the GIL while it checks a signature"""
+
+    def __init__(self, verify_usec):
+        self._delay = verify_usec / 1e6
+
+    def sspl_verify_message(self, msg_len, message, username, signature):
+        time.sleep(self._delay)
+        return 0
+
+
+def request(index):
+    return json.dumps({
+        "title": "SSPL-LL Actuator Request",
+        "description": "Seagate Storage Platform Library - Low Level - Actuator Request",
+        "username": "sspl-ll", "signature": "None",
+        "time": "2020-08-10 14:28:30.974749", "expires": 500,
+        "uuid": f"{index:08d}",
+        "message": {
+            "sspl_ll_msg_header": {"schema_version": "1.0.0", "sspl_version": "1.0.0",
+                                   "msg_version": "1.0.0", "uuid": f"{index:08d}"},
+            "actuator_request_type": {
+                "service_controller": {"service_name": f"service-{index}.service",
+                                       "service_request": "status"}}}})
+
+
+def run(title, requests, prefetch_count, ack_batch_size, worker_threads, ack_usec):
+    bodies = [request(index) for index in range(requests)]
+    msgQlist = {HANDLER: queue.Queue(), "RabbitMQegressProcessor": queue.Queue()}
+    processor = RabbitMQingressProcessor()
+    processor.initialize_msgQ(msgQlist)
+    processor._connection = InMemoryConnection(bodies, ack_usec)
+    processor._prefetch_count = prefetch_count
+    processor._ack_batch_size = ack_batch_size
+    processor._worker_threads = worker_threads
+
+    start = time.time()
+    processor.run()
+    elapsed = time.time() - start
+    if processor._executor is not None:
+        processor._executor.shutdown()
+
+    handed_off = []
+    while not msgQlist[HANDLER].empty():
+        message, _ = msgQlist[HANDLER].get()
+        handed_off.append(message.body["sspl_ll_msg_header"]["uuid"])
+    print(f"{title:>8}: {requests / elapsed:8.0f} requests/sec, "
+          f"{processor._connection.acks:6d} acks")
+    if handed_off != [f"{index:08d}" for index in range(requests)]:
+        print(f"MISMATCH: {len(handed_off)} requests handed off, not in delivery order")
+    if processor._connection.acked != requests:
+        print(f"MISMATCH: {processor._connection.acked} requests acked")
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    verify_usec = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    ack_usec = float(sys.argv[3]) if len(sys.argv) > 3 else 0
+    if verify_usec:
+        rabbitmq_ingress_processor.use_security_lib = True
+        rabbitmq_ingress_processor.SSPL_SEC = SecurityLib(verify_usec)
+
+    run("serial", requests, 0, 1, 1, ack_usec)
+    run("pooled", requests, 64, 16, 4, ack_usec)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of the SEL polls done by NodeHWsensor,
+                     starting ipmitool for a full 'sel list' on every poll
+                     compared to 'sel info' and 'sel list last <n>' run in
+                     one IpmiSession.
+
+                     Runs the ipmisimtool simulator of the source tree on
+                     a generated SEL, a few entries are added to it every
+                     poll. Also checks both ways saw the same entries.
+
+  Usage:             ./benchmark_ipmi_session.py [sel_entries] [polls] [new_per_poll]
+ ****************************************************************************
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '../..')
+from framework.utils.ipmi_session import IpmiSession, SelCursor, parse_info
+
+SIMULATOR = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                "../../../sspl_test/ipmi_simulator/ipmisimtool"))
+FRU_TYPES = "Power Supply|Power Unit|Fan|Drive Slot / Bay|Temperature|Voltage"
+DEVICES = ("Fan #0x0c", "Power Supply #0x51", "Drive Slot / Bay #0xf0",
+           "Power Unit #0x02", "System Event #0x8a")
+
+
+class MockSel(object):
+    """SEL of the simulator, in a copy of its mock data"""
+
+    def __init__(self, entries):
+        self.path = tempfile.mkdtemp(prefix="ipmisim")
+        source = os.path.join(os.path.dirname(SIMULATOR), "ipmi_mock_data")
+        for name in os.listdir(source):
+            shutil.copy(os.path.join(source, name), self.path)
+        with open(os.path.join(self.path, "sel_info.txt")) as f:
+            self.info = f.read()
+        self.entries = 0
+        open(os.path.join(self.path, "sel_list.txt"), "w").close()
+        self.add(entries)
+
+    def add(self, count):
+        with open(os.path.join(self.path, "sel_list.txt"), "a") as f:
+            for index in range(self.entries + 1, self.entries + count + 1):
+                f.write(f"{index:4x} | 02/28/2020 | 14:01:45 | "
+                        f"{DEVICES[index % len(DEVICES)]} | Fully Redundant | Asserted\n")
+        self.entries += count
+        with open(os.path.join(self.path, "sel_info.txt"), "w") as f:
+            f.write(re.sub(r"Entries\s*: \d+", f"Entries          : {self.entries}", self.info))
+
+
+def one_shot():
+    """Poll the way NodeHWsensor did, a new process and a full 'sel list'"""
+    process = subprocess.Popen(f"{SIMULATOR} sel list", shell=True,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, _ = process.communicate()
+    return [line for line in out.decode().split("\n") if re.search(FRU_TYPES, line)]
+
+
+def in_session(session, cursor):
+    """Poll with 'sel info' and only the new entries in the session"""
+    (out, _), _ = session.run([SIMULATOR], "sel info")
+    info = parse_info(out.decode())
+    subcommand = cursor.next_read(info)
+    if subcommand is None:
+        return []
+    (out, _), _ = session.run([SIMULATOR], subcommand)
+    cursor.commit(info)
+    return [line for line in out.decode().split("\n") if re.search(FRU_TYPES, line)]
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    polls = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    new_per_poll = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    sel = MockSel(entries)
+    os.environ["IPMISIMTOOL_MOCK_DATA"] = sel.path
+    print(f"{entries} SEL entries, {polls} polls adding {new_per_poll} entries each")
+
+    try:
+        seen = set()
+        start = time.time()
+        for _ in range(polls):
+            sel.add(new_per_poll)
+            seen.update(one_shot())
+        elapsed = time.time() - start
+        print(f"{'one-shot':>10}: {elapsed * 1000 / polls:8.2f} ms per poll")
+        one_shot_seen = seen
+
+        shutil.rmtree(sel.path, ignore_errors=True)
+        sel = MockSel(entries)
+        os.environ["IPMISIMTOOL_MOCK_DATA"] = sel.path
+        session = IpmiSession()
+        cursor = SelCursor()
+        seen = set(in_session(session, cursor))
+        start = time.time()
+        for _ in range(polls):
+            sel.add(new_per_poll)
+            seen.update(in_session(session, cursor))
+        elapsed = time.time() - start
+        session.close()
+        print(f"{'session':>10}: {elapsed * 1000 / polls:8.2f} ms per poll")
+
+        if seen != one_shot_seen:
+            print(f"MISMATCH: one-shot saw {len(one_shot_seen)} entries, session {len(seen)}")
+    finally:
+        shutil.rmtree(sel.path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
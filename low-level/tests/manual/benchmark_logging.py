@@ -0,0 +1,96 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of the time a module thread spends logging,
+                     with records formatted and sent to syslog by the
+                     calling thread as before, compared to the queue and
+                     writer thread of init_logging().
+
+                     Several threads log the same mix of info, debug (not
+                     logged) and warning records to a local UDP port
+                     standing in for syslog. Prints the mean time per call
+                     and the records written, dropped and rate limited.
+
+  Usage:             ./benchmark_logging.py [threads] [records_per_thread]
+ ****************************************************************************
+"""
+
+import logging
+import logging.handlers
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, '../..')
+from framework.utils import service_logging
+
+SYSLOG_FORMAT = "%(name)s[%(process)d]: %(levelname)s %(message)s (%(filename)s:%(lineno)d)"
+
+
+def log_records(logger, records):
+    payload = {"alert_type": "fault", "resource_id": "/dev/sda", "info": "x" * 200}
+    for index in range(records):
+        logger.info("RAAL: %s", payload)
+        logger.debug("Processing %d: %s", index, payload)
+        if index % 10 == 0:
+            logger.warning("Unable to read sensor data: %s", payload)
+
+
+def run(logger, threads, records):
+    workers = [threading.Thread(target=log_records, args=(logger, records))
+               for _ in range(threads)]
+    start = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.time() - start
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    records = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    calls = threads * records * 2.1
+
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    port = sink.getsockname()[1]
+
+    direct = logging.getLogger("benchmark-direct")
+    direct.propagate = False
+    direct.setLevel(logging.INFO)
+    handler = logging.handlers.SysLogHandler(address=("127.0.0.1", port))
+    handler.setFormatter(logging.Formatter(SYSLOG_FORMAT))
+    direct.addHandler(handler)
+    elapsed = run(direct, threads, records)
+    print(f"  direct: {elapsed * 1e6 / calls:6.2f} usec per call")
+
+    service_logging.init_logging("benchmark", "INFO", "127.0.0.1", port)
+    queued = service_logging.logger
+    queued.propagate = False
+    elapsed = run(queued, threads, records)
+    print(f"  queued: {elapsed * 1e6 / calls:6.2f} usec per call")
+    service_logging.shutdown_logging()
+    print(f"  {service_logging.logging_stats()}")
+    sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of the /proc/mdstat parsing done by
+                     RAIDsensor, reading the whole file into a string and
+                     splitting every line into fields as before compared to
+                     MdstatWatcher streaming the file through parse_mdstat()
+                     and telling which arrays changed.
+
+                     Runs on generated mdstat files with hundreds of arrays,
+                     one array degrading or recovering before every read.
+                     Also checks both ways found the same arrays.
+
+  Usage:             ./benchmark_mdstat_parser.py [arrays ...] [--reads N]
+ ****************************************************************************
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '../..')
+from framework.utils.mdstat import MdstatWatcher
+
+
+def generate(arrays, degraded=()):
+    """mdstat text of arrays raid1 arrays, those in degraded missing a drive"""
+    lines = ["Personalities : [raid1] [raid0] [raid6] [raid5] [raid4]"]
+    for index in range(arrays):
+        first, second = f"sd{index}a1", f"sd{index}b1"
+        if index in degraded:
+            lines.append(f"md{index} : active raid1 {second}[1](F) {first}[0]")
+            lines.append("      976630464 blocks super 1.2 [2/1] [U_]")
+            lines.append("      [==>..................]  recovery = 12.6% "
+                         "(123456/976630464) finish=81.2min speed=180000K/sec")
+        else:
+            lines.append(f"md{index} : active raid1 {second}[1] {first}[0]")
+            lines.append("      976630464 blocks super 1.2 [2/2] [UU]")
+        lines.append("      bitmap: 0/8 pages [0KB], 65536KB chunk")
+        lines.append("")
+    lines.append("unused devices: <none>")
+    return "\n".join(lines) + "\n"
+
+
+class LegacyParser(object):
+    """Reads and parses mdstat the way RAIDsensor did, without mdadm"""
+
+    def __init__(self, path):
+        self._path = path
+        self._contents = None
+
+    def read(self):
+        with open(self._path, "r") as datafile:
+            status = datafile.read()
+        if self._contents == status:
+            return None
+        self._contents = status
+
+        devices = {}
+        device = None
+        md_line_parsed = False
+        for line in status.strip().split("\n"):
+            if md_line_parsed is True:
+                fields = line.split(" ")
+                devices[device]["status"] = fields[-1]
+                md_line_parsed = False
+            fields = line.split(" ")
+            if "md" in fields[0]:
+                device = f"/dev/{fields[0]}"
+                devices[device] = {"drives": []}
+                for field in fields:
+                    if "[" in field:
+                        devices[device]["drives"].append(field[:field.find("[")])
+                md_line_parsed = True
+        return devices
+
+
+def run(arrays, reads, path):
+    with open(path, "w") as f:
+        f.write(generate(arrays))
+
+    results = {}
+    for name, reader in (("legacy", LegacyParser(path)),
+                         ("streaming", MdstatWatcher(path))):
+        reader.read()
+        elapsed = 0.0
+        found = None
+        for index in range(reads):
+            degraded = (index % arrays,) if index % 2 == 0 else ()
+            with open(path, "w") as f:
+                f.write(generate(arrays, degraded))
+            start = time.time()
+            found = reader.read()
+            elapsed += time.time() - start
+        results[name] = (elapsed, found)
+        if name == "streaming":
+            reader.close()
+
+    legacy, streaming = results["legacy"], results["streaming"]
+    print(f"{arrays:6d} arrays: legacy {legacy[0] * 1000 / reads:7.3f} ms, "
+          f"streaming {streaming[0] * 1000 / reads:7.3f} ms per read, "
+          f"{len(streaming[1][1])} changed of {len(streaming[1][0])}")
+    if set(legacy[1]) != set(streaming[1][0]):
+        print(f"MISMATCH: legacy found {len(legacy[1])} arrays, streaming {len(streaming[1][0])}")
+
+
+def main():
+    args = sys.argv[1:]
+    reads = 200
+    if "--reads" in args:
+        index = args.index("--reads")
+        reads = int(args[index + 1])
+        del args[index:index + 2]
+    sizes = [int(arg) for arg in args] or [100, 300, 500, 1000]
+
+    fd, path = tempfile.mkstemp(prefix="mdstat")
+    os.close(fd)
+    try:
+        for arrays in sizes:
+            run(arrays, reads, path)
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of sensor messages built per second through
+                     getJson(), reading and checking the schema for every
+                     message compared to the compiled validators of the
+                     schema registry in full, sampled and off modes.
+
+                     Schemas are read from the source tree.
+
+  Usage:             ./benchmark_message_validation.py [seconds]
+ ****************************************************************************
+"""
+
+import json
+import os
+import sys
+import time
+
+from jsonschema import Draft3Validator
+from jsonschema import validate
+
+sys.path.insert(0, '../..')
+from json_msgs.messages.sensors import base_sensors_msg
+from json_msgs.messages.sensors.iem_data import IEMDataMsg
+from json_msgs.schema_registry import registry
+
+base_sensors_msg.RESOURCE_PATH = os.path.abspath('../../json_msgs/schemas')
+
+INFO = {"event_time": "1600000000", "site_id": "001", "node_id": "001",
+        "cluster_id": "001", "rack_id": "001", "alert_type": "get",
+        "severity": "informational", "source_id": "S", "component_id": "SSP",
+        "module_id": "SP", "event_id": "001", "description": "benchmark",
+        "IEC": "IEC:IS:SSP:SP:001"}
+
+
+class LegacyIEMDataMsg(IEMDataMsg):
+    """IEMDataMsg reading the schema for every message, as before the registry"""
+
+    def __init__(self, info):
+        super(LegacyIEMDataMsg, self).__init__(info)
+        with open(self._schema_file, 'r') as f:
+            _schema = f.read()
+        self._schema = json.loads(' '.join(_schema.split()))
+        Draft3Validator.check_schema(self._schema)
+
+    def validateMsg(self, _jsonMsg):
+        _jsonMsg = self.normalize_kv(_jsonMsg)
+        validate(_jsonMsg, self._schema)
+        return _jsonMsg
+
+
+def measure(title, msg_class, seconds):
+    count = 0
+    start = time.time()
+    while time.time() - start < seconds:
+        msg_class(INFO).getJson()
+        count += 1
+    print(f"{title:>10}: {count / (time.time() - start):10.0f} messages/sec")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    measure("legacy", LegacyIEMDataMsg, seconds)
+    for mode in ("full", "sampled", "off"):
+        registry.configure(mode, 100)
+        measure(mode, IEMDataMsg, seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of the cost of a RAID alert on its way from
+                     RAIDsensor through NodeDataMsgHandler to the signed
+                     body published by RabbitMQegressProcessor.
+
+                     Compares passing JSON text between the modules, parsed
+                     and serialized again at every hop with the debug
+                     logs formatted on every hop, as before, to passing
+                     MsgEnvelopes through InternalMsgQ. Prints the CPU time,
+                     the json.dumps()/json.loads() calls and the bytes of
+                     JSON text made per alert. Schemas are read from the
+                     source tree.
+
+  Usage:             ./benchmark_msg_envelope.py [alerts]
+ ****************************************************************************
+"""
+
+import json
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, '../..')
+from framework.base.debug import Debug
+from framework.base.internal_msgQ import InternalMsgQ
+from json_msgs.messages.sensors import base_sensors_msg
+from json_msgs.messages.sensors.raid_data import RAIDdataMsg
+
+base_sensors_msg.RESOURCE_PATH = os.path.abspath('../../json_msgs/schemas')
+
+HANDLER = "NodeDataMsgHandler"
+EGRESS = "RabbitMQegressProcessor"
+
+
+class JsonCounter(object):
+    """Counts the json.dumps() and json.loads() calls and the text made"""
+
+    def __init__(self):
+        self.dumps = self.loads = self.chars = 0
+        self._dumps, self._loads = json.dumps, json.loads
+
+    def __enter__(self):
+        def dumps(*args, **kwargs):
+            text = self._dumps(*args, **kwargs)
+            self.dumps += 1
+            self.chars += len(text)
+            return text
+
+        def loads(*args, **kwargs):
+            self.loads += 1
+            return self._loads(*args, **kwargs)
+
+        json.dumps, json.loads = dumps, loads
+        return self
+
+    def __exit__(self, *args):
+        json.dumps, json.loads = self._dumps, self._loads
+
+
+class Module(InternalMsgQ, Debug):
+
+    def __init__(self, name, msgQlist):
+        super(Module, self).__init__()
+        self._name = name
+        self.initialize_msgQ(msgQlist)
+
+    def name(self):
+        return self._name
+
+
+def sensor_request(index):
+    return {"sensor_request_type": {"node_data": {
+        "status": "update", "sensor_type": "node:os:raid_data",
+        "host_id": "srvnode-1", "alert_type": "fault",
+        "alert_id": f"{1600000000 + index}{index:032x}", "severity": "critical",
+        "info": {"site_id": "001", "cluster_id": "001", "rack_id": "001",
+                 "node_id": "001", "resource_type": "node:os:raid_data",
+                 "resource_id": "/dev/md0", "event_time": str(1600000000 + index)},
+        "specific_info": {"device": "/dev/md0", "drives": [
+            {"status": "U", "identity": {"path": "/dev/sda1", "serialNumber": "ZC1A2B3C"}},
+            {"status": "_", "identity": {"path": "/dev/sdb1", "serialNumber": "ZC4D5E6F"}}]}}}}
+
+
+def raid_data_msg(request):
+    node_data = request.get("sensor_request_type").get("node_data")
+    return RAIDdataMsg(node_data.get("host_id"), node_data.get("alert_type"),
+                       node_data.get("alert_id"), node_data.get("severity"),
+                       node_data.get("info"), node_data.get("specific_info"))
+
+
+def sign(msg):
+    msg["username"] = "sspl-ll"
+    msg["expires"] = 3600
+    msg["time"] = str(int(time.time()))
+    msg["signature"] = "SecurityLibNotInstalled"
+    return json.dumps(msg).encode('utf8')
+
+
+def legacy_alert(index, sensor, handler, egress):
+    # Every hop formatted its debug log, parsed and serialized the message
+    msgQlist = sensor._msgQlist
+    msg = json.dumps(sensor_request(index))
+    "_write_internal_msgQ: From %s, To %s, Msg:%s" % (sensor.name(), HANDLER, msg)
+    msgQlist[HANDLER].put((msg, None))
+    msg, _ = msgQlist[HANDLER].get()
+    _, request = handler._check_debug(msg)
+    "_read_my_msgQ: %s, Msg:%s" % (handler.name(), request)
+    "_process_msg, jsonMsg: %s" % request
+    msg = raid_data_msg(request).getJson()
+    "_write_internal_msgQ: From %s, To %s, Msg:%s" % (handler.name(), EGRESS, msg)
+    msgQlist[EGRESS].put((msg, None))
+    msg, _ = msgQlist[EGRESS].get()
+    _, msg = egress._check_debug(msg)
+    "_read_my_msgQ: %s, Msg:%s" % (egress.name(), msg)
+    "_transmit_batch, jsonMsg: %s" % msg
+    return sign(msg)
+
+
+def envelope_alert(index, sensor, handler, egress):
+    sensor._write_internal_msgQ(HANDLER, sensor_request(index))
+    request, _ = handler._read_my_msgQ()
+    handler._write_internal_msgQ(EGRESS, raid_data_msg(request).getEnvelope())
+    msg, _ = egress._read_my_msgQ()
+    return sign(dict(msg))
+
+
+def run(title, alert, alerts):
+    msgQlist = {HANDLER: queue.Queue(), EGRESS: queue.Queue()}
+    modules = [Module(name, msgQlist) for name in ("RAIDsensor", HANDLER, EGRESS)]
+    bodies = [alert(index, *modules) for index in range(100)]
+    with JsonCounter() as counter:
+        start = time.process_time()
+        for index in range(alerts):
+            alert(index, *modules)
+        elapsed = time.process_time() - start
+    print(f"{title:>9}: {elapsed * 1e6 / alerts:7.1f} usec CPU, "
+          f"{counter.dumps / alerts:.1f} dumps, {counter.loads / alerts:.1f} loads, "
+          f"{counter.chars / alerts:6.0f} bytes of JSON per alert")
+    return [json.loads(body) for body in bodies]
+
+
+def main():
+    alerts = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    legacy = run("legacy", legacy_alert, alerts)
+    envelope = run("envelope", envelope_alert, alerts)
+    for msg in legacy + envelope:
+        del msg["time"]
+    if legacy != envelope:
+        print("MISMATCH: the published bodies differ")
+
+
+if __name__ == "__main__":
+    main()
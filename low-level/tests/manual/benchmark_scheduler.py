@@ -0,0 +1,119 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of the message hand-off latency between
+                     modules, with each module polling on its own scheduler
+                     thread compared to queue driven modules on the shared
+                     EventScheduler runtime.
+
+                     A chain of relay modules passes a timestamped message
+                     along, the time it takes to reach the last module is
+                     reported.
+
+  Usage:             ./benchmark_scheduler.py [messages] [hops]
+ ****************************************************************************
+"""
+
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, '../..')
+from framework.base.event_scheduler import EventScheduler
+from framework.base.internal_msgQ import InternalMsgQ
+from framework.base.module_thread import ScheduledModuleThread
+
+
+class Relay(ScheduledModuleThread, InternalMsgQ):
+    """Forwards every message to the next module in the chain"""
+
+    QUEUE_DRIVEN = True
+
+    def __init__(self, name, next_name, done):
+        super(Relay, self).__init__(name, 1)
+        self._name = name
+        self._next_name = next_name
+        self._done = done
+
+    def name(self):
+        return self._name
+
+    def initialize(self, conf_reader, msgQlist, product):
+        super(Relay, self).initialize(conf_reader)
+        self.initialize_msgQ(msgQlist)
+
+    def run(self):
+        while not self._is_my_msgQ_empty():
+            jsonMsg, _ = self._read_my_msgQ()
+            if self._next_name is None:
+                self._done(jsonMsg["sent"])
+            else:
+                self._write_internal_msgQ(self._next_name, jsonMsg)
+        self._scheduler.enter(1, self._priority, self.run, ())
+
+
+def measure(title, messages, hops, shared):
+    msgQlist = {f"relay{i}": queue.Queue() for i in range(hops)}
+    latencies = []
+    finished = threading.Event()
+
+    def done(sent):
+        latencies.append(time.time() - sent)
+        if len(latencies) == messages:
+            finished.set()
+
+    relays = [Relay(f"relay{i}", f"relay{i + 1}" if i + 1 < hops else None, done)
+              for i in range(hops)]
+    event_scheduler = None
+    if shared:
+        event_scheduler = EventScheduler(4)
+        for relay in relays:
+            relay.attach_scheduler(event_scheduler)
+        event_scheduler.start()
+
+    for relay in relays:
+        relay.initialize(None, msgQlist, None)
+        if shared:
+            relay.start()
+        else:
+            threading.Thread(target=relay.start, daemon=True).start()
+
+    for _ in range(messages):
+        relays[0]._write_internal_msgQ("relay0", {"sent": time.time()})
+        # Spread the messages so they do not all land in one polling pass
+        time.sleep(0.05)
+    finished.wait(messages + hops * 2)
+
+    if event_scheduler is not None:
+        event_scheduler.stop()
+    latencies.sort()
+    print(f"{title:>10}: {hops} hops, median {latencies[len(latencies) // 2] * 1000:8.2f} ms, "
+          f"max {latencies[-1] * 1000:8.2f} ms, threads alive {threading.active_count()}")
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    hops = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    measure("shared", messages, hops, True)
+    measure("threaded", messages, hops, False)
+
+
+if __name__ == "__main__":
+    main()
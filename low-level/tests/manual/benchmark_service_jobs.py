@@ -0,0 +1,229 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Latency benchmark of service restart requests of the
+                     SystemdService actuator, against a mock systemd1 on a
+                     private dbus-daemon which finishes every job after
+                     job_delay seconds.
+
+                     Compares polling ActiveState every second after
+                     RestartUnit then sleeping 5 seconds, as before, to
+                     waiting for the JobRemoved signal of the job. Requests
+                     used to run one at a time on the ServiceMsgHandler
+                     thread, the new way runs them on several threads as
+                     the handler now does for requests of different
+                     services.
+
+  Usage:             ./benchmark_service_jobs.py [job_delay] [requests]
+ ****************************************************************************
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import dbus
+
+sys.path.insert(0, '../..')
+
+SYSTEMD_BUS_NAME = "org.freedesktop.systemd1"
+SYSTEMD_PATH = "/org/freedesktop/systemd1"
+MANAGER_IFACE = "org.freedesktop.systemd1.Manager"
+UNIT_IFACE = "org.freedesktop.systemd1.Unit"
+
+
+def unit_path(name):
+    return SYSTEMD_PATH + "/unit/" + \
+           re.sub("[^A-Za-z0-9]", lambda match: "_%02x" % ord(match.group()), name)
+
+
+def run_mock_systemd(job_delay):
+    """Serve a mock systemd1 on the session bus until killed"""
+    import dbus.service
+    from dbus.mainloop.glib import DBusGMainLoop
+    from gi.repository import GLib
+
+    class MockUnit(dbus.service.Object):
+
+        def __init__(self, connection, name):
+            super(MockUnit, self).__init__(connection, unit_path(name))
+            self.name = name
+            self.state, self.substate = "active", "running"
+
+        @dbus.service.method(dbus.PROPERTIES_IFACE, in_signature="ss", out_signature="v")
+        def Get(self, interface, name):
+            return {"Id": self.name, "ActiveState": self.state, "SubState": self.substate}[name]
+
+    class MockManager(dbus.service.Object):
+
+        # State of a unit while its job runs and once it is over
+        STATES = {"StartUnit": (("activating", "start"), ("active", "running")),
+                  "RestartUnit": (("activating", "start"), ("active", "running")),
+                  "StopUnit": (("deactivating", "stop"), ("inactive", "dead"))}
+
+        def __init__(self, connection):
+            super(MockManager, self).__init__(connection, SYSTEMD_PATH)
+            self.units = {}
+            self.job_id = 0
+
+        def unit(self, name):
+            if name not in self.units:
+                self.units[name] = MockUnit(self.connection, name)
+            return self.units[name]
+
+        def queue_job(self, method, name):
+            unit = self.unit(str(name))
+            self.job_id += 1
+            job_id, job = self.job_id, f"{SYSTEMD_PATH}/job/{self.job_id}"
+            (unit.state, unit.substate), final = self.STATES[method]
+
+            def finish():
+                unit.state, unit.substate = final
+                self.JobRemoved(dbus.UInt32(job_id), dbus.ObjectPath(job), name, "done")
+                return False
+
+            GLib.timeout_add(int(job_delay * 1000), finish)
+            return job
+
+        @dbus.service.method(MANAGER_IFACE, in_signature="s", out_signature="o")
+        def LoadUnit(self, name):
+            return unit_path(self.unit(str(name)).name)
+
+        @dbus.service.method(MANAGER_IFACE, in_signature="ss", out_signature="o")
+        def StartUnit(self, name, mode):
+            return self.queue_job("StartUnit", name)
+
+        @dbus.service.method(MANAGER_IFACE, in_signature="ss", out_signature="o")
+        def StopUnit(self, name, mode):
+            return self.queue_job("StopUnit", name)
+
+        @dbus.service.method(MANAGER_IFACE, in_signature="ss", out_signature="o")
+        def RestartUnit(self, name, mode):
+            return self.queue_job("RestartUnit", name)
+
+        @dbus.service.method(MANAGER_IFACE)
+        def Subscribe(self):
+            pass
+
+        @dbus.service.method(MANAGER_IFACE)
+        def Unsubscribe(self):
+            pass
+
+        @dbus.service.signal(MANAGER_IFACE, signature="uoss")
+        def JobRemoved(self, job_id, job, name, result):
+            pass
+
+    DBusGMainLoop(set_as_default=True)
+    bus = dbus.SessionBus()
+    # The name is owned as long as its BusName is referenced
+    MockManager(bus).bus_name = dbus.service.BusName(SYSTEMD_BUS_NAME, bus)
+    print("ready", flush=True)
+    GLib.MainLoop().run()
+
+
+def legacy_restart(bus, manager, name):
+    """Restart of SystemdService before JobRemoved was waited for"""
+    proxy = bus.get_object(SYSTEMD_BUS_NAME, str(manager.LoadUnit(name)))
+
+    def get(prop):
+        return proxy.Get(UNIT_IFACE, prop, dbus_interface=dbus.PROPERTIES_IFACE)
+
+    manager.RestartUnit(name, 'replace')
+    max_wait = 0
+    while get("ActiveState") != "active":
+        time.sleep(1)
+        max_wait += 1
+        if max_wait > 20:
+            break
+    time.sleep(5)
+    return name, get("ActiveState"), get("SubState")
+
+
+def restart_request(name):
+    return {"actuator_request_type": {"service_controller": {
+                "service_name": name, "service_request": "restart"}}}
+
+
+def timed(fn, *args):
+    start = time.time()
+    result = fn(*args)
+    return result, time.time() - start
+
+
+def report(name, latencies, elapsed, results):
+    assert all(result[1:] == ("active", "running") for result in results), results
+    latencies = sorted(latencies)
+    print(f"{name:>10}: {len(latencies)} restarts in {elapsed:6.2f} secs, latency "
+          f"min {latencies[0]:6.3f} median {latencies[len(latencies) // 2]:6.3f} "
+          f"max {latencies[-1]:6.3f} secs")
+
+
+def main():
+    job_delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    daemon = subprocess.Popen(["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+                              stdout=subprocess.PIPE, universal_newlines=True)
+    address = daemon.stdout.readline().strip()
+    # Both dbus-python and GDBus take the system bus from there
+    os.environ["DBUS_SESSION_BUS_ADDRESS"] = address
+    os.environ["DBUS_SYSTEM_BUS_ADDRESS"] = address
+    mock = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--mock-systemd",
+                             str(job_delay)],
+                            stdout=subprocess.PIPE, universal_newlines=True)
+    try:
+        assert mock.stdout.readline().strip() == "ready"
+        print(f"Jobs finish after {job_delay} secs")
+        names = [f"service-{index}.service" for index in range(requests)]
+
+        # One at a time on the handler thread
+        bus = dbus.SystemBus()
+        manager = dbus.Interface(bus.get_object(SYSTEMD_BUS_NAME, SYSTEMD_PATH),
+                                 dbus_interface=MANAGER_IFACE)
+        start = time.time()
+        runs = [timed(legacy_restart, bus, manager, name) for name in names]
+        report("legacy", [run[1] for run in runs], time.time() - start, [run[0] for run in runs])
+
+        from actuators.impl.centos_7.systemd_service import SystemdService
+        actuator = SystemdService(job_timeout=30)
+
+        start = time.time()
+        runs = [timed(actuator.perform_request, restart_request(name)) for name in names]
+        report("serial", [run[1] for run in runs], time.time() - start, [run[0] for run in runs])
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=requests) as executor:
+            runs = list(executor.map(lambda name: timed(actuator.perform_request,
+                                                        restart_request(name)), names))
+        report("concurrent", [run[1] for run in runs], time.time() - start, [run[0] for run in runs])
+    finally:
+        mock.terminate()
+        mock.wait()
+        daemon.terminate()
+        daemon.wait()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--mock-systemd":
+        run_mock_systemd(float(sys.argv[2]))
+    else:
+        main()
@@ -0,0 +1,223 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of the consul backed StoreQueue used to hold
+                     egress messages while RabbitMQ is unreachable.
+
+                     Runs against an in-process consul stand-in which adds a
+                     fixed round trip time to every KV/transaction call, and
+                     compares the segmented queue with the previous
+                     one-message-per-key layout.
+
+  Usage:             ./benchmark_store_queue.py [messages] [rtt_ms]
+ ****************************************************************************
+"""
+
+import base64
+import json
+import sys
+import time
+
+sys.path.insert(0, '../..')
+from framework.utils.consulstore import ConsulStore
+from framework.utils.store_queue import StoreQueue
+
+
+class FakeConsul(object):
+    """Minimal in-memory stand-in for consul.Consul covering kv and txn"""
+
+    class _KV(object):
+        def __init__(self, parent):
+            self._parent = parent
+
+        def get(self, key, recurse=False):
+            self._parent._round_trip()
+            data = self._parent.data
+            if recurse:
+                items = [self._parent._item(k) for k in sorted(data) if k.startswith(key)]
+                return self._parent.index, items or None
+            if key not in data:
+                return self._parent.index, None
+            return self._parent.index, self._parent._item(key)
+
+        def put(self, key, value, cas=None):
+            self._parent._round_trip()
+            return self._parent._set(key, value, cas)
+
+        def delete(self, key, recurse=False):
+            self._parent._round_trip()
+            self._parent.data.pop(key, None)
+            return True
+
+    class _Txn(object):
+        def __init__(self, parent):
+            self._parent = parent
+
+        def put(self, payload):
+            self._parent._round_trip()
+            parent = self._parent
+            for op in payload:
+                kv = op["KV"]
+                if kv["Verb"] == "cas":
+                    current = parent.data.get(kv["Key"], (None, 0))[1]
+                    if current != kv["Index"]:
+                        raise Exception("409 transaction rolled back")
+            results = []
+            for op in payload:
+                kv = op["KV"]
+                if kv["Verb"] == "delete":
+                    parent.data.pop(kv["Key"], None)
+                    continue
+                parent._set(kv["Key"], base64.b64decode(kv["Value"]))
+                results.append({"KV": {"Key": kv["Key"],
+                                       "ModifyIndex": parent.data[kv["Key"]][1]}})
+            return {"Results": results, "Errors": None}
+
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.calls = 0
+        self.index = 0
+        self.data = {}
+        self.kv = FakeConsul._KV(self)
+        self.txn = FakeConsul._Txn(self)
+
+    def _round_trip(self):
+        self.calls += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def _item(self, key):
+        value, index = self.data[key]
+        return {"Key": key, "Value": value, "ModifyIndex": index}
+
+    def _set(self, key, value, cas=None):
+        if cas is not None and self.data.get(key, (None, 0))[1] != cas:
+            return False
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        self.index += 1
+        self.data[key] = (value, self.index)
+        return True
+
+
+class LegacyStoreQueue(object):
+    """The one-message-per-key queue StoreQueue replaced, kept for comparison"""
+
+    def __init__(self, store, max_size):
+        self._store = store
+        self._max_size = max_size
+        for key in ("SSPL_MEMORY_USAGE", "SSPL_MESSAGE_HEAD_INDEX", "SSPL_MESSAGE_TAIL_INDEX"):
+            if store.get(key) is None:
+                store.put(0, key)
+
+    def _getter(key):
+        return property(lambda self: self._store.get(key),
+                        lambda self, value: self._store.put(value, key))
+
+    current_size = _getter("SSPL_MEMORY_USAGE")
+    head = _getter("SSPL_MESSAGE_HEAD_INDEX")
+    tail = _getter("SSPL_MESSAGE_TAIL_INDEX")
+
+    def is_empty(self):
+        if self.tail == self.head:
+            self.head = 0
+            self.tail = 0
+            self.current_size = 0
+            return True
+        return False
+
+    def get(self):
+        if self.is_empty():
+            return
+        item = self._store.get(f"SSPL_UNSENT_MESSAGES/{self.head}")
+        self._store.delete(f"SSPL_UNSENT_MESSAGES/{self.head}")
+        self.head += 1
+        self.current_size -= sys.getsizeof(item)
+        return item
+
+    def put(self, item):
+        self._store.put(item, f"SSPL_UNSENT_MESSAGES/{self.tail}", pickled=False)
+        self.tail += 1
+        self.current_size += sys.getsizeof(item)
+
+
+def make_store(rtt):
+    store = ConsulStore.__new__(ConsulStore)
+    store.consul_conn = FakeConsul(rtt)
+    return store
+
+
+def sample_message(index):
+    return json.dumps({"sspl_ll_msg_header": {"msg_version": "1.0.0"},
+                       "message": {"sensor_response_type": {"info": {
+                           "event_time": str(int(time.time())), "resource_id": f"disk_{index}"},
+                           "specific_info": {"health-reason": "x" * 512}}}}).encode('utf8')
+
+
+def run(name, queue, store, messages, drain):
+    store.consul_conn.calls = 0
+    start = time.time()
+    for message in messages:
+        queue.put(message)
+    put_time = time.time() - start
+    put_calls = store.consul_conn.calls
+
+    store.consul_conn.calls = 0
+    start = time.time()
+    received = drain(queue)
+    get_time = time.time() - start
+    get_calls = store.consul_conn.calls
+
+    assert received == messages, f"{name}: queue returned messages out of order"
+    print(f"{name:>24}: put {len(messages) / put_time:10.1f} msg/s ({put_calls} calls), "
+          f"get {len(messages) / get_time:10.1f} msg/s ({get_calls} calls)")
+
+
+def drain_one_by_one(queue):
+    received = []
+    while not queue.is_empty():
+        received.append(queue.get())
+    return received
+
+
+def drain_in_batches(queue):
+    received = []
+    while not queue.is_empty():
+        received.extend(queue.get_batch(100))
+    return received
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rtt = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0005
+    messages = [sample_message(i) for i in range(count)]
+    print(f"{count} messages of {len(messages[0])} bytes, {rtt * 1000} ms per consul call")
+
+    store = make_store(rtt)
+    run("legacy", LegacyStoreQueue(store, 50000000), store, messages, drain_one_by_one)
+
+    store = make_store(rtt)
+    run("segmented", StoreQueue(store, 50000000, 100), store, messages, drain_one_by_one)
+
+    store = make_store(rtt)
+    run("segmented, batched get", StoreQueue(store, 50000000, 100), store, messages, drain_in_batches)
+
+
+if __name__ == "__main__":
+    main()
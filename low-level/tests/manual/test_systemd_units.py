@@ -0,0 +1,342 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Tests of SystemdUnitTracker against a fake systemd1
+
+                     Runs a private dbus-daemon session bus and, in another
+                     process, a fake org.freedesktop.systemd1 with a Manager
+                     and unit objects whose state the tests change through
+                     an extra control interface. The fake counts the calls
+                     made to it, to check how many round trips tracking
+                     costs. Skipped without dbus-python, PyGObject or
+                     dbus-daemon.
+
+  Usage:             ./test_systemd_units.py
+ ****************************************************************************
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+import unittest
+
+try:
+    import dbus
+    import dbus.service
+    from dbus.mainloop.glib import DBusGMainLoop
+    from gi.repository import GLib
+except ImportError:
+    dbus = None
+
+sys.path.insert(0, '../..')
+
+SYSTEMD_BUS_NAME = "org.freedesktop.systemd1"
+SYSTEMD_PATH = "/org/freedesktop/systemd1"
+MANAGER_IFACE = "org.freedesktop.systemd1.Manager"
+UNIT_IFACE = "org.freedesktop.systemd1.Unit"
+SERVICE_IFACE = "org.freedesktop.systemd1.Service"
+CONTROL_IFACE = "com.seagate.sspl.test.FakeSystemd"
+
+# name, ActiveState, SubState, ExecMainPID of the units loaded at start
+UNITS = [("sspl-ll.service", "active", "running", 101),
+         ("rabbitmq-server.service", "failed", "failed", 0),
+         ("m0d@0x7200000000000001.service", "active", "running", 102),
+         ("sshd.service", "active", "running", 103),
+         ("dev-sda.device", "active", "plugged", 0)]
+
+MONITORED = ["sspl-ll.service", "rabbitmq-server.service",
+             "hare-consul-agent.service", "m0d@*"]
+
+
+def unit_path(name):
+    return SYSTEMD_PATH + "/unit/" + \
+           re.sub("[^A-Za-z0-9]", lambda match: "_%02x" % ord(match.group()), name)
+
+
+def run_fake_systemd(units):
+    """Serve a fake systemd1 on the session bus until killed"""
+
+    class FakeUnit(dbus.service.Object):
+
+        def __init__(self, manager, name, state, substate, pid):
+            super(FakeUnit, self).__init__(manager.connection, unit_path(name))
+            self.manager = manager
+            self.name = name
+            self.state = state
+            self.substate = substate
+            self.pid = pid
+
+        def properties(self, interface):
+            if interface == UNIT_IFACE:
+                return {"Id": self.name, "ActiveState": self.state, "SubState": self.substate}
+            if interface == SERVICE_IFACE and self.name.endswith(".service"):
+                return {"ExecMainPID": dbus.UInt32(self.pid)}
+            raise dbus.exceptions.DBusException(f"No interface {interface}",
+                    name="org.freedesktop.DBus.Error.UnknownInterface")
+
+        @dbus.service.method(dbus.PROPERTIES_IFACE, in_signature="s", out_signature="a{sv}")
+        def GetAll(self, interface):
+            self.manager.count("GetAll")
+            return self.properties(interface)
+
+        @dbus.service.method(dbus.PROPERTIES_IFACE, in_signature="ss", out_signature="v")
+        def Get(self, interface, name):
+            self.manager.count("Get")
+            return self.properties(interface)[name]
+
+        @dbus.service.signal(dbus.PROPERTIES_IFACE, signature="sa{sv}as")
+        def PropertiesChanged(self, interface, changed, invalidated):
+            pass
+
+    class FakeManager(dbus.service.Object):
+
+        def __init__(self, connection):
+            super(FakeManager, self).__init__(connection, SYSTEMD_PATH)
+            self.units = {}
+            self.calls = {}
+
+        def count(self, method):
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+        @dbus.service.method(MANAGER_IFACE, out_signature="a(ssssssouso)")
+        def ListUnits(self):
+            self.count("ListUnits")
+            return [(unit.name, "", "loaded", unit.state, unit.substate, "",
+                     unit_path(unit.name), dbus.UInt32(0), "", dbus.ObjectPath("/"))
+                    for unit in self.units.values()]
+
+        @dbus.service.method(MANAGER_IFACE, in_signature="s", out_signature="o")
+        def GetUnit(self, name):
+            self.count("GetUnit")
+            return unit_path(str(name))
+
+        @dbus.service.method(MANAGER_IFACE)
+        def Subscribe(self):
+            self.count("Subscribe")
+
+        @dbus.service.method(MANAGER_IFACE)
+        def Unsubscribe(self):
+            self.count("Unsubscribe")
+
+        @dbus.service.signal(MANAGER_IFACE, signature="so")
+        def UnitNew(self, name, path):
+            pass
+
+        @dbus.service.signal(MANAGER_IFACE, signature="so")
+        def UnitRemoved(self, name, path):
+            pass
+
+        @dbus.service.signal(MANAGER_IFACE, signature="uoss")
+        def JobRemoved(self, job_id, job, name, result):
+            pass
+
+        @dbus.service.method(CONTROL_IFACE, in_signature="sssub")
+        def AddUnit(self, name, state, substate, pid, emit):
+            self.units[str(name)] = FakeUnit(self, str(name), str(state), str(substate), int(pid))
+            if emit:
+                self.UnitNew(name, unit_path(str(name)))
+
+        @dbus.service.method(CONTROL_IFACE, in_signature="s")
+        def RemoveUnit(self, name):
+            unit = self.units.pop(str(name))
+            unit.remove_from_connection()
+            self.UnitRemoved(name, unit_path(str(name)))
+
+        @dbus.service.method(CONTROL_IFACE, in_signature="sssub")
+        def SetState(self, name, state, substate, pid, emit):
+            """Change the state of a unit, with its signals if emit, sent
+            like systemd does: the Service interface first"""
+            unit = self.units[str(name)]
+            unit.state, unit.substate = str(state), str(substate)
+            pid_changed = unit.pid != int(pid)
+            unit.pid = int(pid)
+            if emit:
+                if pid_changed:
+                    unit.PropertiesChanged(SERVICE_IFACE, {"ExecMainPID": dbus.UInt32(pid)}, [])
+                unit.PropertiesChanged(UNIT_IFACE, {"ActiveState": state, "SubState": substate}, [])
+
+        @dbus.service.method(CONTROL_IFACE, in_signature="s")
+        def FinishJob(self, name):
+            self.JobRemoved(dbus.UInt32(1), dbus.ObjectPath(SYSTEMD_PATH + "/job/1"), name, "done")
+
+        @dbus.service.method(CONTROL_IFACE, out_signature="a{su}")
+        def Calls(self):
+            return dict(self.calls)
+
+    DBusGMainLoop(set_as_default=True)
+    bus = dbus.SessionBus()
+    manager = FakeManager(bus)
+    for name, state, substate, pid in units:
+        manager.units[name] = FakeUnit(manager, name, state, substate, pid)
+    # The name is owned as long as its BusName is referenced
+    manager.bus_name = dbus.service.BusName(SYSTEMD_BUS_NAME, bus)
+    print("ready", flush=True)
+    GLib.MainLoop().run()
+
+
+@unittest.skipIf(dbus is None or shutil.which("dbus-daemon") is None,
+                 "needs dbus-python, PyGObject and dbus-daemon")
+class TestSystemdUnitTracker(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.daemon = subprocess.Popen(["dbus-daemon", "--session", "--nofork",
+                                       "--print-address=1"],
+                                      stdout=subprocess.PIPE, universal_newlines=True)
+        cls.address = cls.daemon.stdout.readline().strip()
+        os.environ["DBUS_SESSION_BUS_ADDRESS"] = cls.address
+        DBusGMainLoop(set_as_default=True)
+        cls.context = GLib.MainContext.default()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.daemon.terminate()
+        cls.daemon.wait()
+
+    def setUp(self):
+        from framework.utils.systemd_units import SystemdUnitTracker
+
+        self.fake = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--fake-systemd",
+                                      json.dumps(UNITS)],
+                                     stdout=subprocess.PIPE, universal_newlines=True)
+        self.assertEqual(self.fake.stdout.readline().strip(), "ready")
+        self.bus = dbus.bus.BusConnection(self.address)
+        self.control = dbus.Interface(self.bus.get_object(SYSTEMD_BUS_NAME, SYSTEMD_PATH),
+                                      dbus_interface=CONTROL_IFACE)
+        self.changes = []
+        self.tracker = SystemdUnitTracker(self.bus, self.context, MONITORED,
+                                          self._on_change, reconcile_interval=3600)
+        self.started = self.tracker.start()
+
+    def tearDown(self):
+        self.tracker.stop()
+        self.bus.close()
+        self.fake.terminate()
+        self.fake.wait()
+
+    def _on_change(self, unit, previous):
+        self.changes.append((unit.name, previous and previous.state, unit.state, unit.pid))
+
+    def _pump(self, condition, timeout=5):
+        """Dispatch signals and process them until condition() holds"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            while self.context.iteration(False):
+                pass
+            self.tracker.process()
+            if condition():
+                return True
+            time.sleep(0.01)
+        return condition()
+
+    def _calls(self):
+        return {str(method): int(count) for method, count in self.control.Calls().items()}
+
+    def test_start(self):
+        started = {unit.name: unit for unit in self.started}
+        self.assertEqual(set(started), {"sspl-ll.service", "rabbitmq-server.service",
+                                        "hare-consul-agent.service",
+                                        "m0d@0x7200000000000001.service"})
+        sspl = started["sspl-ll.service"]
+        self.assertEqual((sspl.state, sspl.substate, sspl.pid), ("active", "running", "101"))
+        self.assertEqual(sspl.path, unit_path("sspl-ll.service"))
+        self.assertEqual(started["rabbitmq-server.service"].state, "failed")
+        # Not loaded
+        consul = started["hare-consul-agent.service"]
+        self.assertEqual((consul.path, consul.state, consul.substate), (None, "inactive", "dead"))
+        self.assertEqual(self.changes, [])
+
+        # One ListUnits and a GetAll of each interface of the loaded units
+        self.assertEqual(self._calls(), {"Subscribe": 1, "ListUnits": 1, "GetAll": 6})
+
+    def test_properties_changed(self):
+        self.control.SetState("sspl-ll.service", "activating", "auto-restart", 0, True)
+        self.control.SetState("sspl-ll.service", "active", "running", 201, True)
+        self.assertTrue(self._pump(lambda: len(self.changes) == 2))
+        self.assertEqual(self.changes, [("sspl-ll.service", "active", "activating", "0"),
+                                        ("sspl-ll.service", "activating", "active", "201")])
+        # Read from the signals alone
+        self.assertEqual(self._calls()["GetAll"], 6)
+
+    def test_unmonitored_units_ignored(self):
+        self.control.SetState("sshd.service", "failed", "failed", 0, True)
+        self.control.AddUnit("chronyd.service", "active", "running", 301, True)
+        self.control.SetState("sspl-ll.service", "failed", "failed", 0, True)
+        self.assertTrue(self._pump(lambda: self.changes))
+        self.assertEqual([change[0] for change in self.changes], ["sspl-ll.service"])
+        self.assertNotIn("sshd.service", self.tracker.units)
+        self.assertNotIn("chronyd.service", self.tracker.units)
+
+    def test_unit_new(self):
+        # A named service loaded once started, and a new wildcard match
+        self.control.AddUnit("hare-consul-agent.service", "active", "running", 401, True)
+        self.control.AddUnit("m0d@0x7200000000000002.service", "activating", "start", 402, True)
+        self.assertTrue(self._pump(lambda: len(self.changes) == 2))
+        self.assertEqual(sorted(self.changes),
+                         [("hare-consul-agent.service", "inactive", "active", "401"),
+                          ("m0d@0x7200000000000002.service", "inactive", "activating", "402")])
+
+        self.control.SetState("m0d@0x7200000000000002.service", "active", "running", 402, True)
+        self.assertTrue(self._pump(lambda: len(self.changes) == 3))
+        self.assertEqual(self.changes[-1], ("m0d@0x7200000000000002.service",
+                                            "activating", "active", "402"))
+
+    def test_unit_removed(self):
+        self.control.SetState("rabbitmq-server.service", "inactive", "dead", 0, True)
+        self.control.RemoveUnit("rabbitmq-server.service")
+        self.assertTrue(self._pump(lambda: self.tracker.units["rabbitmq-server.service"].path is None))
+        self.assertEqual(self.tracker.units["rabbitmq-server.service"].state, "inactive")
+
+        # Loaded again later
+        self.control.AddUnit("rabbitmq-server.service", "active", "running", 501, True)
+        self.assertTrue(self._pump(lambda: len(self.changes) == 2))
+        self.assertEqual(self.changes[-1], ("rabbitmq-server.service", "inactive", "active", "501"))
+
+    def test_job_removed(self):
+        # A job finished without PropertiesChanged, the unit is read again
+        self.control.SetState("rabbitmq-server.service", "active", "running", 601, False)
+        self.control.FinishJob("rabbitmq-server.service")
+        self.assertTrue(self._pump(lambda: self.changes))
+        self.assertEqual(self.changes, [("rabbitmq-server.service", "failed", "active", "601")])
+        self.assertEqual(self._calls()["GetAll"], 8)
+
+    def test_reconcile(self):
+        # Signals missed, only the sweep sees the changes
+        self.control.SetState("sspl-ll.service", "failed", "failed", 0, False)
+        self.control.AddUnit("m0d@0x7200000000000003.service", "active", "running", 701, False)
+        self._pump(lambda: False, timeout=0.5)
+        self.assertEqual(self.changes, [])
+
+        self.tracker.reconcile()
+        self.assertTrue(self._pump(lambda: len(self.changes) == 2))
+        self.assertEqual(sorted(self.changes),
+                         [("m0d@0x7200000000000003.service", "inactive", "active", "701"),
+                          ("sspl-ll.service", "active", "failed", "0")])
+        self.assertEqual(self._calls()["ListUnits"], 2)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--fake-systemd":
+        run_fake_systemd([tuple(unit) for unit in json.loads(sys.argv[2])])
+    else:
+        unittest.main()
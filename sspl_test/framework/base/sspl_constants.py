@@ -31,6 +31,10 @@ SSPL_STORE_TYPE = 'consul'
 CONSUL_HOST = '127.0.0.1'
 CONSUL_PORT = '8500'
 CONSUL_PATH = '/usr/bin/'
+WAIT_BEFORE_RETRY = 5
+CONSUL_ERR_STRING = '500 No cluster leader'
+# Serve configuration reads from an in-memory copy of the consul keys
+SSPL_CONFIG_SNAPSHOT = 'true'
 
 # required only for init
 component = 'sspl_test/config'
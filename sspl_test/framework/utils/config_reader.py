@@ -23,7 +23,8 @@ import os
 import sys
 import consul
 import configparser
-from sspl_test.framework.base.sspl_constants import component, file_store_config_path, SSPL_STORE_TYPE, StoreTypes, CONSUL_HOST, CONSUL_PORT
+from sspl_test.framework.base.sspl_constants import component, file_store_config_path, SSPL_STORE_TYPE, StoreTypes, CONSUL_HOST, CONSUL_PORT, SSPL_CONFIG_SNAPSHOT
+from sspl_test.framework.utils.config_snapshot import shared_snapshot
 from sspl_test.framework.utils.service_logging import logger
 
 class ConfigReader(object):
@@ -40,6 +41,7 @@ class ConfigReader(object):
         @param config: configuration file name
         """
         self.store = None
+        self.snapshot = None
         try:
             store_type = os.getenv('SSPL_STORE_TYPE', SSPL_STORE_TYPE)
             if store_type == StoreTypes.FILE.value:
@@ -49,6 +51,8 @@ class ConfigReader(object):
                 host = os.getenv('CONSUL_HOST', CONSUL_HOST)
                 port = os.getenv('CONSUL_PORT', CONSUL_PORT)
                 self.store = consul.Consul(host=host, port=port)
+                if os.getenv('SSPL_CONFIG_SNAPSHOT', SSPL_CONFIG_SNAPSHOT).lower() == 'true':
+                    self.snapshot = shared_snapshot(self.store, component + '/')
             else:
                 raise Exception("{} type store is not supported".format(store_type))
 
@@ -77,7 +81,10 @@ class ConfigReader(object):
             if self.store is not None and isinstance(self.store, configparser.RawConfigParser):
                 value = self.store.get(section, key)
             elif self.store is not None and isinstance(self.store, consul.Consul):
-                value = self.kv_get(component + '/' + section + '/' + key)
+                if self.snapshot is not None:
+                    value = self.snapshot.get(component + '/' + section + '/' + key)
+                else:
+                    value = self.kv_get(component + '/' + section + '/' + key)
             else:
                 raise Exception("{} Invalid store type object.".format(self.store))
         except (RuntimeError, Exception) as e:
@@ -133,6 +140,8 @@ class ConfigReader(object):
         try:
             if self.store is not None and isinstance(self.store, configparser.RawConfigParser):
                 pairs = self.store.items(section)
+            elif self.snapshot is not None:
+                pairs = self.snapshot.items(component + '/' + section + '/')
             elif self.store is not None and isinstance(self.store, consul.Consul):
                 pairs = self.kv_get(component + '/' + section + '/', recurse=True)
             else:
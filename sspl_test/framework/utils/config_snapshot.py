@@ -0,0 +1,134 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       In-memory snapshot of the configuration kept in consul
+
+                     All keys under a prefix are loaded with one recursive
+                     read and served from memory. A watcher thread keeps the
+                     snapshot current with consul blocking queries, so
+                     configuration changes still reach running modules.
+ ****************************************************************************
+"""
+
+import pickle
+import threading
+import time
+
+import requests
+
+from sspl_test.framework.base.sspl_constants import WAIT_BEFORE_RETRY, CONSUL_ERR_STRING
+from sspl_test.framework.utils.service_logging import logger
+
+
+class ConfigSnapshot(object):
+    """Snapshot of every consul key below prefix"""
+
+    # How long a blocking query waits for a change before it is reissued
+    WATCH_WAIT = '60s'
+
+    def __init__(self, consul_conn, prefix):
+        self._consul_conn = consul_conn
+        self._prefix = prefix
+        # Replaced as a whole on refresh, readers never see a partial update
+        self._values = None
+        self._index = None
+        self._watcher = None
+
+    def _fetch(self, index=None):
+        """Recursive read of the prefix, blocking until the consul index
+        moves past index if given. Returns (index, {key: value})."""
+        if index is None:
+            index, items = self._consul_conn.kv.get(self._prefix, recurse=True)
+        else:
+            index, items = self._consul_conn.kv.get(self._prefix, recurse=True,
+                                                    index=index, wait=self.WATCH_WAIT)
+        values = {}
+        for item in items or []:
+            value = item.get("Value")
+            if value is not None:
+                try:
+                    value = pickle.loads(value)
+                except:
+                    pass
+            values[item["Key"]] = value
+        return index, values
+
+    def load(self):
+        """Load the snapshot, returns False if consul could not be read"""
+        try:
+            self._index, self._values = self._fetch()
+        except Exception as err:
+            logger.warn(f"ConfigSnapshot, unable to load {self._prefix}: {err}, "
+                        "reading keys one by one")
+            return False
+        logger.debug(f"ConfigSnapshot, loaded {len(self._values)} keys of {self._prefix}")
+        return True
+
+    def is_loaded(self):
+        return self._values is not None
+
+    def get(self, key):
+        """Value of key, None when the key does not exist"""
+        return self._values.get(key.lstrip('/'))
+
+    def items(self, prefix):
+        """(key, value) pairs of the keys below prefix"""
+        prefix = prefix.lstrip('/')
+        return [(key[len(prefix):], value) for key, value in sorted(self._values.items())
+                if key.startswith(prefix)]
+
+    def watch(self):
+        """Start following changes in the background"""
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch_loop,
+                                             name="sspl-config-watch", daemon=True)
+            self._watcher.start()
+
+    def _watch_loop(self):
+        while True:
+            try:
+                index, values = self._fetch(self._index or 0)
+                if index != self._index:
+                    if self._index is not None and values != self._values:
+                        logger.info(f"ConfigSnapshot, configuration under {self._prefix} changed")
+                    self._values = values
+                    self._index = index
+            except requests.exceptions.ConnectionError as connerr:
+                logger.warn(f"ConfigSnapshot, consul connection refused: {connerr}")
+                time.sleep(WAIT_BEFORE_RETRY)
+            except Exception as gerr:
+                if CONSUL_ERR_STRING != str(gerr):
+                    logger.warn(f"ConfigSnapshot, error watching {self._prefix}: {gerr}")
+                time.sleep(WAIT_BEFORE_RETRY)
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def shared_snapshot(consul_conn, prefix):
+    """Loaded and watched snapshot of prefix shared by the whole process,
+    None if it could not be loaded"""
+    with _snapshots_lock:
+        snapshot = _snapshots.get(prefix)
+        if snapshot is None:
+            snapshot = ConfigSnapshot(consul_conn, prefix)
+            if not snapshot.load():
+                return None
+            snapshot.watch()
+            _snapshots[prefix] = snapshot
+        return snapshot